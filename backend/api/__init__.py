@@ -9,6 +9,7 @@ from api.drevents import drevents_bp
 from api.auth import auth_bp
 from api.ports import ports_bp
 from api.vo_dashboard import vo_dashboard_bp
+from api.metrics import metrics_bp
 
 
 def register_blueprints(app: Flask):
@@ -23,3 +24,4 @@ def register_blueprints(app: Flask):
     app.register_blueprint(contracts_bp, url_prefix="/api/contracts")
     app.register_blueprint(ports_bp, url_prefix="/api/ports")
     app.register_blueprint(vo_dashboard_bp, url_prefix="/api/vo")
+    app.register_blueprint(metrics_bp, url_prefix="/api/metrics")
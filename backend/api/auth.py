@@ -4,15 +4,17 @@ from datetime import datetime, timedelta
 from typing import Dict, Any
 from db.dynamoClient import DynamoClient
 from boto3.dynamodb.conditions import Attr, Key
-from decimal import Decimal
 import hashlib
 import jwt
 import secrets
 import re
 import config
-from middleware.auth_service import AuthService
+from middleware.auth_service import AuthService, prepare_user_data_from_dynamo
+from json_provider import requires_json_provider
+from services.vo_dashboard import invalidate_vo_dashboard_for_users
 
 auth_bp = Blueprint("auth", __name__)
+requires_json_provider(auth_bp)
 
 # Initialize DynamoDB client
 dynamoDB_client = DynamoClient(
@@ -28,31 +30,6 @@ auth_service = AuthService(dynamo_client=dynamoDB_client)
 
 
 # Helper functions
-def convert_decimals(obj):
-    """Convert Decimal objects to float for JSON serialization"""
-    if isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: convert_decimals(value) for key, value in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-
-def prepare_user_data_from_dynamo(data: dict) -> dict:
-    """Prepare user data from DynamoDB for User model"""
-    # Convert Decimals
-    data = convert_decimals(data)
-
-    # Convert ISO datetime strings to datetime objects
-    if "createdAt" in data and isinstance(data["createdAt"], str):
-        data["createdAt"] = datetime.fromisoformat(data["createdAt"])
-    if "updatedAt" in data and isinstance(data["updatedAt"], str):
-        data["updatedAt"] = datetime.fromisoformat(data["updatedAt"])
-
-    return data
-
-
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -184,7 +161,7 @@ def refresh_token():
         if not user_data:
             return jsonify({"error": "User not found"}), 404
 
-        # Convert Decimals before creating User object
+        # Normalize DynamoDB types before creating the User object
         user_data = prepare_user_data_from_dynamo(user_data)
         user = User(**user_data)
 
@@ -431,7 +408,7 @@ def get_current_user():
         if not user_data:
             return jsonify({"error": "User not found"}), 404
 
-        # Convert Decimals before creating User object
+        # Normalize DynamoDB types before creating the User object
         user_data = prepare_user_data_from_dynamo(user_data)
         user = User(**user_data)
 
@@ -446,9 +423,6 @@ def get_current_user():
         if user_data.get("currentVesselId") == "":
             user_data["currentVesselId"] = None
 
-        # Ensure all Decimals are converted
-        user_data = convert_decimals(user_data)
-
         return jsonify(user_data), 200
 
     except Exception as e:
@@ -516,6 +490,7 @@ def patch_current_user():
         updated = dynamoDB_client.update_item(
             key={"id": user_id}, update_data=update_data
         )
+        invalidate_vo_dashboard_for_users([user_id])
         user_data = prepare_user_data_from_dynamo(updated)
         user = User(**user_data)
         if not user.active:
@@ -527,7 +502,7 @@ def patch_current_user():
         # Normalize empty currentVesselId to None for JSON
         if out.get("currentVesselId") == "":
             out["currentVesselId"] = None
-        return jsonify(convert_decimals(out)), 200
+        return jsonify(out), 200
 
     except Exception as e:
         return jsonify({"error": "Failed to update user", "details": str(e)}), 500
@@ -1,27 +1,46 @@
+from boto3.dynamodb.conditions import Key
 from flask import Blueprint, jsonify, request
 from models.charger import Charger
 import decimal
 import config
 from db.dynamoClient import DynamoClient
+from api.pagination import ListParamsError, list_response, parse_list_params, read_page
+from http_cache import conditional_get
 
 chargers_bp = Blueprint("chargers", __name__)
 
+CHARGER_SORT_FIELDS = ("chargingStationId", "chargerType", "maxRate", "status")
+
 dynamoDB_client = DynamoClient(
     table_name=config.CHARGERS_TABLE, region_name=config.AWS_REGION
 )
 
 
 @chargers_bp.route("", methods=["GET"])
+@conditional_get(config.CHARGERS_TABLE)
 def get_chargers():
     """Get all chargers, optionally filtered by station"""
     station_id = request.args.get("stationId")
 
-    chargers = dynamoDB_client.scan_items()
+    try:
+        params = parse_list_params(request.args, sort_fields=CHARGER_SORT_FIELDS)
+    except ListParamsError as error:
+        return jsonify({"error": error.message}), error.status_code
 
     if station_id:
-        chargers = [c.to_dict() for c in chargers if c.chargingStationId == station_id]
-
-    return jsonify(chargers), 200
+        chargers, last_key = read_page(
+            dynamoDB_client,
+            params,
+            key_condition=Key("chargingStationId").eq(station_id),
+            index_name="chargingStationId-index",
+            projection=params.projection(),
+        )
+    else:
+        chargers, last_key = read_page(
+            dynamoDB_client, params, projection=params.projection()
+        )
+
+    return jsonify(list_response(chargers, params, last_key)), 200
 
 
 @chargers_bp.route("/<charger_id>", methods=["GET"])
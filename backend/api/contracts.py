@@ -1,10 +1,13 @@
 from flask import Blueprint, jsonify, request
 from boto3.dynamodb.conditions import Key
 from db.dynamoClient import DynamoClient
+from json_provider import requires_json_provider
+from api.pagination import ListParamsError, list_response, parse_list_params
+from http_cache import conditional_get
 from middleware.auth import require_auth, require_role, require_user_type
 from models.user import UserType
 from services.bookings import BookingService, BookingServiceError
-from services.contracts import ContractService, ContractServiceError, convert_decimals
+from services.contracts import ContractService, ContractServiceError
 from services.eligibility import EligibilityService
 import config
 
@@ -13,10 +16,32 @@ _vessels_client = DynamoClient(
 )
 
 contracts_bp = Blueprint("contracts", __name__)
+requires_json_provider(contracts_bp)
 contract_service = ContractService()
 eligibility_service = EligibilityService()
 booking_service = BookingService()
 
+# Eligibility of pending contracts reads across these tables.
+MY_CONTRACTS_TABLES = (
+    config.CONTRACTS_TABLE,
+    config.VESSELS_TABLE,
+    config.DREVENTS_TABLE,
+    config.BOOKINGS_TABLE,
+    config.CHARGERS_TABLE,
+    config.STATIONS_TABLE,
+    config.MEASUREMENTS_TABLE,
+)
+
+CONTRACT_SORT_FIELDS = (
+    "createdAt",
+    "startTime",
+    "endTime",
+    "status",
+    "vesselName",
+    "energyAmount",
+    "totalValue",
+)
+
 
 def _get_current_user_id():
     caller = request.current_user or {}
@@ -48,22 +73,32 @@ def _get_owned_vessel_ids(user_id: str):
     return [v["id"] for v in vessels] if vessels else []
 
 
-def _get_current_eligibility(contract):
-    dr_event = contract_service.drevent_repository.get_event(contract.get("drEventId"))
+def _get_current_eligibility(contract, use_cache=False, dr_events=None):
+    """Evaluate the contract's vessel against its DR event.
+
+    ``use_cache`` serves the result from the shared per-event eligibility
+    cache; ``dr_events`` memoizes event reads across one request.
+    """
+    event_id = contract.get("drEventId")
+    if dr_events is not None and event_id in dr_events:
+        dr_event = dr_events[event_id]
+    else:
+        dr_event = contract_service.drevent_repository.get_event(event_id)
+        if dr_events is not None:
+            dr_events[event_id] = dr_event
     if not dr_event:
         return None
 
     try:
-        eligibility_result = eligibility_service.evaluate_vessels_for_event(
-            dr_event,
-            include_ineligible=True,
+        if use_cache:
+            return eligibility_service.get_vessel_eligibility(
+                dr_event, contract.get("vesselId")
+            )
+        return eligibility_service.evaluate_vessel_for_event(
+            contract.get("vesselId"), dr_event
         )
     except Exception:
         return None
-    for vessel_result in eligibility_result.get("vessels", []):
-        if vessel_result.get("vesselId") == contract.get("vesselId"):
-            return vessel_result
-    return None
 
 
 def _resolve_caller_vessel_ids() -> list[str]:
@@ -106,19 +141,30 @@ def _build_booking_context(contract: dict) -> dict:
 @contracts_bp.route("", methods=["GET"])
 @require_auth
 @require_role("ADMIN")
+@conditional_get(config.CONTRACTS_TABLE)
 def get_contracts():
     """Get all contracts with optional filtering"""
     try:
         status_filter = request.args.get("status")
         vessel_id = request.args.get("vesselId")
-        filtered_contracts = contract_service.list_contracts(
-            status_filter=status_filter,
-            vessel_id=vessel_id,
-        )
-
-        return jsonify(convert_decimals(filtered_contracts)), 200
-
-    except ContractServiceError as error:
+        params = parse_list_params(request.args, sort_fields=CONTRACT_SORT_FIELDS)
+        if params.paginated:
+            filtered_contracts, last_key = contract_service.list_contracts_page(
+                params.limit,
+                params.start_key,
+                status_filter=status_filter,
+                vessel_id=vessel_id,
+            )
+        else:
+            filtered_contracts = contract_service.list_contracts(
+                status_filter=status_filter,
+                vessel_id=vessel_id,
+            )
+            last_key = None
+
+        return jsonify(list_response(filtered_contracts, params, last_key)), 200
+
+    except (ContractServiceError, ListParamsError) as error:
         return jsonify({"error": error.message}), error.status_code
     except Exception as e:
         return (
@@ -134,7 +180,7 @@ def get_contract(contract_id: str):
     """Get a specific contract by ID"""
     try:
         contract = contract_service.get_contract(contract_id)
-        return jsonify(convert_decimals(contract)), 200
+        return jsonify(contract), 200
 
     except ContractServiceError as error:
         return jsonify({"error": error.message}), error.status_code
@@ -153,12 +199,10 @@ def create_contract():
 
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "message": "Contract created successfully",
-                        "contract": contract,
-                    }
-                )
+                {
+                    "message": "Contract created successfully",
+                    "contract": contract,
+                }
             ),
             201,
         )
@@ -177,12 +221,10 @@ def update_contract(contract_id: str):
         contract = contract_service.update_contract(contract_id, data)
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "message": "Contract updated successfully",
-                        "contract": contract,
-                    }
-                )
+                {
+                    "message": "Contract updated successfully",
+                    "contract": contract,
+                }
             ),
             200,
         )
@@ -201,12 +243,10 @@ def cancel_contract(contract_id: str):
 
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "message": "Contract cancelled successfully",
-                        "contract": contract,
-                    }
-                )
+                {
+                    "message": "Contract cancelled successfully",
+                    "contract": contract,
+                }
             ),
             200,
         )
@@ -225,12 +265,10 @@ def complete_contract(contract_id: str):
 
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "message": "Contract completed successfully",
-                        "contract": contract,
-                    }
-                )
+                {
+                    "message": "Contract completed successfully",
+                    "contract": contract,
+                }
             ),
             200,
         )
@@ -243,6 +281,9 @@ def complete_contract(contract_id: str):
 
 @contracts_bp.route("/my-contracts", methods=["GET"])
 @require_auth
+@conditional_get(
+    *MY_CONTRACTS_TABLES, time_bucket_seconds=config.ELIGIBILITY_CACHE_TTL_SECONDS
+)
 def get_my_contracts():
     """Get contracts for the authenticated vessel operator"""
     try:
@@ -268,6 +309,7 @@ def get_my_contracts():
             all_contracts.extend(vessel_contracts)
 
         visible_contracts = []
+        dr_events = {}
         for contract in all_contracts:
             if contract.get("status") != "pending":
                 visible_contracts.append(contract)
@@ -277,7 +319,9 @@ def get_my_contracts():
                 visible_contracts.append(contract)
                 continue
 
-            eligibility = _get_current_eligibility(contract)
+            eligibility = _get_current_eligibility(
+                contract, use_cache=True, dr_events=dr_events
+            )
             if eligibility and not eligibility.get("eligible"):
                 continue
 
@@ -287,7 +331,7 @@ def get_my_contracts():
             visible_contracts.append(contract_with_eligibility)
 
         visible_contracts.sort(key=lambda c: str(c.get("createdAt") or ""), reverse=True)
-        return jsonify(convert_decimals(visible_contracts)), 200
+        return jsonify(visible_contracts), 200
 
     except ContractServiceError as error:
         return jsonify({"error": error.message}), error.status_code
@@ -326,13 +370,11 @@ def accept_contract(contract_id: str):
 
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "message": "Contract accepted successfully",
-                        "contract": contract,
-                        "bookingContext": booking_context,
-                    }
-                )
+                {
+                    "message": "Contract accepted successfully",
+                    "contract": contract,
+                    "bookingContext": booking_context,
+                }
             ),
             200,
         )
@@ -369,12 +411,10 @@ def get_contract_booking_context(contract_id: str):
         booking_context = _build_booking_context(contract)
         return (
             jsonify(
-                convert_decimals(
-                    {
-                        "contract": contract,
-                        "bookingContext": booking_context,
-                    }
-                )
+                {
+                    "contract": contract,
+                    "bookingContext": booking_context,
+                }
             ),
             200,
         )
@@ -407,9 +447,7 @@ def decline_contract(contract_id: str):
         contract = contract_service.decline_contract(contract_id, vessel_ids)
         return (
             jsonify(
-                convert_decimals(
-                    {"message": "Contract declined successfully", "contract": contract}
-                )
+                {"message": "Contract declined successfully", "contract": contract}
             ),
             200,
         )
@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify, request
+import json
+from flask import Blueprint, Response, jsonify, request
 from threading import Event, Lock, Thread
 
 from middleware.auth import require_auth, require_user_type
@@ -6,13 +7,19 @@ from services.bookings import BookingService, BookingServiceError
 from services.contracts import ContractService
 from services.drevents import DREventService, DREventServiceError
 from services.eligibility import EligibilityService
+from services.analytics import CLOSED_EVENT_STATUSES
 from services.dr.dispatcher import _dispatch_loop
+from services.dr.live import END_OF_STREAM, LiveFeedFullError, dr_live_feed
 from models.drevent import EventStatus
 from models.user import UserType
 from db.dynamoClient import DynamoClient
+from json_provider import encode_value, requires_json_provider
+from api.pagination import ListParamsError, list_response, parse_list_params
+from http_cache import conditional_get
 import config
 
 drevents_bp = Blueprint("drevents", __name__)
+requires_json_provider(drevents_bp)
 
 contract_service = ContractService()
 drevent_service = DREventService()
@@ -22,6 +29,26 @@ _dispatch_lock = Lock()
 _running_dispatch_event_ids: set[str] = set()
 _dispatch_stop_signals: dict[str, Event] = {}
 
+# Tables behind the monitoring and analytics snapshots.
+SNAPSHOT_TABLES = (
+    config.DREVENTS_TABLE,
+    config.MEASUREMENTS_TABLE,
+    config.CONTRACTS_TABLE,
+    config.STATIONS_TABLE,
+)
+# The snapshots cover a window ending now, so they also age with the clock.
+SNAPSHOT_TIME_BUCKET_SECONDS = 30
+
+DREVENT_SORT_FIELDS = (
+    "startTime",
+    "endTime",
+    "status",
+    "stationId",
+    "pricePerKwh",
+    "targetEnergyKwh",
+    "createdAt",
+)
+
 
 def _mark_dispatch_running(event_id: str) -> Event | None:
     with _dispatch_lock:
@@ -42,6 +69,11 @@ def _request_dispatch_stop(event_id: str) -> bool:
         return True
 
 
+def _is_dispatching_here(event_id: str) -> bool:
+    with _dispatch_lock:
+        return event_id in _running_dispatch_event_ids
+
+
 def _clear_dispatch_running(event_id: str) -> None:
     with _dispatch_lock:
         _running_dispatch_event_ids.discard(event_id)
@@ -101,12 +133,21 @@ def _start_dispatch_loop_async(
 
 @drevents_bp.route("", methods=["GET"])
 @require_auth
+@conditional_get(config.DREVENTS_TABLE)
 def get_drevents():
     """Get all DR events, optionally filtered by status."""
     try:
         status_filter = request.args.get("status")
-        return jsonify(drevent_service.list_events(status_filter=status_filter)), 200
-    except DREventServiceError as error:
+        params = parse_list_params(request.args, sort_fields=DREVENT_SORT_FIELDS)
+        if params.paginated:
+            events, last_key = drevent_service.list_events_page(
+                params.limit, params.start_key, status_filter=status_filter
+            )
+        else:
+            events = drevent_service.list_events(status_filter=status_filter)
+            last_key = None
+        return jsonify(list_response(events, params, last_key)), 200
+    except (DREventServiceError, ListParamsError) as error:
         return jsonify({"error": error.message}), error.status_code
     except Exception as error:
         return (
@@ -117,6 +158,7 @@ def get_drevents():
 
 @drevents_bp.route("/monitoring", methods=["GET"])
 @require_auth
+@conditional_get(*SNAPSHOT_TABLES, time_bucket_seconds=SNAPSHOT_TIME_BUCKET_SECONDS)
 def get_drevent_monitoring():
     """Get monitoring metrics for DR events."""
     try:
@@ -142,6 +184,7 @@ def get_drevent_monitoring():
 
 @drevents_bp.route("/analytics", methods=["GET"])
 @require_auth
+@conditional_get(*SNAPSHOT_TABLES, time_bucket_seconds=SNAPSHOT_TIME_BUCKET_SECONDS)
 def get_drevent_analytics():
     """Get historical analytics metrics for DR events."""
     try:
@@ -181,6 +224,97 @@ def get_drevent_by_id(event_id):
         )
 
 
+def _sse_message(message: dict) -> str:
+    data = json.dumps(message, default=encode_value, separators=(",", ":"))
+    return f"event: {message['type']}\ndata: {data}\n\n"
+
+
+def _stream_reachable(event_id: str) -> bool:
+    """Whether this worker receives the event's ticks."""
+    return dr_live_feed.shared or _is_dispatching_here(event_id)
+
+
+def _stream_still_live(event_id: str) -> bool:
+    """Whether a quiet stream should stay open: ticks reach it and still Active."""
+    if not _stream_reachable(event_id):
+        return False
+    try:
+        event = drevent_service.get_event(event_id)
+    except Exception:
+        return True
+    return str(event.get("status") or "") == EventStatus.ACTIVE.value
+
+
+@drevents_bp.route("/<event_id>/stream", methods=["GET"])
+@require_auth
+def stream_drevent(event_id):
+    """Stream live dispatch ticks for a DR event as Server-Sent Events.
+
+    Sends a ``snapshot`` of the running totals first, then one ``tick`` per
+    dispatch interval and a final ``end``.  With the Redis relay every worker
+    receives the ticks; without it only the process running the dispatch loop
+    does and any other answers 409.  A worker already holding
+    ``SSE_MAX_STREAMS`` streams answers 503.  In both cases the client polls
+    ``/api/drevents/monitoring`` instead.
+    """
+    try:
+        event = drevent_service.get_event(event_id)
+    except DREventServiceError as error:
+        return jsonify({"error": error.message}), error.status_code
+
+    if event.get("status") in CLOSED_EVENT_STATUSES:
+        return Response(
+            _sse_message(END_OF_STREAM),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    if not _stream_reachable(event_id):
+        return (
+            jsonify(
+                {
+                    "error": "Live stream is not available for this DR event here",
+                    "fallback": "/api/drevents/monitoring",
+                }
+            ),
+            409,
+        )
+
+    try:
+        subscription = dr_live_feed.subscribe(event_id)
+    except LiveFeedFullError:
+        return (
+            jsonify(
+                {
+                    "error": "Too many live streams are open",
+                    "fallback": "/api/drevents/monitoring",
+                }
+            ),
+            503,
+            {"Retry-After": str(config.SSE_KEEPALIVE_SECONDS)},
+        )
+
+    def events():
+        with subscription:
+            while True:
+                message = subscription.next_message(config.SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    if not _stream_still_live(event_id):
+                        yield _sse_message(END_OF_STREAM)
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message(message)
+                if message is END_OF_STREAM:
+                    return
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @drevents_bp.route("/<event_id>/eligibility", methods=["GET"])
 @require_auth
 def get_drevent_eligibility(event_id):
@@ -213,6 +347,29 @@ def get_drevent_eligibility(event_id):
         )
 
 
+@drevents_bp.route("/<event_id>/booking-plan", methods=["GET"])
+@require_auth
+@require_user_type(
+    UserType.POWER_OPERATOR, "Only power operators can preview booking plans"
+)
+def get_drevent_booking_plan(event_id):
+    """Preview the charger assignment plan for accepted contracts awaiting booking."""
+    try:
+        return jsonify(booking_service.plan_event_bookings(event_id)), 200
+    except BookingServiceError as error:
+        return jsonify({"error": error.message}), error.status_code
+    except Exception as error:
+        return (
+            jsonify(
+                {
+                    "error": "Failed to build booking plan",
+                    "details": str(error),
+                }
+            ),
+            500,
+        )
+
+
 @drevents_bp.route("", methods=["POST"])
 @require_auth
 @require_user_type(UserType.POWER_OPERATOR, "Only power operators can create DR events")
@@ -350,14 +507,10 @@ def start_drevent(event_id):
         if str(event.get("status") or "") != EventStatus.COMMITTED.value:
             return jsonify({"error": "Only committed DR events can be started"}), 400
 
-        contracts_client = DynamoClient(
-            table_name=config.CONTRACTS_TABLE, region_name=config.AWS_REGION
-        )
         valid_contracts = [
             contract
-            for contract in contracts_client.scan_items()
-            if str(contract.get("drEventId") or "") == event_id
-            and str(contract.get("status") or "").lower() == "active"
+            for contract in contract_service.repository.list_contracts_by_event(event_id)
+            if str(contract.get("status") or "").lower() == "active"
             and bool(str(contract.get("bookingId") or "").strip())
         ]
 
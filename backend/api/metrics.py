@@ -0,0 +1,42 @@
+import hmac
+
+from flask import Blueprint, Response, jsonify, request
+
+import config
+from local_metrics import collect
+from middleware.auth import decode_jwt_token
+from models.user import UserRole
+
+metrics_bp = Blueprint("metrics", __name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _scrape_allowed() -> bool:
+    if not config.METRICS_REQUIRE_AUTH:
+        return True
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return False
+    token = auth_header.split(" ", 1)[1]
+    if config.METRICS_TOKEN and hmac.compare_digest(token, config.METRICS_TOKEN):
+        return True
+    try:
+        payload = decode_jwt_token(token)
+    except ValueError:
+        return False
+    return payload.get("role") == UserRole.ADMIN.value
+
+
+@metrics_bp.route("", methods=["GET"])
+def get_metrics():
+    """Prometheus scrape endpoint for request and DynamoDB metrics.
+
+    Under Gunicorn the answer covers every worker, merged from the snapshots
+    in ``METRICS_MULTIPROC_DIR`` (other workers' are up to
+    ``METRICS_SNAPSHOT_SECONDS`` old).  In production the caller needs an
+    admin token or ``METRICS_TOKEN``.
+    """
+    if not _scrape_allowed():
+        return jsonify({"error": "Authentication required"}), 401
+    return Response(collect().render(), content_type=PROMETHEUS_CONTENT_TYPE)
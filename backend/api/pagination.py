@@ -0,0 +1,232 @@
+"""Pagination, field projection and sorting for list endpoints.
+
+List endpoints share these query parameters:
+
+* ``limit`` / ``cursor``: return one DynamoDB page of at most ``limit`` items,
+  starting after ``cursor``.  The body becomes
+  ``{"items": [...], "nextCursor": "..."}`` and ``nextCursor`` is ``null`` on
+  the last page.  Without either parameter the endpoint keeps returning a
+  plain list.  Endpoint filters run in DynamoDB as a ``FilterExpression``;
+  since DynamoDB filters after applying its ``Limit``, ``read_page`` keeps
+  reading until the page is full, so only the last page is short.
+* ``fields``: comma-separated attribute names to return; ``id`` is always
+  included.
+* ``sort`` / ``order``: order the items by one of the endpoint's sort fields,
+  ``asc`` (default) or ``desc``.  DynamoDB pages have no global order, so a
+  paginated response is sorted within the page.
+
+Cursors are the page's ``LastEvaluatedKey`` encoded as URL-safe base64 JSON;
+clients treat them as opaque.
+"""
+
+import base64
+import binascii
+import json
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import config
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ListParamsError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class ListParams:
+    limit: Optional[int] = None
+    start_key: Optional[Dict[str, Any]] = None
+    fields: Optional[Tuple[str, ...]] = None
+    sort: Optional[str] = None
+    descending: bool = False
+    paginated: bool = False
+
+    def projection(self, *required: Optional[str]) -> Optional[List[str]]:
+        """Attributes to read: the requested fields plus ``id``, the sort field
+        and any attributes the endpoint needs to filter on."""
+        if self.fields is None:
+            return None
+        names = ["id", *self.fields, self.sort, *required]
+        return list(dict.fromkeys(name for name in names if name))
+
+
+def _encode_key_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    raise TypeError(f"Unsupported cursor value: {type(value).__name__}")
+
+
+def _decode_key_value(obj: Dict[str, Any]) -> Any:
+    if set(obj) == {"$n"}:
+        return Decimal(obj["$n"])
+    return obj
+
+
+def encode_cursor(last_evaluated_key: Optional[Mapping[str, Any]]) -> Optional[str]:
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(
+        last_evaluated_key, default=_encode_key_value, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(
+            base64.urlsafe_b64decode(padded.encode()),
+            object_hook=_decode_key_value,
+        )
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ListParamsError("Invalid cursor")
+    if not isinstance(key, dict) or not key:
+        raise ListParamsError("Invalid cursor")
+    return key
+
+
+def parse_list_params(
+    args: Mapping[str, str],
+    sort_fields: Iterable[str] = (),
+    default_sort: Optional[str] = None,
+    default_order: str = "asc",
+) -> ListParams:
+    limit_raw = args.get("limit")
+    cursor = args.get("cursor")
+    paginated = bool(limit_raw or cursor)
+
+    limit = None
+    if paginated:
+        try:
+            limit = int(limit_raw) if limit_raw else config.LIST_PAGE_DEFAULT_LIMIT
+        except ValueError:
+            raise ListParamsError("limit must be an integer")
+        if limit < 1:
+            raise ListParamsError("limit must be at least 1")
+        limit = min(limit, config.LIST_PAGE_MAX_LIMIT)
+
+    fields = None
+    fields_raw = args.get("fields")
+    if fields_raw is not None:
+        fields = tuple(
+            dict.fromkeys(name.strip() for name in fields_raw.split(",") if name.strip())
+        )
+        invalid = [name for name in fields if not _FIELD_NAME.match(name)]
+        if not fields or invalid:
+            raise ListParamsError("fields must be a comma-separated list of attribute names")
+
+    sort = args.get("sort") or default_sort
+    if sort is not None and sort not in set(sort_fields):
+        raise ListParamsError(
+            "sort must be one of: " + ", ".join(sorted(sort_fields))
+        )
+    order = (args.get("order") or default_order).lower()
+    if order not in ("asc", "desc"):
+        raise ListParamsError("order must be asc or desc")
+
+    return ListParams(
+        limit=limit,
+        start_key=decode_cursor(cursor) if cursor else None,
+        fields=fields,
+        sort=sort,
+        descending=order == "desc",
+        paginated=paginated,
+    )
+
+
+def read_page(
+    client,
+    params: ListParams,
+    key_condition=None,
+    index_name: Optional[str] = None,
+    projection: Optional[List[str]] = None,
+    filter_expression=None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Read the items for ``params`` from a ``DynamoClient``.
+
+    Scans when ``key_condition`` is None, otherwise queries ``index_name``;
+    ``filter_expression`` (an ``Attr`` condition) is applied by DynamoDB.
+    Returns ``(items, last_evaluated_key)``.
+    """
+    if params.paginated:
+        items: List[Dict[str, Any]] = []
+        start_key = params.start_key
+        while True:
+            # Never ask for more than the page still needs, so the last key
+            # read is exactly where the next page starts.
+            remaining = params.limit - len(items)
+            if key_condition is None:
+                page, last_key = client.scan_page(
+                    remaining, start_key, projection, filter_expression
+                )
+            else:
+                page, last_key = client.query_page(
+                    key_condition,
+                    index_name=index_name,
+                    limit=remaining,
+                    exclusive_start_key=start_key,
+                    projection=projection,
+                    filter_expression=filter_expression,
+                )
+            items.extend(page)
+            if filter_expression is None or not last_key or len(items) >= params.limit:
+                return items, last_key
+            start_key = last_key
+    read_kwargs: Dict[str, Any] = {"projection": projection} if projection else {}
+    if filter_expression is not None:
+        read_kwargs["filter_expression"] = filter_expression
+    if key_condition is None:
+        return client.scan_items(**read_kwargs), None
+    return (
+        client.query_gsi(
+            index_name=index_name,
+            key_condition_expression=key_condition,
+            **read_kwargs,
+        ),
+        None,
+    )
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Order numbers (including numeric strings such as ``"22.0"``) before
+    other strings and anything else, so mixed-type attributes still sort."""
+    if isinstance(value, (int, float, Decimal)):
+        number: Optional[Decimal] = Decimal(str(value))
+    else:
+        try:
+            number = Decimal(str(value).strip()) if isinstance(value, str) else None
+        except ArithmeticError:
+            number = None
+    if number is not None and number.is_finite():
+        return 0, number
+    if isinstance(value, str):
+        return 1, value
+    return 2, repr(value)
+
+
+def list_response(
+    items: List[Dict[str, Any]],
+    params: ListParams,
+    last_evaluated_key: Optional[Mapping[str, Any]] = None,
+) -> Any:
+    """Sort and project ``items`` and wrap them in a page when paginated."""
+    if params.sort:
+        present = [item for item in items if item.get(params.sort) is not None]
+        missing = [item for item in items if item.get(params.sort) is None]
+        present.sort(
+            key=lambda item: _sort_key(item[params.sort]), reverse=params.descending
+        )
+        items = present + missing
+    if params.fields is not None:
+        keep = ("id", *params.fields)
+        items = [{name: item[name] for name in keep if name in item} for item in items]
+    if not params.paginated:
+        return items
+    return {"items": items, "nextCursor": encode_cursor(last_evaluated_key)}
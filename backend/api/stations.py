@@ -1,3 +1,4 @@
+from boto3.dynamodb.conditions import Attr
 from flask import Blueprint, jsonify, request
 from models.station import Station, StationStatus
 from db.dynamoClient import DynamoClient
@@ -5,34 +6,63 @@ from middleware.auth import require_auth
 from services.bookings import BookingService, BookingServiceError
 import decimal
 import config
+from cache import invalidate_namespace
+from api.pagination import ListParamsError, list_response, parse_list_params, read_page
+from http_cache import conditional_get
 
 stations_bp = Blueprint("stations", __name__)
 booking_service = BookingService()
 
+STATION_SORT_FIELDS = ("displayName", "city", "provinceOrState", "country", "status")
+
 dynamoDB_client = DynamoClient(
     table_name=config.STATIONS_TABLE, region_name=config.AWS_REGION
 )
 
 
 @stations_bp.route("", methods=["GET"])
+@conditional_get(config.STATIONS_TABLE)
 def get_stations():
-    """Get all stations, optionally filtered by city or status"""
+    """Get all stations, optionally filtered by city or status
+
+    The filters run in DynamoDB, so paginated responses stay full.
+    """
     city = request.args.get("city")
     status = request.args.get("status")
 
-    stations = list(dynamoDB_client.scan_items())
-
-    if city:
-        stations = [s for s in stations if s.city.lower() == city.lower()]
-
+    status_enum = None
     if status:
         try:
             status_enum = StationStatus[status.upper()]
-            stations = [s for s in stations if s.status == status_enum]
         except KeyError:
             return jsonify({"error": "Invalid status"}), 400
 
-    return jsonify(stations), 200
+    try:
+        params = parse_list_params(request.args, sort_fields=STATION_SORT_FIELDS)
+    except ListParamsError as error:
+        return jsonify({"error": error.message}), error.status_code
+
+    filter_expression = None
+    if city:
+        # DynamoDB compares case-sensitively; accept the usual spellings.
+        spellings = {city, city.lower(), city.upper(), city.title()}
+        filter_expression = Attr("city").is_in(sorted(spellings))
+    if status_enum is not None:
+        status_condition = Attr("status").eq(status_enum.value)
+        filter_expression = (
+            status_condition
+            if filter_expression is None
+            else filter_expression & status_condition
+        )
+
+    stations, last_key = read_page(
+        dynamoDB_client,
+        params,
+        projection=params.projection(),
+        filter_expression=filter_expression,
+    )
+
+    return jsonify(list_response(stations, params, last_key)), 200
 
 
 @stations_bp.route("/<station_id>", methods=["GET"])
@@ -105,6 +135,7 @@ def create_station():
 
     # Store station
     dynamoDB_client.put_item(item=station.to_dict())
+    invalidate_namespace("stations")
 
     return jsonify(station.to_dict()), 201
 
@@ -150,6 +181,7 @@ def update_station(station_id: str):
     updated_station_dict = dynamoDB_client.update_item(
         key={"id": station_id}, update_data=update_data
     )
+    invalidate_namespace("stations")
 
     return jsonify(updated_station_dict), 200
 
@@ -163,6 +195,7 @@ def delete_station(station_id: str):
         return jsonify({"error": "Station not found"}), 404
 
     dynamoDB_client.delete_item(key={"id": station_id})
+    invalidate_namespace("stations")
     return jsonify({"message": "Station deleted successfully"}), 200
 
 
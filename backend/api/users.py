@@ -3,6 +3,8 @@ from models.user import User, UserRole, UserType
 import hashlib
 import config
 from db.dynamoClient import DynamoClient
+from api.pagination import ListParamsError, list_response, parse_list_params, read_page
+from http_cache import conditional_get
 
 
 dynamoDB_client = DynamoClient(
@@ -11,12 +13,20 @@ dynamoDB_client = DynamoClient(
 
 users_bp = Blueprint("users", __name__)
 
+USER_SORT_FIELDS = ("displayName", "email", "role", "type", "orgId", "createdAt")
+
 
 @users_bp.route("", methods=["GET"])
+@conditional_get(config.USERS_TABLE)
 def get_users():
     """Get all users"""
-    users = dynamoDB_client.scan_items()
-    return jsonify(users), 200
+    try:
+        params = parse_list_params(request.args, sort_fields=USER_SORT_FIELDS)
+    except ListParamsError as error:
+        return jsonify({"error": error.message}), error.status_code
+
+    users, last_key = read_page(dynamoDB_client, params, projection=params.projection())
+    return jsonify(list_response(users, params, last_key)), 200
 
 
 @users_bp.route("/<user_id>", methods=["GET"])
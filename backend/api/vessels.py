@@ -1,5 +1,5 @@
 import decimal
-from datetime import datetime, timezone
+from datetime import datetime
 
 from boto3.dynamodb.conditions import Key
 from flask import Blueprint, jsonify, request
@@ -7,26 +7,29 @@ from flask import Blueprint, jsonify, request
 import config
 from db.dynamoClient import DynamoClient
 from models.vessel import Vessel
+from api.pagination import ListParamsError, list_response, parse_list_params, read_page
+from http_cache import conditional_get
+from services.eligibility import invalidate_eligibility_cache
+from services.telemetry import LATEST_SOC_FIELD, latest_soc_from_vessel
+from services.vo_dashboard import (
+    invalidate_vo_dashboard_for_users,
+    invalidate_vo_dashboard_for_vessels,
+)
 
 dynamoDB_client = DynamoClient(
     table_name=config.VESSELS_TABLE, region_name=config.AWS_REGION
 )
-_measurements_client = DynamoClient(
-    table_name=config.MEASUREMENTS_TABLE, region_name=config.AWS_REGION
-)
 
 vessels_bp = Blueprint("vessels", __name__)
 
-
-def _parse_measurement_timestamp(item: dict):
-    raw = item.get("timestamp") or item.get("createdAt")
-    if not raw:
-        return None
-    try:
-        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
-    except ValueError:
-        return None
-    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+VESSEL_SORT_FIELDS = (
+    "displayName",
+    "vesselType",
+    "chargerType",
+    "capacity",
+    "maxCapacity",
+    "createdAt",
+)
 
 
 def _to_float(value):
@@ -36,38 +39,9 @@ def _to_float(value):
         return None
 
 
-def _latest_soc_by_vessel_id() -> dict:
-    latest_soc = {}
-    try:
-        measurements = _measurements_client.scan_items()
-    except Exception:
-        return latest_soc
-
-    for measurement in measurements:
-        vessel_id = measurement.get("vesselId")
-        if not vessel_id:
-            continue
-
-        soc = _to_float(measurement.get("currentSOC"))
-        if soc is None:
-            continue
-
-        timestamp = _parse_measurement_timestamp(measurement)
-        if timestamp is None:
-            continue
-
-        current_best = latest_soc.get(vessel_id)
-        if current_best is None or timestamp > current_best["timestamp"]:
-            latest_soc[vessel_id] = {"timestamp": timestamp, "soc": soc}
-
-    return {
-        vessel_id: payload["soc"] for vessel_id, payload in latest_soc.items()
-    }
-
-
-def _enrich_vessel_payload(vessel: dict, latest_soc_lookup: dict) -> dict:
+def _enrich_vessel_payload(vessel: dict) -> dict:
     enriched = dict(vessel)
-    latest_soc = latest_soc_lookup.get(enriched.get("id"))
+    latest_soc = latest_soc_from_vessel(enriched)
     if latest_soc is None:
         return enriched
 
@@ -81,25 +55,32 @@ def _enrich_vessel_payload(vessel: dict, latest_soc_lookup: dict) -> dict:
 
 
 @vessels_bp.route("", methods=["GET"])
+@conditional_get(config.VESSELS_TABLE)
 def get_vessels():
     """Get all vessels, optionally filtered by userId"""
     user_id = request.args.get("userId")
 
+    try:
+        params = parse_list_params(request.args, sort_fields=VESSEL_SORT_FIELDS)
+    except ListParamsError as error:
+        return jsonify({"error": error.message}), error.status_code
+
+    # The SOC enrichment derives currentSoc and capacity from these attributes.
+    projection = params.projection(LATEST_SOC_FIELD, "maxCapacity")
     if user_id:
-        vessels = dynamoDB_client.query_gsi(
+        vessels, last_key = read_page(
+            dynamoDB_client,
+            params,
+            key_condition=Key("userId").eq(user_id),
             index_name="userId-index",
-            key_condition_expression=Key("userId").eq(user_id),
+            projection=projection,
         )
     else:
-        vessels = dynamoDB_client.scan_items()
+        vessels, last_key = read_page(dynamoDB_client, params, projection=projection)
 
-    latest_soc_lookup = _latest_soc_by_vessel_id()
-    vessels = [
-        _enrich_vessel_payload(vessel, latest_soc_lookup)
-        for vessel in vessels
-    ]
+    vessels = [_enrich_vessel_payload(vessel) for vessel in vessels]
 
-    return jsonify(vessels), 200
+    return jsonify(list_response(vessels, params, last_key)), 200
 
 
 @vessels_bp.route("/<vessel_id>", methods=["GET"])
@@ -109,7 +90,7 @@ def get_vessel(vessel_id: str):
     if not vessel:
         return jsonify({"error": "Vessel not found"}), 404
 
-    vessel = _enrich_vessel_payload(vessel, _latest_soc_by_vessel_id())
+    vessel = _enrich_vessel_payload(vessel)
 
     return jsonify(vessel), 200
 
@@ -166,6 +147,8 @@ def create_vessel():
         if key in vessel_dict and vessel_dict[key] is not None:
             vessel_dict[key] = decimal.Decimal(str(vessel_dict[key]))
     dynamoDB_client.put_item(vessel_dict)
+    invalidate_eligibility_cache()
+    invalidate_vo_dashboard_for_users([vessel_dict.get("userId")])
 
     # Prepare response: convert Decimal fields back to native types for JSON
     resp = vessel.to_dict()
@@ -237,6 +220,8 @@ def update_vessel(vessel_id: str):
     updated_vessel_dict = dynamoDB_client.update_item(
         key={"id": vessel_id}, update_data=update_data
     )
+    invalidate_eligibility_cache()
+    invalidate_vo_dashboard_for_vessels([vessel_id])
 
     updated_vessel = Vessel(**updated_vessel_dict)
     return jsonify(updated_vessel.to_dict()), 200
@@ -250,4 +235,6 @@ def delete_vessel(vessel_id: str):
         return jsonify({"error": "Vessel not found"}), 404
 
     dynamoDB_client.delete_item({"id": vessel_id})
+    invalidate_eligibility_cache()
+    invalidate_vo_dashboard_for_vessels([vessel_id])
     return jsonify({"message": "Vessel deleted successfully"}), 200
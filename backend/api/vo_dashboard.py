@@ -1,17 +1,27 @@
 """VO (Vessel Operator) dashboard API: aggregated metrics and current vessel."""
 
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+from time import perf_counter
 from typing import Any, Dict, List
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from boto3.dynamodb.conditions import Key
 
 from db.dynamoClient import DynamoClient
+from http_cache import conditional_get
+from json_provider import requires_json_provider
 from middleware.auth import require_auth
-from services.contracts import ContractService, convert_decimals
+from services.contracts import ContractService
+from services.telemetry import latest_soc_from_vessel
+from services.vo_dashboard import vo_dashboard_cache
+from timeutil import parse_iso, parse_utc
 import config
 
 vo_dashboard_bp = Blueprint("vo_dashboard", __name__)
+requires_json_provider(vo_dashboard_bp)
 
 _users_client = DynamoClient(table_name=config.USERS_TABLE, region_name=config.AWS_REGION)
 _vessels_client = DynamoClient(
@@ -28,13 +38,28 @@ _stations_client = DynamoClient(
 )
 contract_service = ContractService()
 
+DASHBOARD_TABLES = (
+    config.USERS_TABLE,
+    config.VESSELS_TABLE,
+    config.CONTRACTS_TABLE,
+    config.MEASUREMENTS_TABLE,
+    config.DREVENTS_TABLE,
+    config.STATIONS_TABLE,
+)
 
-def _parse_iso(dt_string):
-    if not dt_string:
-        return None
-    if isinstance(dt_string, datetime):
-        return dt_string
-    return datetime.fromisoformat(str(dt_string).replace("Z", "+00:00"))
+# Shared pool for the dashboard's independent DynamoDB reads.
+_dashboard_executor = ThreadPoolExecutor(
+    max_workers=config.VO_DASHBOARD_MAX_WORKERS, thread_name_prefix="vo-dashboard"
+)
+
+
+def _submit(fn, *args, **kwargs):
+    """Run ``fn`` on the dashboard pool in a copy of the caller's context.
+
+    The copy carries the Flask app context, so reads made on the pool land
+    in the request's DynamoDB call ledger.
+    """
+    return _dashboard_executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
 
 
 def _week_start_utc(dt):
@@ -56,10 +81,9 @@ def _weekly_earnings_from_contracts(contracts, now):
     for c in contracts:
         if c.get("status") != "completed":
             continue
-        end_dt = _parse_iso(c.get("endTime"))
-        if not end_dt:
+        end_utc = parse_utc(c.get("endTime"))
+        if not end_utc:
             continue
-        end_utc = end_dt if end_dt.tzinfo else end_dt.replace(tzinfo=timezone.utc)
         if not (week_start <= end_utc < week_end):
             continue
         weekday = end_utc.weekday()  # Monday=0, Sunday=6
@@ -74,50 +98,26 @@ def _weekly_earnings_from_contracts(contracts, now):
     }
 
 
-def _parse_measurement_timestamp(item: Dict[str, Any]) -> datetime | None:
-    raw = item.get("timestamp") or item.get("createdAt")
-    if not raw:
-        return None
-    try:
-        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
-    except ValueError:
-        return None
-    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-
-
-def _to_float(value: Any) -> float | None:
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _get_latest_soc_for_vessel(vessel_id: str) -> float | None:
-    latest_timestamp = None
-    latest_soc = None
-
-    try:
-        measurements = _measurements_client.scan_items()
-    except Exception:
-        return None
-
-    for item in measurements:
-        if item.get("vesselId") != vessel_id:
-            continue
-
-        timestamp = _parse_measurement_timestamp(item)
-        if timestamp is None:
-            continue
-
-        soc = _to_float(item.get("currentSOC"))
-        if soc is None:
-            continue
+class _StageTimer:
+    """Wall-clock timings per dashboard stage, reported in debug mode."""
 
-        if latest_timestamp is None or timestamp > latest_timestamp:
-            latest_timestamp = timestamp
-            latest_soc = soc
+    def __init__(self):
+        self._started_at = perf_counter()
+        self.stages: Dict[str, float] = {}
 
-    return latest_soc
+    @contextmanager
+    def stage(self, name: str):
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((perf_counter() - started_at) * 1000.0, 2)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            **self.stages,
+            "totalMs": round((perf_counter() - self._started_at) * 1000.0, 2),
+        }
 
 
 def _enrich_active_contract(payload: Dict[str, Any], raw_contract: Dict[str, Any]):
@@ -137,9 +137,27 @@ def _enrich_active_contract(payload: Dict[str, Any], raw_contract: Dict[str, Any
 
         payload["drEventStatus"] = event_status
 
+        # The station and the delivered energy only depend on the event and
+        # contract ids, so both reads go out together.
         station_id = dr_event.get("stationId")
-        if station_id:
-            station = _stations_client.get_item(key={"id": station_id})
+        contract_id = raw_contract.get("id")
+        station_future = (
+            _submit(_stations_client.get_item, key={"id": station_id})
+            if station_id
+            else None
+        )
+        measurements_future = (
+            _submit(
+                _measurements_client.query_gsi,
+                index_name="contractId-index",
+                key_condition_expression=Key("contractId").eq(contract_id),
+            )
+            if contract_id
+            else None
+        )
+
+        if station_future is not None:
+            station = station_future.result()
             if station:
                 payload["station"] = {
                     "id": station.get("id"),
@@ -150,12 +168,8 @@ def _enrich_active_contract(payload: Dict[str, Any], raw_contract: Dict[str, Any
                     "longitude": float(station.get("longitude") or 0),
                 }
 
-        contract_id = raw_contract.get("id")
-        if contract_id:
-            measurements = _measurements_client.query_gsi(
-                index_name="contractId-index",
-                key_condition_expression=Key("contractId").eq(contract_id),
-            )
+        if measurements_future is not None:
+            measurements = measurements_future.result()
             total_delivered_kwh = sum(
                 float(m.get("energyKwh") or 0) for m in measurements
             )
@@ -172,50 +186,91 @@ def _enrich_active_contract(payload: Dict[str, Any], raw_contract: Dict[str, Any
         pass
 
 
-@vo_dashboard_bp.route("/dashboard", methods=["GET"])
-@require_auth
-def get_vo_dashboard():
-    """Get VO dashboard: current vessel SoC, discharge rate, metrics, active contract."""
-    try:
-        user_id = request.current_user.get("user_id")
-        if user_id is None:
-            return jsonify({"error": "Authentication required"}), 401
-        user_id = str(user_id)
-
-        user_data = _users_client.get_item(key={"id": user_id})
-        if not user_data:
-            return jsonify({"error": "User not found"}), 404
+def _current_vessel_payload(vessel_data: Dict[str, Any]) -> Dict[str, Any]:
+    max_cap = float(vessel_data.get("maxCapacity") or 0)
+    latest_soc = latest_soc_from_vessel(vessel_data)
+    if latest_soc is not None and max_cap > 0:
+        soc = latest_soc
+        cap = (max_cap * latest_soc) / 100.0
+    else:
+        cap = float(vessel_data.get("capacity") or 0)
+        soc = (cap / max_cap * 100.0) if max_cap > 0 else None
+    return {
+        "id": vessel_data.get("id"),
+        "displayName": vessel_data.get("displayName") or "",
+        "socPercent": round(soc, 1) if soc is not None else None,
+        "dischargeRateKw": float(vessel_data.get("maxDischargeRate") or 0),
+        "capacityKwh": cap,
+        "maxCapacityKwh": max_cap,
+    }
 
-        current_vessel_id = (user_data.get("currentVesselId") or "").strip() or None
 
-        vessels = _vessels_client.query_gsi(
+def _active_contract_payload(active_contracts: List[Dict[str, Any]], now: datetime):
+    """Return (payload, raw contract) for the first active contract still running."""
+    for c in active_contracts:
+        end_utc = parse_utc(c.get("endTime"))
+        if not end_utc:
+            continue
+        if end_utc <= now:
+            continue
+        start_utc = parse_utc(c.get("startTime"))
+        payload = {
+            "id": c.get("id"),
+            "startTime": c.get("startTime"),
+            "endTime": c.get("endTime"),
+            "timeRemainingSeconds": max(0, int((end_utc - now).total_seconds())),
+            "timeWindowSeconds": (
+                max(0, int((end_utc - start_utc).total_seconds()))
+                if start_utc else None
+            ),
+            "estimatedEarnings": float(c.get("totalValue") or 0),
+            "energyAmountKwh": float(c.get("energyAmount") or 0),
+        }
+        return payload, c
+    return None, None
+
+
+def _load_dashboard_snapshot(
+    user_id: str, now: datetime, timer: _StageTimer
+) -> Dict[str, Any] | None:
+    """Read the user's vessels and contracts and aggregate the cacheable fields."""
+    with timer.stage("userAndVesselsMs"):
+        user_future = _submit(_users_client.get_item, key={"id": user_id})
+        vessels_future = _submit(
+            _vessels_client.query_gsi,
             index_name="userId-index",
             key_condition_expression=Key("userId").eq(user_id),
         )
-        vessel_ids = [v["id"] for v in vessels] if vessels else []
+        user_data = user_future.result()
+        vessels = vessels_future.result() or []
+    if not user_data:
+        return None
 
-        now = datetime.now(timezone.utc)
+    current_vessel_id = (user_data.get("currentVesselId") or "").strip() or None
+    vessel_ids = [v["id"] for v in vessels]
+
+    with timer.stage("contractsMs"):
+        contract_futures = [
+            _submit(contract_service.list_contracts, status_filter=None, vessel_id=vid)
+            for vid in vessel_ids
+        ]
 
         # If user has no current vessel but has vessels, set current to first vessel
         if not current_vessel_id and vessel_ids:
-            first_vessel_id = vessel_ids[0]
+            current_vessel_id = vessel_ids[0]
             _users_client.update_item(
                 key={"id": user_id},
                 update_data={
-                    "currentVesselId": first_vessel_id,
+                    "currentVesselId": current_vessel_id,
                     "updatedAt": now.isoformat(),
                 },
             )
-            current_vessel_id = first_vessel_id
-            user_data = _users_client.get_item(key={"id": user_id}) or user_data
 
         all_contracts = []
-        for vid in vessel_ids:
-            all_contracts.extend(
-                contract_service.list_contracts(status_filter=None, vessel_id=vid)
-            )
+        for contract_future in contract_futures:
+            all_contracts.extend(contract_future.result())
 
-        now = datetime.now(timezone.utc)
+    with timer.stage("aggregateMs"):
         contracts_completed = sum(
             1 for c in all_contracts if c.get("status") == "completed"
         )
@@ -231,73 +286,83 @@ def get_vo_dashboard():
         )
         weekly_earnings = _weekly_earnings_from_contracts(all_contracts, now)
 
-        active_contract = None
-        raw_active_contract = None
-        for c in all_contracts:
-            if c.get("status") != "active":
-                continue
-            end_dt = _parse_iso(c.get("endTime"))
-            if not end_dt:
-                continue
-            end_utc = end_dt if end_dt.tzinfo else end_dt.replace(tzinfo=timezone.utc)
-            if end_utc > now:
-                start_dt = _parse_iso(c.get("startTime"))
-                start_utc = (
-                    start_dt if start_dt and start_dt.tzinfo
-                    else start_dt.replace(tzinfo=timezone.utc) if start_dt
-                    else None
-                )
-                active_contract = {
-                    "id": c.get("id"),
-                    "startTime": c.get("startTime"),
-                    "endTime": c.get("endTime"),
-                    "timeRemainingSeconds": max(0, int((end_utc - now).total_seconds())),
-                    "timeWindowSeconds": (
-                        max(0, int((end_utc - start_utc).total_seconds()))
-                        if start_utc else None
-                    ),
-                    "estimatedEarnings": float(c.get("totalValue") or 0),
-                    "energyAmountKwh": float(c.get("energyAmount") or 0),
-                }
-                raw_active_contract = c
-                break
+    # The userId-index projects every attribute, so the current vessel is
+    # already in hand and needs no extra read.
+    vessel_data = next(
+        (v for v in vessels if current_vessel_id and v.get("id") == current_vessel_id),
+        None,
+    )
+    return {
+        "vesselIds": vessel_ids,
+        "weekStart": _week_start_utc(now).isoformat(),
+        "currentVessel": _current_vessel_payload(vessel_data) if vessel_data else None,
+        "activeContracts": [c for c in all_contracts if c.get("status") == "active"],
+        "metrics": {
+            "contractsCompleted": contracts_completed,
+            "totalKwhDischarged": round(total_kwh_discharged, 2),
+            "totalEarnings": round(total_earnings, 2),
+        },
+        "weeklyEarnings": weekly_earnings,
+    }
+
+
+@vo_dashboard_bp.route("/dashboard", methods=["GET"])
+@require_auth
+@conditional_get(
+    *DASHBOARD_TABLES, time_bucket_seconds=config.VO_DASHBOARD_LIVE_TTL_SECONDS
+)
+def get_vo_dashboard():
+    """Get VO dashboard: current vessel SoC, discharge rate, metrics, active contract."""
+    try:
+        user_id = request.current_user.get("user_id")
+        if user_id is None:
+            return jsonify({"error": "Authentication required"}), 401
+        user_id = str(user_id)
+        timer = _StageTimer()
+        now = datetime.now(timezone.utc)
+
+        generation = vo_dashboard_cache.generation(user_id)
+        vessel_versions = vo_dashboard_cache.vessel_versions(user_id)
+        snapshot = vo_dashboard_cache.get_snapshot(user_id)
+        cache_hit = (
+            snapshot is not None
+            and snapshot["weekStart"] == _week_start_utc(now).isoformat()
+        )
+        if not cache_hit:
+            snapshot = _load_dashboard_snapshot(user_id, now, timer)
+            if snapshot is None:
+                return jsonify({"error": "User not found"}), 404
+            vo_dashboard_cache.put_snapshot(
+                user_id, snapshot, snapshot["vesselIds"], generation, vessel_versions
+            )
 
+        active_contract, raw_active_contract = _active_contract_payload(
+            snapshot["activeContracts"], now
+        )
         if active_contract and raw_active_contract:
-            _enrich_active_contract(active_contract, raw_active_contract)
-
-        current_vessel_payload = None
-        if current_vessel_id and current_vessel_id in vessel_ids:
-            vessel_data = _vessels_client.get_item(key={"id": current_vessel_id})
-            if vessel_data:
-                max_cap = float(vessel_data.get("maxCapacity") or 0)
-                latest_soc = _get_latest_soc_for_vessel(current_vessel_id)
-                if latest_soc is not None and max_cap > 0:
-                    soc = latest_soc
-                    cap = (max_cap * latest_soc) / 100.0
-                else:
-                    cap = float(vessel_data.get("capacity") or 0)
-                    soc = (cap / max_cap * 100.0) if max_cap > 0 else None
-                current_vessel_payload = {
-                    "id": vessel_data.get("id"),
-                    "displayName": vessel_data.get("displayName") or "",
-                    "socPercent": round(soc, 1) if soc is not None else None,
-                    "dischargeRateKw": float(vessel_data.get("maxDischargeRate") or 0),
-                    "capacityKwh": cap,
-                    "maxCapacityKwh": max_cap,
-                }
+            with timer.stage("activeContractMs"):
+                contract_id = str(raw_active_contract.get("id") or "")
+                live = vo_dashboard_cache.get_live(user_id, contract_id)
+                if live is None:
+                    live_fields: Dict[str, Any] = {}
+                    _enrich_active_contract(live_fields, raw_active_contract)
+                    live = {"contractId": contract_id, "fields": live_fields}
+                    vo_dashboard_cache.put_live(user_id, live, generation)
+                active_contract.update(live["fields"])
 
         payload = {
-            "currentVessel": current_vessel_payload,
+            "currentVessel": snapshot["currentVessel"],
             "activeContract": active_contract,
-            "metrics": {
-                "contractsCompleted": contracts_completed,
-                "totalKwhDischarged": round(total_kwh_discharged, 2),
-                "totalEarnings": round(total_earnings, 2),
-            },
-            "weeklyEarnings": weekly_earnings,
+            "metrics": snapshot["metrics"],
+            "weeklyEarnings": snapshot["weeklyEarnings"],
             "updatedAt": now.isoformat(),
         }
-        return jsonify(convert_decimals(payload)), 200
+        if current_app.debug:
+            payload["debugTimings"] = {
+                **timer.as_dict(),
+                "snapshotCache": "hit" if cache_hit else "miss",
+            }
+        return jsonify(payload), 200
 
     except Exception as e:
         return jsonify({"error": "Failed to load dashboard", "details": str(e)}), 500
@@ -305,6 +370,9 @@ def get_vo_dashboard():
 
 @vo_dashboard_bp.route("/soc-history", methods=["GET"])
 @require_auth
+@conditional_get(
+    *DASHBOARD_TABLES, time_bucket_seconds=config.VO_DASHBOARD_LIVE_TTL_SECONDS
+)
 def get_weekly_soc_history():
     """
     Time-series SoC history for the authenticated user's current vessel.
@@ -341,16 +409,20 @@ def get_weekly_soc_history():
         now = datetime.now(timezone.utc)
         window_start = now - timedelta(days=7)
 
+        # Timestamps are stored with whatever offset the writer used, so the
+        # key range starts a day early and the exact window is applied below.
         try:
-            measurements: List[Dict[str, Any]] = _measurements_client.scan_items()
+            measurements: List[Dict[str, Any]] = _measurements_client.query_gsi(
+                index_name="vesselId-timestamp-index",
+                key_condition_expression=Key("vesselId").eq(current_vessel_id)
+                & Key("timestamp").gte((window_start - timedelta(days=1)).isoformat()),
+            )
         except Exception:
             measurements = []
 
         series: List[Dict[str, Any]] = []
         for item in measurements:
-            if item.get("vesselId") != current_vessel_id:
-                continue
-            ts = _parse_measurement_timestamp(item)
+            ts = parse_iso(item.get("timestamp"))
             if ts is None or ts < window_start or ts > now:
                 continue
 
@@ -380,7 +452,7 @@ def get_weekly_soc_history():
             "windowStart": window_start.isoformat(),
             "windowEnd": now.isoformat(),
         }
-        return jsonify(convert_decimals(payload)), 200
+        return jsonify(payload), 200
 
     except Exception as e:  # pragma: no cover - defensive logging path
         return (
@@ -2,45 +2,91 @@ from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+import config
 from api import register_blueprints
-from monitoring import record_request_end, record_request_start, setup_logging
+from http_cache import install_response_compression
+from json_provider import install_json_provider
+from local_metrics import start_metrics_snapshots
+from monitoring import (
+    logger,
+    record_request_end,
+    record_request_start,
+    setup_logging,
+    start_metrics_flusher,
+)
+from profiler import finish_request_profile, start_request_profile
+from rate_limits import limiter_settings
+from services.analytics import start_analytics_materializer
+from services.drevents import DREventService
 
 app = Flask(__name__)
+install_json_provider(app)
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 # Keep demo polling usable in production by matching the development defaults.
 default_limits = ["100000 per day", "5000 per hour"]
 
+# Storage and strategy come from config.RATELIMIT_* (see rate_limits.py).
 limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=default_limits,
-    storage_uri="memory://",
-    strategy="fixed-window",
+    **limiter_settings(),
 )
 
 # Register all API blueprints
 register_blueprints(app)
 
-# Set up structured logging (+ optional CloudWatch Logs)
-setup_logging()
+# Gzip JSON responses for clients that accept it
+install_response_compression(app)
+
+
+def init_process():
+    """Per-process setup: log handlers and background threads (idempotent)."""
+    # Set up structured logging (+ optional CloudWatch Logs)
+    setup_logging()
+
+    # Send buffered CloudWatch metrics off the request path
+    start_metrics_flusher()
+
+    # Share this worker's local metrics with the one that gets scraped
+    start_metrics_snapshots()
+
+    # Keep analytics rollups of closed DR events warm in the background (the
+    # materializer picks one leader among the server processes)
+    if config.ANALYTICS_MATERIALIZER_ENABLED:
+        start_analytics_materializer(DREventService())
+
+    if config.CACHE_BACKEND == "memory" and config.SERVER_PROCESSES > 1:
+        logger.warning(
+            "CACHE_BACKEND=memory with %d server processes: each keeps its own "
+            "cache; set CACHE_BACKEND=redis to share it",
+            config.SERVER_PROCESSES,
+        )
+
+
+# Under Gunicorn every worker runs this after the fork (gunicorn.conf.py), so
+# no thread or connection is started in the preloading master.
+if not config.DEFER_PROCESS_INIT:
+    init_process()
 
 
 # ---------------------------------------------------------------------------
-# Request lifecycle hooks for CloudWatch metrics
+# Request lifecycle hooks for CloudWatch metrics and ?__profile=1
 # ---------------------------------------------------------------------------
 
 
 @app.before_request
 def _before():
     record_request_start(g)
+    start_request_profile()
 
 
 @app.after_request
 def _after(response):
     if getattr(g, "request_start", None) is not None:
-        record_request_end(g, response, request.endpoint or request.path, request.method)
-    return response
+        record_request_end(g, response, request.endpoint, request.method)
+    return finish_request_profile(response)
 
 
 # ---------------------------------------------------------------------------
@@ -64,5 +110,6 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 
+# Development server only; production runs Gunicorn (see gunicorn.conf.py)
 if __name__ == "__main__":
     app.run(debug=True, port=5050)
@@ -0,0 +1,86 @@
+"""Service-level benchmarks over a seeded moto fleet.
+
+Every benchmark runs cold (in-process caches cleared before each round), so
+the numbers reflect a request that misses the caches.
+
+Run from this directory with ``python -m pytest`` (or ``make bench-backend``).
+Each run is saved under ``.benchmarks``; ``--benchmark-compare`` compares it
+against the previous run, and ``--benchmark-compare-fail=median:25%`` fails on
+regressions.
+"""
+
+from datetime import datetime, timedelta, timezone
+from threading import Event
+
+import pytest
+
+import config
+from db.dynamoClient import DynamoClient
+from services.bookings.service import BookingService
+from services.dr import dispatcher
+from services.drevents import DREventService
+from services.eligibility.service import EligibilityService
+from services.ports.repository import PortsRepository
+
+
+def test_eligibility_for_event(cold, fleet):
+    result = cold(EligibilityService().evaluate_vessels_for_event, fleet.active_event)
+
+    assert result["totalVesselsEvaluated"] == fleet.vessel_count
+
+
+def test_dispatch_tick(cold, fleet, monkeypatch):
+    # One tick: the loop stops at its first sleep, and post-event contract
+    # validation is left out of the timing.
+    monkeypatch.setattr(
+        dispatcher.contract_validation, "post_event_contract_validation", lambda c: None
+    )
+    events_client = DynamoClient(config.DREVENTS_TABLE, config.AWS_REGION)
+
+    def one_tick():
+        stop = Event()
+        monkeypatch.setattr(dispatcher.time, "sleep", lambda seconds: stop.set())
+        dispatcher._dispatch_loop(
+            fleet.active_event["id"], fleet.active_contracts, events_client, stop
+        )
+
+    cold(one_tick)
+
+
+def test_monitoring_snapshot(cold, fleet):
+    snapshot = cold(
+        DREventService().get_monitoring_snapshot, event_id=fleet.active_event["id"]
+    )
+
+    assert snapshot
+
+
+def test_analytics_snapshot(cold, fleet):
+    snapshot = cold(DREventService().get_analytics_snapshot, period_hours=24 * 30)
+
+    assert snapshot
+
+
+def test_booking_conflict_check(cold, fleet):
+    start = datetime.now(timezone.utc) + timedelta(hours=12)
+    availability = cold(
+        BookingService().get_station_availability,
+        fleet.station_ids[0],
+        start.isoformat(),
+        (start + timedelta(hours=2)).isoformat(),
+    )
+
+    assert availability["chargers"]
+
+
+@pytest.mark.parametrize("query", ["vancouver", "netherlands"])
+def test_port_search_by_name(cold, fleet, query):
+    ports = cold(PortsRepository().search_ports_by_name, query, limit=100)
+
+    assert ports
+
+
+def test_port_search_in_bbox(cold, fleet):
+    ports = cold(PortsRepository().get_ports_in_bbox, -130.0, 40.0, -110.0, 60.0)
+
+    assert isinstance(ports, list)
@@ -0,0 +1,81 @@
+"""Fixtures for the moto-backed benchmark suite.
+
+Tables are created from the test suite's ``_TABLE_DEFINITIONS`` (via
+``test/conftest.py``'s ``create_tables``), then seeded once per fleet size.
+
+Environment knobs:
+  BENCH_FLEET_SIZES              – comma-separated vessel counts (default: 100,1000;
+                                   add 10000 for the full run)
+  BENCH_MEASUREMENTS_PER_VESSEL  – measurements seeded per vessel (default: 10;
+                                   100 with 10000 vessels gives a million)
+  BENCH_PORTS                    – ports seeded for port search (default: 2000)
+  BENCH_ROUNDS                   – timed rounds per benchmark (default: 5)
+"""
+
+import importlib.util
+import os
+from pathlib import Path
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import config
+from fleet import seed_fleet
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def _load_test_tables():
+    path = Path(__file__).resolve().parent.parent / "test" / "conftest.py"
+    spec = importlib.util.spec_from_file_location("_test_tables", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.create_tables
+
+
+create_tables = _load_test_tables()
+
+FLEET_SIZES = [
+    int(size) for size in os.environ.get("BENCH_FLEET_SIZES", "100,1000").split(",") if size
+]
+MEASUREMENTS_PER_VESSEL = int(os.environ.get("BENCH_MEASUREMENTS_PER_VESSEL", "10"))
+PORT_COUNT = int(os.environ.get("BENCH_PORTS", "2000"))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", "5"))
+
+
+def reset_in_process_caches():
+    from cache import reset_cache
+    from local_metrics import registry
+    from services.dr.live import dr_live_feed
+
+    reset_cache()
+    dr_live_feed.clear()
+    registry.clear()
+
+
+@pytest.fixture(scope="session", params=FLEET_SIZES, ids=lambda size: f"{size}-vessels")
+def fleet(request):
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name=config.AWS_REGION)
+        create_tables(dynamodb)
+        yield seed_fleet(dynamodb, request.param, MEASUREMENTS_PER_VESSEL, PORT_COUNT)
+
+
+@pytest.fixture
+def cold(benchmark):
+    """Time ``fn`` with every in-process cache cleared before each round."""
+
+    def run(fn, *args, **kwargs):
+        return benchmark.pedantic(
+            fn,
+            args=args,
+            kwargs=kwargs,
+            setup=reset_in_process_caches,
+            rounds=ROUNDS,
+            iterations=1,
+        )
+
+    return run
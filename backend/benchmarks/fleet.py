@@ -0,0 +1,208 @@
+"""Synthetic fleet data for the benchmarks.
+
+``seed_fleet`` fills the moto tables with a fleet of ``vessel_count``
+vessels spread over ten stations.  Every vessel has one contract in one DR
+event (one event per hundred vessels, at least five; the first is Active, the
+rest Completed), one booking on a station charger, and
+``measurements_per_vessel`` measurements in its event.  Data is generated
+from a fixed seed so runs are comparable.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import config
+
+STATION_COUNT = 10
+CHARGERS_PER_STATION = 10
+CITIES = ["Victoria", "Vancouver", "Nanaimo", "Seattle", "Tacoma"]
+PORT_NAMES = ["Vancouver", "Victoria", "Valparaiso", "Rotterdam", "Hamburg", "Osaka"]
+
+
+@dataclass
+class Fleet:
+    vessel_count: int
+    measurement_count: int
+    station_ids: List[str] = field(default_factory=list)
+    active_event: Dict[str, Any] = field(default_factory=dict)
+    active_contracts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _d(value: float) -> Decimal:
+    return Decimal(str(round(value, 4)))
+
+
+def _write(dynamodb, table_name: str, items) -> int:
+    count = 0
+    with dynamodb.Table(table_name).batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+            count += 1
+    return count
+
+
+def seed_fleet(
+    dynamodb,
+    vessel_count: int,
+    measurements_per_vessel: int,
+    port_count: int,
+) -> Fleet:
+    rng = random.Random(vessel_count)
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    fleet = Fleet(vessel_count, vessel_count * measurements_per_vessel)
+
+    stations = [
+        {
+            "id": f"station-{index:03d}",
+            "displayName": f"Harbour {index}",
+            "city": CITIES[index % len(CITIES)],
+            "provinceOrState": "BC",
+            "country": "Canada",
+            "latitude": _d(48.4 + index * 0.05),
+            "longitude": _d(-123.4 + index * 0.05),
+            "status": 1,
+        }
+        for index in range(STATION_COUNT)
+    ]
+    fleet.station_ids = [station["id"] for station in stations]
+    _write(dynamodb, config.STATIONS_TABLE, stations)
+    _write(
+        dynamodb,
+        config.CHARGERS_TABLE,
+        (
+            {
+                "id": f"{station['id']}-charger-{index}",
+                "chargingStationId": station["id"],
+                "chargerType": "Type 2 AC",
+                "maxRate": "22.0",
+                "status": "active",
+            }
+            for station in stations
+            for index in range(CHARGERS_PER_STATION)
+        ),
+    )
+
+    event_count = max(5, vessel_count // 100)
+    events = []
+    for index in range(event_count):
+        start = now - timedelta(hours=2 + 6 * index)
+        events.append(
+            {
+                "id": f"dr-{index:05d}",
+                "stationId": fleet.station_ids[index % STATION_COUNT],
+                "status": "Active" if index == 0 else "Completed",
+                "startTime": start.isoformat(),
+                "endTime": (start + timedelta(hours=4)).isoformat(),
+                "targetEnergyKwh": _d(500),
+                "maxParticipants": 100,
+                "pricePerKwh": _d(0.25),
+                "details": {"requiredChargerType": "Type 2 AC", "minimumSoc": 20},
+            }
+        )
+    _write(dynamodb, config.DREVENTS_TABLE, events)
+    fleet.active_event = events[0]
+
+    vessels, contracts, bookings, measurements = [], [], [], []
+    for index in range(vessel_count):
+        vessel_id = f"vessel-{index:06d}"
+        event = events[index % event_count]
+        station = stations[index % STATION_COUNT]
+        soc = rng.uniform(40, 95)
+        vessels.append(
+            {
+                "id": vessel_id,
+                "userId": f"owner-{index % 50:03d}",
+                "displayName": f"Vessel {index}",
+                "vesselType": "ferry",
+                "chargerType": "Type 2 AC",
+                "capacity": _d(200 * soc / 100),
+                "maxCapacity": _d(200),
+                "maxDischargeRate": _d(20),
+                "maxChargeRate": _d(20),
+                "rangeMeters": _d(50_000),
+                "latitude": _d(float(station["latitude"]) + rng.uniform(-0.1, 0.1)),
+                "longitude": _d(float(station["longitude"]) + rng.uniform(-0.1, 0.1)),
+                "latestSoc": _d(soc),
+                "latestSocAt": now.isoformat(),
+                "active": True,
+                "createdAt": "2024-01-01T00:00:00",
+            }
+        )
+        contract = {
+            "id": f"contract-{index:06d}",
+            "vesselId": vessel_id,
+            "drEventId": event["id"],
+            "vesselName": f"Vessel {index}",
+            "energyAmount": _d(10),
+            "pricePerKwh": _d(0.25),
+            "totalValue": _d(2.5),
+            "startTime": event["startTime"],
+            "endTime": event["endTime"],
+            "status": "active" if event["status"] == "Active" else "completed",
+            "terms": "",
+            "createdAt": event["startTime"],
+            "createdBy": "pso-benchmark",
+        }
+        contracts.append(contract)
+        if event is fleet.active_event:
+            fleet.active_contracts.append(contract)
+
+        booking_start = now + timedelta(hours=rng.randrange(0, 72))
+        bookings.append(
+            {
+                "id": f"booking-{index:06d}",
+                "userId": vessels[-1]["userId"],
+                "vesselId": vessel_id,
+                "stationId": station["id"],
+                "chargerId": f"{station['id']}-charger-{rng.randrange(CHARGERS_PER_STATION)}",
+                "startTime": booking_start.isoformat(),
+                "endTime": (booking_start + timedelta(hours=2)).isoformat(),
+                "status": 2,
+            }
+        )
+
+        event_start = datetime.fromisoformat(event["startTime"])
+        for tick in range(measurements_per_vessel):
+            timestamp = event_start + timedelta(minutes=tick)
+            measurements.append(
+                {
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "vesselId": vessel_id,
+                    "contractId": contract["id"],
+                    "drEventId": event["id"],
+                    "timestamp": timestamp.isoformat(),
+                    "energyKwh": _d(rng.uniform(0.1, 0.4)),
+                    "powerKw": _d(rng.uniform(5, 20)),
+                    "currentSOC": _d(soc - tick * 0.1),
+                    "createdAt": timestamp.isoformat(),
+                }
+            )
+        # Flush measurements in chunks so millions never sit in memory at once
+        if len(measurements) >= 50_000:
+            _write(dynamodb, config.MEASUREMENTS_TABLE, measurements)
+            measurements = []
+
+    _write(dynamodb, config.VESSELS_TABLE, vessels)
+    _write(dynamodb, config.CONTRACTS_TABLE, contracts)
+    _write(dynamodb, config.BOOKINGS_TABLE, bookings)
+    _write(dynamodb, config.MEASUREMENTS_TABLE, measurements)
+    _write(
+        dynamodb,
+        config.PORTS_TABLE,
+        (
+            {
+                "id": f"port-{index:05d}",
+                "portId": f"port-{index:05d}",
+                "CITY": f"{PORT_NAMES[index % len(PORT_NAMES)]} {index}",
+                "COUNTRY": "Canada" if index % 3 else "Netherlands",
+                "LATITUDE": _d(rng.uniform(-60, 70)),
+                "LONGITUDE": _d(rng.uniform(-180, 180)),
+            }
+            for index in range(port_count)
+        ),
+    )
+    return fleet
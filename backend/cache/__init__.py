@@ -0,0 +1,26 @@
+"""Shared cache layer with in-process and Redis-compatible backends."""
+
+from .backends import MISSING, CacheBackend, InMemoryBackend, RedisBackend
+from .core import (
+    Cache,
+    bump_table_version,
+    cached,
+    get_cache,
+    invalidate_namespace,
+    reset_cache,
+    table_versions,
+)
+
+__all__ = [
+    "MISSING",
+    "Cache",
+    "CacheBackend",
+    "InMemoryBackend",
+    "RedisBackend",
+    "bump_table_version",
+    "cached",
+    "get_cache",
+    "invalidate_namespace",
+    "reset_cache",
+    "table_versions",
+]
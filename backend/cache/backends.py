@@ -0,0 +1,151 @@
+"""Storage backends for ``cache.Cache``.
+
+Backends store opaque Python values under string keys with an optional TTL
+and expose atomic counters (``incr``/``counter``) used for namespace
+versions.  ``get`` returns ``MISSING`` (not ``None``) for absent keys so
+``None`` results can be cached.
+"""
+
+import pickle
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+try:
+    import redis
+except ModuleNotFoundError:
+    redis = None
+
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    # True when every worker process sees the same data and counters.
+    shared: bool
+
+    def get(self, key: str) -> Any:
+        pass
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        pass
+
+    def counter(self, key: str) -> int:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryBackend:
+    """Thread-safe TTL + LRU store local to one process."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        # Counters (namespace versions) never expire and are never evicted.
+        self._counters: Dict[str, int] = {}
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at is not None and monotonic() >= expires_at:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = None if ttl_seconds is None else monotonic() + ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Backend speaking the Redis protocol, shared by every worker process.
+
+    Works with any client exposing redis-py's ``get``/``set``/``delete``/
+    ``incr`` (Redis, Valkey, KeyDB or a test stand-in).  Values are pickled,
+    so the server must only be reachable by trusted backends.
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        key_prefix: str = "aquacharge:",
+    ):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis package is required for the redis cache")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if ttl_seconds is None:
+            self.client.set(self._key(key), payload)
+        else:
+            self.client.set(
+                self._key(key), payload, px=max(1, int(ttl_seconds * 1000))
+            )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self._key(key)))
+
+    def counter(self, key: str) -> int:
+        raw = self.client.get(self._key(key))
+        return 0 if raw is None else int(raw)
+
+    def clear(self) -> None:
+        # Shared data is retired through namespace versions, never flushed.
+        pass
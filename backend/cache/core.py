@@ -0,0 +1,215 @@
+"""Namespaced cache with hit/miss counters and a memoization decorator.
+
+Keys live in namespaces (``"stations"``, ``"vessels"``...).  Each namespace
+has a version counter stored in the backend; ``invalidate_namespace`` bumps
+it, which retires every key in that namespace at once across all processes
+sharing the backend.  Backend failures are logged and treated as misses so a
+cache outage never fails a request.  Hits, misses and errors are also counted
+per namespace in ``local_metrics`` (``aquacharge_cache_*_total``).
+
+``table:<name>`` namespaces hold no entries: ``DynamoClient`` bumps them on
+every write, and their versions identify the state of a table (HTTP ETags are
+derived from them).
+"""
+
+import functools
+import inspect
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import config
+from local_metrics import observe_cache
+from monitoring import logger
+
+from .backends import MISSING, CacheBackend, InMemoryBackend, RedisBackend
+
+
+class Cache:
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        default_ttl_seconds: Optional[float] = None,
+    ):
+        self.backend = backend or InMemoryBackend()
+        self.default_ttl_seconds = (
+            config.CACHE_DEFAULT_TTL_SECONDS
+            if default_ttl_seconds is None
+            else default_ttl_seconds
+        )
+        self._stats_lock = Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, namespace: str, outcome: str) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(
+                namespace, {"hits": 0, "misses": 0, "errors": 0}
+            )
+            counters[outcome] += 1
+        observe_cache(namespace, outcome)
+
+    def namespace_version(self, namespace: str) -> int:
+        return self.backend.counter(f"ns:{namespace}")
+
+    def _versioned_key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{self.namespace_version(namespace)}:{key}"
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Return the cached value or ``MISSING``."""
+        try:
+            value = self.backend.get(self._versioned_key(namespace, key))
+        except Exception as error:
+            self._record(namespace, "errors")
+            logger.warning(
+                "Cache read failed",
+                extra={"namespace": namespace, "error": str(error)},
+            )
+            return MISSING
+        self._record(namespace, "misses" if value is MISSING else "hits")
+        return value
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            self.backend.set(self._versioned_key(namespace, key), value, ttl)
+        except Exception as error:
+            self._record(namespace, "errors")
+            logger.warning(
+                "Cache write failed",
+                extra={"namespace": namespace, "error": str(error)},
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self.backend.delete(self._versioned_key(namespace, key))
+        except Exception as error:
+            self._record(namespace, "errors")
+            logger.warning(
+                "Cache delete failed",
+                extra={"namespace": namespace, "error": str(error)},
+            )
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        try:
+            self.backend.incr(f"ns:{namespace}")
+        except Exception as error:
+            self._record(namespace, "errors")
+            logger.warning(
+                "Cache invalidation failed",
+                extra={"namespace": namespace, "error": str(error)},
+            )
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        value = self.get(namespace, key)
+        if value is MISSING:
+            value = loader()
+            self.set(namespace, key, value, ttl_seconds)
+        return value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            return {
+                namespace: dict(counters) for namespace, counters in self._stats.items()
+            }
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+
+_cache_lock = Lock()
+_cache: Optional[Cache] = None
+
+
+def _build_cache() -> Cache:
+    if config.CACHE_BACKEND == "redis":
+        backend: CacheBackend = RedisBackend(url=config.CACHE_REDIS_URL)
+    else:
+        backend = InMemoryBackend(max_entries=config.CACHE_MAX_ENTRIES)
+    return Cache(backend)
+
+
+def get_cache() -> Cache:
+    """Process-wide cache built from ``CACHE_BACKEND`` on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build_cache()
+    return _cache
+
+
+def reset_cache(cache: Optional[Cache] = None) -> None:
+    """Replace the process-wide cache (``None`` rebuilds it from config)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def invalidate_namespace(namespace: str) -> None:
+    get_cache().invalidate_namespace(namespace)
+
+
+def _table_namespace(table_name: str) -> str:
+    return f"table:{table_name}"
+
+
+def bump_table_version(table_name: str) -> None:
+    """Record a write to ``table_name`` so versions derived from it change."""
+    invalidate_namespace(_table_namespace(table_name))
+
+
+def table_versions(table_names: Iterable[str]) -> Optional[Tuple[int, ...]]:
+    """Current write versions of ``table_names``, or ``None`` if unavailable."""
+    cache = get_cache()
+    try:
+        return tuple(
+            cache.namespace_version(_table_namespace(name)) for name in table_names
+        )
+    except Exception as error:
+        logger.warning("Table version read failed", extra={"error": str(error)})
+        return None
+
+
+def cached(namespace: str, ttl_seconds: Optional[float] = None):
+    """Memoize a function or repository method in ``namespace``.
+
+    The key is the function's qualified name plus the ``repr`` of its
+    arguments; for methods ``self`` is skipped so every repository instance
+    shares entries.  The in-memory backend hands back the stored object, so
+    callers must treat cached results as read-only.
+    """
+
+    def decorator(func):
+        parameters = list(inspect.signature(func).parameters)
+        skip_self = bool(parameters) and parameters[0] == "self"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key_args = args[1:] if skip_self else args
+            key = (
+                f"{func.__module__}.{func.__qualname__}:"
+                f"{key_args!r}:{sorted(kwargs.items())!r}"
+            )
+            return get_cache().get_or_set(
+                namespace,
+                key,
+                lambda: func(*args, **kwargs),
+                ttl_seconds,
+            )
+
+        return wrapper
+
+    return decorator
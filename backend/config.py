@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 # ---------------------------------------------------------------------------
@@ -53,11 +54,109 @@ PORTS_TABLE = _table("ports")
 DREVENTS_TABLE = _table("drevents")
 ORGS_TABLE = _table("orgs")
 MEASUREMENTS_TABLE = _table("measurements")
+RATELIMITS_TABLE = _table("ratelimits")
+ANALYTICS_ROLLUPS_TABLE = _table("analyticsrollups")
 DR_START_ASYNC = _env_bool("DR_START_ASYNC", default=not _is_production_environment())
 DR_DISPATCH_INTERVAL_SECONDS = _env_int(
     "DR_DISPATCH_INTERVAL_SECONDS",
     default=60 if _is_production_environment() else 10,
 )
+ELIGIBILITY_CACHE_TTL_SECONDS = _env_int("ELIGIBILITY_CACHE_TTL_SECONDS", default=30)
+VO_DASHBOARD_MAX_WORKERS = _env_int("VO_DASHBOARD_MAX_WORKERS", default=8)
+VO_DASHBOARD_CACHE_TTL_SECONDS = _env_int("VO_DASHBOARD_CACHE_TTL_SECONDS", default=120)
+VO_DASHBOARD_LIVE_TTL_SECONDS = _env_int("VO_DASHBOARD_LIVE_TTL_SECONDS", default=5)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").strip().lower()
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_DEFAULT_TTL_SECONDS = _env_int("CACHE_DEFAULT_TTL_SECONDS", default=300)
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", default=10000)
+ANALYTICS_MATERIALIZER_ENABLED = _env_bool(
+    "ANALYTICS_MATERIALIZER_ENABLED", default=_is_production_environment()
+)
+ANALYTICS_MATERIALIZE_INTERVAL_SECONDS = _env_int(
+    "ANALYTICS_MATERIALIZE_INTERVAL_SECONDS", default=300
+)
+# Held by the one server process that runs the materializer.
+ANALYTICS_MATERIALIZER_LOCK_FILE = os.environ.get(
+    "ANALYTICS_MATERIALIZER_LOCK_FILE",
+    os.path.join(tempfile.gettempdir(), "aquacharge-analytics-materializer.lock"),
+)
+# Contract index reads can lag a write, so a rollup built this soon after an
+# invalidation is served but not stored.
+ANALYTICS_ROLLUP_SETTLE_SECONDS = _env_int("ANALYTICS_ROLLUP_SETTLE_SECONDS", default=10)
+# Per-vessel rollup entries per analytics rollups item (~200 B each, well
+# under DynamoDB's 400 KB item limit).
+ANALYTICS_ROLLUP_VESSELS_PER_ITEM = _env_int(
+    "ANALYTICS_ROLLUP_VESSELS_PER_ITEM", default=500
+)
+LIST_PAGE_DEFAULT_LIMIT = _env_int("LIST_PAGE_DEFAULT_LIMIT", default=50)
+LIST_PAGE_MAX_LIMIT = _env_int("LIST_PAGE_MAX_LIMIT", default=500)
+COMPRESS_MIN_BYTES = _env_int("COMPRESS_MIN_BYTES", default=1024)
+COMPRESS_LEVEL = _env_int("COMPRESS_LEVEL", default=6)
+SSE_KEEPALIVE_SECONDS = _env_int("SSE_KEEPALIVE_SECONDS", default=15)
+SSE_SUBSCRIBER_QUEUE_SIZE = _env_int("SSE_SUBSCRIBER_QUEUE_SIZE", default=100)
+LOCAL_METRICS_MAX_SERIES = _env_int("LOCAL_METRICS_MAX_SERIES", default=2000)
+# GET /api/metrics: when required, only admin tokens or the scraper's
+# METRICS_TOKEN (sent as a bearer token) may read it.
+METRICS_REQUIRE_AUTH = _env_bool(
+    "METRICS_REQUIRE_AUTH", default=_is_production_environment()
+)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "").strip()
+REQUEST_PROFILING_ENABLED = _env_bool("REQUEST_PROFILING_ENABLED", default=True)
+REQUEST_PROFILING_ADMIN_ONLY = _env_bool(
+    "REQUEST_PROFILING_ADMIN_ONLY", default=_is_production_environment()
+)
+PROFILE_SAMPLE_INTERVAL_MS = _env_int("PROFILE_SAMPLE_INTERVAL_MS", default=5)
+# API rate limiting (rate_limits.py). "memory://" keeps counters per process;
+# "redis://host:port" or "dynamodb://<table>" share them across workers.  With
+# CACHE_BACKEND=redis the limiter shares the cache's Redis; the DynamoDB table
+# (four synchronous calls per request) is opt-in.
+RATELIMIT_STORAGE_URI = os.environ.get(
+    "RATELIMIT_STORAGE_URI",
+    CACHE_REDIS_URL if CACHE_BACKEND == "redis" else "memory://",
+).strip()
+RATELIMIT_STRATEGY = (
+    os.environ.get("RATELIMIT_STRATEGY", "sliding-window-counter").strip().lower()
+)
+RATELIMIT_KEY_PREFIX = os.environ.get("RATELIMIT_KEY_PREFIX", f"aquacharge-{ENVIRONMENT}")
+# Production WSGI server (gunicorn.conf.py)
+WSGI_BIND = os.environ.get("WSGI_BIND", "0.0.0.0:5050")
+WSGI_WORKER_CLASS = os.environ.get("WSGI_WORKER_CLASS", "gthread").strip().lower()
+WSGI_WORKERS = _env_int("WSGI_WORKERS", default=os.cpu_count() or 1)
+WSGI_THREADS = _env_int("WSGI_THREADS", default=8)
+WSGI_WORKER_CONNECTIONS = _env_int("WSGI_WORKER_CONNECTIONS", default=1000)
+WSGI_KEEPALIVE_SECONDS = _env_int("WSGI_KEEPALIVE_SECONDS", default=5)
+WSGI_TIMEOUT_SECONDS = _env_int("WSGI_TIMEOUT_SECONDS", default=60)
+WSGI_GRACEFUL_TIMEOUT_SECONDS = _env_int("WSGI_GRACEFUL_TIMEOUT_SECONDS", default=30)
+WSGI_PRELOAD = _env_bool("WSGI_PRELOAD", default=True)
+WSGI_WARMUP_ENABLED = _env_bool("WSGI_WARMUP_ENABLED", default=True)
+# Open /stream connections each worker accepts.  A gthread stream holds one of
+# the WSGI_THREADS request threads, so by default half of them stay free.
+SSE_MAX_STREAMS = _env_int(
+    "SSE_MAX_STREAMS",
+    default=(
+        WSGI_WORKER_CONNECTIONS // 2
+        if WSGI_WORKER_CLASS == "gevent"
+        else max(1, WSGI_THREADS // 2)
+    ),
+)
+# Set by gunicorn.conf.py: log handlers and background threads start in each
+# worker after the fork instead of in the preloading master.
+DEFER_PROCESS_INIT = _env_bool("DEFER_PROCESS_INIT", default=False)
+# Processes serving requests.  State held in process memory (the in-memory
+# cache backend's table versions) only describes the whole server when this
+# is 1.
+SERVER_PROCESSES = WSGI_WORKERS if DEFER_PROCESS_INIT else 1
+# With several processes each one writes its metrics here every
+# METRICS_SNAPSHOT_SECONDS and GET /api/metrics merges them; empty disables it.
+METRICS_MULTIPROC_DIR = os.environ.get(
+    "METRICS_MULTIPROC_DIR",
+    (
+        os.path.join(tempfile.gettempdir(), "aquacharge-metrics")
+        if SERVER_PROCESSES > 1
+        else ""
+    ),
+).strip()
+METRICS_SNAPSHOT_SECONDS = _env_int("METRICS_SNAPSHOT_SECONDS", default=5)
 
 
 class Config:
@@ -0,0 +1,76 @@
+"""Per-request accounting of DynamoDB calls.
+
+``monitoring.record_request_start`` attaches a ``DynamoCallLedger`` to Flask
+``g``; every ``DynamoClient`` call made while that request's app context is
+active is appended to it, and ``record_request_end`` logs the summary
+(call count, RCUs/WCUs, time in DynamoDB, scans and per-table operation
+counts).  A handler issuing dozens of GetItems or a full Scan shows up in the
+request's log line.
+
+Calls made outside an app context (background dispatch, the analytics
+materializer) are not attributed to any request.  Executor threads have no
+app context of their own; work submitted through
+``contextvars.copy_context().run`` carries the request's and is attributed
+to it.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_app_context
+
+READ_OPERATIONS = frozenset(
+    {"GetItem", "BatchGetItem", "Query", "Scan", "TransactGetItems"}
+)
+
+
+@dataclass
+class DynamoCall:
+    operation: str
+    table: str
+    index: Optional[str]
+    latency_ms: float
+    item_count: int
+    capacity_units: float
+
+    @property
+    def is_read(self) -> bool:
+        return self.operation in READ_OPERATIONS
+
+
+@dataclass
+class DynamoCallLedger:
+    calls: List[DynamoCall] = field(default_factory=list)
+
+    def record(self, call: DynamoCall) -> None:
+        self.calls.append(call)
+
+    def summary(self) -> Dict[str, Any]:
+        operations = Counter(
+            f"{call.table}{'/' + call.index if call.index else ''}.{call.operation}"
+            for call in self.calls
+        )
+        return {
+            "dynamo_calls": len(self.calls),
+            "dynamo_rcu": round(sum(c.capacity_units for c in self.calls if c.is_read), 2),
+            "dynamo_wcu": round(
+                sum(c.capacity_units for c in self.calls if not c.is_read), 2
+            ),
+            "dynamo_ms": round(sum(c.latency_ms for c in self.calls), 2),
+            "dynamo_items": sum(c.item_count for c in self.calls),
+            "dynamo_scans": sum(1 for c in self.calls if c.operation == "Scan"),
+            "dynamo_operations": dict(operations.most_common()),
+        }
+
+
+def start_ledger(request_globals) -> DynamoCallLedger:
+    ledger = DynamoCallLedger()
+    request_globals.dynamo_ledger = ledger
+    return ledger
+
+
+def current_ledger() -> Optional[DynamoCallLedger]:
+    if not has_app_context():
+        return None
+    return g.get("dynamo_ledger")
@@ -1,15 +1,132 @@
+import time
+import weakref
+
 import boto3
 from botocore.exceptions import ClientError
 
+from cache import bump_table_version
+from db.callLedger import DynamoCall, current_ledger
+from local_metrics import observe_dynamodb_call
+
+_CALL_CONTEXT_KEY = "aquacharge_call"
+_CAPACITY_OPERATIONS = frozenset(
+    {
+        "GetItem",
+        "PutItem",
+        "UpdateItem",
+        "DeleteItem",
+        "Query",
+        "Scan",
+        "BatchGetItem",
+        "BatchWriteItem",
+        "TransactGetItems",
+        "TransactWriteItems",
+    }
+)
+# Every live client, so a freshly forked worker can open their connections.
+_clients = weakref.WeakSet()
+# TransactWriteItems takes at most 100 actions per request.
+TRANSACT_WRITE_MAX_ITEMS = 100
+
+
+def _start_call(params, model, context, **kwargs):
+    tables = dict(params.get("RequestItems") or {})
+    for action in params.get("TransactItems") or []:
+        for request in action.values():
+            tables.setdefault(request["TableName"], []).append(request)
+    if model.name not in _CAPACITY_OPERATIONS and not params.get("TableName"):
+        return  # account-level calls such as the warm-up's DescribeEndpoints
+    table = params.get("TableName") or (next(iter(tables)) if len(tables) == 1 else "batch")
+    if model.name in _CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    requested = sum(len(requests) for requests in tables.values()) if tables else 1
+    context[_CALL_CONTEXT_KEY] = (
+        table,
+        params.get("IndexName"),
+        model.name,
+        requested,
+        time.perf_counter(),
+    )
+
+
+def _item_count(operation: str, parsed: dict, requested: int) -> int:
+    if "Count" in parsed:
+        return parsed["Count"]
+    if operation == "GetItem":
+        return 1 if parsed.get("Item") else 0
+    if operation == "BatchGetItem":
+        return sum(len(items) for items in (parsed.get("Responses") or {}).values())
+    if operation == "BatchWriteItem":
+        unprocessed = parsed.get("UnprocessedItems") or {}
+        return requested - sum(len(requests) for requests in unprocessed.values())
+    return requested
+
+
+def _capacity_units(parsed: dict) -> float:
+    consumed = parsed.get("ConsumedCapacity") or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return float(sum(entry.get("CapacityUnits") or 0 for entry in consumed))
+
+
+def _finish_call(context, http_response=None, parsed=None, exception=None, **kwargs):
+    started = context.pop(_CALL_CONTEXT_KEY, None)
+    if started is None:
+        return
+    table, index, operation, requested, start = started
+    elapsed = time.perf_counter() - start
+    error = exception is not None or (
+        http_response is not None and http_response.status_code >= 400
+    )
+    observe_dynamodb_call(table, operation, elapsed, error)
+
+    ledger = current_ledger()
+    if ledger is not None:
+        parsed = parsed if not error and parsed else {}
+        ledger.record(
+            DynamoCall(
+                operation=operation,
+                table=table,
+                index=index,
+                latency_ms=round(elapsed * 1000, 3),
+                item_count=_item_count(operation, parsed, requested) if parsed else 0,
+                capacity_units=_capacity_units(parsed),
+            )
+        )
+
+
+def warm_up_clients() -> int:
+    """Warm up every live ``DynamoClient``; returns how many were warmed."""
+    clients = list(_clients)
+    for client in clients:
+        client.warm_up()
+    return len(clients)
+
 
 class DynamoClient:
     def __init__(self, table_name: str, region_name: str):
         self.dynamodb = boto3.resource("dynamodb", region_name=region_name)
+        self.table_name = table_name
         self.table = self.dynamodb.Table(table_name)
+        # Per-table call metrics for /api/metrics and the per-request ledger.
+        events = self.dynamodb.meta.client.meta.events
+        events.register("before-parameter-build.dynamodb", _start_call)
+        events.register("after-call.dynamodb", _finish_call)
+        events.register("after-call-error.dynamodb", _finish_call)
+        _clients.add(self)
+
+    def warm_up(self) -> None:
+        """Resolve credentials and open this client's connection to DynamoDB."""
+        self.dynamodb.meta.client.describe_endpoints()
+
+    def _record_write(self) -> None:
+        # Table versions back the HTTP ETags of endpoints reading this table.
+        bump_table_version(self.table_name)
 
     def put_item(self, item: dict):
         try:
             response = self.table.put_item(Item=item)
+            self._record_write()
             return response
         except Exception as e:
             print(f"Error putting item: {e}")
@@ -45,6 +162,7 @@ class DynamoClient:
                 params["ExpressionAttributeValues"] = expression_attribute_values
 
             response = self.table.put_item(**params)
+            self._record_write()
             return response
         except ClientError as e:
             if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
@@ -77,64 +195,193 @@ class DynamoClient:
             raise
 
     def scan_items(
-        self, filter_expression=None, expression_attribute_values=None
+        self, filter_expression=None, expression_attribute_values=None, projection=None
     ) -> list:
+        """Scan the whole table, following LastEvaluatedKey past the 1 MB page limit."""
         try:
-            if filter_expression and expression_attribute_values:
-                response = self.table.scan(
-                    FilterExpression=filter_expression,
-                    ExpressionAttributeValues=expression_attribute_values,
-                )
-            else:
-                response = self.table.scan()
-            return response.get("Items", [])
+            scan_params = self._projection_params(projection)
+            if filter_expression is not None:
+                scan_params["FilterExpression"] = filter_expression
+            if expression_attribute_values:
+                scan_params["ExpressionAttributeValues"] = expression_attribute_values
+
+            items = []
+            while True:
+                response = self.table.scan(**scan_params)
+                items.extend(response.get("Items", []))
+                last_evaluated_key = response.get("LastEvaluatedKey")
+                if not last_evaluated_key:
+                    return items
+                scan_params["ExclusiveStartKey"] = last_evaluated_key
         except Exception as e:
             print(f"Error scanning items: {e}")
             raise
 
+    @staticmethod
+    def _projection_params(projection=None) -> dict:
+        if not projection:
+            return {}
+        names = {f"#proj{i}": name for i, name in enumerate(projection)}
+        return {
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+
+    @classmethod
+    def _page_params(
+        cls, limit=None, exclusive_start_key=None, projection=None, filter_expression=None
+    ) -> dict:
+        params = cls._projection_params(projection)
+        if filter_expression is not None:
+            params["FilterExpression"] = filter_expression
+        if limit is not None:
+            params["Limit"] = limit
+        if exclusive_start_key:
+            params["ExclusiveStartKey"] = exclusive_start_key
+        return params
+
+    def scan_page(
+        self, limit=None, exclusive_start_key=None, projection=None, filter_expression=None
+    ) -> tuple:
+        """
+        Read a single scan page
+
+        Args:
+            limit: Maximum number of items to evaluate
+            exclusive_start_key: LastEvaluatedKey of the previous page
+            projection: Optional list of attribute names to return
+            filter_expression: Optional condition (use Attr() from
+                boto3.dynamodb.conditions); applied after ``limit`` items
+                are read, so a page can hold fewer than ``limit`` items
+
+        Returns:
+            (items, last_evaluated_key); the key is None on the last page
+        """
+        try:
+            response = self.table.scan(
+                **self._page_params(
+                    limit, exclusive_start_key, projection, filter_expression
+                )
+            )
+            return response.get("Items", []), response.get("LastEvaluatedKey")
+        except Exception as e:
+            print(f"Error scanning page: {e}")
+            raise
+
+    def query_page(
+        self,
+        key_condition_expression,
+        index_name=None,
+        limit=None,
+        exclusive_start_key=None,
+        projection=None,
+        filter_expression=None,
+    ) -> tuple:
+        """
+        Read a single query page from the table or one of its GSIs
+
+        Returns:
+            (items, last_evaluated_key); the key is None on the last page
+        """
+        try:
+            query_params = self._page_params(
+                limit, exclusive_start_key, projection, filter_expression
+            )
+            query_params["KeyConditionExpression"] = key_condition_expression
+            if index_name:
+                query_params["IndexName"] = index_name
+            response = self.table.query(**query_params)
+            return response.get("Items", []), response.get("LastEvaluatedKey")
+        except Exception as e:
+            print(f"Error querying page: {e}")
+            raise
+
     def delete_item(self, key: dict) -> dict:
         try:
             response = self.table.delete_item(Key=key)
+            self._record_write()
             return response
         except Exception as e:
             print(f"Error deleting item: {e}")
             raise
 
-    def update_item(self, key: dict, update_data: dict) -> dict:
-        try:
-            # Build the update expression and attribute values dynamically
-            update_expression_parts = []
-            expression_attribute_values = {}
-            expression_attribute_names = {}
+    @staticmethod
+    def _build_update_expression(update_data: dict) -> dict:
+        # Build the update expression and attribute values dynamically
+        update_expression_parts = []
+        expression_attribute_values = {}
+        expression_attribute_names = {}
 
-            for i, (field, value) in enumerate(update_data.items()):
-                placeholder = f":val{i}"
-                name_placeholder = f"#field{i}"
+        for i, (field, value) in enumerate(update_data.items()):
+            placeholder = f":val{i}"
+            name_placeholder = f"#field{i}"
 
-                update_expression_parts.append(f"{name_placeholder} = {placeholder}")
-                expression_attribute_values[placeholder] = value
-                expression_attribute_names[name_placeholder] = field
+            update_expression_parts.append(f"{name_placeholder} = {placeholder}")
+            expression_attribute_values[placeholder] = value
+            expression_attribute_names[name_placeholder] = field
 
-            update_expression = "SET " + ", ".join(update_expression_parts)
+        return {
+            "UpdateExpression": "SET " + ", ".join(update_expression_parts),
+            "ExpressionAttributeValues": expression_attribute_values,
+            "ExpressionAttributeNames": expression_attribute_names,
+        }
 
+    def update_item(self, key: dict, update_data: dict) -> dict:
+        try:
             response = self.table.update_item(
                 Key=key,
-                UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values,
-                ExpressionAttributeNames=expression_attribute_names,
                 ReturnValues="ALL_NEW",  # Returns the updated item
+                **self._build_update_expression(update_data),
             )
+            self._record_write()
 
             return response.get("Attributes", {})
         except Exception as e:
             print(f"Error updating item: {e}")
             raise
 
+    def update_item_conditional(
+        self,
+        key: dict,
+        update_data: dict,
+        condition_expression,
+    ) -> dict:
+        """
+        Update an item only if a condition is met.
+
+        Args:
+            key: Primary key of the item to update.
+            update_data: Attributes to SET.
+            condition_expression: A boto3 Attr condition evaluated against the stored item.
+
+        Returns:
+            The updated item, or None if the condition failed.
+        """
+        try:
+            response = self.table.update_item(
+                Key=key,
+                ConditionExpression=condition_expression,
+                ReturnValues="ALL_NEW",
+                **self._build_update_expression(update_data),
+            )
+            self._record_write()
+            return response.get("Attributes", {})
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            print(f"Error in conditional update: {e}")
+            raise
+        except Exception as e:
+            print(f"Error in conditional update: {e}")
+            raise
+
     def query_gsi(
         self,
         index_name: str,
         key_condition_expression,
         expression_attribute_values=None,
+        projection=None,
+        filter_expression=None,
     ) -> list:
         """
         Query a Global Secondary Index
@@ -143,22 +390,34 @@ class DynamoClient:
             index_name: Name of the GSI (e.g., "email-index")
             key_condition_expression: Condition expression (use Key() from boto3.dynamodb.conditions)
             expression_attribute_values: Optional values dict (only used with string expressions)
+            projection: Optional list of attribute names to return
+            filter_expression: Optional condition on non-key attributes
 
         Returns:
-            List of items matching the query
+            List of items matching the query, following LastEvaluatedKey
+            until every page has been read
         """
         try:
             query_params = {
                 "IndexName": index_name,
                 "KeyConditionExpression": key_condition_expression,
+                **self._projection_params(projection),
             }
+            if filter_expression is not None:
+                query_params["FilterExpression"] = filter_expression
 
             # Only add ExpressionAttributeValues if provided and not None
             if expression_attribute_values is not None:
                 query_params["ExpressionAttributeValues"] = expression_attribute_values
 
-            response = self.table.query(**query_params)
-            return response.get("Items", [])
+            items = []
+            while True:
+                response = self.table.query(**query_params)
+                items.extend(response.get("Items", []))
+                last_evaluated_key = response.get("LastEvaluatedKey")
+                if not last_evaluated_key:
+                    return items
+                query_params["ExclusiveStartKey"] = last_evaluated_key
         except Exception as e:
             print(f"Error querying GSI: {e}")
             raise
@@ -207,6 +466,7 @@ class DynamoClient:
                             unprocessed_items.append(req["PutRequest"]["Item"])
                             success_count -= 1
 
+            self._record_write()
             return {
                 "success_count": success_count,
                 "unprocessed_items": unprocessed_items,
@@ -215,6 +475,115 @@ class DynamoClient:
             print(f"Error in batch write: {e}")
             raise
 
+    def put_items_if_absent(self, items: list, key_attribute: str = "id") -> list:
+        """
+        Write the items whose key is not taken yet, 100 per TransactWriteItems.
+
+        Each put carries ``attribute_not_exists(<key>)``.  A transaction is
+        all-or-nothing, so when a chunk is cancelled by a failed condition the
+        items that already exist are dropped and the rest of the chunk is
+        written again.  Duplicate keys in ``items`` keep their first item.
+
+        Args:
+            items: List of dictionaries representing items to write
+            key_attribute: Partition key attribute of the table
+
+        Returns:
+            List of the keys that were written
+        """
+        try:
+            unique = list({item[key_attribute]: item for item in reversed(items)}.values())
+            unique.reverse()
+            written = []
+            for i in range(0, len(unique), TRANSACT_WRITE_MAX_ITEMS):
+                chunk = unique[i : i + TRANSACT_WRITE_MAX_ITEMS]
+                while chunk:
+                    taken = self._transact_put_if_absent(chunk, key_attribute)
+                    if taken is None:
+                        written.extend(item[key_attribute] for item in chunk)
+                        break
+                    chunk = [item for item in chunk if item[key_attribute] not in taken]
+            if written:
+                self._record_write()
+            return written
+        except Exception as e:
+            print(f"Error in conditional batch put: {e}")
+            raise
+
+    def _transact_put_if_absent(self, chunk: list, key_attribute: str):
+        """Put ``chunk`` in one transaction; the existing keys if it was cancelled."""
+        actions = [
+            {
+                "Put": {
+                    "TableName": self.table_name,
+                    "Item": item,
+                    "ConditionExpression": "attribute_not_exists(#key)",
+                    "ExpressionAttributeNames": {"#key": key_attribute},
+                }
+            }
+            for item in chunk
+        ]
+        try:
+            self.dynamodb.meta.client.transact_write_items(TransactItems=actions)
+            return None
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "TransactionCanceledException":
+                raise
+            reasons = e.response.get("CancellationReasons") or []
+            taken = {
+                item[key_attribute]
+                for item, reason in zip(chunk, reasons)
+                if reason.get("Code") == "ConditionalCheckFailed"
+            }
+            if not taken:
+                raise  # cancelled for another reason (conflict, throttling)
+            return taken
+
+    def transact_write_items(self, actions: list) -> bool:
+        """
+        Run TransactWriteItems ``actions`` (on any tables) as one transaction.
+
+        Expressions in the actions are strings; values are plain Python types.
+
+        Returns:
+            False if a condition cancelled the transaction, True otherwise
+        """
+        try:
+            self.dynamodb.meta.client.transact_write_items(TransactItems=actions)
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if e.response["Error"]["Code"] == "TransactionCanceledException" and any(
+                reason.get("Code") == "ConditionalCheckFailed" for reason in reasons
+            ):
+                return False
+            print(f"Error in transaction: {e}")
+            raise
+        for table_name in {
+            next(iter(action.values()))["TableName"] for action in actions
+        }:
+            bump_table_version(table_name)
+        return True
+
+    def batch_get_items(self, keys: list) -> list:
+        """
+        Read items by key, 100 per BatchGetItem, retrying unprocessed keys.
+
+        Returns:
+            The items found, in no particular order
+        """
+        try:
+            items = []
+            for i in range(0, len(keys), 100):
+                request = {self.table_name: {"Keys": keys[i : i + 100]}}
+                while request:
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+                    items.extend(response["Responses"].get(self.table_name, []))
+                    request = response.get("UnprocessedKeys")
+            return items
+        except Exception as e:
+            print(f"Error in batch get: {e}")
+            raise
+
     def batch_delete_items(self, keys: list) -> dict:
         """
         Delete multiple items in batches (up to 25 items per batch).
@@ -259,6 +628,7 @@ class DynamoClient:
                             unprocessed_keys.append(req["DeleteRequest"]["Key"])
                             success_count -= 1
 
+            self._record_write()
             return {
                 "success_count": success_count,
                 "unprocessed_keys": unprocessed_keys,
@@ -21,6 +21,7 @@ from models.drevent import DREvent, EventStatus
 from models.measurments import Measurement
 from models.station import Station, StationStatus
 from models.vessel import Vessel
+from services.telemetry import latest_soc_projection
 
 DEMO_ACCOUNTS = {
     "dev": {
@@ -528,6 +529,7 @@ def _collect_cleanup_targets(
         robert_user_id=robert_user_id,
         now=datetime.now(timezone.utc),
     )
+    demo_vessel.update(latest_soc_projection(demo_measurements))
 
     return MutationPlan(
         deletes={
@@ -0,0 +1,66 @@
+"""Gunicorn settings for the production server.
+
+    gunicorn --config gunicorn.conf.py app:app
+
+Every setting comes from ``config.py`` (``WSGI_*`` environment variables).
+The default ``gthread`` worker serves ``WSGI_THREADS`` requests at a time in
+each of ``WSGI_WORKERS`` processes (one per core by default), which suits an
+app that mostly waits on DynamoDB.  An open ``/stream`` SSE connection holds
+a thread for as long as it is open, so each worker accepts at most
+``SSE_MAX_STREAMS`` of them (half its threads); with many live viewers use
+``WSGI_WORKER_CLASS=gevent`` (``pip install gevent``), where each worker takes
+up to ``WSGI_WORKER_CONNECTIONS`` connections.
+
+The app is preloaded in the master so imports happen once and workers share
+the memory.  Nothing in the master opens a connection or starts a thread: each
+worker runs ``app.init_process`` (log handlers, metrics flusher and
+snapshots, analytics materializer) and then ``warmup.warm_up`` after it is forked.  Only one
+worker keeps the materializer running (see ``services/analytics``).
+
+Workers share caches, rate-limit counters and live DR ticks only through a
+shared store: ``docker-compose.prod.yaml`` runs Redis and sets
+``CACHE_BACKEND=redis``.  ``/api/metrics`` merges the snapshots every worker
+writes to ``METRICS_MULTIPROC_DIR``, which the master empties on start.
+"""
+
+import os
+
+# Must be set before the app (and config) is imported.
+os.environ.setdefault("DEFER_PROCESS_INIT", "true")
+
+# Gunicorn reads every module-level name here as a setting, and ``config`` is
+# one of them.
+import config as app_config  # noqa: E402
+
+if app_config.WSGI_WORKER_CLASS == "gevent":
+    # Patch before the preloaded app imports ssl, socket and threading.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+bind = app_config.WSGI_BIND
+workers = app_config.WSGI_WORKERS
+worker_class = app_config.WSGI_WORKER_CLASS
+threads = app_config.WSGI_THREADS
+worker_connections = app_config.WSGI_WORKER_CONNECTIONS
+keepalive = app_config.WSGI_KEEPALIVE_SECONDS
+timeout = app_config.WSGI_TIMEOUT_SECONDS
+graceful_timeout = app_config.WSGI_GRACEFUL_TIMEOUT_SECONDS
+preload_app = app_config.WSGI_PRELOAD
+
+
+def on_starting(server):
+    # Snapshots left by a previous run would be added to this one's counts.
+    from local_metrics import clear_snapshots
+
+    clear_snapshots()
+
+
+def post_worker_init(worker):
+    # Runs in the worker once the app is loaded, before it accepts requests.
+    from app import init_process
+    from warmup import warm_up
+
+    init_process()
+    if app_config.WSGI_WARMUP_ENABLED:
+        warm_up()
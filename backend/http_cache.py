@@ -0,0 +1,142 @@
+"""Conditional GET and response compression for polled endpoints.
+
+``conditional_get`` derives a strong ETag for a GET request from the request
+URL, the caller, and the write versions of the DynamoDB tables the endpoint
+reads (see ``cache.bump_table_version``).  A matching ``If-None-Match`` is
+answered with ``304 Not Modified`` before the view runs, so idle polling
+skips the snapshot work entirely.  Endpoints whose payload also depends on the
+clock pass ``time_bucket_seconds`` to fold the current time bucket into the
+tag.
+
+With the in-process cache backend table versions are per process: a write
+served by one worker never bumps another worker's versions.  Tags are then
+only issued when a single process serves every request
+(``config.SERVER_PROCESSES``), and include a per-process token so a restart
+never matches an old tag.  With Redis every worker shares the versions.
+
+``install_response_compression`` gzips JSON and text responses for clients
+that accept it.  A compressed body carries its own strong tag (``-gzip``
+suffix), and ``If-None-Match`` accepts either form.
+"""
+
+import functools
+import gzip
+import hashlib
+import os
+import time
+import uuid
+from typing import Optional
+
+from flask import Flask, make_response, request
+
+import config
+from cache import get_cache, table_versions
+
+GZIP_ETAG_SUFFIX = "-gzip"
+_PROCESS_TOKEN = uuid.uuid4().hex
+_COMPRESSIBLE_MIMETYPES = ("application/json", "text/")
+
+
+def _new_process_token() -> None:
+    # Workers forked from a preloading server must not share the parent's token.
+    global _PROCESS_TOKEN
+    _PROCESS_TOKEN = uuid.uuid4().hex
+
+
+os.register_at_fork(after_in_child=_new_process_token)
+
+
+def _request_etag(tables, time_bucket_seconds: Optional[int]) -> Optional[str]:
+    shared = getattr(get_cache().backend, "shared", False)
+    if not shared and config.SERVER_PROCESSES > 1:
+        return None
+    versions = table_versions(tables)
+    if versions is None:
+        return None
+    caller = getattr(request, "current_user", None) or {}
+    parts = [
+        request.full_path,
+        repr(sorted(caller.items())),
+        ",".join(f"{table}={version}" for table, version in zip(tables, versions)),
+    ]
+    if time_bucket_seconds:
+        parts.append(str(int(time.time() // time_bucket_seconds)))
+    if not shared:
+        parts.append(_PROCESS_TOKEN)
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+
+def _cache_control() -> str:
+    # Authenticated responses must not be stored by shared caches.
+    if getattr(request, "current_user", None):
+        return "private, no-cache"
+    return "no-cache"
+
+
+def conditional_get(*tables: str, time_bucket_seconds: Optional[int] = None):
+    """Serve ``304 Not Modified`` while ``tables`` are unchanged.
+
+    Apply below ``require_auth`` so the caller is known and unauthenticated
+    requests never receive a 304.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET":
+                return view(*args, **kwargs)
+            etag = _request_etag(tables, time_bucket_seconds)
+            if etag is None:
+                return view(*args, **kwargs)
+
+            matched = next(
+                (
+                    tag
+                    for tag in (etag, etag + GZIP_ETAG_SUFFIX)
+                    if request.if_none_match.contains(tag)
+                ),
+                None,
+            )
+            if matched:
+                response = make_response("", 304)
+                response.set_etag(matched)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+            response.headers["Cache-Control"] = _cache_control()
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or not (response.mimetype or "").startswith(_COMPRESSIBLE_MIMETYPES)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+    data = response.get_data()
+    if len(data) < config.COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=config.COMPRESS_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag + GZIP_ETAG_SUFFIX)
+    return response
+
+
+def install_response_compression(app: Flask) -> None:
+    app.after_request(_compress_response)
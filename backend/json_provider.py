@@ -0,0 +1,71 @@
+"""Flask JSON provider that encodes DynamoDB and model types directly.
+
+DynamoDB returns numbers as ``Decimal`` and the models hold ``datetime`` and
+``Enum`` values.  Encoding them during serialization means handlers can pass
+repository data straight to ``jsonify`` without first copying the whole
+payload through a ``convert_decimals`` pass.
+
+orjson is used when installed; otherwise the standard library encoder is
+used with the same ``default`` hook.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def encode_value(value: Any) -> Any:
+    """``default`` hook for values the JSON encoders do not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return DefaultJSONProvider.default(value)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    default = staticmethod(encode_value)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # orjson only supports compact or two-space output; defer to the
+        # standard encoder for anything else (e.g. pretty-printed debug output).
+        if orjson is not None and kwargs.get("indent") is None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if kwargs.get("sort_keys", self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=encode_value, option=option).decode()
+        kwargs.setdefault("default", encode_value)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def install_json_provider(app) -> None:
+    if not isinstance(app.json, AppJSONProvider):
+        app.json = AppJSONProvider(app)
+
+
+def requires_json_provider(blueprint) -> None:
+    """Install the provider on every app ``blueprint`` is registered on.
+
+    For blueprints whose handlers pass ``Decimal`` data straight to ``jsonify``.
+    """
+    blueprint.record_once(lambda state: install_json_provider(state.app))
@@ -0,0 +1,32 @@
+"""Accounts shared by the load-test seeder and the Locust users.
+
+Kept free of backend imports so the Locust process (which gevent-patches
+everything it loads) never imports the app.
+
+Environment knobs (read by both sides, so keep them identical):
+  LOADTEST_PSO_ACCOUNTS    – power-operator accounts (default: 5)
+  LOADTEST_VO_ACCOUNTS     – vessel-operator accounts (default: 20)
+  LOADTEST_VESSELS_PER_VO  – vessels owned by each vessel operator (default: 3)
+  LOADTEST_STATIONS        – stations, two chargers each (default: 10)
+"""
+
+import os
+
+PASSWORD = "LoadTest#2024"
+
+PSO_ACCOUNTS = int(os.environ.get("LOADTEST_PSO_ACCOUNTS", "5"))
+VO_ACCOUNTS = int(os.environ.get("LOADTEST_VO_ACCOUNTS", "20"))
+VESSELS_PER_VO = int(os.environ.get("LOADTEST_VESSELS_PER_VO", "3"))
+STATIONS = int(os.environ.get("LOADTEST_STATIONS", "10"))
+
+
+def pso_email(index: int) -> str:
+    return f"pso-{index:03d}@loadtest.aquacharge.local"
+
+
+def vo_email(index: int) -> str:
+    return f"vo-{index:03d}@loadtest.aquacharge.local"
+
+
+def station_id(index: int) -> str:
+    return f"loadtest-station-{index:03d}"
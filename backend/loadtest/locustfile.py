@@ -0,0 +1,240 @@
+"""Locust users replaying the PSO and VO workflows from the demo runbook.
+
+``PsoUser`` polls the monitoring and analytics dashboards and drives DR events
+through create → dispatch → start → end.  ``VoUser`` polls its dashboard and
+contracts, accepts pending offers and books a charger for them.  Polling sends
+``If-None-Match`` like the browser does, so 304s are part of the mix.
+
+Requests for a specific event or contract are grouped by route (``name=``) so
+the report has one row per endpoint.  A 409 from accept or booking means
+another user won the race for the vessel or charger; it is counted as a
+success because it is the expected outcome under contention.
+
+Run headless against a local moto-backed app with ``run_local.py``, or point
+Locust at any running backend::
+
+    locust -f locustfile.py --headless -u 50 -r 5 -t 2m --host http://127.0.0.1:5050
+"""
+
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from locust import HttpUser, between, task
+
+from accounts import PASSWORD, PSO_ACCOUNTS, STATIONS, VO_ACCOUNTS, pso_email, station_id, vo_email
+
+THINK_SECONDS = float(os.environ.get("LOADTEST_THINK_SECONDS", "2"))
+# Let an Active event dispatch this long before the PSO ends it.
+EVENT_RUN_SECONDS = float(os.environ.get("LOADTEST_EVENT_RUN_SECONDS", "20"))
+# Give up on an event that never gets a booking after this long.
+EVENT_ABANDON_SECONDS = float(os.environ.get("LOADTEST_EVENT_ABANDON_SECONDS", "120"))
+
+_pso_accounts = itertools.cycle(range(PSO_ACCOUNTS))
+_vo_accounts = itertools.cycle(range(VO_ACCOUNTS))
+
+
+class _AquaChargeUser(HttpUser):
+    abstract = True
+    wait_time = between(THINK_SECONDS / 2, THINK_SECONDS * 1.5)
+
+    email = ""
+
+    def on_start(self):
+        self.etags = {}
+        response = self.client.post(
+            "/api/auth/login", json={"email": self.email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['token']}"
+
+    def poll(self, path, name=None):
+        """GET ``path`` revalidating with the ETag from the previous poll."""
+        headers = {}
+        if path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        with self.client.get(
+            path, headers=headers, name=name or path, catch_response=True
+        ) as response:
+            if response.status_code == 304:
+                response.success()
+                return None
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return None
+            if response.headers.get("ETag"):
+                self.etags[path] = response.headers["ETag"]
+            return response.json()
+
+    def post(self, path, name, payload=None, expected=(200, 201)):
+        with self.client.post(
+            path, json=payload or {}, name=name, catch_response=True
+        ) as response:
+            if response.status_code == 409:
+                response.success()
+                return None
+            if response.status_code not in expected:
+                response.failure(f"HTTP {response.status_code}: {response.text[:200]}")
+                return None
+            return response.json()
+
+
+class PsoUser(_AquaChargeUser):
+    """Power-system operator: dashboards plus the DR event lifecycle."""
+
+    weight = 1
+
+    def on_start(self):
+        self.email = pso_email(next(_pso_accounts))
+        self.event = None
+        super().on_start()
+
+    @task(10)
+    def monitoring_dashboard(self):
+        self.poll("/api/drevents/monitoring?periodHours=24")
+
+    @task(3)
+    def analytics_dashboard(self):
+        self.poll("/api/drevents/analytics?periodHours=168")
+
+    @task(3)
+    def event_list(self):
+        self.poll("/api/drevents")
+
+    @task(4)
+    def advance_event(self):
+        if self.event is None:
+            self._create_and_dispatch()
+            return
+
+        event_id = self.event["id"]
+        event = self.poll(f"/api/drevents/{event_id}", name="/api/drevents/[id]")
+        if event is None:
+            return
+        status = event.get("status")
+        age = time.monotonic() - self.event["since"]
+        if status == "Committed":
+            started = self.post(
+                f"/api/drevents/{event_id}/start", "/api/drevents/[id]/start",
+                expected=(202,),
+            )
+            if started:
+                self.event["since"] = time.monotonic()
+        elif status == "Active":
+            self.poll(
+                f"/api/drevents/monitoring?eventId={event_id}",
+                name="/api/drevents/monitoring?eventId=[id]",
+            )
+            if age >= EVENT_RUN_SECONDS:
+                self.post(f"/api/drevents/{event_id}/end", "/api/drevents/[id]/end")
+                self.event = None
+        elif status in ("Completed", "Cancelled", "Archived") or age >= EVENT_ABANDON_SECONDS:
+            self.event = None
+
+    def _create_and_dispatch(self):
+        # Spread windows over a month so events at one station rarely overlap.
+        start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(
+            hours=random.randint(1, 24 * 30)
+        )
+        event = self.post(
+            "/api/drevents",
+            "/api/drevents",
+            {
+                "stationId": station_id(random.randrange(STATIONS)),
+                "startTime": start.isoformat(),
+                "endTime": (start + timedelta(hours=1)).isoformat(),
+                "targetEnergyKwh": 50,
+                "maxParticipants": 10,
+                "pricePerKwh": 0.25,
+            },
+            expected=(201,),
+        )
+        if not event:
+            return
+        dispatched = self.post(
+            f"/api/drevents/{event['id']}/dispatch", "/api/drevents/[id]/dispatch"
+        )
+        if dispatched:
+            self.event = {"id": event["id"], "since": time.monotonic()}
+
+
+class VoUser(_AquaChargeUser):
+    """Vessel operator: dashboard polling, contract acceptance and booking."""
+
+    weight = 4
+
+    def on_start(self):
+        self.email = vo_email(next(_vo_accounts))
+        self.contracts = []
+        super().on_start()
+
+    @task(10)
+    def dashboard(self):
+        self.poll("/api/vo/dashboard")
+
+    @task(10)
+    def my_contracts(self):
+        contracts = self.poll("/api/contracts/my-contracts")
+        if contracts is not None:
+            self.contracts = contracts
+
+    @task(4)
+    def respond_to_offer(self):
+        awaiting_booking = [
+            contract
+            for contract in self.contracts
+            if contract.get("status") == "pending" and contract.get("acceptedAt")
+        ]
+        offers = [
+            contract
+            for contract in self.contracts
+            if contract.get("status") == "pending" and not contract.get("acceptedAt")
+        ]
+        if awaiting_booking:
+            self._book(random.choice(awaiting_booking))
+        elif offers:
+            contract = random.choice(offers)
+            accepted = self.post(
+                f"/api/contracts/{contract['id']}/accept",
+                "/api/contracts/[id]/accept",
+                {"committedPowerKw": 10},
+            )
+            self.contracts.remove(contract)
+            if accepted:
+                self._book(accepted["contract"], accepted["bookingContext"])
+
+    def _book(self, contract, context=None):
+        if context is None:
+            with self.client.get(
+                f"/api/contracts/{contract['id']}/booking-context",
+                name="/api/contracts/[id]/booking-context",
+                catch_response=True,
+            ) as response:
+                if response.status_code == 409:
+                    response.success()
+                    return
+                if response.status_code != 200:
+                    response.failure(f"HTTP {response.status_code}")
+                    return
+                context = response.json()["bookingContext"]
+        if contract in self.contracts:
+            self.contracts.remove(contract)
+
+        slots = [slot for slot in context.get("availableSlots", []) if slot.get("available")]
+        if not slots:
+            return
+        self.post(
+            "/api/bookings",
+            "/api/bookings",
+            {
+                "vesselId": contract["vesselId"],
+                "stationId": context["stationId"],
+                "startTime": context["startTime"],
+                "endTime": context["endTime"],
+                "chargerId": random.choice(slots)["chargerId"],
+                "contractId": contract["id"],
+            },
+            expected=(201,),
+        )
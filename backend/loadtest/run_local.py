@@ -0,0 +1,202 @@
+"""Headless load test against a local app on moto (or LocalStack).
+
+Starts a moto server (unless ``--dynamodb-endpoint`` points at one already
+running, e.g. LocalStack), creates the tables from ``test/conftest.py``,
+seeds the load-test accounts, serves the app on a threaded WSGI server and
+runs ``locustfile.py`` headless against it.  With ``--host`` it skips all of
+that and only runs Locust against an app you started yourself (seed it with
+``seed.py``'s ``seed_accounts`` first).
+
+Rate limiting is switched off for the in-process app, since every simulated
+user shares 127.0.0.1; pass ``--keep-rate-limits`` to leave it on.
+
+Run from the backend directory::
+
+    python loadtest/run_local.py --users 50 --spawn-rate 5 --run-time 2m
+
+Locust's CSV files go to ``--csv`` (default ``loadtest/results/run``) and a
+per-endpoint throughput and latency table is printed at the end.
+"""
+
+import argparse
+import csv
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+LOADTEST_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = LOADTEST_DIR.parent
+
+REPORT_COLUMNS = [
+    ("Name", "Endpoint", "<"),
+    ("Request Count", "Requests", ">"),
+    ("Failure Count", "Failures", ">"),
+    ("Requests/s", "Req/s", ">"),
+    ("50%", "p50 ms", ">"),
+    ("95%", "p95 ms", ">"),
+    ("99%", "p99 ms", ">"),
+    ("Max Response Time", "Max ms", ">"),
+]
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=25)
+    parser.add_argument("--spawn-rate", type=float, default=5)
+    parser.add_argument("--run-time", default="1m")
+    parser.add_argument("--host", help="Run against an already running app instead")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the local app")
+    parser.add_argument("--moto-port", type=int, default=5056)
+    parser.add_argument(
+        "--dynamodb-endpoint",
+        help="Use this DynamoDB endpoint (e.g. LocalStack) instead of starting moto",
+    )
+    parser.add_argument(
+        "--dispatch-interval",
+        default="2",
+        help="DR_DISPATCH_INTERVAL_SECONDS for the local app",
+    )
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--csv", default=str(LOADTEST_DIR / "results" / "run"))
+    return parser.parse_args(argv)
+
+
+def _load_create_tables():
+    path = BACKEND_DIR / "test" / "conftest.py"
+    spec = importlib.util.spec_from_file_location("_test_tables", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.create_tables
+
+
+def _start_local_app(args):
+    """Bring up DynamoDB, seed it and serve the app; returns (host, stop)."""
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["DR_DISPATCH_INTERVAL_SECONDS"] = args.dispatch_interval
+
+    moto_server = None
+    endpoint = args.dynamodb_endpoint
+    if endpoint is None:
+        from moto.server import ThreadedMotoServer
+
+        moto_server = ThreadedMotoServer(
+            ip_address="127.0.0.1", port=args.moto_port, verbose=False
+        )
+        moto_server.start()
+        endpoint = f"http://127.0.0.1:{args.moto_port}"
+    # Must be set before any backend module builds its boto3 clients.
+    os.environ["AWS_ENDPOINT_URL"] = endpoint
+
+    sys.path[:0] = [str(BACKEND_DIR), str(LOADTEST_DIR)]
+    import boto3
+    from werkzeug.serving import make_server
+
+    import config
+    from seed import seed_accounts
+
+    dynamodb = boto3.resource("dynamodb", region_name=config.AWS_REGION)
+    _load_create_tables()(dynamodb)
+    for table, count in seed_accounts(dynamodb).items():
+        print(f"Seeded {count} rows into {table}")
+
+    from app import app, limiter
+
+    limiter.enabled = args.keep_rate_limits
+    server = make_server("127.0.0.1", args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-app", daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        if moto_server is not None:
+            moto_server.stop()
+
+    return f"http://127.0.0.1:{args.port}", stop
+
+
+def _run_locust(args, host) -> int:
+    Path(args.csv).parent.mkdir(parents=True, exist_ok=True)
+    command = [
+        sys.executable,
+        "-m",
+        "locust",
+        "-f",
+        str(LOADTEST_DIR / "locustfile.py"),
+        "--headless",
+        "--only-summary",
+        "--users",
+        str(args.users),
+        "--spawn-rate",
+        str(args.spawn_rate),
+        "--run-time",
+        args.run_time,
+        "--host",
+        host,
+        "--csv",
+        args.csv,
+    ]
+    return subprocess.call(command, cwd=LOADTEST_DIR)
+
+
+def print_report(stats_csv: str) -> None:
+    """Print throughput and latency percentiles per endpoint from Locust's CSV."""
+    with open(stats_csv, newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    if not rows:
+        print("No requests were recorded.")
+        return
+
+    def cell(row, column):
+        value = row.get(column) or ""
+        if column == "Name" and row.get("Type") not in ("", "None", None):
+            return f"{row['Type']} {value}"
+        if column == "Requests/s":
+            return f"{float(value or 0):.2f}"
+        if column == "Max Response Time":
+            return f"{float(value or 0):.0f}"
+        return value
+
+    table = [[cell(row, column) for column, _, _ in REPORT_COLUMNS] for row in rows]
+    headers = [title for _, title, _ in REPORT_COLUMNS]
+    widths = [
+        max(len(header), *(len(line[index]) for line in table))
+        for index, header in enumerate(headers)
+    ]
+
+    def render(values):
+        return "  ".join(
+            f"{value:{align}{width}}"
+            for value, width, (_, _, align) in zip(values, widths, REPORT_COLUMNS)
+        )
+
+    print()
+    print(render(headers))
+    print(render(["-" * width for width in widths]))
+    for line in table:
+        print(render(line))
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    stop = None
+    host = args.host
+    if host is None:
+        host, stop = _start_local_app(args)
+    try:
+        exit_code = _run_locust(args, host)
+    finally:
+        if stop is not None:
+            stop()
+
+    stats_csv = f"{args.csv}_stats.csv"
+    if os.path.exists(stats_csv):
+        print_report(stats_csv)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Seed the accounts, stations, chargers and vessels the Locust users expect.
+
+Each vessel operator's vessels sit beside one station (operators are spread
+round-robin over the stations), inside range and with enough charge that a
+DR event at that station offers them a contract.  Stations are far enough
+apart that an event only reaches the vessels moored at its own station.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import config
+from accounts import (
+    PASSWORD,
+    PSO_ACCOUNTS,
+    STATIONS,
+    VESSELS_PER_VO,
+    VO_ACCOUNTS,
+    pso_email,
+    station_id,
+    vo_email,
+)
+
+CHARGERS_PER_STATION = 2
+
+
+def _write(dynamodb, table_name: str, items) -> int:
+    count = 0
+    with dynamodb.Table(table_name).batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+            count += 1
+    return count
+
+
+def _user(user_id: str, email: str, user_type: int, created_at: str) -> dict:
+    return {
+        "id": user_id,
+        "displayName": email.split("@")[0],
+        "email": email,
+        "passwordHash": hashlib.sha256(PASSWORD.encode()).hexdigest(),
+        "role": 2,
+        "type": user_type,
+        "active": True,
+        "createdAt": created_at,
+    }
+
+
+def seed_accounts(dynamodb) -> dict:
+    """Write the load-test data set and return the number of rows per table."""
+    created_at = datetime.now(timezone.utc).isoformat()
+    stations = [
+        {
+            "id": station_id(index),
+            "displayName": f"Load Test Harbour {index}",
+            "city": f"Harbour {index}",
+            "provinceOrState": "NS",
+            "country": "Canada",
+            "latitude": Decimal(str(44.0 + index * 0.5)),
+            "longitude": Decimal("-64.0"),
+            "status": 1,
+        }
+        for index in range(STATIONS)
+    ]
+    users = [
+        _user(f"loadtest-pso-{index:03d}", pso_email(index), 2, created_at)
+        for index in range(PSO_ACCOUNTS)
+    ] + [
+        _user(f"loadtest-vo-{index:03d}", vo_email(index), 1, created_at)
+        for index in range(VO_ACCOUNTS)
+    ]
+    vessels = []
+    for owner in range(VO_ACCOUNTS):
+        station = stations[owner % STATIONS]
+        for index in range(VESSELS_PER_VO):
+            vessels.append(
+                {
+                    "id": f"loadtest-vessel-{owner:03d}-{index}",
+                    "userId": f"loadtest-vo-{owner:03d}",
+                    "displayName": f"Load Test Vessel {owner}-{index}",
+                    "vesselType": "electric_ferry",
+                    "chargerType": "CCS",
+                    "capacity": Decimal("100"),
+                    "maxCapacity": Decimal("120"),
+                    "maxChargeRate": Decimal("50"),
+                    "maxDischargeRate": Decimal("50"),
+                    "rangeMeters": Decimal("20000"),
+                    "latitude": station["latitude"] + Decimal("0.005") * (index + 1),
+                    "longitude": station["longitude"],
+                    "active": True,
+                    "createdAt": created_at,
+                }
+            )
+    chargers = [
+        {
+            "id": f"{station['id']}-charger-{index}",
+            "chargingStationId": station["id"],
+            "chargerType": "CCS",
+            "maxRate": Decimal("120"),
+            "status": "active",
+        }
+        for station in stations
+        for index in range(CHARGERS_PER_STATION)
+    ]
+    return {
+        config.STATIONS_TABLE: _write(dynamodb, config.STATIONS_TABLE, stations),
+        config.CHARGERS_TABLE: _write(dynamodb, config.CHARGERS_TABLE, chargers),
+        config.USERS_TABLE: _write(dynamodb, config.USERS_TABLE, users),
+        config.VESSELS_TABLE: _write(dynamodb, config.VESSELS_TABLE, vessels),
+    }
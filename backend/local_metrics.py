@@ -0,0 +1,491 @@
+"""In-process latency histograms and call counters, exported for Prometheus.
+
+``monitoring.record_request_end`` observes every request per route,
+``DynamoClient`` observes every DynamoDB call per table and operation
+(through botocore's ``before-parameter-build``/``after-call`` events, so paginated
+scans and batch writes count each underlying API call), and ``cache.Cache``
+counts hits, misses and backend errors per namespace.  ``GET /api/metrics``
+renders the registry in the Prometheus text format: latencies as histograms
+(aggregate them and take ``histogram_quantile`` in Prometheus) plus p50/p95/p99
+gauges computed from the full-resolution buckets, so latency is visible
+without CloudWatch.
+
+Histograms use fixed log-scale buckets (HDR-style): each bucket is
+2^(1/8) wide, so a reported quantile is within ~5% of the true value from
+10 µs up to 100 s.  The exported ``le`` buckets are every eighth one (one per
+doubling).  An observation takes one uncontended per-series lock; the
+registry lock is only taken when a series is first seen.
+
+Under Gunicorn a scrape reaches one random worker, so with
+``METRICS_MULTIPROC_DIR`` set every worker writes a snapshot of its registry
+there every ``METRICS_SNAPSHOT_SECONDS`` and the scraped worker merges all of
+them (its own taken fresh).  Snapshots are plain JSON, so a file planted
+in the directory can at worst skew the numbers, never run code.  Snapshots
+of workers that exited stay in the directory so counters never go
+backwards; ``gunicorn.conf.py`` empties it when the server starts.
+"""
+
+import glob
+import json
+import math
+import os
+import tempfile
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+QUANTILES = (0.5, 0.95, 0.99)
+_MIN_SECONDS = 1e-5
+_BUCKETS_PER_OCTAVE = 8
+_BUCKET_COUNT = math.ceil(math.log2(100 / _MIN_SECONDS) * _BUCKETS_PER_OCTAVE) + 1
+# Fine bucket ``i`` holds values below _MIN_SECONDS * 2^(i/8); the last one
+# also holds everything above 100 s, so it ends no exported bucket.
+_EXPORTED_BUCKETS = tuple(
+    (index, _MIN_SECONDS * 2 ** (index // _BUCKETS_PER_OCTAVE))
+    for index in range(0, _BUCKET_COUNT - 1, _BUCKETS_PER_OCTAVE)
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.sum = 0.0
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        if seconds <= _MIN_SECONDS:
+            return 0
+        index = int(math.log2(seconds / _MIN_SECONDS) * _BUCKETS_PER_OCTAVE) + 1
+        return min(index, _BUCKET_COUNT - 1)
+
+    def observe(self, seconds: float) -> None:
+        index = self._bucket(seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def snapshot(self) -> Tuple[Dict[int, int], int, float]:
+        """Sparse bucket counts, count and sum, for merging in another process."""
+        with self._lock:
+            counts = {i: c for i, c in enumerate(self._counts) if c}
+            return counts, self.count, self.sum
+
+    def merge(self, snapshot: Tuple[Dict[int, int], int, float]) -> None:
+        counts, count, total = snapshot
+        with self._lock:
+            for index, bucket_count in counts.items():
+                self._counts[index] += bucket_count
+            self.count += count
+            self.sum += total
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """``(le, count)`` pairs of the exported buckets, without ``+Inf``."""
+        with self._lock:
+            counts = list(self._counts)
+        buckets = []
+        seen = 0
+        start = 0
+        for index, upper in _EXPORTED_BUCKETS:
+            seen += sum(counts[start:index + 1])
+            start = index + 1
+            buckets.append((upper, seen))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        """Return the ``q`` quantile, as the geometric midpoint of its bucket."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self.count
+        if not total:
+            return 0.0
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                break
+        if index == 0:
+            return _MIN_SECONDS
+        lower = _MIN_SECONDS * 2 ** ((index - 1) / _BUCKETS_PER_OCTAVE)
+        return lower * 2 ** (0.5 / _BUCKETS_PER_OCTAVE)
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+    def merge(self, snapshot: float) -> None:
+        self.inc(snapshot)
+
+
+class MetricsRegistry:
+    """Named metric families, each holding one series per label set.
+
+    At most ``max_series`` label sets are kept across all families; once the
+    limit is reached, observations for new label sets are dropped and counted
+    in ``dropped`` (unmatched request paths must not grow memory unbounded).
+    """
+
+    def __init__(self, max_series: Optional[int] = None):
+        self.max_series = max_series
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._families: Dict[str, dict] = {}
+        self._series_count = 0
+
+    def _series(self, kind: str, name: str, help_text: str, labels: Labels):
+        family = self._families.get(name)
+        series = family["series"].get(labels) if family else None
+        if series is not None:
+            return series
+        limit = self.max_series
+        if limit is None:
+            limit = config.LOCAL_METRICS_MAX_SERIES
+        with self._lock:
+            family = self._families.setdefault(
+                name, {"kind": kind, "help": help_text, "series": {}}
+            )
+            series = family["series"].get(labels)
+            if series is None:
+                if self._series_count >= limit:
+                    self.dropped += 1
+                    return None
+                series = LatencyHistogram() if kind == "histogram" else Counter()
+                family["series"][labels] = series
+                self._series_count += 1
+            return series
+
+    def inc(self, name: str, help_text: str, amount: float = 1, **labels: str) -> None:
+        counter = self._series("counter", name, help_text, _labels(labels))
+        if counter is not None:
+            counter.inc(amount)
+
+    def observe(self, name: str, help_text: str, seconds: float, **labels: str) -> None:
+        histogram = self._series("histogram", name, help_text, _labels(labels))
+        if histogram is not None:
+            histogram.observe(seconds)
+
+    def get(self, name: str, **labels: str):
+        family = self._families.get(name)
+        return family["series"].get(_labels(labels)) if family else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._families.clear()
+            self._series_count = 0
+            self.dropped = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data copy of every series, for ``merge`` in another process."""
+        with self._lock:
+            families = {
+                name: (family["kind"], family["help"], dict(family["series"]))
+                for name, family in self._families.items()
+            }
+            dropped = self.dropped
+        return {
+            "families": {
+                name: {
+                    "kind": kind,
+                    "help": help_text,
+                    "series": {labels: s.snapshot() for labels, s in series.items()},
+                }
+                for name, (kind, help_text, series) in families.items()
+            },
+            "dropped": dropped,
+        }
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the series of another registry's ``snapshot`` to this one."""
+        for name, family in snapshot["families"].items():
+            for labels, data in family["series"].items():
+                series = self._series(family["kind"], name, family["help"], labels)
+                if series is not None:
+                    series.merge(data)
+        with self._lock:
+            self.dropped += snapshot["dropped"]
+
+    def render(self, const_labels: Optional[Dict[str, str]] = None) -> str:
+        """Render every family in the Prometheus text exposition format.
+
+        ``const_labels`` are added to every sample.
+        """
+        const = _labels(const_labels or {})
+        with self._lock:
+            families = {
+                name: (family["kind"], family["help"], dict(family["series"]))
+                for name, family in self._families.items()
+            }
+        lines: List[str] = []
+        quantile_lines: List[str] = []
+        for name in sorted(families):
+            kind, help_text, series = families[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                quantile_name = _quantile_name(name)
+                quantile_lines.append(
+                    f"# HELP {quantile_name} p50/p95/p99 of {name} in this scrape."
+                )
+                quantile_lines.append(f"# TYPE {quantile_name} gauge")
+            for series_labels in sorted(series):
+                metric = series[series_labels]
+                labels = const + series_labels
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_number(metric.value)}")
+                    continue
+                for upper, count in metric.cumulative_buckets():
+                    bucket_labels = labels + (("le", _number(upper)),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                inf_labels = labels + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{_format_labels(inf_labels)} {metric.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_number(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+                for q in QUANTILES:
+                    quantile_labels = labels + (("quantile", str(q)),)
+                    quantile_lines.append(
+                        f"{_quantile_name(name)}{_format_labels(quantile_labels)} "
+                        f"{_number(metric.quantile(q))}"
+                    )
+        lines.extend(quantile_lines)
+        lines.append("# HELP aquacharge_metrics_dropped_total Observations dropped by the series limit.")
+        lines.append("# TYPE aquacharge_metrics_dropped_total counter")
+        lines.append(
+            f"aquacharge_metrics_dropped_total{_format_labels(const)} {self.dropped}"
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _quantile_name(name: str) -> str:
+    # aquacharge_x_duration_seconds -> aquacharge_x_duration_quantile_seconds
+    base = name[: -len("_seconds")] if name.endswith("_seconds") else name
+    return f"{base}_quantile_seconds"
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(round(float(value), 9))
+
+
+registry = MetricsRegistry()
+
+
+def observe_request(endpoint: str, method: str, status_code: int, seconds: float) -> None:
+    registry.inc(
+        "aquacharge_http_requests_total",
+        "HTTP requests by route, method and status.",
+        endpoint=endpoint,
+        method=method,
+        status=str(status_code),
+    )
+    registry.observe(
+        "aquacharge_http_request_duration_seconds",
+        "HTTP request latency by route and method.",
+        seconds,
+        endpoint=endpoint,
+        method=method,
+    )
+
+
+def observe_dynamodb_call(table: str, operation: str, seconds: float, error: bool) -> None:
+    registry.inc(
+        "aquacharge_dynamodb_calls_total",
+        "DynamoDB API calls by table and operation.",
+        table=table,
+        operation=operation,
+    )
+    if error:
+        registry.inc(
+            "aquacharge_dynamodb_errors_total",
+            "DynamoDB API calls that returned an error.",
+            table=table,
+            operation=operation,
+        )
+    registry.observe(
+        "aquacharge_dynamodb_call_duration_seconds",
+        "DynamoDB API call latency by table and operation.",
+        seconds,
+        table=table,
+        operation=operation,
+    )
+
+
+_CACHE_HELP = {
+    "hits": "Cache lookups served from the cache, by namespace.",
+    "misses": "Cache lookups that found no entry, by namespace.",
+    "errors": "Cache backend operations that failed, by namespace.",
+}
+
+
+def observe_cache(namespace: str, outcome: str) -> None:
+    """Count a ``hits``/``misses``/``errors`` outcome of a cache namespace."""
+    registry.inc(f"aquacharge_cache_{outcome}_total", _CACHE_HELP[outcome], namespace=namespace)
+
+
+# ---------------------------------------------------------------------------
+# Sharing the registry between worker processes
+# ---------------------------------------------------------------------------
+
+_snapshot_lock = threading.Lock()
+_snapshot_thread: Optional[threading.Thread] = None
+_snapshot_stop = threading.Event()
+_snapshot_file: Optional[Tuple[int, str]] = None
+
+
+def _process_snapshot_path(directory: str) -> str:
+    """This process's snapshot file; a reused pid never takes over a dead one's."""
+    global _snapshot_file
+    pid = os.getpid()
+    if _snapshot_file is None or _snapshot_file[0] != pid:
+        _snapshot_file = (pid, f"{pid}-{uuid.uuid4().hex[:8]}.metrics")
+    return os.path.join(directory, _snapshot_file[1])
+
+
+def _snapshot_to_json(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    families = {}
+    for name, family in snapshot["families"].items():
+        series = []
+        for labels, data in family["series"].items():
+            if family["kind"] == "histogram":
+                counts, count, total = data
+                data = [sorted(counts.items()), count, total]
+            series.append([[list(label) for label in labels], data])
+        families[name] = {"kind": family["kind"], "help": family["help"], "series": series}
+    return {"families": families, "dropped": snapshot["dropped"]}
+
+
+def _snapshot_from_json(document: Dict[str, Any]) -> Dict[str, Any]:
+    families = {}
+    for name, family in document["families"].items():
+        kind = family["kind"]
+        if kind not in ("counter", "histogram"):
+            raise ValueError(f"unknown metric kind {kind!r}")
+        series = {}
+        for labels, data in family["series"]:
+            labels = tuple((str(key), str(value)) for key, value in labels)
+            if kind == "histogram":
+                counts, count, total = data
+                data = (
+                    {int(index): int(c) for index, c in counts if 0 <= int(index) < _BUCKET_COUNT},
+                    int(count),
+                    float(total),
+                )
+            elif isinstance(data, bool) or not isinstance(data, (int, float)):
+                raise TypeError(f"counter value {data!r} is not a number")
+            series[labels] = data
+        families[str(name)] = {"kind": kind, "help": str(family["help"]), "series": series}
+    return {"families": families, "dropped": int(document["dropped"])}
+
+
+def write_process_snapshot(directory: Optional[str] = None) -> Optional[str]:
+    """Atomically write this process's registry to ``directory``."""
+    directory = directory or config.METRICS_MULTIPROC_DIR
+    if not directory:
+        return None
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    path = _process_snapshot_path(directory)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(_snapshot_to_json(registry.snapshot()), handle, separators=(",", ":"))
+    os.replace(temp_path, path)
+    return path
+
+
+def collect(directory: Optional[str] = None) -> MetricsRegistry:
+    """The registry merged across every process that wrote to ``directory``.
+
+    Without a directory this process's registry is returned as is.
+    """
+    directory = directory or config.METRICS_MULTIPROC_DIR
+    if not directory:
+        return registry
+    own_path = write_process_snapshot(directory)
+    merged = MetricsRegistry(max_series=math.inf)
+    for path in sorted(glob.glob(os.path.join(directory, "*.metrics"))):
+        try:
+            with open(path) as handle:
+                snapshot = _snapshot_from_json(json.load(handle))
+        except (OSError, ValueError, KeyError, TypeError):
+            if path == own_path:
+                raise
+            continue  # replaced or removed while being read, or not a snapshot
+        merged.merge(snapshot)
+    return merged
+
+
+def clear_snapshots(directory: Optional[str] = None) -> None:
+    """Remove every snapshot (the server master calls this on start)."""
+    directory = directory or config.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    for path in glob.glob(os.path.join(directory, "*.metrics")):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _run_snapshots(interval_seconds: float) -> None:
+    while not _snapshot_stop.wait(interval_seconds):
+        try:
+            write_process_snapshot()
+        except OSError as error:  # keep the writer alive
+            from monitoring import logger
+
+            logger.warning("Metrics snapshot failed: %s", error)
+
+
+def start_metrics_snapshots(
+    interval_seconds: Optional[float] = None,
+) -> Optional[threading.Thread]:
+    """Start writing this process's snapshots, once per process (multi-worker only)."""
+    global _snapshot_thread
+    if not config.METRICS_MULTIPROC_DIR:
+        return None
+    with _snapshot_lock:
+        if _snapshot_thread is not None and _snapshot_thread.is_alive():
+            return None
+        _snapshot_stop.clear()
+        _snapshot_thread = threading.Thread(
+            target=_run_snapshots,
+            args=(interval_seconds or config.METRICS_SNAPSHOT_SECONDS,),
+            name="metrics-snapshots",
+            daemon=True,
+        )
+        _snapshot_thread.start()
+        return _snapshot_thread
+
+
+def stop_metrics_snapshots() -> None:
+    _snapshot_stop.set()
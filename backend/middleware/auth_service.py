@@ -13,20 +13,13 @@ from db.dynamoClient import DynamoClient
 from models.user import User, UserRole, UserType
 
 
-def convert_decimals(obj):
-    """Convert Decimal objects for JSON serialization."""
-    if isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    if isinstance(obj, dict):
-        return {key: convert_decimals(value) for key, value in obj.items()}
-    if isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-
 def prepare_user_data_from_dynamo(data: dict) -> dict:
     """Convert DynamoDB types into values expected by the User model."""
-    data = convert_decimals(data)
+    data = dict(data)
+    # DynamoDB returns numbers as Decimal; role and type go into JWTs as ints.
+    for name in ("role", "type"):
+        if isinstance(data.get(name), Decimal):
+            data[name] = int(data[name])
 
     if "createdAt" in data and isinstance(data["createdAt"], str):
         data["createdAt"] = datetime.fromisoformat(data["createdAt"])
@@ -156,7 +149,7 @@ class AuthService:
 
             return {
                 "token": token,
-                "user": convert_decimals(response_user),
+                "user": response_user,
                 "expires_in": 24 * 3600,
             }, 200
         except Exception as exc:
@@ -246,7 +239,7 @@ class AuthService:
             if response_user.get("currentVesselId") == "":
                 response_user["currentVesselId"] = None
 
-            return {"user": convert_decimals(response_user), "valid": True}, 200
+            return {"user": response_user, "valid": True}, 200
         except Exception as exc:
             return {"error": "Token verification failed", "details": str(exc)}, 500
 
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field, fields
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+from decimal import Decimal
 from enum import Enum
 import uuid
 
@@ -89,6 +90,12 @@ class DREvent(BaseModel):
             )
         if "status" in normalized:
             normalized["status"] = parse_event_status(normalized["status"])
+        # DynamoDB returns numbers as Decimal; keep the declared scalar types.
+        for name in ("pricePerKwh", "targetEnergyKwh"):
+            if isinstance(normalized.get(name), Decimal):
+                normalized[name] = float(normalized[name])
+        if isinstance(normalized.get("maxParticipants"), Decimal):
+            normalized["maxParticipants"] = int(normalized["maxParticipants"])
 
         allowed_fields = {field_definition.name for field_definition in fields(cls)}
         filtered = {
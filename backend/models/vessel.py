@@ -22,6 +22,8 @@ class Vessel(BaseModel):
     latitude: float = 0.0
     rangeMeters: float = 0.0
     active: bool = True
+    latestSoc: Optional[float] = None
+    latestSocAt: Optional[str] = None
     createdAt: datetime = field(default_factory=datetime.now)
     updatedAt: Optional[datetime] = None
 
@@ -44,6 +46,7 @@ class Vessel(BaseModel):
             "longitude",
             "latitude",
             "rangeMeters",
+            "latestSoc",
         ):
             if key in normalized and normalized[key] is not None:
                 normalized[key] = float(normalized[key])
@@ -52,6 +55,10 @@ class Vessel(BaseModel):
     def to_dict(self) -> Dict[str, Any]:
         """Return a dict suitable for DynamoDB; ensure numeric capacity fields are Decimal."""
         data = super().to_dict()
+        # The latest-SOC projection is written by the dispatcher only.
+        for key in ("latestSoc", "latestSocAt"):
+            if data.get(key) is None:
+                data.pop(key, None)
         try:
             from decimal import Decimal
 
@@ -3,21 +3,34 @@ CloudWatch monitoring: structured logging and custom metrics.
 
 Controlled by env vars:
   CLOUDWATCH_ENABLED=true       – emit logs/metrics to AWS (default: false)
+  METRICS_TRANSPORT             – "api" (PutMetricData) or "emf" (Embedded Metric Format
+                                  log lines on the logging pipeline; no CloudWatch API
+                                  calls, works without CLOUDWATCH_ENABLED) (default: api)
   CLOUDWATCH_LOG_GROUP          – log group name (default: /aquacharge/backend)
   CLOUDWATCH_NAMESPACE          – custom metrics namespace (default: AquaCharge/Backend)
   AWS_REGION                    – AWS region (default: us-east-1)
   AWS_ENDPOINT_URL              – override endpoint, e.g. http://localstack:4566 for local dev
+  METRICS_FLUSH_INTERVAL_SECONDS – how often buffered metrics are sent (default: 60)
+  METRICS_MAX_SERIES            – distinct metric/dimension sets buffered per interval (default: 2000)
+  METRICS_MAX_PENDING           – unsent data points kept for retry after a failed flush (default: 5000)
 """
 
+import atexit
 import json
 import logging
+import math
 import os
 import sys
+import threading
 import time
+from datetime import datetime, timezone
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
+from db.callLedger import start_ledger
+from local_metrics import observe_request
+
 CLOUDWATCH_ENABLED = os.environ.get("CLOUDWATCH_ENABLED", "false").lower() == "true"
 AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 AWS_ENDPOINT_URL = os.environ.get(
@@ -25,6 +38,20 @@ AWS_ENDPOINT_URL = os.environ.get(
 )  # None → real AWS; set for LocalStack
 LOG_GROUP = os.environ.get("CLOUDWATCH_LOG_GROUP", "/aquacharge/backend")
 METRICS_NAMESPACE = os.environ.get("CLOUDWATCH_NAMESPACE", "AquaCharge/Backend")
+METRICS_FLUSH_INTERVAL_SECONDS = int(os.environ.get("METRICS_FLUSH_INTERVAL_SECONDS", "60"))
+METRICS_MAX_SERIES = int(os.environ.get("METRICS_MAX_SERIES", "2000"))
+METRICS_MAX_PENDING = int(os.environ.get("METRICS_MAX_PENDING", "5000"))
+METRICS_TRANSPORT = os.environ.get("METRICS_TRANSPORT", "api").lower()
+# PutMetricData accepts at most 1000 data points per call.
+PUT_METRIC_DATA_BATCH_SIZE = 1000
+# EMF allows at most 100 distinct values per metric and 100 metrics per line.
+EMF_MAX_VALUES = 100
+EMF_MAX_METRICS = 100
+# Label for requests that matched no route, so scanners probing random paths
+# share one series instead of filling the series caps.
+UNMATCHED_ENDPOINT = "unmatched"
+# Histogram buckets are 2^(1/4) wide, i.e. within ~9% of the recorded value.
+_HISTOGRAM_BUCKETS_PER_OCTAVE = 4
 
 
 def _boto_client(service: str):
@@ -36,6 +63,7 @@ def _boto_client(service: str):
 
 
 logger = logging.getLogger("aquacharge")
+_emf_logger = logging.getLogger("aquacharge.metrics")
 
 
 _LOG_RECORD_BUILTINS = frozenset(logging.LogRecord(
@@ -44,7 +72,12 @@ _LOG_RECORD_BUILTINS = frozenset(logging.LogRecord(
 
 
 class _JsonFormatter(logging.Formatter):
-    """Emit log records as single-line JSON, including any extra fields."""
+    """
+    Emit log records as single-line JSON, including any extra fields.
+
+    An ``emf`` extra (an Embedded Metric Format document) is merged into the
+    top level of the line, where CloudWatch Logs looks for it.
+    """
 
     def format(self, record: logging.LogRecord) -> str:
         payload = {
@@ -56,8 +89,11 @@ class _JsonFormatter(logging.Formatter):
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
         for key, value in record.__dict__.items():
-            if key not in _LOG_RECORD_BUILTINS:
+            if key not in _LOG_RECORD_BUILTINS and key != "emf":
                 payload[key] = value
+        emf = getattr(record, "emf", None)
+        if emf:
+            payload.update(emf)
         return json.dumps(payload, default=str)
 
 
@@ -119,6 +155,236 @@ def _get_metrics_client():
     return _cw_metrics_client
 
 
+def _metrics_enabled() -> bool:
+    return CLOUDWATCH_ENABLED or METRICS_TRANSPORT == "emf"
+
+
+def _histogram_bucket(value: float) -> float:
+    if value <= 0:
+        return 0.0
+    exponent = round(math.log2(value) * _HISTOGRAM_BUCKETS_PER_OCTAVE)
+    return round(2 ** (exponent / _HISTOGRAM_BUCKETS_PER_OCTAVE), 3)
+
+
+class MetricsBuffer:
+    """
+    Aggregates metrics in memory and flushes them per interval.
+
+    Every (name, unit, dimensions) series is reduced to one statistic set
+    (SampleCount/Sum/Minimum/Maximum) plus a log-bucketed histogram per flush
+    interval, so a busy endpoint costs one data point per interval instead of
+    one API call per request.  With METRICS_TRANSPORT=api the statistic sets
+    go out in batched PutMetricData calls; with "emf" they are written as
+    Embedded Metric Format log lines carrying the histogram (see
+    ``_flush_emf``).
+
+    Backpressure: once ``max_series`` series are buffered, samples for new
+    series are dropped; data points from a failed flush are kept for the next
+    one up to ``max_pending``, and the oldest beyond that are dropped.  Both
+    are counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        max_series: int = METRICS_MAX_SERIES,
+        max_pending: int = METRICS_MAX_PENDING,
+        batch_size: int = PUT_METRIC_DATA_BATCH_SIZE,
+    ):
+        self.max_series = max_series
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._series: dict = {}
+        self._histograms: dict = {}
+        self._window_start: datetime | None = None
+        self._pending: list[dict] = []
+
+    def add(
+        self,
+        name: str,
+        value: float,
+        unit: str = "Count",
+        dimensions: list[dict] | None = None,
+    ) -> None:
+        key = (
+            name,
+            unit,
+            tuple(sorted((d["Name"], str(d["Value"])) for d in dimensions or ())),
+        )
+        value = float(value)
+        with self._lock:
+            stats = self._series.get(key)
+            if stats is None:
+                if len(self._series) >= self.max_series:
+                    self.dropped += 1
+                    return
+                if self._window_start is None:
+                    self._window_start = datetime.now(timezone.utc)
+                self._series[key] = {
+                    "SampleCount": 1.0,
+                    "Sum": value,
+                    "Minimum": value,
+                    "Maximum": value,
+                }
+                self._histograms[key] = {_histogram_bucket(value): 1}
+                return
+            stats["SampleCount"] += 1
+            stats["Sum"] += value
+            stats["Minimum"] = min(stats["Minimum"], value)
+            stats["Maximum"] = max(stats["Maximum"], value)
+            histogram = self._histograms[key]
+            bucket = _histogram_bucket(value)
+            if bucket not in histogram and len(histogram) >= EMF_MAX_VALUES:
+                bucket = min(histogram, key=lambda b: abs(b - bucket))
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def _swap(self):
+        with self._lock:
+            series, self._series = self._series, {}
+            histograms, self._histograms = self._histograms, {}
+            timestamp, self._window_start = self._window_start, None
+        return series, histograms, timestamp
+
+    def _drain(self) -> list[dict]:
+        series, _, timestamp = self._swap()
+        data = [
+            {
+                "MetricName": name,
+                "Unit": unit,
+                "Timestamp": timestamp,
+                "StatisticValues": stats,
+                **(
+                    {"Dimensions": [{"Name": n, "Value": v} for n, v in dims]}
+                    if dims
+                    else {}
+                ),
+            }
+            for (name, unit, dims), stats in series.items()
+        ]
+        pending, self._pending = self._pending, []
+        return pending + data
+
+    def flush(self) -> int:
+        """Send everything buffered; returns the number of data points sent."""
+        with self._flush_lock:
+            if METRICS_TRANSPORT == "emf":
+                return self._flush_emf()
+            data = self._drain()
+            sent = 0
+            for start in range(0, len(data), self.batch_size):
+                batch = data[start : start + self.batch_size]
+                try:
+                    _get_metrics_client().put_metric_data(
+                        Namespace=METRICS_NAMESPACE, MetricData=batch
+                    )
+                except (BotoCoreError, ClientError) as exc:
+                    logger.warning("Failed to flush %d metrics: %s", len(batch), exc)
+                    self._spill(data[start:])
+                    break
+                sent += len(batch)
+            return sent
+
+    def _flush_emf(self) -> int:
+        """
+        Write one EMF log line per dimension set through the ``aquacharge``
+        logger, so the CloudWatch Logs pipeline extracts the metrics.
+
+        Each metric value is a distribution: the histogram buckets as
+        ``Values``/``Counts`` plus the exact Min/Max/Sum/Count.
+        """
+        series, histograms, timestamp = self._swap()
+        by_dimensions: dict = {}
+        for key in series:
+            by_dimensions.setdefault(key[2], []).append(key)
+
+        timestamp_ms = int((timestamp or datetime.now(timezone.utc)).timestamp() * 1000)
+        written = 0
+        for dims, keys in by_dimensions.items():
+            for start in range(0, len(keys), EMF_MAX_METRICS):
+                chunk = keys[start : start + EMF_MAX_METRICS]
+                payload = {
+                    "_aws": {
+                        "Timestamp": timestamp_ms,
+                        "CloudWatchMetrics": [
+                            {
+                                "Namespace": METRICS_NAMESPACE,
+                                "Dimensions": [[name for name, _ in dims]],
+                                "Metrics": [
+                                    {"Name": name, "Unit": unit}
+                                    for name, unit, _ in chunk
+                                ],
+                            }
+                        ],
+                    },
+                    **dict(dims),
+                }
+                for key in chunk:
+                    stats = series[key]
+                    buckets = sorted(histograms[key].items())
+                    payload[key[0]] = {
+                        "Values": [bucket for bucket, _ in buckets],
+                        "Counts": [count for _, count in buckets],
+                        "Min": stats["Minimum"],
+                        "Max": stats["Maximum"],
+                        "Sum": stats["Sum"],
+                        "Count": stats["SampleCount"],
+                    }
+                _emf_logger.info("metrics", extra={"emf": payload})
+                written += len(chunk)
+        return written
+
+    def _spill(self, data: list[dict]) -> None:
+        overflow = len(data) - self.max_pending
+        if overflow > 0:
+            self.dropped += overflow
+            data = data[overflow:]
+        self._pending = data
+
+
+_metrics_buffer = MetricsBuffer()
+_flusher_lock = threading.Lock()
+_flusher_thread: threading.Thread | None = None
+_flusher_stop = threading.Event()
+
+
+def flush_metrics() -> int:
+    return _metrics_buffer.flush()
+
+
+def _run_flusher(interval_seconds: float) -> None:
+    while not _flusher_stop.wait(interval_seconds):
+        try:
+            flush_metrics()
+        except Exception as exc:  # keep the flusher alive
+            logger.warning("Metrics flush failed: %s", exc)
+
+
+def start_metrics_flusher(interval_seconds: float | None = None) -> threading.Thread | None:
+    """Start the background metrics flusher once per process (when metrics are on)."""
+    global _flusher_thread
+    if not _metrics_enabled():
+        return None
+    with _flusher_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return None
+        _flusher_stop.clear()
+        _flusher_thread = threading.Thread(
+            target=_run_flusher,
+            args=(interval_seconds or METRICS_FLUSH_INTERVAL_SECONDS,),
+            name="metrics-flusher",
+            daemon=True,
+        )
+        _flusher_thread.start()
+        atexit.register(flush_metrics)
+        return _flusher_thread
+
+
+def stop_metrics_flusher() -> None:
+    _flusher_stop.set()
+
+
 def emit_metric(
     name: str,
     value: float,
@@ -126,7 +392,11 @@ def emit_metric(
     dimensions: list[dict] | None = None,
 ) -> None:
     """
-    Put a single custom metric to CloudWatch.  No-op when CLOUDWATCH_ENABLED is false.
+    Buffer a custom metric for CloudWatch.  No-op unless CLOUDWATCH_ENABLED is
+    true or METRICS_TRANSPORT is "emf".
+
+    The sample is aggregated in memory and sent by the background flusher
+    (see ``start_metrics_flusher``), so callers never wait on CloudWatch.
 
     Args:
         name:       Metric name, e.g. "RequestCount".
@@ -134,20 +404,9 @@ def emit_metric(
         unit:       CloudWatch unit string (Count, Milliseconds, Bytes, …).
         dimensions: List of {"Name": str, "Value": str} dicts.
     """
-    if not CLOUDWATCH_ENABLED:
+    if not _metrics_enabled():
         return
-
-    metric_datum: dict = {"MetricName": name, "Value": value, "Unit": unit}
-    if dimensions:
-        metric_datum["Dimensions"] = dimensions
-
-    try:
-        _get_metrics_client().put_metric_data(
-            Namespace=METRICS_NAMESPACE,
-            MetricData=[metric_datum],
-        )
-    except (BotoCoreError, ClientError) as exc:
-        logger.warning("Failed to emit metric %s: %s", name, exc)
+    _metrics_buffer.add(name, value, unit, dimensions)
 
 
 # ---------------------------------------------------------------------------
@@ -156,14 +415,20 @@ def emit_metric(
 
 
 def record_request_start(g) -> None:
-    """Store request start time on Flask's g object."""
+    """Store request start time and a fresh DynamoDB call ledger on Flask's g object."""
     g.request_start = time.monotonic()
+    start_ledger(g)
 
 
-def record_request_end(g, response, endpoint: str, method: str) -> None:
+def record_request_end(g, response, endpoint: str | None, method: str) -> None:
     """
-    Emit RequestCount, ResponseLatency, and (when applicable) ErrorCount metrics.
-    Also log the completed request at INFO level.
+    Emit RequestCount, ResponseLatency, and (when applicable) ErrorCount metrics,
+    and record the request in the in-process histograms behind /api/metrics.
+    Also log the completed request at INFO level, with the request's DynamoDB
+    call count, consumed capacity and time spent in DynamoDB.
+
+    ``endpoint`` is the Flask endpoint name; ``None`` (no route matched) is
+    recorded as ``UNMATCHED_ENDPOINT`` rather than the raw path.
     """
     start_time = getattr(g, "request_start", None)
     if start_time is None:
@@ -172,12 +437,15 @@ def record_request_end(g, response, endpoint: str, method: str) -> None:
 
     elapsed_ms = (time.monotonic() - start_time) * 1000
     status_code = response.status_code
+    endpoint = endpoint or UNMATCHED_ENDPOINT
 
     dims = [
-        {"Name": "Endpoint", "Value": endpoint or "unknown"},
+        {"Name": "Endpoint", "Value": endpoint},
         {"Name": "Method", "Value": method},
     ]
 
+    observe_request(endpoint, method, status_code, elapsed_ms / 1000)
+
     emit_metric("RequestCount", 1, "Count", dims)
     emit_metric("ResponseLatency", round(elapsed_ms, 2), "Milliseconds", dims)
 
@@ -188,10 +456,14 @@ def record_request_end(g, response, endpoint: str, method: str) -> None:
     if status_code == 429:
         emit_metric("RateLimitHit", 1, "Count", dims)
 
+    ledger = getattr(g, "dynamo_ledger", None)
+    dynamo = ledger.summary() if ledger is not None else {}
     logger.info(
-        "%s %s → %d (%.1f ms)",
+        "%s %s → %d (%.1f ms, %d DynamoDB calls)",
         method,
-        endpoint or "unknown",
+        endpoint,
         status_code,
         elapsed_ms,
+        dynamo.get("dynamo_calls", 0),
+        extra=dynamo,
     )
@@ -0,0 +1,185 @@
+"""Opt-in sampling profiler for single requests.
+
+Adding ``?__profile=1`` to a request runs it under a wall-clock stack sampler
+and replaces the response body with the profile:
+
+* ``__profile=1`` or ``__profile=speedscope`` – speedscope JSON
+  (open at https://www.speedscope.app)
+* ``__profile=collapsed`` – collapsed stacks (``a;b;c <count>`` per line)
+  for flamegraph.pl / inferno
+
+The original status code is reported in ``X-Profiled-Status``.  Profiling is
+honoured for anyone outside production; in production
+(``REQUEST_PROFILING_ADMIN_ONLY``) only for admin tokens, and for anyone else
+the parameter is ignored.  ``REQUEST_PROFILING_ENABLED=false`` turns it off
+everywhere.
+
+The sampler is a background thread that reads the request thread's frame
+every ``PROFILE_SAMPLE_INTERVAL_MS``, so time spent waiting on DynamoDB shows
+up as well as CPU time.  Nothing is sampled unless the parameter is present.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, g, request
+
+import config
+from middleware.auth import decode_jwt_token
+from models.user import UserRole
+
+PROFILE_QUERY_PARAM = "__profile"
+_FORMATS = {"1": "speedscope", "speedscope": "speedscope", "collapsed": "collapsed"}
+
+# A request whose after_request never runs must not leave its sampler behind.
+_MAX_PROFILE_SECONDS = 300
+
+Frame = Tuple[str, str, int]
+
+
+class StackSampler:
+    """Counts the stacks a thread is in, sampled on a fixed interval."""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.samples: Counter = Counter()
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def _run(self) -> None:
+        deadline = self.started_at + _MAX_PROFILE_SECONDS
+        while not self._stop.wait(self.interval_seconds) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_stack(frame)] += 1
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    stack: List[Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(samples: Counter) -> str:
+    return "".join(
+        ";".join(_label(frame) for frame in stack) + f" {count}\n"
+        for stack, count in samples.most_common()
+    )
+
+
+def speedscope_profile(samples: Counter, name: str, interval_ms: float) -> Dict:
+    frame_index: Dict[Frame, int] = {}
+    frames: List[Dict] = []
+    stacks: List[List[int]] = []
+    weights: List[float] = []
+    for stack, count in samples.items():
+        indices = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indices.append(frame_index[frame])
+        stacks.append(indices)
+        weights.append(count * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "aquacharge-backend",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def _caller_is_admin() -> bool:
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return False
+    try:
+        payload = decode_jwt_token(auth_header.split(" ", 1)[1])
+    except ValueError:
+        return False
+    return payload.get("role") == UserRole.ADMIN.value
+
+
+def _profiling_allowed() -> bool:
+    if not config.REQUEST_PROFILING_ENABLED:
+        return False
+    return not config.REQUEST_PROFILING_ADMIN_ONLY or _caller_is_admin()
+
+
+def start_request_profile() -> Optional[StackSampler]:
+    """Start sampling this request if it asked for (and may have) a profile."""
+    profile_format = _FORMATS.get(request.args.get(PROFILE_QUERY_PARAM, ""))
+    if profile_format is None or not _profiling_allowed():
+        return None
+    g.profile_format = profile_format
+    g.profiler = StackSampler(
+        threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+    ).start()
+    return g.profiler
+
+
+def finish_request_profile(response: Response) -> Response:
+    """Stop the request's sampler and answer with the profile instead."""
+    sampler = g.pop("profiler", None)
+    if sampler is None:
+        return response
+    sampler.stop()
+    if response.is_streamed:
+        return response
+
+    name = f"{request.method} {request.full_path.rstrip('?')}"
+    if g.pop("profile_format") == "collapsed":
+        profiled = Response(collapsed_stacks(sampler.samples), mimetype="text/plain")
+    else:
+        profile = speedscope_profile(
+            sampler.samples, name, config.PROFILE_SAMPLE_INTERVAL_MS
+        )
+        profiled = Response(json.dumps(profile), mimetype="application/json")
+        profiled.headers["Content-Disposition"] = (
+            'attachment; filename="profile.speedscope.json"'
+        )
+    profiled.headers["X-Profiled-Status"] = str(response.status_code)
+    profiled.headers["X-Profile-Samples"] = str(sum(sampler.samples.values()))
+    profiled.headers["X-Profile-Elapsed-Ms"] = f"{sampler.elapsed * 1000:.1f}"
+    profiled.headers["Cache-Control"] = "no-store"
+    return profiled
@@ -0,0 +1,218 @@
+"""Rate-limit counters shared by every server process.
+
+``memory://`` keeps Flask-Limiter's counters inside each process, so with N
+Gunicorn workers a client gets N times its limit and every worker holds a
+counter for every client address it has seen.  ``RATELIMIT_STORAGE_URI``
+points the limiter at a shared store instead:
+
+* ``redis://host:port`` — the ``limits`` Redis storage (needs
+  ``pip install redis``); works with any Redis-protocol server.  The default
+  with ``CACHE_BACKEND=redis``, on the cache's ``CACHE_REDIS_URL``.
+* ``dynamodb://<table>`` — ``DynamoDBStorage`` below, opt-in.  One item per
+  client and window (``id``, ``hits``, ``expiresAt``), incremented atomically
+  with ``UpdateItem``; the table's TTL on ``expiresAt`` removes old windows.
+  With the two default limits a request costs four synchronous calls (two
+  strongly consistent batch reads, two updates), so prefer Redis where it
+  runs.
+
+The default strategy is the sliding-window counter: it weights the previous
+window's count by how much of it still overlaps the moving window, so a
+client cannot burst twice its limit across a window boundary, while storing
+only two counters per client and limit.  An exact moving window
+(``RATELIMIT_STRATEGY=moving-window``, memory or Redis only) stores one
+timestamp per request — up to 5000 per client for the hourly limit.
+
+When the shared store is unreachable the limiter falls back to per-process
+memory counters until it answers again, so an outage never fails requests.
+"""
+
+import math
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlparse
+
+from botocore.exceptions import BotoCoreError, ClientError
+from limits.storage import SlidingWindowCounterSupport, Storage
+from limits.storage.base import TimestampedSlidingWindow
+
+import config
+from db.dynamoClient import DynamoClient
+
+_MAX_RESTARTS = 3
+
+
+def _condition_failed(error: ClientError) -> bool:
+    return error.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+class DynamoDBStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """``limits`` storage keeping fixed and sliding-window counters in DynamoDB."""
+
+    STORAGE_SCHEME = ["dynamodb"]
+
+    def __init__(self, uri: str = "dynamodb://", wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        parsed = urlparse(uri)
+        table_name = (parsed.netloc + parsed.path).strip("/") or config.RATELIMITS_TABLE
+        self._client = DynamoClient(
+            table_name, str(options.get("region_name", config.AWS_REGION))
+        )
+        self._table = self._client.table
+
+    @property
+    def base_exceptions(self):
+        return (BotoCoreError, ClientError)
+
+    @staticmethod
+    def _live_hits(item: dict, now: float) -> int:
+        # TTL deletion lags expiry by up to two days, so expiry is checked here.
+        if not item or item["expiresAt"] <= now:
+            return 0
+        return int(item["hits"])
+
+    def _get_items(self, keys: Iterable[str]) -> Dict[str, dict]:
+        request = {
+            self._client.table_name: {
+                "Keys": [{"id": key} for key in keys],
+                "ConsistentRead": True,
+            }
+        }
+        items: Dict[str, dict] = {}
+        while request:
+            response = self._client.dynamodb.batch_get_item(RequestItems=request)
+            for item in response["Responses"].get(self._client.table_name, []):
+                items[item["id"]] = item
+            request = response.get("UnprocessedKeys")
+        return items
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """Add ``amount`` hits to ``key``, starting a new ``expiry``-second window
+        when the stored one has expired."""
+        for _ in range(_MAX_RESTARTS):
+            now = time.time()
+            values = {
+                ":amount": amount,
+                ":expiresAt": math.ceil(now + expiry),
+                ":now": Decimal(str(now)),
+            }
+            try:
+                response = self._table.update_item(
+                    Key={"id": key},
+                    UpdateExpression=(
+                        "ADD hits :amount "
+                        "SET expiresAt = if_not_exists(expiresAt, :expiresAt)"
+                    ),
+                    ConditionExpression=(
+                        "attribute_not_exists(expiresAt) OR expiresAt > :now"
+                    ),
+                    ExpressionAttributeValues=values,
+                    ReturnValues="UPDATED_NEW",
+                )
+                return int(response["Attributes"]["hits"])
+            except ClientError as error:
+                if not _condition_failed(error):
+                    raise
+            try:
+                self._table.update_item(
+                    Key={"id": key},
+                    UpdateExpression="SET hits = :amount, expiresAt = :expiresAt",
+                    ConditionExpression="expiresAt <= :now",
+                    ExpressionAttributeValues=values,
+                )
+                return amount
+            except ClientError as error:
+                # Another process restarted the window first; add to theirs.
+                if not _condition_failed(error):
+                    raise
+        raise RuntimeError(f"Rate-limit counter {key} kept changing during increment")
+
+    def decr(self, key: str, amount: int = 1) -> None:
+        try:
+            self._table.update_item(
+                Key={"id": key},
+                UpdateExpression="ADD hits :decrement",
+                ConditionExpression="hits >= :amount",
+                ExpressionAttributeValues={":decrement": -amount, ":amount": amount},
+            )
+        except ClientError as error:
+            if not _condition_failed(error):
+                raise
+
+    def get(self, key: str) -> int:
+        item = self._table.get_item(Key={"id": key}, ConsistentRead=True).get("Item")
+        return self._live_hits(item, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        item = self._table.get_item(Key={"id": key}, ConsistentRead=True).get("Item")
+        if not self._live_hits(item, now):
+            return now
+        return float(item["expiresAt"])
+
+    def check(self) -> bool:
+        try:
+            self._table.reload()
+        except (BotoCoreError, ClientError):
+            return False
+        return True
+
+    def reset(self) -> int:
+        keys = [{"id": item["id"]} for item in self._client.scan_items(projection=["id"])]
+        self._client.batch_delete_items(keys)
+        return len(keys)
+
+    def clear(self, key: str) -> None:
+        self._table.delete_item(Key={"id": key})
+
+    def _sliding_window(
+        self, key: str, expiry: int, now: float
+    ) -> Tuple[str, int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        items = self._get_items([previous_key, current_key])
+        previous_count = self._live_hits(items.get(previous_key), now)
+        current_count = self._live_hits(items.get(current_key), now)
+        # Same window arithmetic as limits' MemoryStorage.
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        if amount > limit:
+            return False
+        current_key, previous_count, previous_ttl, current_count, _ = (
+            self._sliding_window(key, expiry, time.time())
+        )
+        previous_weight = previous_count * previous_ttl / expiry
+        if math.floor(previous_weight + current_count) + amount > limit:
+            return False
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if math.floor(previous_weight + current_count) > limit:
+            # A concurrent hit from another process took the last slot.
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self._sliding_window(key, expiry, time.time())[1:]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
+
+
+def limiter_settings() -> dict:
+    """Flask-Limiter keyword arguments for the configured storage and strategy."""
+    settings = {
+        "storage_uri": config.RATELIMIT_STORAGE_URI,
+        "strategy": config.RATELIMIT_STRATEGY,
+        "key_prefix": config.RATELIMIT_KEY_PREFIX,
+    }
+    if not config.RATELIMIT_STORAGE_URI.startswith("memory://"):
+        settings["in_memory_fallback_enabled"] = True
+    return settings
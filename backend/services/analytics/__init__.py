@@ -0,0 +1,43 @@
+"""Pre-aggregated DR event analytics."""
+
+from .frame import MeasurementFrame
+from .materializer import (
+    invalidate_event_analytics,
+    start_analytics_materializer,
+    stop_analytics_materializer,
+)
+from .rollup import (
+    CLOSED_EVENT_STATUSES,
+    ROLLUP_FIELD,
+    ROLLUP_GENERATION_FIELD,
+    ROLLUP_VESSEL_PARTS_FIELD,
+    build_event_rollup,
+    from_dynamo,
+    merge_rollups,
+    rollup_can_be_stored,
+    rollup_is_current,
+    rollup_measurements,
+    slice_measurement_rollup,
+    split_rollup_vessels,
+    to_dynamo,
+)
+
+__all__ = [
+    "CLOSED_EVENT_STATUSES",
+    "MeasurementFrame",
+    "ROLLUP_FIELD",
+    "ROLLUP_GENERATION_FIELD",
+    "ROLLUP_VESSEL_PARTS_FIELD",
+    "build_event_rollup",
+    "from_dynamo",
+    "invalidate_event_analytics",
+    "merge_rollups",
+    "rollup_can_be_stored",
+    "rollup_is_current",
+    "rollup_measurements",
+    "slice_measurement_rollup",
+    "split_rollup_vessels",
+    "start_analytics_materializer",
+    "stop_analytics_materializer",
+    "to_dynamo",
+]
@@ -0,0 +1,135 @@
+"""Background job that persists analytics rollups for closed DR events.
+
+The job only pre-warms: the analytics API rolls up any closed event that has
+no current rollup itself and stores the result, so a stopped materializer
+makes the first request slower but never changes its answer.
+
+Under Gunicorn every worker calls ``start_analytics_materializer``, but only
+the worker holding ``ANALYTICS_MATERIALIZER_LOCK_FILE`` runs the job.  The
+lock is released when that worker exits, and its replacement takes it over.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from threading import Event, Lock, Thread
+from typing import IO, Any, Iterable, Optional
+
+from boto3.dynamodb.conditions import Attr
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Gunicorn itself only runs on POSIX
+    fcntl = None
+
+import config
+from db.dynamoClient import DynamoClient
+from monitoring import logger
+
+from .rollup import (
+    ROLLUP_FIELD,
+    ROLLUP_GENERATION_FIELD,
+    ROLLUP_INVALIDATED_AT_FIELD,
+)
+
+_events_client: Optional[DynamoClient] = None
+_materializer_lock = Lock()
+_materializer_thread: Optional[Thread] = None
+_materializer_stop = Event()
+_leader_lock_file: Optional[IO[str]] = None
+
+
+def _get_events_client() -> DynamoClient:
+    global _events_client
+    if _events_client is None:
+        _events_client = DynamoClient(
+            table_name=config.DREVENTS_TABLE, region_name=config.AWS_REGION
+        )
+    return _events_client
+
+
+def invalidate_event_analytics(event_ids: Iterable[Optional[str]]) -> None:
+    """Drop stored rollups so the next read or materializer run rebuilds them.
+
+    Called by contract writers.  The generation changes even when no rollup
+    is stored, so a rollup being built from the old contracts is not stored;
+    the condition keeps missing events from being created.
+    """
+    invalidated_at = datetime.now(timezone.utc).isoformat()
+    for event_id in {event_id for event_id in event_ids if event_id}:
+        try:
+            _get_events_client().update_item_conditional(
+                key={"id": event_id},
+                update_data={
+                    ROLLUP_FIELD: None,
+                    ROLLUP_GENERATION_FIELD: uuid.uuid4().hex,
+                    ROLLUP_INVALIDATED_AT_FIELD: invalidated_at,
+                },
+                condition_expression=Attr("id").exists(),
+            )
+        except Exception as error:
+            logger.warning(
+                "Failed to invalidate analytics rollup for %s: %s", event_id, error
+            )
+
+
+def _run(service: Any, interval_seconds: int) -> None:
+    while not _materializer_stop.is_set():
+        try:
+            materialized = service.materialize_analytics()
+            if materialized:
+                logger.info("Materialized analytics for %d DR events", materialized)
+        except Exception as error:
+            logger.warning("Analytics materialization failed: %s", error)
+        _materializer_stop.wait(interval_seconds)
+
+
+def _is_materializer_leader() -> bool:
+    """Whether this process runs the job: always when it is the only server
+    process, otherwise when it holds the host-wide lock (kept until exit)."""
+    global _leader_lock_file
+    if config.SERVER_PROCESSES <= 1 or fcntl is None:
+        return True
+    if _leader_lock_file is not None:
+        return True
+    lock_file = open(config.ANALYTICS_MATERIALIZER_LOCK_FILE, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _leader_lock_file = lock_file
+    return True
+
+
+def start_analytics_materializer(
+    service: Any, interval_seconds: Optional[int] = None
+) -> Optional[Thread]:
+    """Start the materializer thread, in one server process only.
+
+    ``service`` is a ``DREventService``; it is passed in rather than imported
+    because the DR event service itself depends on this package.  Returns
+    ``None`` when the thread is already running or another process leads.
+    """
+    global _materializer_thread
+    with _materializer_lock:
+        if _materializer_thread is not None and _materializer_thread.is_alive():
+            return None
+        if not _is_materializer_leader():
+            logger.info("Analytics materializer runs in another server process")
+            return None
+        _materializer_stop.clear()
+        _materializer_thread = Thread(
+            target=_run,
+            args=(
+                service,
+                interval_seconds or config.ANALYTICS_MATERIALIZE_INTERVAL_SECONDS,
+            ),
+            name="analytics-materializer",
+            daemon=True,
+        )
+        _materializer_thread.start()
+        return _materializer_thread
+
+
+def stop_analytics_materializer() -> None:
+    _materializer_stop.set()
@@ -0,0 +1,355 @@
+"""Per-event analytics rollups.
+
+A rollup pre-aggregates one DR event's measurements into UTC hour buckets and
+per-vessel hourly totals, and its contracts into payout/exposure figures.
+Hour buckets are the finest grain the analytics API serves, so day series,
+the weekday/hour heatmap, leaderboards and financials can all be rebuilt by
+merging rollups, and a period starting part-way through an event keeps only
+its hours (``slice_measurement_rollup``), without touching the raw
+measurements.  Periods therefore count whole UTC hours.
+
+Rollups of closed events are persisted by the materializer: the hour buckets
+and contract figures on the event item (``analyticsRollup``), the per-vessel
+entries, which grow with the fleet, in ``vesselParts`` items of the analytics
+rollups table (see ``DynamoDREventRepository.store_rollup``).  Open events
+are rolled up live on each request.
+
+Every invalidation also writes a new ``analyticsGeneration`` token and
+``analyticsInvalidatedAt`` time.  A rollup is only stored if the generation it
+was built from is still current, so a build racing an invalidation never
+overwrites it, and only once the invalidation has settled
+(``ANALYTICS_ROLLUP_SETTLE_SECONDS``), so contracts read through the lagging
+``drEventId-index`` include the change that triggered it.
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from models.drevent import EventStatus
+
+from timeutil import US_PER_HOUR, from_epoch_us, parse_epoch_us, parse_utc
+
+from .frame import MeasurementFrame
+
+ROLLUP_FIELD = "analyticsRollup"
+ROLLUP_GENERATION_FIELD = "analyticsGeneration"
+ROLLUP_INVALIDATED_AT_FIELD = "analyticsInvalidatedAt"
+ROLLUP_VERSION = 2
+# Stored summaries replace the measurement rollup's ``vessels`` by this count
+# of rollups-table items.
+ROLLUP_VESSEL_PARTS_FIELD = "vesselParts"
+
+# Events in these states no longer receive measurements, so their rollup can
+# be stored and reused until the event or one of its contracts changes.
+CLOSED_EVENT_STATUSES = frozenset(
+    {
+        EventStatus.COMPLETED.value,
+        EventStatus.SETTLED.value,
+        EventStatus.ARCHIVED.value,
+        EventStatus.CANCELLED.value,
+    }
+)
+
+_FINALIZED_CONTRACT_STATUSES = {"completed", "failed", "cancelled"}
+_OPEN_CONTRACT_STATUSES = {"pending", "active"}
+
+
+def _hour_key(timestamp: datetime) -> str:
+    return timestamp.replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rollup_measurements(
+    measurements: Iterable[Dict[str, Any]],
+    since: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Aggregate measurements taken at or after ``since`` into hour buckets."""
+    frame = MeasurementFrame.from_records(measurements, since=since)
+    hour_starts, energy, power, samples = frame.bucket_sums(US_PER_HOUR)
+    hours = {
+        from_epoch_us(start).isoformat(): {
+            "energyKwh": float(energy_kwh),
+            "powerKw": float(power_kw),
+            "samples": int(count),
+        }
+        for start, energy_kwh, power_kw, count in zip(hour_starts, energy, power, samples)
+    }
+
+    vessel_codes, vessel_energy = frame.vessel_totals()
+    _, latest_rows = frame.latest_rows_by_vessel()
+    _, first_rows = frame.first_rows_by_vessel()
+    hour_codes, vessel_hour_starts, vessel_hour_energy, _ = frame.vessel_bucket_sums(
+        US_PER_HOUR, include_missing=True
+    )
+    vessel_hours: Dict[int, Dict[str, float]] = {}
+    for code, start, energy_kwh in zip(hour_codes, vessel_hour_starts, vessel_hour_energy):
+        vessel_hours.setdefault(int(code), {})[from_epoch_us(start).isoformat()] = float(
+            energy_kwh
+        )
+    vessels: Dict[str, Dict[str, Any]] = {}
+    for code, energy_kwh, latest_row, first_row in zip(
+        vessel_codes, vessel_energy, latest_rows, first_rows
+    ):
+        vessels[str(frame.vessel_id(int(code)) or "unknown")] = {
+            "contractId": frame.contract_id(latest_row) or frame.contract_id(first_row),
+            "energyKwh": float(energy_kwh),
+            "hourEnergyKwh": vessel_hours.get(int(code), {}),
+            "latestPowerKw": float(frame.power_kw[latest_row]),
+            "latestTimestamp": from_epoch_us(frame.timestamps[latest_row]).isoformat(),
+        }
+
+    has_rows = len(frame) > 0
+    return {
+        "measurementCount": len(frame),
+        "firstMeasurementAt": (
+            from_epoch_us(frame.timestamps.min()).isoformat() if has_rows else None
+        ),
+        "lastMeasurementAt": (
+            from_epoch_us(frame.timestamps.max()).isoformat() if has_rows else None
+        ),
+        "hours": hours,
+        "vessels": vessels,
+    }
+
+
+def slice_measurement_rollup(
+    measurement_rollup: Dict[str, Any], period_start: datetime
+) -> Optional[Dict[str, Any]]:
+    """Keep the hours of ``measurement_rollup`` from the one holding ``period_start`` on.
+
+    Vessels keep their energy in those hours and are dropped when they have
+    none.  Returns ``None`` when no measurement falls in the period.
+    """
+    first_hour = _hour_key(period_start.astimezone(timezone.utc))
+    hours = {
+        key: hour
+        for key, hour in measurement_rollup.get("hours", {}).items()
+        if parse_utc(key) >= parse_utc(first_hour)
+    }
+    if not hours:
+        return None
+    if len(hours) == len(measurement_rollup.get("hours", {})):
+        return measurement_rollup
+    vessels = {}
+    for vessel_id, vessel in measurement_rollup.get("vessels", {}).items():
+        vessel_hours = {
+            key: energy
+            for key, energy in vessel.get("hourEnergyKwh", {}).items()
+            if key in hours
+        }
+        if vessel_hours:
+            vessels[vessel_id] = {
+                **vessel,
+                "energyKwh": sum(vessel_hours.values()),
+                "hourEnergyKwh": vessel_hours,
+            }
+    return {
+        **measurement_rollup,
+        "measurementCount": sum(int(hour["samples"]) for hour in hours.values()),
+        "firstMeasurementAt": min(hours, key=parse_utc),
+        "hours": hours,
+        "vessels": vessels,
+    }
+
+
+def split_rollup_vessels(
+    rollup: Dict[str, Any], vessels_per_part: int
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return the rollup without its vessel entries, and those entries in parts."""
+    measurements = dict(rollup.get("measurements") or {})
+    vessel_items = list((measurements.pop("vessels", None) or {}).items())
+    parts = [
+        dict(vessel_items[index : index + vessels_per_part])
+        for index in range(0, len(vessel_items), vessels_per_part)
+    ]
+    measurements[ROLLUP_VESSEL_PARTS_FIELD] = len(parts)
+    return {**rollup, "measurements": measurements}, parts
+
+
+def rollup_contracts(contracts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {
+        "count": 0,
+        "finalized": 0,
+        "completed": 0,
+        "payoutUsd": 0.0,
+        "exposureUsd": 0.0,
+        "payoutByHour": {},
+    }
+    for contract in contracts:
+        status = str(contract.get("status") or "").lower()
+        value = _float(contract.get("totalValue"))
+        summary["count"] += 1
+        if status in _FINALIZED_CONTRACT_STATUSES:
+            summary["finalized"] += 1
+        if status == "completed":
+            summary["completed"] += 1
+            summary["payoutUsd"] += value
+            end_time = parse_utc(contract.get("endTime"))
+            if end_time:
+                key = _hour_key(end_time)
+                summary["payoutByHour"][key] = summary["payoutByHour"].get(key, 0.0) + value
+        elif status in _OPEN_CONTRACT_STATUSES:
+            summary["exposureUsd"] += value
+    return summary
+
+
+def build_event_rollup(
+    event: Dict[str, Any],
+    measurements: Iterable[Dict[str, Any]],
+    contracts: Iterable[Dict[str, Any]],
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    return {
+        "version": ROLLUP_VERSION,
+        "eventStatus": event.get("status"),
+        "materializedAt": (now or datetime.now(timezone.utc)).isoformat(),
+        "measurements": rollup_measurements(measurements),
+        "contracts": rollup_contracts(contracts),
+    }
+
+
+def rollup_is_current(event: Dict[str, Any], rollup: Any) -> bool:
+    """A stored rollup is reusable while the event stays in the closed state it was built in."""
+    return (
+        isinstance(rollup, dict)
+        and rollup.get("version") == ROLLUP_VERSION
+        and event.get("status") in CLOSED_EVENT_STATUSES
+        and rollup.get("eventStatus") == event.get("status")
+    )
+
+
+def rollup_can_be_stored(raw_event: Dict[str, Any], now: datetime) -> bool:
+    """Whether the last invalidation is old enough for index reads to reflect it."""
+    invalidated_at = parse_utc(raw_event.get(ROLLUP_INVALIDATED_AT_FIELD))
+    if invalidated_at is None:
+        return True
+    return (now - invalidated_at).total_seconds() >= config.ANALYTICS_ROLLUP_SETTLE_SECONDS
+
+
+def from_dynamo(value: Any) -> Any:
+    """Decode a stored rollup: DynamoDB hands its numbers back as ``Decimal``."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: from_dynamo(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_dynamo(item) for item in value]
+    return value
+
+
+def to_dynamo(value: Any) -> Any:
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: to_dynamo(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo(item) for item in value]
+    return value
+
+
+def _bucket_key(hour_key: str, grain: str) -> str:
+    timestamp = parse_utc(hour_key)
+    if grain == "day":
+        timestamp = timestamp.replace(hour=0)
+    return timestamp.isoformat()
+
+
+def merge_rollups(
+    parts: List[Tuple[str, Optional[Dict[str, Any]], Dict[str, Any]]],
+    grain: str,
+) -> Dict[str, Any]:
+    """Combine ``(event_id, measurement_rollup, contract_rollup)`` triples.
+
+    ``measurement_rollup`` is ``None`` for events with no measurements in the
+    requested period.
+    """
+    time_buckets: Dict[str, Dict[str, Any]] = {}
+    vessels: Dict[str, Dict[str, Any]] = {}
+    heat: Dict[Tuple[int, int], Dict[str, float]] = {}
+    total_energy = 0.0
+    total_power = 0.0
+    samples = 0
+    finalized = 0
+    completed = 0
+    contracts_count = 0
+    total_payout = 0.0
+    exposure = 0.0
+    payout_buckets: Dict[str, float] = {}
+    payout_by_event: Dict[str, float] = {}
+
+    for event_id, measurement_rollup, contract_rollup in parts:
+        if measurement_rollup:
+            for hour_key, hour in measurement_rollup.get("hours", {}).items():
+                key = _bucket_key(hour_key, grain)
+                bucket = time_buckets.setdefault(
+                    key,
+                    {
+                        "timestamp": key,
+                        "energyDischargedKwh": 0.0,
+                        "averagePowerKw": 0.0,
+                        "samples": 0,
+                    },
+                )
+                bucket["energyDischargedKwh"] += hour["energyKwh"]
+                bucket["averagePowerKw"] += hour["powerKw"]
+                bucket["samples"] += int(hour["samples"])
+                total_energy += hour["energyKwh"]
+                total_power += hour["powerKw"]
+                samples += int(hour["samples"])
+
+                hour_ts = parse_utc(hour_key)
+                heat_entry = heat.setdefault(
+                    (hour_ts.weekday(), hour_ts.hour), {"powerTotal": 0.0, "samples": 0}
+                )
+                heat_entry["powerTotal"] += hour["powerKw"]
+                heat_entry["samples"] += int(hour["samples"])
+
+            for vessel_id, vessel in measurement_rollup.get("vessels", {}).items():
+                merged = vessels.get(vessel_id)
+                if merged is None:
+                    vessels[vessel_id] = dict(vessel)
+                    continue
+                merged["energyKwh"] += vessel["energyKwh"]
+                if parse_epoch_us(vessel.get("latestTimestamp")) >= parse_epoch_us(
+                    merged.get("latestTimestamp")
+                ):
+                    merged["latestTimestamp"] = vessel.get("latestTimestamp")
+                    merged["latestPowerKw"] = vessel.get("latestPowerKw")
+                    if vessel.get("contractId"):
+                        merged["contractId"] = vessel.get("contractId")
+
+        contracts_count += int(contract_rollup.get("count", 0))
+        finalized += int(contract_rollup.get("finalized", 0))
+        completed += int(contract_rollup.get("completed", 0))
+        total_payout += contract_rollup.get("payoutUsd", 0.0)
+        exposure += contract_rollup.get("exposureUsd", 0.0)
+        payout_by_event[event_id] = (
+            payout_by_event.get(event_id, 0.0) + contract_rollup.get("payoutUsd", 0.0)
+        )
+        for hour_key, payout in contract_rollup.get("payoutByHour", {}).items():
+            key = _bucket_key(hour_key, grain)
+            payout_buckets[key] = payout_buckets.get(key, 0.0) + payout
+
+    return {
+        "timeBuckets": time_buckets,
+        "vessels": vessels,
+        "heat": heat,
+        "totalEnergyKwh": total_energy,
+        "totalPowerKw": total_power,
+        "samples": samples,
+        "contractsCount": contracts_count,
+        "finalizedContracts": finalized,
+        "completedContracts": completed,
+        "totalPayoutUsd": total_payout,
+        "committedExposureUsd": exposure,
+        "payoutBuckets": payout_buckets,
+        "payoutByEvent": payout_by_event,
+    }
@@ -2,11 +2,16 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Callable, Dict, List, Optional, Protocol
 
+from boto3.dynamodb.conditions import Key
+
 import config
 from db.dynamoClient import DynamoClient
 from models.booking import Booking, BookingStatus
 from models.contract import ContractStatus
 from services.drevents import DREventService, DREventServiceError
+from services.vo_dashboard import invalidate_vo_dashboard_for_vessels
+from timeutil import parse_iso
+from .assignment import AssignmentRequest, BusyWindows, plan_charger_assignments
 
 
 class BookingServiceError(Exception):
@@ -17,11 +22,10 @@ class BookingServiceError(Exception):
 
 
 def parse_datetime_safe(dt_string: str) -> datetime:
-    normalized = str(dt_string).strip().replace("Z", "+00:00")
-    dt = datetime.fromisoformat(normalized)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt
+    parsed = parse_iso(str(dt_string))
+    if parsed is None:
+        raise ValueError(f"Invalid isoformat string: {dt_string!r}")
+    return parsed
 
 
 def now_utc() -> datetime:
@@ -46,10 +50,40 @@ def _is_active_charger(charger: Dict[str, Any]) -> bool:
     return status in [1, "ACTIVE", "active", "Active", "1"]
 
 
+def _is_booked_active_contract(contract: Dict[str, Any]) -> bool:
+    return str(contract.get("status") or "").lower() == (
+        ContractStatus.ACTIVE.value
+    ) and bool(str(contract.get("bookingId") or "").strip())
+
+
+def _is_awaiting_booking(contract: Dict[str, Any]) -> bool:
+    return (
+        str(contract.get("status") or "").lower() == ContractStatus.PENDING.value
+        and bool(contract.get("acceptedAt"))
+        and not str(contract.get("bookingId") or "").strip()
+    )
+
+
+def _required_charger_type(dr_event: Dict[str, Any]) -> str:
+    return str((dr_event.get("details") or {}).get("requiredChargerType") or "").strip()
+
+
+def _window_is_busy(
+    busy: BusyWindows, charger_id: str, start_time: datetime, end_time: datetime
+) -> bool:
+    return any(
+        _booking_windows_overlap(start_time, end_time, busy_start, busy_end)
+        for busy_start, busy_end in busy.get(charger_id, ())
+    )
+
+
 class BookingRepository(Protocol):
     def list_bookings(self) -> List[Dict[str, Any]]:
         pass
 
+    def list_station_bookings(self, station_id: str) -> List[Dict[str, Any]]:
+        pass
+
     def get_booking(self, booking_id: str) -> Optional[Dict[str, Any]]:
         pass
 
@@ -80,6 +114,12 @@ class ContractRepository(Protocol):
     def list_contracts(self) -> List[Dict[str, Any]]:
         pass
 
+    def get_contract_by_booking_id(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        pass
+
     def update_contract(
         self, contract_id: str, update_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -103,6 +143,12 @@ class DynamoBookingRepository:
     def list_bookings(self) -> List[Dict[str, Any]]:
         return self.client.scan_items()
 
+    def list_station_bookings(self, station_id: str) -> List[Dict[str, Any]]:
+        return self.client.query_gsi(
+            index_name="stationId-index",
+            key_condition_expression=Key("stationId").eq(station_id),
+        )
+
     def get_booking(self, booking_id: str) -> Optional[Dict[str, Any]]:
         booking = self.client.get_item(key={"id": booking_id})
         return booking or None
@@ -130,11 +176,10 @@ class DynamoChargerRepository:
         return charger or None
 
     def list_station_chargers(self, station_id: str) -> List[Dict[str, Any]]:
-        return [
-            charger
-            for charger in self.client.scan_items()
-            if str(charger.get("chargingStationId") or "") == station_id
-        ]
+        return self.client.query_gsi(
+            index_name="chargingStationId-index",
+            key_condition_expression=Key("chargingStationId").eq(station_id),
+        )
 
 
 class DynamoContractRepository:
@@ -150,6 +195,19 @@ class DynamoContractRepository:
     def list_contracts(self) -> List[Dict[str, Any]]:
         return self.client.scan_items()
 
+    def get_contract_by_booking_id(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        contracts = self.client.query_gsi(
+            index_name="bookingId-index",
+            key_condition_expression=Key("bookingId").eq(booking_id),
+        )
+        return contracts[0] if contracts else None
+
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        return self.client.query_gsi(
+            index_name="drEventId-index",
+            key_condition_expression=Key("drEventId").eq(dr_event_id),
+        )
+
     def update_contract(
         self, contract_id: str, update_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -234,13 +292,28 @@ class BookingService:
             raise BookingServiceError("End time must be after start time", 400)
 
         station_id = str(data["stationId"])
+        contract = None
+        contract_id = str(data.get("contractId") or "").strip()
+        if contract_id:
+            contract = self.contract_repository.get_contract(contract_id)
+            if not contract:
+                raise BookingServiceError("Contract not found", 404)
+            if str(contract.get("vesselId") or "") != str(data["vesselId"]):
+                raise BookingServiceError("Contract does not belong to this vessel", 403)
+            if str(contract.get("bookingId") or "").strip():
+                raise BookingServiceError("Contract already has a booking", 409)
+
         charger_id = str(data.get("chargerId") or "").strip()
         if not charger_id:
+            charger_type = str(data.get("chargerType") or "").strip()
+            if contract is not None and contract.get("drEventId"):
+                charger_type = self._event_charger_type(str(contract["drEventId"]))
             charger_id = self._resolve_charger_id(
                 station_id=station_id,
-                charger_type=str(data.get("chargerType") or "").strip(),
+                charger_type=charger_type,
                 start_time=start_time,
                 end_time=end_time,
+                contract=contract,
             )
             if not charger_id:
                 raise BookingServiceError("chargerId is required", 400)
@@ -257,18 +330,8 @@ class BookingService:
         if not _is_active_charger(charger):
             raise BookingServiceError("Selected charger is unavailable", 409)
 
-        contract = None
-        contract_id = str(data.get("contractId") or "").strip()
-        if contract_id:
-            contract = self.contract_repository.get_contract(contract_id)
-            if not contract:
-                raise BookingServiceError("Contract not found", 404)
-            if str(contract.get("vesselId") or "") != str(data["vesselId"]):
-                raise BookingServiceError("Contract does not belong to this vessel", 403)
-            if str(contract.get("bookingId") or "").strip():
-                raise BookingServiceError("Contract already has a booking", 409)
-
         self._assert_no_charger_conflict(
+            station_id=station_id,
             charger_id=str(data["chargerId"]),
             start_time=start_time,
             end_time=end_time,
@@ -292,9 +355,10 @@ class BookingService:
 
         booking_data = booking.to_dict()
         self.repository.create_booking(booking_data)
+        invalidate_vo_dashboard_for_vessels([booking.vesselId])
 
         if contract_id:
-            self.contract_repository.update_contract(
+            booked_contract = self.contract_repository.update_contract(
                 contract_id,
                 {
                     "bookingId": booking.id,
@@ -302,7 +366,9 @@ class BookingService:
                     "updatedAt": self.now_provider().isoformat(),
                 },
             )
-            self._transition_event_to_committed_if_ready(str(contract.get("drEventId") or ""))
+            self._transition_event_to_committed_if_ready(
+                str(contract.get("drEventId") or ""), booked_contract
+            )
 
         return booking_data
 
@@ -368,13 +434,16 @@ class BookingService:
             update_data["chargerType"] = str(charger.get("chargerType") or "")
 
         self._assert_no_charger_conflict(
+            station_id=next_station_id,
             charger_id=next_charger_id,
             start_time=next_start_time,
             end_time=next_end_time,
             excluded_booking_id=booking_id,
         )
 
-        return self.repository.update_booking(booking_id, update_data)
+        updated = self.repository.update_booking(booking_id, update_data)
+        invalidate_vo_dashboard_for_vessels([booking.get("vesselId")])
+        return updated
 
     def cancel_booking(
         self,
@@ -397,10 +466,12 @@ class BookingService:
                     400,
                 )
 
-        return self.repository.update_booking(
+        cancelled = self.repository.update_booking(
             booking_id,
             {"status": BookingStatus.CANCELLED.value},
         )
+        invalidate_vo_dashboard_for_vessels([booking.get("vesselId")])
+        return cancelled
 
     def delete_booking(
         self,
@@ -445,14 +516,11 @@ class BookingService:
             raise BookingServiceError("End time must be after start time", 400)
 
         chargers = self.charger_repository.list_station_chargers(station_id)
+        busy = self._busy_windows(station_id)
         availability = []
         for charger in chargers:
             charger_id = str(charger.get("id") or "")
-            has_conflict = self._charger_has_conflict(
-                charger_id=charger_id,
-                start_time=start_time,
-                end_time=end_time,
-            )
+            has_conflict = _window_is_busy(busy, charger_id, start_time, end_time)
             availability.append(
                 {
                     "chargerId": charger_id,
@@ -470,6 +538,72 @@ class BookingService:
             "chargers": availability,
         }
 
+    def plan_event_bookings(self, dr_event_id: str) -> Dict[str, Any]:
+        try:
+            dr_event = self.drevent_service.get_event(dr_event_id)
+        except DREventServiceError as error:
+            raise BookingServiceError(error.message, error.status_code) from error
+
+        station_id = str(dr_event.get("stationId") or "")
+        charger_type = _required_charger_type(dr_event)
+
+        requests: List[AssignmentRequest] = []
+        unassigned: List[Dict[str, Any]] = []
+        for contract in self.contract_repository.list_contracts_by_event(dr_event_id):
+            if not _is_awaiting_booking(contract):
+                continue
+            request = self._assignment_request(contract, charger_type)
+            if request is None:
+                unassigned.append(
+                    {
+                        "contractId": contract.get("id"),
+                        "vesselId": contract.get("vesselId"),
+                        "reason": "Contract has invalid time window",
+                    }
+                )
+                continue
+            requests.append(request)
+
+        chargers = self._bookable_station_chargers(station_id)
+        assignments = plan_charger_assignments(
+            requests, chargers, self._busy_windows(station_id)
+        )
+        charger_types = {
+            str(charger.get("id") or ""): charger.get("chargerType") for charger in chargers
+        }
+
+        planned: List[Dict[str, Any]] = []
+        for request in requests:
+            charger_id = assignments.get(request.contract_id)
+            if not charger_id:
+                unassigned.append(
+                    {
+                        "contractId": request.contract_id,
+                        "vesselId": request.vessel_id,
+                        "reason": "No compatible charger is free for the contract window",
+                    }
+                )
+                continue
+            planned.append(
+                {
+                    "contractId": request.contract_id,
+                    "vesselId": request.vessel_id,
+                    "chargerId": charger_id,
+                    "chargerType": charger_types.get(charger_id),
+                    "startTime": request.start_time.isoformat(),
+                    "endTime": request.end_time.isoformat(),
+                }
+            )
+
+        return {
+            "eventId": dr_event_id,
+            "stationId": station_id,
+            "chargersConsidered": len(chargers),
+            "contractsConsidered": len(requests) + len(unassigned),
+            "assignments": planned,
+            "unassigned": unassigned,
+        }
+
     def _assert_booking_ownership(
         self,
         booking: Dict[str, Any],
@@ -480,45 +614,24 @@ class BookingService:
 
     def _assert_no_charger_conflict(
         self,
+        station_id: str,
         charger_id: str,
         start_time: datetime,
         end_time: datetime,
         excluded_booking_id: Optional[str] = None,
     ) -> None:
-        if self._charger_has_conflict(
-            charger_id=charger_id,
-            start_time=start_time,
-            end_time=end_time,
-            excluded_booking_id=excluded_booking_id,
-        ):
+        busy = self._busy_windows(station_id, excluded_booking_id)
+        if _window_is_busy(busy, charger_id, start_time, end_time):
             raise BookingServiceError("Time slot conflicts with existing booking", 409)
 
-    def _charger_has_conflict(
-        self,
-        charger_id: str,
-        start_time: datetime,
-        end_time: datetime,
-        excluded_booking_id: Optional[str] = None,
-    ) -> bool:
-        for existing_booking in self.repository.list_bookings():
-            if excluded_booking_id and existing_booking.get("id") == excluded_booking_id:
-                continue
-            if str(existing_booking.get("chargerId") or "") != charger_id:
-                continue
-            if not _is_active_booking_status(existing_booking.get("status")):
-                continue
-
-            existing_start = parse_datetime_safe(str(existing_booking["startTime"]))
-            existing_end = parse_datetime_safe(str(existing_booking["endTime"]))
-            if _booking_windows_overlap(start_time, end_time, existing_start, existing_end):
-                return True
-        return False
-
     def _linked_contract(self, booking_id: str) -> Optional[Dict[str, Any]]:
-        for contract in self.contract_repository.list_contracts():
-            if str(contract.get("bookingId") or "") == booking_id:
-                return contract
-        return None
+        return self.contract_repository.get_contract_by_booking_id(booking_id)
+
+    def _event_charger_type(self, dr_event_id: str) -> str:
+        try:
+            return _required_charger_type(self.drevent_service.get_event(dr_event_id))
+        except DREventServiceError as error:
+            raise BookingServiceError(error.message, error.status_code) from error
 
     def _resolve_charger_id(
         self,
@@ -526,25 +639,130 @@ class BookingService:
         charger_type: str,
         start_time: datetime,
         end_time: datetime,
+        contract: Optional[Dict[str, Any]] = None,
     ) -> str:
+        busy = self._busy_windows(station_id)
+        reserved: set = set()
+        if contract is not None:
+            contract_id = str(contract.get("id") or "")
+            assignments = self._event_plan(
+                station_id, charger_type, start_time, end_time, contract, busy
+            )
+            if assignments.get(contract_id):
+                return assignments[contract_id]
+            # Chargers the plan gives other contracts are not up for grabs.
+            reserved = {
+                charger_id
+                for other_id, charger_id in assignments.items()
+                if other_id != contract_id
+            }
+
         for charger in self.charger_repository.list_station_chargers(station_id):
             charger_id = str(charger.get("id") or "")
-            if not charger_id:
+            if not charger_id or charger_id in reserved:
                 continue
             if charger_type and str(charger.get("chargerType") or "") != charger_type:
                 continue
             if not _is_active_charger(charger):
                 continue
-            if self._charger_has_conflict(
-                charger_id=charger_id,
-                start_time=start_time,
-                end_time=end_time,
-            ):
+            if _window_is_busy(busy, charger_id, start_time, end_time):
                 continue
             return charger_id
         return ""
 
-    def _transition_event_to_committed_if_ready(self, dr_event_id: str) -> None:
+    def _event_plan(
+        self,
+        station_id: str,
+        charger_type: str,
+        start_time: datetime,
+        end_time: datetime,
+        contract: Dict[str, Any],
+        busy: BusyWindows,
+    ) -> Dict[str, str]:
+        """Plan every contract of the event still awaiting a booking.
+
+        Uses the same inputs as ``plan_event_bookings`` (the event's required
+        charger type), so this booking takes the charger the plan reserves
+        for it rather than one a later vessel needs.
+        """
+        contract_id = str(contract.get("id") or "")
+        dr_event_id = str(contract.get("drEventId") or "")
+        requests = [
+            AssignmentRequest(
+                contract_id=contract_id,
+                vessel_id=str(contract.get("vesselId") or ""),
+                start_time=start_time,
+                end_time=end_time,
+                charger_type=charger_type,
+            )
+        ]
+        if dr_event_id:
+            for other in self.contract_repository.list_contracts_by_event(dr_event_id):
+                if str(other.get("id") or "") == contract_id:
+                    continue
+                if not _is_awaiting_booking(other):
+                    continue
+                request = self._assignment_request(other, charger_type)
+                if request is not None:
+                    requests.append(request)
+
+        chargers = self._bookable_station_chargers(station_id)
+        return plan_charger_assignments(requests, chargers, busy)
+
+    def _bookable_station_chargers(self, station_id: str) -> List[Dict[str, Any]]:
+        return [
+            charger
+            for charger in self.charger_repository.list_station_chargers(station_id)
+            if str(charger.get("id") or "") and _is_active_charger(charger)
+        ]
+
+    def _busy_windows(
+        self, station_id: str, excluded_booking_id: Optional[str] = None
+    ) -> BusyWindows:
+        """Active booking windows per charger, from one stationId-index query."""
+        busy: BusyWindows = {}
+        for booking in self.repository.list_station_bookings(station_id):
+            if excluded_booking_id and booking.get("id") == excluded_booking_id:
+                continue
+            if not _is_active_booking_status(booking.get("status")):
+                continue
+            try:
+                window = (
+                    parse_datetime_safe(str(booking["startTime"])),
+                    parse_datetime_safe(str(booking["endTime"])),
+                )
+            except (KeyError, ValueError):
+                continue
+            busy.setdefault(str(booking.get("chargerId") or ""), []).append(window)
+        return busy
+
+    def _assignment_request(
+        self, contract: Dict[str, Any], charger_type: str
+    ) -> Optional[AssignmentRequest]:
+        try:
+            start_time = parse_datetime_safe(str(contract["startTime"]))
+            end_time = parse_datetime_safe(str(contract["endTime"]))
+        except (KeyError, ValueError):
+            return None
+        if end_time <= start_time:
+            return None
+        return AssignmentRequest(
+            contract_id=str(contract.get("id") or ""),
+            vessel_id=str(contract.get("vesselId") or ""),
+            start_time=start_time,
+            end_time=end_time,
+            charger_type=charger_type,
+        )
+
+    def _transition_event_to_committed_if_ready(
+        self, dr_event_id: str, booked_contract: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Commit an Accepted event once one of its contracts is booked and active.
+
+        ``booked_contract`` is the contract just updated by this request; it
+        satisfies the condition on its own, so the drEventId-index (which may
+        not reflect that update yet) is only read without it.
+        """
         if not dr_event_id:
             return
 
@@ -556,14 +774,14 @@ class BookingService:
         if str(dr_event.get("status") or "") != "Accepted":
             return
 
-        has_booked_active_contract = any(
-            str(contract.get("drEventId") or "") == dr_event_id
-            and str(contract.get("status") or "").lower() == ContractStatus.ACTIVE.value
-            and bool(str(contract.get("bookingId") or "").strip())
-            for contract in self.contract_repository.list_contracts()
-        )
-        if not has_booked_active_contract:
-            return
+        if not booked_contract or not _is_booked_active_contract(booked_contract):
+            if not any(
+                _is_booked_active_contract(contract)
+                for contract in self.contract_repository.list_contracts_by_event(
+                    dr_event_id
+                )
+            ):
+                return
 
         self.drevent_service.update_event(
             dr_event_id,
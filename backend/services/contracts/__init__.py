@@ -1,5 +1,5 @@
 """Contract business service package."""
 
-from .service import ContractService, ContractServiceError, convert_decimals
+from .service import ContractService, ContractServiceError
 
-__all__ = ["ContractService", "ContractServiceError", "convert_decimals"]
+__all__ = ["ContractService", "ContractServiceError"]
@@ -1,25 +1,22 @@
+import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from boto3.dynamodb.conditions import Key
 
 import config
 from db.dynamoClient import DynamoClient
 from models.booking import BookingStatus
 from models.contract import Contract, ContractStatus
 from models.vessel import Vessel
+from services.analytics import invalidate_event_analytics
+from services.vo_dashboard import invalidate_vo_dashboard_for_vessels
+from timeutil import parse_iso
 from . import validation
 
-
-def convert_decimals(obj):
-    """Convert Decimal objects to float for JSON serialization."""
-    if isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    if isinstance(obj, dict):
-        return {key: convert_decimals(value) for key, value in obj.items()}
-    if isinstance(obj, Decimal):
-        return float(obj)
-    return obj
+_OFFER_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "aquacharge:contract-offer")
 
 
 class ContractServiceError(Exception):
@@ -30,22 +27,54 @@ class ContractServiceError(Exception):
 
 
 def parse_datetime_safe(dt_string: str) -> datetime:
-    dt = datetime.fromisoformat(dt_string.replace("Z", "+00:00"))
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt
+    parsed = parse_iso(str(dt_string))
+    if parsed is None:
+        raise ValueError(f"Invalid isoformat string: {dt_string!r}")
+    return parsed
+
+
+def offer_contract_id(dr_event_id: str, vessel_id: str) -> str:
+    """Deterministic contract id for the (drEventId, vesselId) offer pair.
+
+    Re-dispatching the same event targets the same keys, and offers are only
+    written where no contract exists yet, so a repeated dispatch neither adds
+    duplicates nor resets an offer the vessel operator already accepted.
+    """
+    return str(uuid.uuid5(_OFFER_ID_NAMESPACE, f"{dr_event_id}:{vessel_id}"))
 
 
 class ContractRepository(Protocol):
     def list_contracts(self) -> List[Dict[str, Any]]:
         pass
 
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        pass
+
+    def list_contracts_by_status(self, status: str) -> List[Dict[str, Any]]:
+        pass
+
+    def list_contracts_by_vessel(self, vessel_id: str) -> List[Dict[str, Any]]:
+        pass
+
+    def list_contracts_page(
+        self,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        vessel_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        pass
+
     def get_contract(self, contract_id: str) -> Optional[Dict[str, Any]]:
         pass
 
     def create_contract(self, contract_data: Dict[str, Any]) -> None:
         pass
 
+    def create_contracts(self, contracts_data: List[Dict[str, Any]]) -> List[str]:
+        """Write contracts whose id is not taken yet; return the ids written."""
+        pass
+
     def update_contract(
         self, contract_id: str, update_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -85,6 +114,47 @@ class DynamoContractRepository:
     def list_contracts(self) -> List[Dict[str, Any]]:
         return self.client.scan_items()
 
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        return self.client.query_gsi(
+            index_name="drEventId-index",
+            key_condition_expression=Key("drEventId").eq(dr_event_id),
+        )
+
+    def list_contracts_by_status(self, status: str) -> List[Dict[str, Any]]:
+        return self.client.query_gsi(
+            index_name="status-index",
+            key_condition_expression=Key("status").eq(status),
+        )
+
+    def list_contracts_by_vessel(self, vessel_id: str) -> List[Dict[str, Any]]:
+        return self.client.query_gsi(
+            index_name="vesselId-index",
+            key_condition_expression=Key("vesselId").eq(vessel_id),
+        )
+
+    def list_contracts_page(
+        self,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+        vessel_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        if vessel_id:
+            return self.client.query_page(
+                Key("vesselId").eq(vessel_id),
+                index_name="vesselId-index",
+                limit=limit,
+                exclusive_start_key=exclusive_start_key,
+            )
+        if status:
+            return self.client.query_page(
+                Key("status").eq(status),
+                index_name="status-index",
+                limit=limit,
+                exclusive_start_key=exclusive_start_key,
+            )
+        return self.client.scan_page(limit, exclusive_start_key)
+
     def get_contract(self, contract_id: str) -> Optional[Dict[str, Any]]:
         contract = self.client.get_item(key={"id": contract_id})
         return contract or None
@@ -92,6 +162,12 @@ class DynamoContractRepository:
     def create_contract(self, contract_data: Dict[str, Any]) -> None:
         self.client.put_item(item=contract_data)
 
+    def create_contracts(self, contracts_data: List[Dict[str, Any]]) -> List[str]:
+        # BatchWriteItem cannot take conditions; transactions of up to 100 can.
+        if not contracts_data:
+            return []
+        return self.client.put_items_if_absent(contracts_data)
+
     def update_contract(
         self, contract_id: str, update_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -159,9 +235,44 @@ class ContractService:
         self,
         status_filter: Optional[str] = None,
         vessel_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if vessel_id:
+            contracts = self.repository.list_contracts_by_vessel(vessel_id)
+        elif status_filter:
+            contracts = self.repository.list_contracts_by_status(status_filter)
+        else:
+            contracts = self.repository.list_contracts()
+
+        filtered_contracts = self._public_contracts(contracts, status_filter, vessel_id)
+        filtered_contracts.sort(key=lambda item: item["createdAt"], reverse=True)
+        return filtered_contracts
+
+    def list_contracts_page(
+        self,
+        limit: int,
+        start_key: Optional[Dict[str, Any]] = None,
+        status_filter: Optional[str] = None,
+        vessel_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One repository page of ``list_contracts``, newest first within the page.
+
+        Returns ``(contracts, last_evaluated_key)``.
+        """
+        contracts, last_key = self.repository.list_contracts_page(
+            limit, start_key, status=status_filter, vessel_id=vessel_id
+        )
+        page = self._public_contracts(contracts, status_filter, vessel_id)
+        page.sort(key=lambda item: item["createdAt"], reverse=True)
+        return page, last_key
+
+    @staticmethod
+    def _public_contracts(
+        contracts: List[Dict[str, Any]],
+        status_filter: Optional[str],
+        vessel_id: Optional[str],
     ) -> List[Dict[str, Any]]:
         filtered_contracts: List[Dict[str, Any]] = []
-        for contract_data in self.repository.list_contracts():
+        for contract_data in contracts:
             if status_filter and contract_data.get("status") != status_filter:
                 continue
             if vessel_id and contract_data.get("vesselId") != vessel_id:
@@ -169,8 +280,6 @@ class ContractService:
 
             contract = Contract.from_dict(contract_data)
             filtered_contracts.append(contract.to_public_dict())
-
-        filtered_contracts.sort(key=lambda item: item["createdAt"], reverse=True)
         return filtered_contracts
 
     def get_contract(self, contract_id: str) -> Dict[str, Any]:
@@ -181,6 +290,15 @@ class ContractService:
         return contract.to_public_dict()
 
     def create_contract(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        contract = self._build_contract(data)
+        self.repository.create_contract(self._storage_dict(contract))
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
+        invalidate_event_analytics([contract.drEventId])
+        return contract.to_public_dict()
+
+    def _build_contract(
+        self, data: Dict[str, Any], contract_id: Optional[str] = None
+    ) -> Contract:
         required_fields = [
             "vesselId",
             "drEventId",
@@ -219,6 +337,8 @@ class ContractService:
             terms=data["terms"],
             createdBy=data.get("createdBy", "unknown"),
         )
+        if contract_id:
+            contract.id = contract_id
         contract.totalValue = contract.energyAmount * contract.pricePerKwh
 
         try:
@@ -226,12 +346,13 @@ class ContractService:
         except ValueError as error:
             raise ContractServiceError(str(error), 400) from error
 
-        contract_data = contract.to_dict()
-        contract_data = {
-            key: value for key, value in contract_data.items() if value is not None
+        return contract
+
+    @staticmethod
+    def _storage_dict(contract: Contract) -> Dict[str, Any]:
+        return {
+            key: value for key, value in contract.to_dict().items() if value is not None
         }
-        self.repository.create_contract(contract_data)
-        return contract.to_public_dict()
 
     def update_contract(self, contract_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         existing_data = self.repository.get_contract(contract_id)
@@ -258,6 +379,7 @@ class ContractService:
                 "updatedAt": contract.updatedAt.isoformat(),
             },
         )
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
 
         return contract.to_public_dict()
 
@@ -279,6 +401,8 @@ class ContractService:
                 "updatedAt": contract.updatedAt.isoformat(),
             },
         )
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
+        invalidate_event_analytics([contract.drEventId])
 
         return contract.to_public_dict()
 
@@ -306,6 +430,8 @@ class ContractService:
                 "updatedAt": contract.updatedAt.isoformat(),
             },
         )
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
+        invalidate_event_analytics([contract.drEventId])
 
         return contract.to_public_dict()
 
@@ -322,6 +448,11 @@ class ContractService:
         """
         Generate one pending contract offer per eligible vessel.
 
+        All offers are validated in memory before anything is written, then
+        stored in one conditional transaction per 100 offers.  Offer ids are derived from the
+        (drEventId, vesselId) pair and pairs that already have a contract
+        are skipped, so a retried dispatch never duplicates an offer.
+
         Parameters
         ----------
         dr_event:
@@ -346,13 +477,13 @@ class ContractService:
         if n == 0:
             return []
 
-        existing_contracts = self.repository.list_contracts()
+        existing_contracts = self.repository.list_contracts_by_event(event_id)
         existing_pairs = {
             (str(contract.get("drEventId") or ""), str(contract.get("vesselId") or ""))
             for contract in existing_contracts
         }
 
-        created: List[Dict[str, Any]] = []
+        offers: List[Contract] = []
         for vessel_result in slots:
             vessel_id = vessel_result.get("vesselId", "")
             display_name = vessel_result.get("displayName") or vessel_id
@@ -374,11 +505,25 @@ class ContractService:
                 ),
                 "createdBy": caller_user_id,
             }
-            contract = self.create_contract(contract_data)
-            created.append(contract)
+            offers.append(
+                self._build_contract(
+                    contract_data,
+                    contract_id=offer_contract_id(event_id, vessel_id),
+                )
+            )
             existing_pairs.add((event_id, vessel_id))
 
-        return created
+        if offers:
+            written_ids = set(
+                self.repository.create_contracts(
+                    [self._storage_dict(contract) for contract in offers]
+                )
+            )
+            offers = [contract for contract in offers if contract.id in written_ids]
+            invalidate_vo_dashboard_for_vessels(
+                contract.vesselId for contract in offers
+            )
+        return [contract.to_public_dict() for contract in offers]
 
     # ------------------------------------------------------------------
     # Accept: ownership check → schedule conflict check → booking handoff
@@ -524,6 +669,7 @@ class ContractService:
                 "updatedAt": contract.updatedAt.isoformat(),
             },
         )
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
 
         if str(dr_event_data.get("status") or "") == "Dispatched":
             self.drevent_repository.update_event(
@@ -556,6 +702,7 @@ class ContractService:
                 "updatedAt": contract.updatedAt.isoformat(),
             },
         )
+        invalidate_vo_dashboard_for_vessels([contract.vesselId])
         return contract.to_public_dict()
 
     def delete_contract(self, contract_id: str) -> None:
@@ -564,3 +711,5 @@ class ContractService:
             raise ContractServiceError("Contract not found", 404)
 
         self.repository.delete_contract(contract_id)
+        invalidate_vo_dashboard_for_vessels([existing_data.get("vesselId")])
+        invalidate_event_analytics([existing_data.get("drEventId")])
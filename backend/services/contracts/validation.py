@@ -6,6 +6,8 @@ from models.vessel import Vessel
 from db.dynamoClient import DynamoClient
 from models import contract
 from boto3.dynamodb.conditions import Key
+from services.analytics import invalidate_event_analytics
+from services.vo_dashboard import invalidate_vo_dashboard_for_vessels
 
 
 MAX_FAILED_CONTRACTS = 3
@@ -142,5 +144,7 @@ def post_event_contract_validation(
         key={"id": validated_contract.id},
         update_data={"status": status}
     )
+    invalidate_vo_dashboard_for_vessels([validated_contract.vesselId])
+    invalidate_event_analytics([validated_contract.drEventId])
 
     return status
@@ -1,10 +1,15 @@
 import config
 from db.dynamoClient import DynamoClient
 from services.battery_model.battery import BESS
+from models.drevent import EventStatus
 from models.measurments import Measurement
 from datetime import datetime, timezone
 import time
 from services.contracts import validation as contract_validation
+from services.dr.live import dr_live_feed
+from services.eligibility import invalidate_eligibility_cache
+from services.telemetry import record_latest_soc
+from services.vo_dashboard import invalidate_vo_dashboard_for_vessels
 from decimal import Decimal
 from threading import Event
 
@@ -13,6 +18,18 @@ def get_dispatch_interval_seconds() -> int:
     return max(1, int(getattr(config, "DR_DISPATCH_INTERVAL_SECONDS", 60)))
 
 
+def _event_still_active(events_client: DynamoClient | None, event_id: str) -> bool:
+    # ``/end`` may be served by another worker, whose stop signal this loop
+    # never sees, so the stored status is checked between ticks as well.
+    if events_client is None:
+        return True
+    try:
+        event = events_client.get_item(key={"id": event_id}) or {}
+    except Exception:
+        return True
+    return str(event.get("status") or "") == EventStatus.ACTIVE.value
+
+
 def _dispatch_loop(
     event_id: str,
     valid_contracts: list[dict],
@@ -54,10 +71,14 @@ def _dispatch_loop(
         if stop_signal and stop_signal.is_set():
             print(f"[DR {event_id}] Stop requested. Ending dispatch loop.")
             break
+        if iteration and not _event_still_active(dynamo_client, event_id):
+            print(f"[DR {event_id}] Event is no longer active. Ending dispatch loop.")
+            break
 
         iteration += 1
         now = datetime.now(timezone.utc)
         active_vessels = 0
+        tick_measurements = []
         interval_seconds = get_dispatch_interval_seconds()
         interval_hours = interval_seconds / 3600.0
 
@@ -91,16 +112,29 @@ def _dispatch_loop(
 
             # Write measurement to measurements table
             measurements_client.put_item(meas.to_dict())
+            tick_measurements.append(
+                {
+                    "vesselId": bess.vessel_id,
+                    "contractId": contract_id,
+                    "energyKwh": energy_delivered,
+                    "powerKw": discharge_setpoint,
+                    "currentSOC": bess.soc_percent,
+                }
+            )
 
-            # Persist updated SOC back to the vessel record (use Decimal for DynamoDB)
+            # Persist updated SOC and the latest-SOC projection back to the vessel
+            # record (use Decimal for DynamoDB)
             try:
                 capacity_decimal = Decimal(str(round(bess.soc, 4)))
             except Exception:
                 capacity_decimal = Decimal("0")
 
-            vessels_client.update_item(
-                key={"id": bess.vessel_id},
-                update_data={
+            record_latest_soc(
+                vessels_client,
+                bess.vessel_id,
+                bess.soc_percent,
+                meas.timestamp.isoformat(),
+                extra_fields={
                     "capacity": capacity_decimal,
                     "updatedAt": now.isoformat(),
                 },
@@ -111,6 +145,18 @@ def _dispatch_loop(
                     f"[DR {event_id}] Vessel {bess.vessel_id} hit SOC floor — excluded from further discharge."
                 )
 
+        if tick_measurements:
+            # Fan the tick out to live monitoring streams
+            dr_live_feed.publish_tick(event_id, now.isoformat(), tick_measurements)
+
+        if active_vessels:
+            # New SOC telemetry changes eligibility answers for open events
+            # and the live figures on the owners' VO dashboards.
+            invalidate_eligibility_cache()
+            invalidate_vo_dashboard_for_vessels(
+                bess.vessel_id for bess in bess_map.values()
+            )
+
         # All vessels exhausted — end the loop early
         if active_vessels == 0:
             print(
@@ -120,6 +166,8 @@ def _dispatch_loop(
 
         time.sleep(interval_seconds)
 
+    dr_live_feed.close_event(event_id)
+
     for c in valid_contracts:
         try:
             contract_validation.post_event_contract_validation(c)
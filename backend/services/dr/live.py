@@ -0,0 +1,327 @@
+"""In-process pub/sub for live DR event telemetry.
+
+The dispatch loop publishes one message per tick with the vessels' new
+measurements and the event's aggregate deltas; the SSE endpoint fans the
+messages out to every subscriber of that event.  Each tick is computed once
+no matter how many operators are watching.
+
+Every subscriber has a bounded queue.  A subscriber that falls behind loses
+its oldest undelivered ticks rather than slowing the dispatch loop down.
+The feed also keeps the event's running totals and latest per-vessel
+readings so a new subscriber starts from a snapshot instead of waiting for
+the next tick.
+
+With ``CACHE_BACKEND=redis`` (the production setup) the feed carries its
+messages between worker processes over Redis pub/sub: the dispatching worker
+publishes each tick and the event's latest snapshot to Redis, and a listener
+thread in every worker hands them to that worker's subscribers.  Without a
+shared relay, subscribers only see events dispatched by the same process and
+the SSE endpoint answers 409 anywhere else.
+
+Each worker holds at most ``SSE_MAX_STREAMS`` subscriptions, so open streams
+cannot take every request thread.
+"""
+
+import json
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import config
+from json_provider import encode_value
+from monitoring import logger
+
+try:
+    import redis
+except ModuleNotFoundError:
+    redis = None
+
+END_OF_STREAM = {"type": "end"}
+
+
+class LiveFeedFullError(Exception):
+    """Raised when a worker already holds ``max_subscribers`` streams."""
+
+
+class LiveSubscription:
+    def __init__(self, feed: "DRLiveFeed", event_id: str, queue_size: int):
+        self.feed = feed
+        self.event_id = event_id
+        self.queue: "Queue[Dict[str, Any]]" = Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except Empty:
+                    pass
+
+    def next_message(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Return the next message, or ``None`` if none arrived in ``timeout``."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def close(self) -> None:
+        self.feed.unsubscribe(self)
+
+    def __enter__(self) -> "LiveSubscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RedisLiveRelay:
+    """Carries feed messages between worker processes over Redis pub/sub.
+
+    Works with any client exposing redis-py's ``publish``/``pubsub``/``get``/
+    ``set``/``delete``.  The latest snapshot of each event is kept under a
+    plain key so a subscriber in any worker can start from it.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        key_prefix: str = "aquacharge:dr-live:",
+        snapshot_ttl_seconds: int = 24 * 60 * 60,
+    ):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis package is required for the live relay")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.key_prefix = key_prefix
+        self.snapshot_ttl_seconds = snapshot_ttl_seconds
+
+    def _channel(self, event_id: str) -> str:
+        return f"{self.key_prefix}events:{event_id}"
+
+    def _snapshot_key(self, event_id: str) -> str:
+        return f"{self.key_prefix}snapshots:{event_id}"
+
+    @staticmethod
+    def _encode(message: Dict[str, Any]) -> str:
+        return json.dumps(message, default=encode_value, separators=(",", ":"))
+
+    def publish(
+        self,
+        event_id: str,
+        message: Dict[str, Any],
+        snapshot: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if snapshot is None:
+            self.client.delete(self._snapshot_key(event_id))
+        else:
+            self.client.set(
+                self._snapshot_key(event_id),
+                self._encode(snapshot),
+                ex=self.snapshot_ttl_seconds,
+            )
+        self.client.publish(self._channel(event_id), self._encode(message))
+
+    def snapshot(self, event_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._snapshot_key(event_id))
+        return None if raw is None else json.loads(raw)
+
+    def listen(self, deliver: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call ``deliver(event_id, message)`` for every published message."""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self._channel("*"))
+        prefix = self._channel("")
+        for item in pubsub.listen():
+            if item.get("type") != "pmessage":
+                continue
+            channel = item["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            deliver(channel[len(prefix):], json.loads(item["data"]))
+
+
+class DRLiveFeed:
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        relay: Optional[RedisLiveRelay] = None,
+        max_subscribers: Optional[int] = None,
+    ):
+        self.queue_size = (
+            config.SSE_SUBSCRIBER_QUEUE_SIZE if queue_size is None else queue_size
+        )
+        self.max_subscribers = (
+            config.SSE_MAX_STREAMS if max_subscribers is None else max_subscribers
+        )
+        self.relay = relay
+        self._lock = Lock()
+        self._subscribers: Dict[str, Set[LiveSubscription]] = {}
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._listener: Optional[Thread] = None
+
+    @property
+    def shared(self) -> bool:
+        """True when subscribers in every worker see every event."""
+        return self.relay is not None
+
+    def _start_listener(self) -> None:
+        # Started by the first subscriber, so it runs in the forked worker.
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._listener = Thread(
+            target=self._listen, name="dr-live-relay", daemon=True
+        )
+        self._listener.start()
+
+    def _listen(self) -> None:
+        try:
+            self.relay.listen(self._deliver)
+        except Exception as error:
+            logger.warning("DR live relay stopped", extra={"error": str(error)})
+            with self._lock:
+                self._listener = None
+
+    def _deliver(self, event_id: str, message: Dict[str, Any]) -> None:
+        if message.get("type") == END_OF_STREAM["type"]:
+            message = END_OF_STREAM
+        with self._lock:
+            subscribers = list(self._subscribers.get(event_id, ()))
+        for subscription in subscribers:
+            subscription.offer(message)
+
+    def subscribe(self, event_id: str) -> LiveSubscription:
+        subscription = LiveSubscription(self, event_id, self.queue_size)
+        with self._lock:
+            count = sum(len(subscribers) for subscribers in self._subscribers.values())
+            if count >= self.max_subscribers:
+                raise LiveFeedFullError(
+                    f"{count} live streams are already open in this worker"
+                )
+            self._subscribers.setdefault(event_id, set()).add(subscription)
+            if self.relay is not None:
+                self._start_listener()
+            state = self._states.get(event_id)
+            if state is not None:
+                subscription.offer(_snapshot_message(event_id, state))
+                return subscription
+        if self.relay is not None:
+            try:
+                snapshot = self.relay.snapshot(event_id)
+            except Exception as error:
+                logger.warning("DR live snapshot read failed", extra={"error": str(error)})
+                snapshot = None
+            if snapshot is not None:
+                subscription.offer(snapshot)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.event_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.event_id]
+
+    def subscriber_count(self, event_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(event_id, ()))
+
+    def publish_tick(
+        self,
+        event_id: str,
+        timestamp: str,
+        vessels: Iterable[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Fold one dispatch tick into the event state and fan it out.
+
+        ``vessels`` holds the tick's measurements (``vesselId``,
+        ``contractId``, ``energyKwh``, ``powerKw``, ``currentSOC``).
+        """
+        vessels = [dict(vessel) for vessel in vessels]
+        delta_energy = sum(float(v.get("energyKwh") or 0) for v in vessels)
+        delta_power = sum(float(v.get("powerKw") or 0) for v in vessels)
+        with self._lock:
+            state = self._states.setdefault(
+                event_id, {"ticks": 0, "totalEnergyKwh": 0.0, "vessels": {}}
+            )
+            state["ticks"] += 1
+            state["totalEnergyKwh"] += delta_energy
+            state["updatedAt"] = timestamp
+            for vessel in vessels:
+                state["vessels"][vessel.get("vesselId")] = {
+                    **vessel,
+                    "timestamp": timestamp,
+                }
+            message = {
+                "type": "tick",
+                "eventId": event_id,
+                "tick": state["ticks"],
+                "timestamp": timestamp,
+                "vessels": vessels,
+                "delta": {
+                    "energyKwh": round(delta_energy, 4),
+                    "powerKw": round(delta_power, 4),
+                    "activeVessels": len(vessels),
+                },
+                "totals": {"energyKwh": round(state["totalEnergyKwh"], 4)},
+            }
+            snapshot = _snapshot_message(event_id, state)
+        self._fan_out(event_id, message, snapshot)
+        return message
+
+    def close_event(self, event_id: str) -> None:
+        """Tell subscribers the dispatch ended and drop the event's state."""
+        with self._lock:
+            self._states.pop(event_id, None)
+        self._fan_out(event_id, END_OF_STREAM, None)
+
+    def _fan_out(
+        self,
+        event_id: str,
+        message: Dict[str, Any],
+        snapshot: Optional[Dict[str, Any]],
+    ) -> None:
+        # With a relay every worker, this one included, receives the message
+        # from its listener; if Redis is unreachable only local viewers get it.
+        if self.relay is not None:
+            try:
+                self.relay.publish(event_id, message, snapshot)
+                return
+            except Exception as error:
+                logger.warning("DR live publish failed", extra={"error": str(error)})
+        self._deliver(event_id, message)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+            self._states.clear()
+
+
+def _snapshot_message(event_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    vessels: List[Dict[str, Any]] = list(state["vessels"].values())
+    return {
+        "type": "snapshot",
+        "eventId": event_id,
+        "tick": state["ticks"],
+        "timestamp": state.get("updatedAt"),
+        "vessels": vessels,
+        "totals": {
+            "energyKwh": round(state["totalEnergyKwh"], 4),
+            "powerKw": round(sum(float(v.get("powerKw") or 0) for v in vessels), 4),
+        },
+    }
+
+
+def _build_relay() -> Optional[RedisLiveRelay]:
+    if config.CACHE_BACKEND == "redis":
+        return RedisLiveRelay(url=config.CACHE_REDIS_URL)
+    return None
+
+
+dr_live_feed = DRLiveFeed(relay=_build_relay())
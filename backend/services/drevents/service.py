@@ -3,36 +3,40 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 import config
-from db.dynamoClient import DynamoClient
+from cache import cached
+from db.dynamoClient import TRANSACT_WRITE_MAX_ITEMS, DynamoClient
 from models.drevent import DREvent, EventStatus
-
-
-def convert_decimals(obj):
-    if isinstance(obj, list):
-        return [convert_decimals(item) for item in obj]
-    if isinstance(obj, dict):
-        return {key: convert_decimals(value) for key, value in obj.items()}
-    if isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-
-def parse_datetime(value: Any) -> Optional[datetime]:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
-    if not isinstance(value, str):
-        return None
-
-    try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
-    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+from monitoring import logger
+from services.analytics import (
+    CLOSED_EVENT_STATUSES,
+    MeasurementFrame,
+    ROLLUP_FIELD,
+    ROLLUP_GENERATION_FIELD,
+    ROLLUP_VESSEL_PARTS_FIELD,
+    build_event_rollup,
+    from_dynamo,
+    merge_rollups,
+    rollup_can_be_stored,
+    rollup_is_current,
+    slice_measurement_rollup,
+    split_rollup_vessels,
+    to_dynamo,
+)
+from services.eligibility import invalidate_eligibility_cache
+from timeutil import US_PER_MINUTE, from_epoch_us, parse_epoch_us
+
+
+def _start_time_key(item: Dict[str, Any], missing: float) -> float:
+    """Sort key for ``startTime``; events without one sort at ``missing``."""
+    epoch_us = parse_epoch_us(item.get("startTime"))
+    return missing if epoch_us is None else epoch_us
 
 
 class DREventServiceError(Exception):
@@ -46,6 +50,14 @@ class DREventRepository(Protocol):
     def list_events(self) -> List[Dict[str, Any]]:
         pass
 
+    def list_events_page(
+        self,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        pass
+
     def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
         pass
 
@@ -57,16 +69,32 @@ class DREventRepository(Protocol):
     ) -> Dict[str, Any]:
         pass
 
+    def store_rollup(
+        self, event_id: str, rollup: Dict[str, Any], generation: Optional[str]
+    ) -> bool:
+        pass
+
+    def load_rollup_vessels(
+        self, event_id: str, rollup: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        pass
+
 
 class MeasurementRepository(Protocol):
     def list_measurements(self) -> List[Dict[str, Any]]:
         pass
 
+    def list_measurements_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        pass
+
 
 class ContractRepository(Protocol):
     def list_contracts(self) -> List[Dict[str, Any]]:
         pass
 
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        pass
+
 
 class StationRepository(Protocol):
     def get_station(self, station_id: str) -> Optional[Dict[str, Any]]:
@@ -74,14 +102,36 @@ class StationRepository(Protocol):
 
 
 class DynamoDREventRepository:
-    def __init__(self, client: Optional[DynamoClient] = None):
+    def __init__(
+        self,
+        client: Optional[DynamoClient] = None,
+        rollups_client: Optional[DynamoClient] = None,
+    ):
         self.client = client or DynamoClient(
             table_name=config.DREVENTS_TABLE, region_name=config.AWS_REGION
         )
+        self.rollups_client = rollups_client or DynamoClient(
+            table_name=config.ANALYTICS_ROLLUPS_TABLE, region_name=config.AWS_REGION
+        )
 
     def list_events(self) -> List[Dict[str, Any]]:
         return self.client.scan_items()
 
+    def list_events_page(
+        self,
+        limit: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        if status:
+            return self.client.query_page(
+                Key("status").eq(status),
+                index_name="status-index",
+                limit=limit,
+                exclusive_start_key=exclusive_start_key,
+            )
+        return self.client.scan_page(limit, exclusive_start_key)
+
     def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
         return self.client.get_item(key={"id": event_id}) or None
 
@@ -93,6 +143,75 @@ class DynamoDREventRepository:
     ) -> Dict[str, Any]:
         return self.client.update_item(key={"id": event_id}, update_data=update_data)
 
+    def store_rollup(
+        self, event_id: str, rollup: Dict[str, Any], generation: Optional[str]
+    ) -> bool:
+        """Store ``rollup`` unless the event was invalidated since ``generation``.
+
+        The event item gets the rollup without its vessel entries, which go in
+        ``ANALYTICS_ROLLUP_VESSELS_PER_ITEM``-sized items ``<event id>#<n>`` of
+        the rollups table, all in one transaction, so no item nears
+        DynamoDB's 400 KB limit.  A rollup that still cannot be stored (more
+        than 99 parts, or a rejected write) is logged and served unstored.
+        """
+        summary, parts = split_rollup_vessels(
+            rollup, config.ANALYTICS_ROLLUP_VESSELS_PER_ITEM
+        )
+        if len(parts) >= TRANSACT_WRITE_MAX_ITEMS:
+            logger.warning(
+                "Analytics rollup of %s has %d vessel parts; not stored",
+                event_id,
+                len(parts),
+            )
+            return False
+        if generation is None:
+            unchanged = "attribute_not_exists(#generation)"
+            values: Dict[str, Any] = {":rollup": summary}
+        else:
+            unchanged = "#generation = :generation"
+            values = {":rollup": summary, ":generation": generation}
+        actions = [
+            {
+                "Update": {
+                    "TableName": self.client.table_name,
+                    "Key": {"id": event_id},
+                    "UpdateExpression": "SET #rollup = :rollup",
+                    "ConditionExpression": f"attribute_exists(id) AND {unchanged}",
+                    "ExpressionAttributeNames": {
+                        "#rollup": ROLLUP_FIELD,
+                        "#generation": ROLLUP_GENERATION_FIELD,
+                    },
+                    "ExpressionAttributeValues": values,
+                }
+            }
+        ]
+        actions.extend(
+            {
+                "Put": {
+                    "TableName": self.rollups_client.table_name,
+                    "Item": {"id": f"{event_id}#{index}", "eventId": event_id, "vessels": part},
+                }
+            }
+            for index, part in enumerate(parts)
+        )
+        try:
+            return self.client.transact_write_items(actions)
+        except ClientError as error:
+            logger.warning("Failed to store analytics rollup of %s: %s", event_id, error)
+            return False
+
+    def load_rollup_vessels(
+        self, event_id: str, rollup: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """The vessel entries of a stored rollup, read back from its parts."""
+        part_count = int(rollup["measurements"].get(ROLLUP_VESSEL_PARTS_FIELD, 0))
+        vessels: Dict[str, Dict[str, Any]] = {}
+        for part in self.rollups_client.batch_get_items(
+            [{"id": f"{event_id}#{index}"} for index in range(part_count)]
+        ):
+            vessels.update(from_dynamo(part.get("vessels") or {}))
+        return vessels
+
 
 class DynamoMeasurementRepository:
     def __init__(self, client: Optional[DynamoClient] = None):
@@ -106,6 +225,15 @@ class DynamoMeasurementRepository:
         except Exception:
             return []
 
+    def list_measurements_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        try:
+            return self.client.query_gsi(
+                index_name="drEventId-index",
+                key_condition_expression=Key("drEventId").eq(dr_event_id),
+            )
+        except Exception:
+            return []
+
 
 class DynamoContractRepository:
     def __init__(self, client: Optional[DynamoClient] = None):
@@ -119,6 +247,15 @@ class DynamoContractRepository:
         except Exception:
             return []
 
+    def list_contracts_by_event(self, dr_event_id: str) -> List[Dict[str, Any]]:
+        try:
+            return self.client.query_gsi(
+                index_name="drEventId-index",
+                key_condition_expression=Key("drEventId").eq(dr_event_id),
+            )
+        except Exception:
+            return []
+
 
 class DynamoStationRepository:
     def __init__(self, client: Optional[DynamoClient] = None):
@@ -126,13 +263,14 @@ class DynamoStationRepository:
             table_name=config.STATIONS_TABLE, region_name=config.AWS_REGION
         )
 
+    @cached("stations")
     def get_station(self, station_id: str) -> Optional[Dict[str, Any]]:
         return self.client.get_item(key={"id": station_id}) or None
 
 
 def serialize_event(event: Dict[str, Any]) -> Dict[str, Any]:
     drevent = DREvent.from_dict(dict(event))
-    return convert_decimals(drevent.to_public_dict())
+    return drevent.to_public_dict()
 
 
 ALLOWED_TRANSITIONS = {
@@ -189,11 +327,31 @@ class DREventService:
         if status_filter:
             events = [event for event in events if event.get("status") == status_filter]
         events.sort(
-            key=lambda item: parse_datetime(item.get("startTime"))
-            or datetime.max.replace(tzinfo=timezone.utc)
+            key=lambda item: _start_time_key(item, missing=float("inf"))
         )
         return events
 
+    def list_events_page(
+        self,
+        limit: int,
+        start_key: Optional[Dict[str, Any]] = None,
+        status_filter: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One repository page of ``list_events``, by start time within the page.
+
+        Returns ``(events, last_evaluated_key)``.
+        """
+        items, last_key = self.event_repository.list_events_page(
+            limit, start_key, status=status_filter
+        )
+        events = [serialize_event(item) for item in items]
+        if status_filter:
+            events = [event for event in events if event.get("status") == status_filter]
+        events.sort(
+            key=lambda item: _start_time_key(item, missing=float("inf"))
+        )
+        return events, last_key
+
     def get_event(self, event_id: str) -> Dict[str, Any]:
         event = self.event_repository.get_event(event_id)
         if not event:
@@ -275,6 +433,7 @@ class DREventService:
 
         event_data = drevent.to_dict()
         self.event_repository.put_event(event_data)
+        invalidate_eligibility_cache()
         return serialize_event(event_data)
 
     def _validate_transition(self, current_status: str, next_status: str) -> None:
@@ -338,123 +497,82 @@ class DREventService:
         elif filtered_events:
             selected_event = sorted(
                 filtered_events,
-                key=lambda item: parse_datetime(item.get("startTime"))
-                or datetime.min.replace(tzinfo=timezone.utc),
+                key=lambda item: _start_time_key(item, missing=float("-inf")),
                 reverse=True,
             )[0]
 
         selected_event_id = selected_event.get("id") if selected_event else None
-        measurements = []
-        for measurement in self.measurement_repository.list_measurements():
-            measurement_time = parse_datetime(
-                measurement.get("timestamp") or measurement.get("createdAt")
-            )
-            if measurement_time is None or measurement_time < period_start:
-                continue
-            if selected_event_id and measurement.get("drEventId") != selected_event_id:
-                continue
-            measurements.append(
-                {
-                    **measurement,
-                    "timestamp": measurement_time,
-                    "energyKwh": float(measurement.get("energyKwh", 0) or 0),
-                    "powerKw": float(measurement.get("powerKw", 0) or 0),
-                    "currentSOC": float(measurement.get("currentSOC", 0) or 0),
-                }
+        if selected_event_id:
+            records = self.measurement_repository.list_measurements_by_event(
+                selected_event_id
             )
+        else:
+            records = self.measurement_repository.list_measurements()
+        frame = MeasurementFrame.from_records(records, since=period_start)
+        energy_delivered = float(frame.energy_kwh.sum())
 
-        vessel_latest: Dict[str, Dict[str, Any]] = {}
-        energy_delivered = 0.0
-        time_series: Dict[str, Dict[str, Any]] = {}
-        vessel_series: Dict[str, Dict[str, Any]] = {}
-        for measurement in measurements:
-            energy_delivered += measurement["energyKwh"]
-            vessel_id = measurement.get("vesselId")
-            previous = vessel_latest.get(vessel_id)
-            if previous is None or measurement["timestamp"] >= previous["timestamp"]:
-                vessel_latest[vessel_id] = measurement
-
-            bucket = (
-                measurement["timestamp"].replace(second=0, microsecond=0).isoformat()
-            )
-            bucket_item = time_series.setdefault(
-                bucket,
-                {
-                    "timestamp": bucket,
-                    "energyDischargedKwh": 0.0,
-                    "cumulativeEnergyDischargedKwh": 0.0,
-                    "v2gContributionKw": 0.0,
-                    "gridLoadWithoutV2GKw": None,
-                    "gridLoadWithV2GKw": None,
-                },
+        minute_starts, minute_energy, minute_power, _ = frame.bucket_sums(US_PER_MINUTE)
+        load_curve = [
+            {
+                "timestamp": from_epoch_us(start).isoformat(),
+                "energyDischargedKwh": float(energy_kwh),
+                "cumulativeEnergyDischargedKwh": round(float(cumulative), 2),
+                "v2gContributionKw": float(power_kw),
+                "gridLoadWithoutV2GKw": None,
+                "gridLoadWithV2GKw": None,
+            }
+            for start, energy_kwh, power_kw, cumulative in zip(
+                minute_starts, minute_energy, minute_power, np.cumsum(minute_energy)
             )
-            bucket_item["energyDischargedKwh"] += measurement["energyKwh"]
-            bucket_item["v2gContributionKw"] += measurement["powerKw"]
-
-            if vessel_id:
-                vessel_item = vessel_series.setdefault(
-                    vessel_id,
-                    {
-                        "vesselId": vessel_id,
-                        "contractId": measurement.get("contractId"),
-                        "points": {},
-                    },
-                )
-                if measurement.get("contractId"):
-                    vessel_item["contractId"] = measurement.get("contractId")
-                point = vessel_item["points"].setdefault(
-                    bucket,
-                    {
-                        "timestamp": bucket,
-                        "energyDischargedKwh": 0.0,
-                        "cumulativeEnergyDischargedKwh": 0.0,
-                        "v2gContributionKw": 0.0,
-                    },
-                )
-                point["energyDischargedKwh"] += measurement["energyKwh"]
-                point["v2gContributionKw"] += measurement["powerKw"]
+        ]
 
-        vessel_rates = []
-        for vessel_id, measurement in vessel_latest.items():
-            vessel_rates.append(
-                {
-                    "vesselId": vessel_id,
-                    "contractId": measurement.get("contractId"),
-                    "dischargeRateKw": round(measurement["powerKw"], 2),
-                    "currentSoc": round(measurement["currentSOC"], 2),
-                    "timestamp": measurement["timestamp"].isoformat(),
-                }
-            )
+        latest_codes, latest_rows = frame.latest_rows_by_vessel()
+        latest_by_vessel = dict(zip(latest_codes.tolist(), latest_rows.tolist()))
+        vessel_rates = [
+            {
+                "vesselId": frame.vessel_id(code),
+                "contractId": frame.contract_id(row),
+                "dischargeRateKw": round(float(frame.power_kw[row]), 2),
+                "currentSoc": round(float(frame.soc[row]), 2),
+                "timestamp": from_epoch_us(frame.timestamps[row]).isoformat(),
+            }
+            for code, row in latest_by_vessel.items()
+        ]
         vessel_rates.sort(key=lambda item: item["dischargeRateKw"], reverse=True)
 
+        point_codes, point_starts, point_energy, point_power = frame.vessel_bucket_sums(
+            US_PER_MINUTE
+        )
         vessel_curve = []
-        for vessel_id, series in vessel_series.items():
-            latest_measurement = vessel_latest.get(vessel_id, {})
-            points = sorted(
-                series["points"].values(), key=lambda item: item["timestamp"]
-            )
-            cumulative_energy = 0.0
-            for point in points:
-                cumulative_energy += point["energyDischargedKwh"]
-                point["cumulativeEnergyDischargedKwh"] = round(cumulative_energy, 2)
+        for code in np.unique(point_codes).tolist():
+            in_vessel = point_codes == code
+            points = [
+                {
+                    "timestamp": from_epoch_us(start).isoformat(),
+                    "energyDischargedKwh": float(energy_kwh),
+                    "cumulativeEnergyDischargedKwh": round(float(cumulative), 2),
+                    "v2gContributionKw": float(power_kw),
+                }
+                for start, energy_kwh, power_kw, cumulative in zip(
+                    point_starts[in_vessel],
+                    point_energy[in_vessel],
+                    point_power[in_vessel],
+                    np.cumsum(point_energy[in_vessel]),
+                )
+            ]
+            latest_row = latest_by_vessel[code]
             vessel_curve.append(
                 {
-                    "vesselId": vessel_id,
-                    "contractId": series.get("contractId"),
-                    "currentSoc": round(
-                        float(latest_measurement.get("currentSOC", 0) or 0), 2
-                    ),
-                    "latestDischargeRateKw": round(
-                        float(latest_measurement.get("powerKw", 0) or 0), 2
-                    ),
+                    "vesselId": frame.vessel_id(code),
+                    "contractId": frame.contract_id(latest_row),
+                    "currentSoc": round(float(frame.soc[latest_row]), 2),
+                    "latestDischargeRateKw": round(float(frame.power_kw[latest_row]), 2),
                     "totalEnergyDischargedKwh": round(
-                        sum(point["energyDischargedKwh"] for point in points), 2
-                    ),
-                    "latestTimestamp": (
-                        latest_measurement.get("timestamp").isoformat()
-                        if latest_measurement.get("timestamp")
-                        else None
+                        float(point_energy[in_vessel].sum()), 2
                     ),
+                    "latestTimestamp": from_epoch_us(
+                        frame.timestamps[latest_row]
+                    ).isoformat(),
                     "points": points,
                 }
             )
@@ -462,12 +580,6 @@ class DREventService:
             key=lambda item: item["totalEnergyDischargedKwh"], reverse=True
         )
 
-        load_curve = sorted(time_series.values(), key=lambda item: item["timestamp"])
-        cumulative_energy = 0.0
-        for point in load_curve:
-            cumulative_energy += point["energyDischargedKwh"]
-            point["cumulativeEnergyDischargedKwh"] = round(cumulative_energy, 2)
-
         target_energy = (
             float(selected_event.get("targetEnergyKwh", 0) or 0)
             if selected_event
@@ -492,51 +604,118 @@ class DREventService:
             for event in filtered_events
         ]
         available_events.sort(
-            key=lambda item: parse_datetime(item["startTime"])
-            or datetime.min.replace(tzinfo=timezone.utc),
+            key=lambda item: _start_time_key(item, missing=float("-inf")),
             reverse=True,
         )
 
-        return convert_decimals(
-            {
-                "filters": {
-                    "eventId": selected_event_id,
-                    "region": region or "",
-                    "periodHours": period_hours,
-                },
-                "selectedEvent": (
-                    {
-                        "id": selected_event["id"],
-                        "stationId": selected_event["stationId"],
-                        "status": selected_event["status"],
-                        "targetEnergyKwh": selected_event["targetEnergyKwh"],
-                        "startTime": selected_event["startTime"],
-                        "endTime": selected_event["endTime"],
-                        "regionLabel": self._region_label(
-                            selected_event.get("station") or {}
-                        ),
-                    }
-                    if selected_event
-                    else None
-                ),
-                "summary": {
-                    "totalEnergyDeliveredKwh": round(energy_delivered, 2),
-                    "progressPercent": progress_percent,
-                    "activeVessels": len(vessel_rates),
-                    "eventStatus": (
-                        selected_event.get("status") if selected_event else None
+        return {
+            "filters": {
+                "eventId": selected_event_id,
+                "region": region or "",
+                "periodHours": period_hours,
+            },
+            "selectedEvent": (
+                {
+                    "id": selected_event["id"],
+                    "stationId": selected_event["stationId"],
+                    "status": selected_event["status"],
+                    "targetEnergyKwh": selected_event["targetEnergyKwh"],
+                    "startTime": selected_event["startTime"],
+                    "endTime": selected_event["endTime"],
+                    "regionLabel": self._region_label(
+                        selected_event.get("station") or {}
                     ),
-                    "targetEnergyKwh": round(target_energy, 2),
-                },
-                "vesselRates": vessel_rates,
-                "vesselCurve": vessel_curve,
-                "loadCurve": load_curve,
-                "baselineAvailable": False,
-                "availableEvents": available_events,
-                "empty": len(measurements) == 0,
-                "updatedAt": now.isoformat(),
-            }
+                }
+                if selected_event
+                else None
+            ),
+            "summary": {
+                "totalEnergyDeliveredKwh": round(energy_delivered, 2),
+                "progressPercent": progress_percent,
+                "activeVessels": len(vessel_rates),
+                "eventStatus": (
+                    selected_event.get("status") if selected_event else None
+                ),
+                "targetEnergyKwh": round(target_energy, 2),
+            },
+            "vesselRates": vessel_rates,
+            "vesselCurve": vessel_curve,
+            "loadCurve": load_curve,
+            "baselineAvailable": False,
+            "availableEvents": available_events,
+            "empty": len(frame) == 0,
+            "updatedAt": now.isoformat(),
+        }
+
+    def materialize_analytics(self) -> int:
+        """Store rollups for closed events that lack a current one.
+
+        Returns the number of events rolled up.
+        """
+        materialized = 0
+        for raw_event in self.event_repository.list_events():
+            event = serialize_event(raw_event)
+            if event.get("status") not in CLOSED_EVENT_STATUSES:
+                continue
+            if rollup_is_current(event, raw_event.get(ROLLUP_FIELD)):
+                continue
+            self._build_event_rollup(event, raw_event)
+            materialized += 1
+        return materialized
+
+    def _build_event_rollup(
+        self,
+        event: Dict[str, Any],
+        raw_event: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Roll up ``event`` and store the result if it is closed.
+
+        ``raw_event`` is the stored item the build started from; its
+        analytics generation guards the write against concurrent
+        invalidations.
+        """
+        now = datetime.now(timezone.utc)
+        rollup = build_event_rollup(
+            event,
+            self.measurement_repository.list_measurements_by_event(event["id"]),
+            self.contract_repository.list_contracts_by_event(event["id"]),
+            now=now,
         )
+        if event.get("status") in CLOSED_EVENT_STATUSES and rollup_can_be_stored(
+            raw_event, now
+        ):
+            self.event_repository.store_rollup(
+                event["id"], to_dynamo(rollup), raw_event.get(ROLLUP_GENERATION_FIELD)
+            )
+        return rollup
+
+    def _event_analytics(
+        self,
+        event: Dict[str, Any],
+        raw_event: Dict[str, Any],
+        period_start: datetime,
+    ) -> Tuple[str, Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Return the event's measurement rollup for the period and its contract rollup.
+
+        A stored rollup is sliced to the period from its hour buckets; only
+        events without one read their measurements.
+        """
+        rollup = raw_event.get(ROLLUP_FIELD)
+        if rollup_is_current(event, rollup):
+            rollup = from_dynamo(rollup)
+        else:
+            rollup = self._build_event_rollup(event, raw_event)
+
+        measurements = rollup["measurements"]
+        measurement_rollup = slice_measurement_rollup(measurements, period_start)
+        if measurement_rollup is not None and "vessels" not in measurements:
+            # Stored rollups keep their vessel entries in separate items,
+            # read only for events with measurements in the period.
+            vessels = self.event_repository.load_rollup_vessels(event["id"], rollup)
+            measurement_rollup = slice_measurement_rollup(
+                {**measurements, "vessels": vessels}, period_start
+            )
+        return event["id"], measurement_rollup, rollup["contracts"]
 
     def get_analytics_snapshot(
         self,
@@ -554,13 +733,19 @@ class DREventService:
         period_start = now - timedelta(hours=period_hours)
         normalized_region = (region or "").strip().lower()
 
-        events = self.list_events()
         filtered_events = []
-        for event in events:
+        raw_events: Dict[str, Dict[str, Any]] = {}
+        # Events share a handful of stations; read each one once.
+        stations: Dict[Any, Optional[Dict[str, Any]]] = {}
+        for raw_event in self.event_repository.list_events():
+            event = serialize_event(raw_event)
             if event_id and event.get("id") != event_id:
                 continue
 
-            station = self.station_repository.get_station(event.get("stationId"))
+            station_id = event.get("stationId")
+            if station_id not in stations:
+                stations[station_id] = self.station_repository.get_station(station_id)
+            station = stations[station_id]
             if normalized_region:
                 region_parts = [
                     str(station.get("city", "")).lower() if station else "",
@@ -571,8 +756,11 @@ class DREventService:
                     continue
 
             filtered_events.append({**event, "station": station or {}})
+            raw_events[event["id"]] = raw_event
+        filtered_events.sort(
+            key=lambda item: _start_time_key(item, missing=float("inf"))
+        )
 
-        event_ids = {event.get("id") for event in filtered_events if event.get("id")}
         explicit_event_id = (event_id or "").strip()
         selected_event = None
         if event_id:
@@ -582,94 +770,18 @@ class DREventService:
             if selected_event is None:
                 raise DREventServiceError("DR event not found", 404)
 
-        selected_event_id = selected_event.get("id") if selected_event else None
-
-        measurements: List[Dict[str, Any]] = []
-        for measurement in self.measurement_repository.list_measurements():
-            measurement_time = parse_datetime(
-                measurement.get("timestamp") or measurement.get("createdAt")
-            )
-            if measurement_time is None or measurement_time < period_start:
-                continue
-            measurement_event_id = measurement.get("drEventId")
-            if selected_event_id and measurement_event_id != selected_event_id:
-                continue
-            if not selected_event_id and event_ids and measurement_event_id not in event_ids:
-                continue
-            measurements.append(
-                {
-                    **measurement,
-                    "timestamp": measurement_time,
-                    "energyKwh": float(measurement.get("energyKwh", 0) or 0),
-                    "powerKw": float(measurement.get("powerKw", 0) or 0),
-                    "currentSOC": float(measurement.get("currentSOC", 0) or 0),
-                }
-            )
-
-        contracts = []
-        for contract in self.contract_repository.list_contracts():
-            contract_event_id = contract.get("drEventId")
-            if selected_event_id and contract_event_id != selected_event_id:
-                continue
-            if not selected_event_id and event_ids and contract_event_id not in event_ids:
-                continue
-            contracts.append(contract)
-
-        def _bucket_start(ts: datetime) -> datetime:
-            if normalized_grain == "hour":
-                return ts.replace(minute=0, second=0, microsecond=0)
-            return ts.replace(hour=0, minute=0, second=0, microsecond=0)
-
-        time_buckets: Dict[str, Dict[str, Any]] = {}
-        vessel_totals: Dict[str, Dict[str, Any]] = {}
-        hourly_heatmap: Dict[tuple, Dict[str, float]] = {}
-        total_energy = 0.0
-        total_power = 0.0
-        for measurement in measurements:
-            timestamp = measurement["timestamp"]
-            bucket_ts = _bucket_start(timestamp)
-            bucket_key = bucket_ts.isoformat()
-            bucket = time_buckets.setdefault(
-                bucket_key,
-                {
-                    "timestamp": bucket_key,
-                    "energyDischargedKwh": 0.0,
-                    "averagePowerKw": 0.0,
-                    "samples": 0,
-                },
-            )
-            bucket["energyDischargedKwh"] += measurement["energyKwh"]
-            bucket["averagePowerKw"] += measurement["powerKw"]
-            bucket["samples"] += 1
-
-            total_energy += measurement["energyKwh"]
-            total_power += measurement["powerKw"]
+        merged = merge_rollups(
+            [
+                self._event_analytics(event, raw_events[event["id"]], period_start)
+                for event in filtered_events
+            ],
+            normalized_grain,
+        )
+        total_energy = merged["totalEnergyKwh"]
 
-            vessel_id = str(measurement.get("vesselId") or "unknown")
-            vessel_entry = vessel_totals.setdefault(
-                vessel_id,
-                {
-                    "vesselId": vessel_id,
-                    "contractId": measurement.get("contractId"),
-                    "totalEnergyDischargedKwh": 0.0,
-                    "latestPowerKw": 0.0,
-                    "latestTimestamp": None,
-                },
-            )
-            vessel_entry["totalEnergyDischargedKwh"] += measurement["energyKwh"]
-            latest_ts = vessel_entry.get("latestTimestamp")
-            if latest_ts is None or timestamp >= latest_ts:
-                vessel_entry["latestTimestamp"] = timestamp
-                vessel_entry["latestPowerKw"] = measurement["powerKw"]
-                if measurement.get("contractId"):
-                    vessel_entry["contractId"] = measurement.get("contractId")
-
-            heat_key = (timestamp.weekday(), timestamp.hour)
-            heat_entry = hourly_heatmap.setdefault(heat_key, {"powerTotal": 0.0, "samples": 0})
-            heat_entry["powerTotal"] += measurement["powerKw"]
-            heat_entry["samples"] += 1
-
-        ordered_series = sorted(time_buckets.values(), key=lambda item: item["timestamp"])
+        ordered_series = sorted(
+            merged["timeBuckets"].values(), key=lambda item: item["timestamp"]
+        )
         for bucket in ordered_series:
             samples = max(int(bucket.pop("samples", 0)), 1)
             bucket["averagePowerKw"] = round(bucket["averagePowerKw"] / samples, 2)
@@ -678,18 +790,13 @@ class DREventService:
         vessel_leaderboard = sorted(
             [
                 {
-                    **entry,
-                    "totalEnergyDischargedKwh": round(
-                        entry["totalEnergyDischargedKwh"], 2
-                    ),
+                    "vesselId": vessel_id,
+                    "contractId": entry.get("contractId"),
+                    "totalEnergyDischargedKwh": round(entry["energyKwh"], 2),
                     "latestPowerKw": round(float(entry.get("latestPowerKw", 0.0) or 0.0), 2),
-                    "latestTimestamp": (
-                        entry["latestTimestamp"].isoformat()
-                        if entry.get("latestTimestamp")
-                        else None
-                    ),
+                    "latestTimestamp": entry.get("latestTimestamp"),
                 }
-                for entry in vessel_totals.values()
+                for vessel_id, entry in merged["vessels"].items()
             ],
             key=lambda item: item["totalEnergyDischargedKwh"],
             reverse=True,
@@ -713,20 +820,9 @@ class DREventService:
             reverse=True,
         )
 
-        finalized_contracts = [
-            contract
-            for contract in contracts
-            if str(contract.get("status") or "").lower()
-            in {"completed", "failed", "cancelled"}
-        ]
-        completed_contracts = [
-            contract
-            for contract in finalized_contracts
-            if str(contract.get("status") or "").lower() == "completed"
-        ]
         completion_rate = (
-            (len(completed_contracts) / len(finalized_contracts)) * 100
-            if finalized_contracts
+            (merged["completedContracts"] / merged["finalizedContracts"]) * 100
+            if merged["finalizedContracts"]
             else 0.0
         )
 
@@ -734,7 +830,9 @@ class DREventService:
             int(float(event.get("maxParticipants", 0) or 0)) for event in filtered_events
         )
         participation_rate = (
-            (len(vessel_totals) / max_participants) * 100 if max_participants > 0 else 0.0
+            (len(merged["vessels"]) / max_participants) * 100
+            if max_participants > 0
+            else 0.0
         )
 
         day_labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
@@ -746,7 +844,7 @@ class DREventService:
                 power_total = 0.0
                 samples = 0
                 for hour in range(band_start, band_end):
-                    entry = hourly_heatmap.get((day_index, hour))
+                    entry = merged["heat"].get((day_index, hour))
                     if entry:
                         power_total += entry["powerTotal"]
                         samples += int(entry["samples"])
@@ -771,36 +869,12 @@ class DREventService:
             for event in filtered_events
         ]
         available_events.sort(
-            key=lambda item: parse_datetime(item["startTime"])
-            or datetime.min.replace(tzinfo=timezone.utc),
+            key=lambda item: _start_time_key(item, missing=float("-inf")),
             reverse=True,
         )
 
         # --- Financials ---
-        total_payout_usd = 0.0
-        committed_exposure_usd = 0.0
-        financial_time_buckets: Dict[str, float] = {}
-        event_payout_map: Dict[str, float] = {}
-
-        for contract in contracts:
-            contract_status = str(contract.get("status") or "").lower()
-            contract_value = float(contract.get("totalValue") or 0)
-            if contract_status == "completed":
-                total_payout_usd += contract_value
-                end_time = parse_datetime(contract.get("endTime"))
-                if end_time:
-                    bucket_ts = _bucket_start(end_time)
-                    bucket_key = bucket_ts.isoformat()
-                    financial_time_buckets[bucket_key] = (
-                        financial_time_buckets.get(bucket_key, 0.0) + contract_value
-                    )
-                contract_event_id = contract.get("drEventId") or ""
-                event_payout_map[contract_event_id] = (
-                    event_payout_map.get(contract_event_id, 0.0) + contract_value
-                )
-            elif contract_status in ("pending", "active"):
-                committed_exposure_usd += contract_value
-
+        total_payout_usd = merged["totalPayoutUsd"]
         cost_per_kwh_usd = (
             round(total_payout_usd / total_energy, 4)
             if total_payout_usd > 0 and total_energy > 0
@@ -823,7 +897,7 @@ class DREventService:
 
         financial_series = [
             {"timestamp": ts, "payoutUsd": round(payout, 2)}
-            for ts, payout in sorted(financial_time_buckets.items())
+            for ts, payout in sorted(merged["payoutBuckets"].items())
         ]
 
         event_breakdown = []
@@ -832,7 +906,7 @@ class DREventService:
             target_kwh = float(event.get("targetEnergyKwh") or 0)
             price = float(event.get("pricePerKwh") or 0)
             target_value = round(target_kwh * price, 2)
-            actual_payout = round(event_payout_map.get(ev_id, 0.0), 2)
+            actual_payout = round(merged["payoutByEvent"].get(ev_id, 0.0), 2)
             delivery_rate = (
                 round((actual_payout / target_value) * 100, 2) if target_value > 0 else 0.0
             )
@@ -846,74 +920,71 @@ class DREventService:
                 }
             )
         event_breakdown.sort(
-            key=lambda item: parse_datetime(item["startTime"])
-            or datetime.min.replace(tzinfo=timezone.utc),
+            key=lambda item: _start_time_key(item, missing=float("-inf")),
             reverse=True,
         )
 
         financials = {
             "totalPayoutUsd": round(total_payout_usd, 2),
-            "committedExposureUsd": round(committed_exposure_usd, 2),
+            "committedExposureUsd": round(merged["committedExposureUsd"], 2),
             "costPerKwhUsd": cost_per_kwh_usd,
             "avgPricePerKwhUsd": avg_price_per_kwh_usd,
             "timeSeries": financial_series,
             "eventBreakdown": event_breakdown,
         }
 
-        return convert_decimals(
-            {
-                "filters": {
-                    "eventId": explicit_event_id or "",
-                    "region": region or "",
-                    "periodHours": period_hours,
-                    "grain": normalized_grain,
-                },
-                "summary": {
-                    "totalEnergyDischargedKwh": round(total_energy, 2),
-                    "averagePowerKw": round(total_power / len(measurements), 2)
-                    if measurements
-                    else 0.0,
-                    "peakPowerKw": round(
-                        max(
-                            (
-                                float(point.get("averagePowerKw", 0) or 0)
-                                for point in ordered_series
-                            ),
-                            default=0.0,
+        return {
+            "filters": {
+                "eventId": explicit_event_id or "",
+                "region": region or "",
+                "periodHours": period_hours,
+                "grain": normalized_grain,
+            },
+            "summary": {
+                "totalEnergyDischargedKwh": round(total_energy, 2),
+                "averagePowerKw": round(merged["totalPowerKw"] / merged["samples"], 2)
+                if merged["samples"]
+                else 0.0,
+                "peakPowerKw": round(
+                    max(
+                        (
+                            float(point.get("averagePowerKw", 0) or 0)
+                            for point in ordered_series
                         ),
-                        2,
+                        default=0.0,
                     ),
-                    "completionRatePercent": round(completion_rate, 2),
-                    "participationRatePercent": round(participation_rate, 2),
-                    "eventsConsidered": len(filtered_events),
-                    "contractsConsidered": len(contracts),
-                    "baselineAvailable": False,
-                },
-                "selectedEvent": (
-                    {
-                        "id": selected_event["id"],
-                        "stationId": selected_event["stationId"],
-                        "status": selected_event["status"],
-                        "targetEnergyKwh": selected_event["targetEnergyKwh"],
-                        "startTime": selected_event["startTime"],
-                        "endTime": selected_event["endTime"],
-                        "regionLabel": self._region_label(
-                            selected_event.get("station") or {}
-                        ),
-                    }
-                    if selected_event
-                    else None
+                    2,
                 ),
-                "timeSeries": ordered_series,
-                "statusDistribution": status_distribution,
-                "vesselLeaderboard": vessel_leaderboard,
-                "heatmap": heatmap,
-                "availableEvents": available_events,
-                "financials": financials,
-                "empty": len(measurements) == 0,
-                "updatedAt": now.isoformat(),
-            }
-        )
+                "completionRatePercent": round(completion_rate, 2),
+                "participationRatePercent": round(participation_rate, 2),
+                "eventsConsidered": len(filtered_events),
+                "contractsConsidered": merged["contractsCount"],
+                "baselineAvailable": False,
+            },
+            "selectedEvent": (
+                {
+                    "id": selected_event["id"],
+                    "stationId": selected_event["stationId"],
+                    "status": selected_event["status"],
+                    "targetEnergyKwh": selected_event["targetEnergyKwh"],
+                    "startTime": selected_event["startTime"],
+                    "endTime": selected_event["endTime"],
+                    "regionLabel": self._region_label(
+                        selected_event.get("station") or {}
+                    ),
+                }
+                if selected_event
+                else None
+            ),
+            "timeSeries": ordered_series,
+            "statusDistribution": status_distribution,
+            "vesselLeaderboard": vessel_leaderboard,
+            "heatmap": heatmap,
+            "availableEvents": available_events,
+            "financials": financials,
+            "empty": merged["samples"] == 0,
+            "updatedAt": now.isoformat(),
+        }
 
     def _region_label(self, station: Dict[str, Any]) -> str:
         parts = [
@@ -1,5 +1,10 @@
 """Eligibility service package."""
 
+from .cache import EligibilityResultCache, invalidate_eligibility_cache
 from .service import EligibilityService
 
-__all__ = ["EligibilityService"]
+__all__ = [
+    "EligibilityResultCache",
+    "EligibilityService",
+    "invalidate_eligibility_cache",
+]
@@ -0,0 +1,58 @@
+"""Cache for per-event eligibility results.
+
+Results are stored per event and vessel in the ``eligibility`` namespace of
+the shared cache (``cache.get_cache()``).  Writes that can change an
+eligibility answer (vessel edits, new measurements, event updates) call
+``invalidate_eligibility_cache``, which bumps the namespace version, so with
+``CACHE_BACKEND=redis`` every worker stops reading the old results at once.
+The TTL bounds staleness for writes that do not invalidate.
+"""
+
+from typing import Any, Optional
+
+import config
+from cache import Cache, get_cache
+
+ELIGIBILITY_NAMESPACE = "eligibility"
+
+
+def invalidate_eligibility_cache() -> None:
+    get_cache().invalidate_namespace(ELIGIBILITY_NAMESPACE)
+
+
+class EligibilityResultCache:
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        cache: Optional[Cache] = None,
+    ):
+        self.ttl_seconds = (
+            config.ELIGIBILITY_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self._cache = cache
+
+    @property
+    def cache(self) -> Cache:
+        return self._cache or get_cache()
+
+    @staticmethod
+    def _key(event_id: str, vessel_id: str) -> str:
+        return f"{event_id}:{vessel_id}"
+
+    def get(self, event_id: str, vessel_id: str) -> Any:
+        """Return the cached result (``None`` for unknown vessels) or ``MISSING``."""
+        return self.cache.get(ELIGIBILITY_NAMESPACE, self._key(event_id, vessel_id))
+
+    def set(self, event_id: str, vessel_id: str, result: Any) -> None:
+        self.cache.set(
+            ELIGIBILITY_NAMESPACE,
+            self._key(event_id, vessel_id),
+            result,
+            self.ttl_seconds,
+        )
+
+    def clear(self) -> None:
+        self.cache.invalidate_namespace(ELIGIBILITY_NAMESPACE)
+
+
+eligibility_result_cache = EligibilityResultCache()
@@ -1,7 +1,6 @@
-from datetime import datetime
 from time import perf_counter
 from math import asin, cos, radians, sin, sqrt
-from typing import Any, Dict, List, Optional, Protocol, Tuple
+from typing import Any, Dict, List, Optional, Protocol
 
 try:
     from geopy.distance import geodesic
@@ -9,7 +8,12 @@ except ModuleNotFoundError:
     geodesic = None
 
 import config
+from cache import MISSING, cached
 from db.dynamoClient import DynamoClient
+from services.telemetry import latest_soc_from_vessel
+from timeutil import parse_epoch_us
+
+from .cache import EligibilityResultCache, eligibility_result_cache
 
 DEFAULT_KWH_PER_KM = 0.2
 
@@ -60,20 +64,6 @@ def _distance_meters(
     return _haversine_distance_meters(start_lat, start_lon, end_lat, end_lon)
 
 
-def _parse_datetime(value: Any) -> Optional[datetime]:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value
-    if not isinstance(value, str):
-        return None
-
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
-
-
 def _derive_soc_from_capacity(vessel: Dict[str, Any]) -> Optional[float]:
     capacity_kwh = _to_float(vessel.get("capacity"))
     max_capacity_kwh = _to_float(vessel.get("maxCapacity"))
@@ -92,6 +82,9 @@ class VesselRepository(Protocol):
     def list_vessels(self) -> List[Dict[str, Any]]:
         pass
 
+    def get_vessel(self, vessel_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
 
 class StationRepository(Protocol):
     def get_station(self, station_id: str) -> Optional[Dict[str, Any]]:
@@ -112,6 +105,10 @@ class DynamoVesselRepository:
     def list_vessels(self) -> List[Dict[str, Any]]:
         return self.client.scan_items()
 
+    def get_vessel(self, vessel_id: str) -> Optional[Dict[str, Any]]:
+        vessel = self.client.get_item({"id": vessel_id})
+        return vessel or None
+
 
 class DynamoStationRepository:
     def __init__(self, client: Optional[DynamoClient] = None):
@@ -119,66 +116,71 @@ class DynamoStationRepository:
             table_name=config.STATIONS_TABLE, region_name=config.AWS_REGION
         )
 
+    @cached("stations")
     def get_station(self, station_id: str) -> Optional[Dict[str, Any]]:
         station = self.client.get_item({"id": station_id})
         return station or None
 
 
-class DynamoMeasurementRepository:
-    def __init__(self, client: Optional[DynamoClient] = None):
-        self.client = client or DynamoClient(
-            table_name=config.MEASUREMENTS_TABLE, region_name=config.AWS_REGION
-        )
-        self._latest_soc_by_vessel_id: Optional[Dict[str, Tuple[str, float]]] = None
-
-    def _build_soc_cache(self) -> None:
-        if self._latest_soc_by_vessel_id is not None:
-            return
-
-        self._latest_soc_by_vessel_id = {}
-        try:
-            measurements = self.client.scan_items()
-        except Exception:
-            measurements = []
-
-        for measurement in measurements:
-            vessel_id = measurement.get("vesselId")
-            if not vessel_id:
-                continue
-
-            soc = _to_float(measurement.get("currentSOC"))
-            if soc is None:
-                continue
-
-            timestamp = str(
-                measurement.get("timestamp") or measurement.get("createdAt") or ""
-            )
-
-            current_best = self._latest_soc_by_vessel_id.get(vessel_id)
-            if current_best is None or timestamp >= current_best[0]:
-                self._latest_soc_by_vessel_id[vessel_id] = (timestamp, soc)
-
-    def get_latest_soc(self, vessel_id: str) -> Optional[float]:
-        self._build_soc_cache()
-        if self._latest_soc_by_vessel_id is None:
-            return None
-
-        latest = self._latest_soc_by_vessel_id.get(vessel_id)
-        return None if latest is None else latest[1]
-
-
 class EligibilityService:
     def __init__(
         self,
         vessel_repository: Optional[VesselRepository] = None,
         station_repository: Optional[StationRepository] = None,
         measurement_repository: Optional[MeasurementRepository] = None,
+        result_cache: Optional[EligibilityResultCache] = None,
     ):
         self.vessel_repository = vessel_repository or DynamoVesselRepository()
         self.station_repository = station_repository or DynamoStationRepository()
-        self.measurement_repository = (
-            measurement_repository or DynamoMeasurementRepository()
-        )
+        # Latest SOC comes from the projection on each vessel item; an
+        # explicit measurement repository is only consulted when it is absent.
+        self.measurement_repository = measurement_repository
+        self.result_cache = result_cache or eligibility_result_cache
+
+    def get_vessel_eligibility(
+        self,
+        dr_event: Dict[str, Any],
+        vessel_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Return one vessel's result for an event, reusing cached evaluations.
+
+        Results are stored per event and vessel until the cache is
+        invalidated; unknown vessels yield ``None``.
+        """
+        vessel_key = str(vessel_id)
+        event_id = str(dr_event.get("id") or "")
+        if event_id:
+            cached_result = self.result_cache.get(event_id, vessel_key)
+            if cached_result is not MISSING:
+                return cached_result
+
+        try:
+            vessel_result = self.evaluate_vessel_for_event(vessel_key, dr_event)
+        except LookupError:
+            vessel_result = None
+        if event_id:
+            self.result_cache.set(event_id, vessel_key, vessel_result)
+        return vessel_result
+
+    def evaluate_vessel_for_event(
+        self,
+        vessel_id: str,
+        dr_event: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Evaluate a single vessel with point reads instead of fleet scans."""
+        station_id = dr_event.get("stationId")
+        if not station_id:
+            raise ValueError("DR event must include stationId")
+
+        vessel = self.vessel_repository.get_vessel(vessel_id)
+        if not vessel:
+            raise LookupError("Vessel not found")
+
+        station = self.station_repository.get_station(station_id)
+        if not station:
+            raise LookupError("Station not found")
+
+        return self._evaluate_single_vessel(vessel, station, dr_event)
 
     def evaluate_vessels_for_event(
         self,
@@ -272,7 +274,9 @@ class EligibilityService:
         if minimum_soc is None:
             minimum_soc = 20.0
 
-        current_soc = self.measurement_repository.get_latest_soc(vessel.get("id"))
+        current_soc = latest_soc_from_vessel(vessel)
+        if current_soc is None and self.measurement_repository is not None:
+            current_soc = self.measurement_repository.get_latest_soc(vessel.get("id"))
         if current_soc is None:
             current_soc = _to_float(vessel.get("currentSoc"))
         if current_soc is None:
@@ -345,16 +349,16 @@ class EligibilityService:
         vessel: Dict[str, Any],
         dr_event: Dict[str, Any],
     ) -> bool:
-        event_start = _parse_datetime(dr_event.get("startTime"))
-        event_end = _parse_datetime(dr_event.get("endTime"))
+        event_start = parse_epoch_us(dr_event.get("startTime"))
+        event_end = parse_epoch_us(dr_event.get("endTime"))
 
         if event_start is None or event_end is None:
             return True
 
-        available_from = _parse_datetime(
+        available_from = parse_epoch_us(
             vessel.get("availableFrom") or vessel.get("availableStart")
         )
-        available_until = _parse_datetime(
+        available_until = parse_epoch_us(
             vessel.get("availableUntil") or vessel.get("availableEnd")
         )
 
@@ -0,0 +1,17 @@
+"""Vessel telemetry helpers."""
+
+from .latest_soc import (
+    LATEST_SOC_AT_FIELD,
+    LATEST_SOC_FIELD,
+    latest_soc_from_vessel,
+    latest_soc_projection,
+    record_latest_soc,
+)
+
+__all__ = [
+    "LATEST_SOC_AT_FIELD",
+    "LATEST_SOC_FIELD",
+    "latest_soc_from_vessel",
+    "latest_soc_projection",
+    "record_latest_soc",
+]
@@ -0,0 +1,78 @@
+"""Latest-SOC projection stored on vessel items.
+
+The dispatcher writes each vessel's newest SOC reading onto the vessel record
+(``latestSoc`` / ``latestSocAt``) so readers get it from the vessel read they
+already make instead of scanning the measurements table.  Writes are
+conditional on the timestamp, so a delayed or replayed reading never
+overwrites a newer one.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+from boto3.dynamodb.conditions import Attr
+
+from db.dynamoClient import DynamoClient
+
+LATEST_SOC_FIELD = "latestSoc"
+LATEST_SOC_AT_FIELD = "latestSocAt"
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def latest_soc_from_vessel(vessel: Optional[Dict[str, Any]]) -> Optional[float]:
+    if not vessel:
+        return None
+    return _to_float(vessel.get(LATEST_SOC_FIELD))
+
+
+def record_latest_soc(
+    vessels_client: DynamoClient,
+    vessel_id: str,
+    soc_percent: float,
+    timestamp: str,
+    extra_fields: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Store a SOC reading unless the vessel already holds a newer one.
+
+    ``extra_fields`` are written in the same conditional update.  Returns
+    ``False`` when the vessel is missing or has a newer reading.
+    """
+    update_data = dict(extra_fields or {})
+    update_data[LATEST_SOC_FIELD] = Decimal(str(round(soc_percent, 4)))
+    update_data[LATEST_SOC_AT_FIELD] = timestamp
+
+    condition = Attr("id").exists() & (
+        Attr(LATEST_SOC_AT_FIELD).not_exists()
+        | Attr(LATEST_SOC_AT_FIELD).lte(timestamp)
+    )
+    updated = vessels_client.update_item_conditional(
+        key={"id": vessel_id},
+        update_data=update_data,
+        condition_expression=condition,
+    )
+    return updated is not None
+
+
+def latest_soc_projection(measurements: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Projection fields for the newest measurement carrying a SOC, if any."""
+    latest: Optional[Dict[str, Any]] = None
+    for measurement in measurements:
+        if _to_float(measurement.get("currentSOC")) is None:
+            continue
+        timestamp = str(measurement.get("timestamp") or "")
+        if not timestamp:
+            continue
+        if latest is None or timestamp >= latest[LATEST_SOC_AT_FIELD]:
+            latest = {
+                LATEST_SOC_FIELD: Decimal(str(measurement.get("currentSOC"))),
+                LATEST_SOC_AT_FIELD: timestamp,
+            }
+    return latest or {}
@@ -0,0 +1,15 @@
+"""VO dashboard service helpers."""
+
+from .cache import (
+    VODashboardCache,
+    invalidate_vo_dashboard_for_users,
+    invalidate_vo_dashboard_for_vessels,
+    vo_dashboard_cache,
+)
+
+__all__ = [
+    "VODashboardCache",
+    "invalidate_vo_dashboard_for_users",
+    "invalidate_vo_dashboard_for_vessels",
+    "vo_dashboard_cache",
+]
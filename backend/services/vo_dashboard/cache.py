@@ -0,0 +1,176 @@
+"""Per-user cache for the VO dashboard payload.
+
+A snapshot holds the parts of the dashboard that only change when one of the
+user's contracts, bookings or vessels changes (totals, weekly earnings, the
+current vessel and the active contract).  The live energy figures of the
+active contract are cached separately with a much shorter TTL.
+
+Entries live in the ``vo_dashboard`` namespace of the shared cache
+(``cache.get_cache()``), so with ``CACHE_BACKEND=redis`` every worker serves
+and invalidates the same snapshots.  Invalidation only bumps namespace
+versions, which are atomic counters in the backend:
+
+* each user has a generation (``vo_dashboard:user:<id>``), bumped by
+  ``invalidate_vo_dashboard_for_users``; a snapshot computed concurrently
+  with the bump is discarded instead of stored;
+* each vessel has a version (``vo_dashboard:vessel:<id>``), bumped by
+  ``invalidate_vo_dashboard_for_vessels``; a snapshot records the versions
+  of its vessels and is dropped once any of them moves on.
+
+Vessel versions must be read before the load that builds a snapshot, or a
+bump landing mid-load would be recorded as already seen.  The vessel ids are
+only known after the load, so ``vessel_versions`` reads the versions of the
+ids the user's last snapshot (or last unstored load) listed; a load that
+turns up a vessel without a pre-load version is not stored, only its ids are.
+
+The live figures follow user invalidations and otherwise just expire.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import config
+from cache import MISSING, Cache, get_cache
+
+VO_DASHBOARD_NAMESPACE = "vo_dashboard"
+# The vessel ids of a user outlive any snapshot so that the versions of a
+# cold user's vessels can still be read before the load.
+VESSEL_IDS_TTL_SECONDS = 24 * 60 * 60
+
+
+def _user_namespace(user_id: str) -> str:
+    return f"{VO_DASHBOARD_NAMESPACE}:user:{user_id}"
+
+
+def _vessel_namespace(vessel_id: str) -> str:
+    return f"{VO_DASHBOARD_NAMESPACE}:vessel:{vessel_id}"
+
+
+class VODashboardCache:
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        live_ttl_seconds: Optional[float] = None,
+        cache: Optional[Cache] = None,
+    ):
+        self.ttl_seconds = (
+            config.VO_DASHBOARD_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self.live_ttl_seconds = (
+            config.VO_DASHBOARD_LIVE_TTL_SECONDS
+            if live_ttl_seconds is None
+            else live_ttl_seconds
+        )
+        self._cache = cache
+
+    @property
+    def cache(self) -> Cache:
+        return self._cache or get_cache()
+
+    def generation(self, user_id: str) -> int:
+        return self.cache.namespace_version(_user_namespace(str(user_id)))
+
+    def _vessel_versions(self, vessel_ids: Iterable[str]) -> Dict[str, int]:
+        return {
+            vessel_id: self.cache.namespace_version(_vessel_namespace(vessel_id))
+            for vessel_id in vessel_ids
+        }
+
+    def get_snapshot(self, user_id: str) -> Optional[Dict[str, Any]]:
+        cached = self.cache.get(VO_DASHBOARD_NAMESPACE, f"snapshot:{user_id}")
+        if cached is MISSING or cached["generation"] != self.generation(user_id):
+            return None
+        if self._vessel_versions(cached["vessels"]) != cached["vessels"]:
+            return None
+        return cached["snapshot"]
+
+    def vessel_versions(
+        self, user_id: str, vessel_ids: Iterable[str] = ()
+    ) -> Dict[str, int]:
+        """Versions of the user's known vessels (and ``vessel_ids``), read pre-load."""
+        ids = {str(v) for v in vessel_ids}
+        cached = self.cache.get(VO_DASHBOARD_NAMESPACE, f"snapshot:{user_id}")
+        if cached is not MISSING:
+            ids.update(cached["vessels"])
+        known = self.cache.get(VO_DASHBOARD_NAMESPACE, f"vessels:{user_id}")
+        if known is not MISSING:
+            ids.update(known)
+        return self._vessel_versions(sorted(ids))
+
+    def put_snapshot(
+        self,
+        user_id: str,
+        snapshot: Dict[str, Any],
+        vessel_ids: Iterable[str],
+        generation: int,
+        vessel_versions: Dict[str, int],
+    ) -> bool:
+        """Store a snapshot unless the user or one of its vessels moved on.
+
+        ``generation`` and ``vessel_versions`` are the values read before the
+        snapshot was loaded; those are what the stored entry records.
+        """
+        vessel_ids = [str(v) for v in vessel_ids]
+        if any(vessel_id not in vessel_versions for vessel_id in vessel_ids):
+            # Remember the ids so the next load can read their versions first.
+            self.cache.set(
+                VO_DASHBOARD_NAMESPACE,
+                f"vessels:{user_id}",
+                vessel_ids,
+                VESSEL_IDS_TTL_SECONDS,
+            )
+            return False
+        if self.generation(user_id) != generation:
+            return False
+        seen = {vessel_id: vessel_versions[vessel_id] for vessel_id in vessel_ids}
+        if self._vessel_versions(vessel_ids) != seen:
+            return False
+        self.cache.set(
+            VO_DASHBOARD_NAMESPACE,
+            f"snapshot:{user_id}",
+            {"generation": generation, "vessels": seen, "snapshot": snapshot},
+            self.ttl_seconds,
+        )
+        return True
+
+    def get_live(self, user_id: str, contract_id: str) -> Optional[Dict[str, Any]]:
+        cached = self.cache.get(VO_DASHBOARD_NAMESPACE, f"live:{user_id}")
+        if (
+            cached is MISSING
+            or cached["generation"] != self.generation(user_id)
+            or cached["live"].get("contractId") != contract_id
+        ):
+            return None
+        return cached["live"]
+
+    def put_live(self, user_id: str, live: Dict[str, Any], generation: int) -> None:
+        if self.generation(user_id) == generation:
+            self.cache.set(
+                VO_DASHBOARD_NAMESPACE,
+                f"live:{user_id}",
+                {"generation": generation, "live": live},
+                self.live_ttl_seconds,
+            )
+
+    def invalidate_users(self, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self.cache.invalidate_namespace(_user_namespace(str(user_id)))
+
+    def invalidate_vessels(self, vessel_ids: Iterable[str]) -> None:
+        for vessel_id in vessel_ids:
+            self.cache.invalidate_namespace(_vessel_namespace(str(vessel_id)))
+
+    def clear(self) -> None:
+        self.cache.invalidate_namespace(VO_DASHBOARD_NAMESPACE)
+
+
+vo_dashboard_cache = VODashboardCache()
+
+
+def invalidate_vo_dashboard_for_vessels(vessel_ids: Iterable[Optional[str]]) -> None:
+    vo_dashboard_cache.invalidate_vessels(
+        vessel_id for vessel_id in vessel_ids if vessel_id
+    )
+
+
+def invalidate_vo_dashboard_for_users(user_ids: Iterable[Optional[str]]) -> None:
+    vo_dashboard_cache.invalidate_users(user_id for user_id in user_ids if user_id)
@@ -93,9 +93,12 @@ _TABLE_DEFINITIONS = [
             _gsi("contractId-index", "contractId"),
             _gsi("drEventId-index", "drEventId"),
             _gsi("vesselId-index", "vesselId"),
+            _gsi("vesselId-timestamp-index", "vesselId", sk="timestamp"),
         ],
     },
     {"name": config.PORTS_TABLE, "gsis": []},
+    {"name": config.RATELIMITS_TABLE, "gsis": []},
+    {"name": config.ANALYTICS_ROLLUPS_TABLE, "gsis": []},
 ]
 
 # ---------------------------------------------------------------------------
@@ -139,6 +142,33 @@ _SEED_VESSELS = [
 ]
 
 
+def create_tables(dynamodb):
+    """Create every table in ``_TABLE_DEFINITIONS`` (also used by the benchmarks)."""
+    for table_def in _TABLE_DEFINITIONS:
+        # Collect all attribute definitions (id + GSI keys, deduplicated)
+        attr_map = {"id": "S"}
+        gsi_list = []
+        for g in table_def.get("gsis", []):
+            gsi_list.append(g["index"])
+            for attr in g["attrs"]:
+                attr_map[attr["AttributeName"]] = attr["AttributeType"]
+
+        attr_defs = [
+            {"AttributeName": k, "AttributeType": v} for k, v in attr_map.items()
+        ]
+
+        kwargs = {
+            "TableName": table_def["name"],
+            "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+            "AttributeDefinitions": attr_defs,
+            "BillingMode": "PAY_PER_REQUEST",
+        }
+        if gsi_list:
+            kwargs["GlobalSecondaryIndexes"] = gsi_list
+
+        dynamodb.create_table(**kwargs)
+
+
 @pytest.fixture(autouse=True)
 def mock_dynamo():
     os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
@@ -147,30 +177,7 @@ def mock_dynamo():
 
     with mock_aws():
         dynamodb = boto3.resource("dynamodb", region_name=config.AWS_REGION)
-
-        for table_def in _TABLE_DEFINITIONS:
-            # Collect all attribute definitions (id + GSI keys, deduplicated)
-            attr_map = {"id": "S"}
-            gsi_list = []
-            for g in table_def.get("gsis", []):
-                gsi_list.append(g["index"])
-                for attr in g["attrs"]:
-                    attr_map[attr["AttributeName"]] = attr["AttributeType"]
-
-            attr_defs = [
-                {"AttributeName": k, "AttributeType": v} for k, v in attr_map.items()
-            ]
-
-            kwargs = {
-                "TableName": table_def["name"],
-                "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
-                "AttributeDefinitions": attr_defs,
-                "BillingMode": "PAY_PER_REQUEST",
-            }
-            if gsi_list:
-                kwargs["GlobalSecondaryIndexes"] = gsi_list
-
-            dynamodb.create_table(**kwargs)
+        create_tables(dynamodb)
 
         # Seed records needed by tests that assume pre-existing data
         dynamodb.Table(config.USERS_TABLE).put_item(Item=_SEED_USERS[0])
@@ -178,3 +185,16 @@ def mock_dynamo():
         dynamodb.Table(config.VESSELS_TABLE).put_item(Item=_SEED_VESSELS[0])
 
         yield
+
+
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    # Tables are recreated for every test, so cached reads must not leak.
+    from cache import reset_cache
+    from local_metrics import registry
+    from services.dr.live import dr_live_feed
+
+    reset_cache()
+    dr_live_feed.clear()
+    registry.clear()
+    yield
@@ -0,0 +1,146 @@
+import fcntl
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from botocore.exceptions import ClientError
+
+import config
+from services.analytics import (
+    ROLLUP_FIELD,
+    ROLLUP_GENERATION_FIELD,
+    invalidate_event_analytics,
+    rollup_can_be_stored,
+    to_dynamo,
+)
+from services.analytics import materializer
+from services.drevents.service import DynamoDREventRepository
+
+
+def _events_table():
+    return boto3.resource("dynamodb", region_name=config.AWS_REGION).Table(
+        config.DREVENTS_TABLE
+    )
+
+
+def test_invalidate_event_analytics_clears_stored_rollups():
+    table = _events_table()
+    table.put_item(
+        Item={
+            "id": "event-1",
+            "status": "Completed",
+            ROLLUP_FIELD: to_dynamo({"version": 1, "contracts": {"payoutUsd": 1.5}}),
+        }
+    )
+
+    invalidate_event_analytics(["event-1", None])
+
+    assert table.get_item(Key={"id": "event-1"})["Item"][ROLLUP_FIELD] is None
+
+
+def test_invalidate_event_analytics_does_not_create_missing_events():
+    invalidate_event_analytics(["missing-event"])
+
+    assert "Item" not in _events_table().get_item(Key={"id": "missing-event"})
+
+
+def test_invalidation_changes_the_generation_of_events_without_a_rollup():
+    table = _events_table()
+    table.put_item(Item={"id": "event-1", "status": "Completed"})
+
+    invalidate_event_analytics(["event-1"])
+    first = table.get_item(Key={"id": "event-1"})["Item"][ROLLUP_GENERATION_FIELD]
+    invalidate_event_analytics(["event-1"])
+    second = table.get_item(Key={"id": "event-1"})["Item"][ROLLUP_GENERATION_FIELD]
+
+    assert first and second and first != second
+
+
+def test_rollup_built_before_an_invalidation_is_not_stored():
+    table = _events_table()
+    table.put_item(Item={"id": "event-1", "status": "Completed"})
+    repository = DynamoDREventRepository()
+    invalidate_event_analytics(["event-1"])
+    generation = repository.get_event("event-1")[ROLLUP_GENERATION_FIELD]
+
+    invalidate_event_analytics(["event-1"])  # a contract changes mid-build
+    stale = repository.store_rollup("event-1", {"version": 2}, generation)
+    current = repository.store_rollup(
+        "event-1", {"version": 2}, repository.get_event("event-1")[ROLLUP_GENERATION_FIELD]
+    )
+
+    assert (stale, current) == (False, True)
+    assert table.get_item(Key={"id": "event-1"})["Item"][ROLLUP_FIELD] == {
+        "version": 2,
+        "measurements": {"vesselParts": 0},
+    }
+
+
+def test_rollup_vessels_are_stored_in_parts_off_the_event_item(monkeypatch):
+    monkeypatch.setattr(config, "ANALYTICS_ROLLUP_VESSELS_PER_ITEM", 2)
+    _events_table().put_item(Item={"id": "event-1", "status": "Completed"})
+    repository = DynamoDREventRepository()
+    vessels = {
+        f"vessel-{index}": {"energyKwh": 1.5, "hourEnergyKwh": {"2026-01-01T00:00:00+00:00": 1.5}}
+        for index in range(5)
+    }
+    rollup = {"version": 2, "measurements": {"hours": {}, "vessels": vessels}}
+
+    assert repository.store_rollup("event-1", to_dynamo(rollup), None)
+
+    stored = repository.get_event("event-1")[ROLLUP_FIELD]
+    assert stored["measurements"] == {"hours": {}, "vesselParts": 3}
+    assert repository.load_rollup_vessels("event-1", stored) == vessels
+
+
+def test_rollup_that_cannot_be_written_is_not_stored(monkeypatch):
+    _events_table().put_item(Item={"id": "event-1", "status": "Completed"})
+    repository = DynamoDREventRepository()
+
+    def _too_large(actions):
+        raise ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "Item size has exceeded"}},
+            "TransactWriteItems",
+        )
+
+    monkeypatch.setattr(repository.client, "transact_write_items", _too_large)
+
+    assert repository.store_rollup("event-1", {"version": 2}, None) is False
+    assert ROLLUP_FIELD not in repository.get_event("event-1")
+
+
+def test_rollup_is_stored_once_the_invalidation_has_settled():
+    now = datetime.now(timezone.utc)
+    invalidated = {"analyticsInvalidatedAt": now.isoformat()}
+
+    assert rollup_can_be_stored({}, now)
+    assert not rollup_can_be_stored(invalidated, now + timedelta(seconds=1))
+    assert rollup_can_be_stored(
+        invalidated,
+        now + timedelta(seconds=config.ANALYTICS_ROLLUP_SETTLE_SECONDS),
+    )
+
+
+class _IdleService:
+    def materialize_analytics(self):
+        return 0
+
+
+def test_materializer_runs_in_one_server_process_only(monkeypatch, tmp_path):
+    lock_path = tmp_path / "materializer.lock"
+    monkeypatch.setattr(config, "SERVER_PROCESSES", 4)
+    monkeypatch.setattr(config, "ANALYTICS_MATERIALIZER_LOCK_FILE", str(lock_path))
+    monkeypatch.setattr(materializer, "_leader_lock_file", None)
+
+    # Another worker holds the lock.
+    with open(lock_path, "a") as leader:
+        fcntl.flock(leader, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert materializer.start_analytics_materializer(_IdleService(), 3600) is None
+
+    # The leader exited, so the next worker to start takes over.
+    thread = materializer.start_analytics_materializer(_IdleService(), 3600)
+    try:
+        assert thread is not None and thread.is_alive()
+    finally:
+        materializer.stop_analytics_materializer()
+        thread.join(timeout=5)
+        materializer._leader_lock_file.close()
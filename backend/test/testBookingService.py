@@ -17,6 +17,9 @@ class InMemoryBookingRepository(BookingRepository):
     def list_bookings(self):
         return self.bookings
 
+    def list_station_bookings(self, station_id):
+        return [booking for booking in self.bookings if booking.get("stationId") == station_id]
+
     def get_booking(self, booking_id):
         for booking in self.bookings:
             if booking.get("id") == booking_id:
@@ -62,6 +65,19 @@ class InMemoryContractRepository(ContractRepository):
     def list_contracts(self):
         return list(self.contracts.values())
 
+    def get_contract_by_booking_id(self, booking_id):
+        for contract in self.contracts.values():
+            if contract.get("bookingId") == booking_id:
+                return contract
+        return None
+
+    def list_contracts_by_event(self, dr_event_id):
+        return [
+            contract
+            for contract in self.contracts.values()
+            if contract.get("drEventId") == dr_event_id
+        ]
+
     def update_contract(self, contract_id, update_data):
         if contract_id not in self.contracts:
             raise AssertionError("Unknown contract update")
@@ -250,3 +266,230 @@ def test_create_booking_transitions_accepted_event_to_committed():
     assert contract_repository.get_contract("contract-1")["status"] == "active"
     assert contract_repository.get_contract("contract-1")["bookingId"] == booking["id"]
     assert drevent_service.get_event("event-1")["status"] == "Committed"
+
+
+def test_create_booking_commits_event_without_rereading_lagging_event_index():
+    class LaggingEventIndexRepository(InMemoryContractRepository):
+        def list_contracts_by_event(self, dr_event_id):
+            # The GSI has not caught up with the booking yet.
+            return []
+
+    contract_repository = LaggingEventIndexRepository(
+        [_accepted_contract("contract-1", "v-1")]
+    )
+    drevent_service = InMemoryDREventService(
+        [{"id": "event-1", "status": "Accepted"}]
+    )
+    service = BookingService(
+        repository=InMemoryBookingRepository(),
+        charger_repository=InMemoryChargerRepository(
+            [
+                {
+                    "id": "charger-1",
+                    "chargingStationId": "station-1",
+                    "chargerType": "Type 2 AC",
+                    "status": 1,
+                }
+            ]
+        ),
+        contract_repository=contract_repository,
+        drevent_service=drevent_service,
+        now_provider=lambda: datetime.fromisoformat("2026-03-01T00:00:00+00:00"),
+    )
+
+    service.create_booking(
+        {
+            "userId": "u-1",
+            "vesselId": "v-1",
+            "stationId": "station-1",
+            "chargerId": "charger-1",
+            "startTime": "2026-03-04T11:00:00+00:00",
+            "endTime": "2026-03-04T12:00:00+00:00",
+            "contractId": "contract-1",
+        }
+    )
+
+    assert drevent_service.get_event("event-1")["status"] == "Committed"
+
+
+def _accepted_contract(contract_id, vessel_id, **overrides):
+    contract = {
+        "id": contract_id,
+        "vesselId": vessel_id,
+        "drEventId": "event-1",
+        "startTime": "2026-03-04T11:00:00+00:00",
+        "endTime": "2026-03-04T12:00:00+00:00",
+        "status": "pending",
+        "acceptedAt": "2026-03-03T08:00:00+00:00",
+        "bookingId": None,
+    }
+    contract.update(overrides)
+    return contract
+
+
+def _planning_service(contracts, bookings=None):
+    return BookingService(
+        repository=InMemoryBookingRepository(bookings),
+        charger_repository=InMemoryChargerRepository(
+            [
+                {
+                    "id": "charger-any",
+                    "chargingStationId": "station-1",
+                    "chargerType": "Type 2 AC",
+                    "status": 1,
+                },
+                {
+                    "id": "charger-ac",
+                    "chargingStationId": "station-1",
+                    "chargerType": "Type 2 AC",
+                    "status": 1,
+                },
+            ]
+        ),
+        contract_repository=InMemoryContractRepository(contracts),
+        drevent_service=InMemoryDREventService(
+            [{"id": "event-1", "status": "Accepted", "stationId": "station-1"}]
+        ),
+        now_provider=lambda: datetime.fromisoformat("2026-03-01T00:00:00+00:00"),
+    )
+
+
+def test_plan_event_bookings_assigns_every_awaiting_contract():
+    service = _planning_service(
+        [
+            _accepted_contract("contract-1", "v-1"),
+            _accepted_contract("contract-2", "v-2"),
+            _accepted_contract("contract-3", "v-3", acceptedAt=None),
+        ]
+    )
+
+    plan = service.plan_event_bookings("event-1")
+
+    assert plan["contractsConsidered"] == 2
+    assert {item["chargerId"] for item in plan["assignments"]} == {
+        "charger-any",
+        "charger-ac",
+    }
+    assert plan["unassigned"] == []
+
+
+def test_plan_event_bookings_reports_contracts_without_a_free_charger():
+    service = _planning_service(
+        [
+            _accepted_contract("contract-1", "v-1"),
+            _accepted_contract("contract-2", "v-2"),
+        ],
+        bookings=[
+            {
+                "id": "b-1",
+                "stationId": "station-1",
+                "chargerId": "charger-any",
+                "startTime": "2026-03-04T10:30:00+00:00",
+                "endTime": "2026-03-04T11:30:00+00:00",
+                "status": BookingStatus.CONFIRMED.value,
+            }
+        ],
+    )
+
+    plan = service.plan_event_bookings("event-1")
+
+    assert len(plan["assignments"]) == 1
+    assert plan["assignments"][0]["chargerId"] == "charger-ac"
+    assert len(plan["unassigned"]) == 1
+
+
+def test_create_booking_auto_resolves_charger_from_event_plan():
+    service = _planning_service(
+        [
+            _accepted_contract("contract-1", "v-1"),
+            _accepted_contract("contract-2", "v-2"),
+        ]
+    )
+
+    first = service.create_booking(
+        {
+            "userId": "u-1",
+            "vesselId": "v-1",
+            "stationId": "station-1",
+            "startTime": "2026-03-04T11:00:00+00:00",
+            "endTime": "2026-03-04T12:00:00+00:00",
+            "contractId": "contract-1",
+        }
+    )
+    second = service.create_booking(
+        {
+            "userId": "u-2",
+            "vesselId": "v-2",
+            "stationId": "station-1",
+            "startTime": "2026-03-04T11:00:00+00:00",
+            "endTime": "2026-03-04T12:00:00+00:00",
+            "contractId": "contract-2",
+        }
+    )
+
+    assert {first["chargerId"], second["chargerId"]} == {"charger-any", "charger-ac"}
+
+
+def test_booking_and_plan_both_use_the_event_charger_type():
+    service = _planning_service([_accepted_contract("contract-1", "v-1")])
+    service.charger_repository.chargers["charger-ccs"] = {
+        "id": "charger-ccs",
+        "chargingStationId": "station-1",
+        "chargerType": "CCS",
+        "status": 1,
+    }
+    service.drevent_service.events["event-1"]["details"] = {"requiredChargerType": "CCS"}
+
+    plan = service.plan_event_bookings("event-1")
+    booking = service.create_booking(
+        {
+            "userId": "u-1",
+            "vesselId": "v-1",
+            "stationId": "station-1",
+            "startTime": "2026-03-04T11:00:00+00:00",
+            "endTime": "2026-03-04T12:00:00+00:00",
+            "chargerType": "Type 2 AC",
+            "contractId": "contract-1",
+        }
+    )
+
+    assert plan["assignments"][0]["chargerId"] == "charger-ccs"
+    assert booking["chargerId"] == "charger-ccs"
+
+
+def test_fallback_never_takes_a_charger_planned_for_other_contracts():
+    service = _planning_service(
+        [
+            _accepted_contract("contract-1", "v-1"),
+            _accepted_contract(
+                "contract-2",
+                "v-2",
+                startTime="2026-03-04T11:00:00+00:00",
+                endTime="2026-03-04T13:00:00+00:00",
+            ),
+            _accepted_contract(
+                "contract-3",
+                "v-3",
+                startTime="2026-03-04T12:00:00+00:00",
+                endTime="2026-03-04T13:00:00+00:00",
+            ),
+        ]
+    )
+    del service.charger_repository.chargers["charger-ac"]
+
+    try:
+        service.create_booking(
+            {
+                "userId": "u-2",
+                "vesselId": "v-2",
+                "stationId": "station-1",
+                "startTime": "2026-03-04T11:00:00+00:00",
+                "endTime": "2026-03-04T13:00:00+00:00",
+                "contractId": "contract-2",
+            }
+        )
+        assert False, "Expected the booking to find no free charger"
+    except BookingServiceError as error:
+        assert error.status_code == 400
+
+    assert service.repository.bookings == []
@@ -0,0 +1,150 @@
+import time
+
+import pytest
+
+from cache import (
+    MISSING,
+    Cache,
+    InMemoryBackend,
+    RedisBackend,
+    cached,
+    invalidate_namespace,
+    reset_cache,
+)
+from local_metrics import registry
+
+
+class _RedisStandIn:
+    """Implements the subset of redis-py used by RedisBackend, storing bytes."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    def _expired(self, key):
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+            return True
+        return False
+
+    def get(self, key):
+        if self._expired(key):
+            return None
+        return self.store.get(key)
+
+    def set(self, key, value, px=None):
+        self.store[key] = value
+        if px is None:
+            self.expiry.pop(key, None)
+        else:
+            self.expiry[key] = time.monotonic() + px / 1000.0
+        return True
+
+    def delete(self, key):
+        self.store.pop(key, None)
+        return 1
+
+    def incr(self, key):
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+
+class _UnavailableRedis:
+    def get(self, key):
+        raise ConnectionError("redis is down")
+
+    set = delete = incr = get
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return Cache(InMemoryBackend(max_entries=100), default_ttl_seconds=60)
+    return Cache(RedisBackend(client=_RedisStandIn()), default_ttl_seconds=60)
+
+
+def test_cache_round_trip_and_none_values(cache):
+    assert cache.get("stations", "s-1") is MISSING
+
+    cache.set("stations", "s-1", {"id": "s-1"})
+    cache.set("stations", "s-2", None)
+
+    assert cache.get("stations", "s-1") == {"id": "s-1"}
+    assert cache.get("stations", "s-2") is None
+    assert cache.stats()["stations"] == {"hits": 2, "misses": 1, "errors": 0}
+
+
+def test_cache_outcomes_are_exported_per_namespace(cache):
+    cache.get("stations", "s-1")
+    cache.set("stations", "s-1", "station")
+    cache.get("stations", "s-1")
+    cache.get("vessels", "v-1")
+
+    body = registry.render()
+
+    assert 'aquacharge_cache_hits_total{namespace="stations"} 1' in body
+    assert 'aquacharge_cache_misses_total{namespace="stations"} 1' in body
+    assert 'aquacharge_cache_misses_total{namespace="vessels"} 1' in body
+    assert registry.get("aquacharge_cache_errors_total", namespace="stations") is None
+
+
+def test_namespace_invalidation_only_affects_that_namespace(cache):
+    cache.set("stations", "s-1", "station")
+    cache.set("vessels", "v-1", "vessel")
+
+    cache.invalidate_namespace("stations")
+
+    assert cache.get("stations", "s-1") is MISSING
+    assert cache.get("vessels", "v-1") == "vessel"
+
+
+def test_entries_expire_after_ttl(cache):
+    cache.set("stations", "s-1", "station", ttl_seconds=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("stations", "s-1") is MISSING
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    backend = InMemoryBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("b") is MISSING
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+
+def test_backend_failures_are_counted_as_errors_not_raised():
+    cache = Cache(RedisBackend(client=_UnavailableRedis()), default_ttl_seconds=60)
+
+    cache.set("stations", "s-1", "station")
+    assert cache.get("stations", "s-1") is MISSING
+    assert cache.get_or_set("stations", "s-1", lambda: "loaded") == "loaded"
+    assert cache.stats()["stations"]["errors"] == 4
+    assert registry.get("aquacharge_cache_errors_total", namespace="stations").value == 4
+
+
+def test_cached_decorator_shares_entries_across_instances():
+    shared = Cache(RedisBackend(client=_RedisStandIn()), default_ttl_seconds=60)
+    reset_cache(shared)
+    calls = []
+
+    class _Repository:
+        @cached("stations")
+        def get_station(self, station_id):
+            calls.append(station_id)
+            return {"id": station_id}
+
+    assert _Repository().get_station("s-1") == {"id": "s-1"}
+    assert _Repository().get_station("s-1") == {"id": "s-1"}
+    assert calls == ["s-1"]
+
+    invalidate_namespace("stations")
+    _Repository().get_station("s-1")
+    assert calls == ["s-1", "s-1"]
@@ -0,0 +1,96 @@
+import logging
+
+import pytest
+from boto3.dynamodb.conditions import Key
+from flask import Flask, g, request
+
+import config
+from db.callLedger import DynamoCall, DynamoCallLedger, current_ledger
+from db.dynamoClient import DynamoClient
+from monitoring import record_request_end, record_request_start
+
+
+@pytest.fixture
+def chargers():
+    return DynamoClient(table_name=config.CHARGERS_TABLE, region_name=config.AWS_REGION)
+
+
+def test_summary_splits_read_and_write_capacity():
+    ledger = DynamoCallLedger()
+    ledger.record(DynamoCall("Scan", "chargers", None, 12.0, 40, 5.5))
+    ledger.record(DynamoCall("GetItem", "vessels", None, 2.0, 1, 0.5))
+    ledger.record(DynamoCall("GetItem", "vessels", None, 3.0, 1, 0.5))
+    ledger.record(DynamoCall("PutItem", "contracts", None, 4.0, 1, 1.0))
+    ledger.record(DynamoCall("Query", "contracts", "status-index", 1.0, 2, 0.5))
+
+    summary = ledger.summary()
+
+    assert summary["dynamo_calls"] == 5
+    assert summary["dynamo_rcu"] == 7.0
+    assert summary["dynamo_wcu"] == 1.0
+    assert summary["dynamo_ms"] == 22.0
+    assert summary["dynamo_items"] == 45
+    assert summary["dynamo_scans"] == 1
+    assert summary["dynamo_operations"] == {
+        "vessels.GetItem": 2,
+        "chargers.Scan": 1,
+        "contracts.PutItem": 1,
+        "contracts/status-index.Query": 1,
+    }
+
+
+def test_calls_in_a_request_are_recorded_with_capacity(chargers):
+    app = Flask(__name__)
+    with app.test_request_context("/"):
+        record_request_start(g)
+        chargers.put_item({"id": "charger-ledger", "chargingStationId": "station-001"})
+        chargers.get_item({"id": "charger-ledger"})
+        chargers.scan_items()
+        chargers.query_gsi(
+            index_name="chargingStationId-index",
+            key_condition_expression=Key("chargingStationId").eq("station-001"),
+        )
+
+        calls = current_ledger().calls
+
+    assert [call.operation for call in calls] == ["PutItem", "GetItem", "Scan", "Query"]
+    assert all(call.table == config.CHARGERS_TABLE for call in calls)
+    assert calls[3].index == "chargingStationId-index"
+    assert calls[1].item_count == 1
+    assert calls[2].item_count == 2
+    assert all(call.capacity_units > 0 for call in calls)
+    assert all(call.latency_ms >= 0 for call in calls)
+
+
+def test_calls_outside_a_request_are_not_attributed(chargers):
+    assert current_ledger() is None
+    assert chargers.get_item({"id": "charger-seed-001"})
+
+
+def test_request_log_line_carries_dynamo_totals(chargers, caplog):
+    app = Flask(__name__)
+
+    @app.get("/api/fan-out")
+    def fan_out():
+        for _ in range(3):
+            chargers.get_item({"id": "charger-seed-001"})
+        return {"ok": True}
+
+    @app.before_request
+    def _before():
+        record_request_start(g)
+
+    @app.after_request
+    def _after(response):
+        record_request_end(g, response, request.endpoint, request.method)
+        return response
+
+    with caplog.at_level(logging.INFO, logger="aquacharge"):
+        app.test_client().get("/api/fan-out")
+
+    (record,) = [r for r in caplog.records if "DynamoDB calls" in r.getMessage()]
+    assert "3 DynamoDB calls" in record.getMessage()
+    assert record.dynamo_calls == 3
+    assert record.dynamo_rcu == 1.5
+    assert record.dynamo_wcu == 0
+    assert record.dynamo_operations == {f"{config.CHARGERS_TABLE}.GetItem": 3}
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from services.bookings.assignment import AssignmentRequest, plan_charger_assignments
+
+START = datetime(2026, 3, 10, 8, 0, tzinfo=timezone.utc)
+END = START + timedelta(hours=4)
+
+
+def _charger(charger_id, charger_type="DC"):
+    return {"id": charger_id, "chargerType": charger_type}
+
+
+def _request(contract_id, charger_type="", start=START, end=END):
+    return AssignmentRequest(
+        contract_id=contract_id,
+        vessel_id=f"vessel-{contract_id}",
+        start_time=start,
+        end_time=end,
+        charger_type=charger_type,
+    )
+
+
+def test_matching_avoids_greedy_stranding():
+    # First-fit would hand charger-dc to the flexible request and strand the DC one.
+    chargers = [_charger("charger-dc", "DC"), _charger("charger-ac", "AC")]
+    requests = [_request("flexible"), _request("dc-only", charger_type="DC")]
+
+    assignments = plan_charger_assignments(requests, chargers, busy_windows={})
+
+    assert assignments == {"flexible": "charger-ac", "dc-only": "charger-dc"}
+
+
+def test_existing_bookings_block_overlapping_windows():
+    chargers = [_charger("charger-1"), _charger("charger-2")]
+    busy = {"charger-1": [(START - timedelta(hours=1), START + timedelta(hours=1))]}
+
+    assignments = plan_charger_assignments(
+        [_request("a"), _request("b")], chargers, busy_windows=busy
+    )
+
+    assert len(assignments) == 1
+    assert list(assignments.values()) == ["charger-2"]
+    assert busy == {
+        "charger-1": [(START - timedelta(hours=1), START + timedelta(hours=1))]
+    }
+
+
+def test_sequential_windows_reuse_a_charger():
+    later_start = END
+    later_end = END + timedelta(hours=2)
+
+    assignments = plan_charger_assignments(
+        [_request("early"), _request("late", start=later_start, end=later_end)],
+        [_charger("charger-1")],
+        busy_windows={},
+    )
+
+    assert assignments == {"early": "charger-1", "late": "charger-1"}
+
+
+def test_large_fleet_is_fully_assigned():
+    # Each vessel fits exactly one charger type, listed in an order that
+    # defeats first-fit, with hundreds of vessels and chargers.
+    size = 400
+    chargers = [_charger(f"charger-{index}", f"type-{index}") for index in range(size)]
+    requests = [_request("flexible-0")] + [
+        _request(f"contract-{index}", charger_type=f"type-{index}")
+        for index in range(size - 1)
+    ]
+
+    started_at = perf_counter()
+    assignments = plan_charger_assignments(requests, chargers, busy_windows={})
+    elapsed = perf_counter() - started_at
+
+    assert len(assignments) == size
+    assert len(set(assignments.values())) == size
+    assert elapsed < 5.0
@@ -6,6 +6,7 @@ from services.contracts.service import (
     ContractService,
     ContractServiceError,
 )
+from services.vo_dashboard import vo_dashboard_cache
 
 
 class InMemoryContractRepository(ContractRepository):
@@ -15,6 +16,15 @@ class InMemoryContractRepository(ContractRepository):
     def list_contracts(self):
         return self.contracts
 
+    def list_contracts_by_event(self, dr_event_id):
+        return [c for c in self.contracts if c.get("drEventId") == dr_event_id]
+
+    def list_contracts_by_status(self, status):
+        return [c for c in self.contracts if c.get("status") == status]
+
+    def list_contracts_by_vessel(self, vessel_id):
+        return [c for c in self.contracts if c.get("vesselId") == vessel_id]
+
     def get_contract(self, contract_id):
         for contract in self.contracts:
             if contract.get("id") == contract_id:
@@ -24,6 +34,12 @@ class InMemoryContractRepository(ContractRepository):
     def create_contract(self, contract_data):
         self.contracts.append(contract_data)
 
+    def create_contracts(self, contracts_data):
+        taken = {contract.get("id") for contract in self.contracts}
+        written = [data for data in contracts_data if data["id"] not in taken]
+        self.contracts.extend(written)
+        return [data["id"] for data in written]
+
     def update_contract(self, contract_id, update_data):
         contract = self.get_contract(contract_id)
         contract.update(update_data)
@@ -148,3 +164,29 @@ def test_complete_contract_allows_active_status():
     result = service.complete_contract("contract-1")
 
     assert result["status"] == ContractStatus.COMPLETED.value
+
+
+def test_contract_writes_invalidate_the_owner_vo_dashboard():
+    vo_dashboard_cache.put_snapshot(
+        "user-1", {"metrics": {}}, ["vessel-1"], 0, {"vessel-1": 0}
+    )
+    service = ContractService(repository=InMemoryContractRepository())
+
+    service.create_contract(_contract_payload())
+
+    assert vo_dashboard_cache.get_snapshot("user-1") is None
+
+
+def test_dynamo_repository_never_overwrites_existing_contracts():
+    from services.contracts import service as contract_service_module
+
+    repository = contract_service_module.DynamoContractRepository()
+    repository.create_contract({"id": "c-1", "status": "active"})
+
+    written = repository.create_contracts(
+        [{"id": "c-1", "status": "pending"}, {"id": "c-2", "status": "pending"}]
+    )
+
+    assert written == ["c-2"]
+    assert repository.get_contract("c-1")["status"] == "active"
+    assert repository.get_contract("c-2")["status"] == "pending"
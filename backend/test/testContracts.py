@@ -105,12 +105,27 @@ class InMemoryContractRepo:
     def list_contracts(self):
         return list(self._store.values())
 
+    def list_contracts_by_event(self, dr_event_id):
+        return [c for c in self._store.values() if c.get("drEventId") == dr_event_id]
+
+    def list_contracts_by_status(self, status):
+        return [c for c in self._store.values() if c.get("status") == status]
+
+    def list_contracts_by_vessel(self, vessel_id):
+        return [c for c in self._store.values() if c.get("vesselId") == vessel_id]
+
     def get_contract(self, contract_id):
         return self._store.get(contract_id)
 
     def create_contract(self, contract_data):
         self._store[contract_data["id"]] = contract_data
 
+    def create_contracts(self, contracts_data):
+        written = [data for data in contracts_data if data["id"] not in self._store]
+        for contract_data in written:
+            self.create_contract(contract_data)
+        return [data["id"] for data in written]
+
     def update_contract(self, contract_id, update_data):
         self._store[contract_id].update(update_data)
         return self._store[contract_id]
@@ -489,7 +504,10 @@ class TestAcceptEndpoint:
         monkeypatch.setattr(
             contracts_api,
             "_get_current_eligibility",
-            lambda contract: {"eligible": False, "reasons": ["Vessel moved out of range"]},
+            lambda contract, **_: {
+                "eligible": False,
+                "reasons": ["Vessel moved out of range"],
+            },
         )
 
         rv = client.get(
@@ -525,7 +543,10 @@ class TestAcceptEndpoint:
         monkeypatch.setattr(
             contracts_api,
             "_get_current_eligibility",
-            lambda contract: {"eligible": False, "reasons": ["Vessel moved out of range"]},
+            lambda contract, **_: {
+                "eligible": False,
+                "reasons": ["Vessel moved out of range"],
+            },
         )
 
         rv = client.get(
@@ -650,12 +671,8 @@ class TestAcceptEndpoint:
         drevents_api._running_dispatch_event_ids.clear()
         drevents_api._dispatch_stop_signals.clear()
 
-        class _FakeDynamoClient:
-            def __init__(self, table_name, region_name):
-                self.table_name = table_name
-                self.region_name = region_name
-
-            def scan_items(self):
+        class _FakeContractRepository:
+            def list_contracts_by_event(self, dr_event_id):
                 return [
                     {
                         **_make_contract(status="active", vessel_id="vessel-abc"),
@@ -684,7 +701,9 @@ class TestAcceptEndpoint:
             "update_event",
             lambda event_id, update_data: {"id": event_id, **update_data},
         )
-        monkeypatch.setattr(drevents_api, "DynamoClient", _FakeDynamoClient)
+        monkeypatch.setattr(
+            drevents_api.contract_service, "repository", _FakeContractRepository()
+        )
         monkeypatch.setattr(
             drevents_api,
             "_start_dispatch_loop_async",
@@ -716,12 +735,8 @@ class TestAcceptEndpoint:
         drevents_api._running_dispatch_event_ids.clear()
         drevents_api._dispatch_stop_signals.clear()
 
-        class _FakeDynamoClient:
-            def __init__(self, table_name, region_name):
-                self.table_name = table_name
-                self.region_name = region_name
-
-            def scan_items(self):
+        class _FakeContractRepository:
+            def list_contracts_by_event(self, dr_event_id):
                 return [
                     {**_make_contract(status="pending", vessel_id="vessel-abc")},
                     {
@@ -736,7 +751,9 @@ class TestAcceptEndpoint:
             "get_event",
             lambda event_id: {"id": event_id, "status": "Committed"},
         )
-        monkeypatch.setattr(drevents_api, "DynamoClient", _FakeDynamoClient)
+        monkeypatch.setattr(
+            drevents_api.contract_service, "repository", _FakeContractRepository()
+        )
 
         rv = client.post(
             "/api/drevents/dr-001/start",
@@ -752,12 +769,8 @@ class TestAcceptEndpoint:
         drevents_api._running_dispatch_event_ids.clear()
         drevents_api._dispatch_stop_signals.clear()
 
-        class _FakeDynamoClient:
-            def __init__(self, table_name, region_name):
-                self.table_name = table_name
-                self.region_name = region_name
-
-            def scan_items(self):
+        class _FakeContractRepository:
+            def list_contracts_by_event(self, dr_event_id):
                 return [
                     {
                         **_make_contract(status="active", vessel_id="vessel-abc"),
@@ -776,7 +789,9 @@ class TestAcceptEndpoint:
             "update_event",
             lambda event_id, update_data: {"id": event_id, **update_data},
         )
-        monkeypatch.setattr(drevents_api, "DynamoClient", _FakeDynamoClient)
+        monkeypatch.setattr(
+            drevents_api.contract_service, "repository", _FakeContractRepository()
+        )
         monkeypatch.setattr(
             drevents_api,
             "_start_dispatch_loop_async",
@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 
 import pytest
 
 from models.drevent import DREvent, parse_event_status
-from services.drevents.service import DREventService, DREventServiceError
+from services.drevents.service import (
+    DREventService,
+    DREventServiceError,
+    serialize_event,
+)
 
 
 class InMemoryEventRepository:
@@ -24,6 +29,13 @@ class InMemoryEventRepository:
         self.events[event_id].update(update_data)
         return dict(self.events[event_id])
 
+    def store_rollup(self, event_id, rollup, generation):
+        event = self.events.get(event_id)
+        if event is None or event.get("analyticsGeneration") != generation:
+            return False
+        event["analyticsRollup"] = rollup
+        return True
+
 
 class InMemoryMeasurementRepository:
     def __init__(self, measurements=None):
@@ -32,6 +44,9 @@ class InMemoryMeasurementRepository:
     def list_measurements(self):
         return list(self.measurements)
 
+    def list_measurements_by_event(self, dr_event_id):
+        return [m for m in self.measurements if m.get("drEventId") == dr_event_id]
+
 
 class InMemoryStationRepository:
     def __init__(self, stations=None):
@@ -49,6 +64,9 @@ class InMemoryContractRepository:
     def list_contracts(self):
         return list(self.contracts)
 
+    def list_contracts_by_event(self, dr_event_id):
+        return [c for c in self.contracts if c.get("drEventId") == dr_event_id]
+
 
 def make_event(status="Created", event_id="event-1", station_id="station-1"):
     now = datetime.now(timezone.utc)
@@ -214,6 +232,24 @@ def test_from_dict_accepts_legacy_uppercase_status():
     assert event.to_public_dict()["status"] == "Active"
 
 
+def test_serialize_event_keeps_model_scalar_types_without_a_decimal_pass():
+    stored = {
+        **make_event(),
+        "pricePerKwh": Decimal("0.3"),
+        "targetEnergyKwh": Decimal("120"),
+        "maxParticipants": Decimal("4"),
+        "details": {"minimumSoc": Decimal("25")},
+    }
+
+    event = serialize_event(stored)
+
+    assert event["pricePerKwh"] == 0.3
+    assert event["targetEnergyKwh"] == 120.0
+    assert event["maxParticipants"] == 4 and isinstance(event["maxParticipants"], int)
+    # Nested values are left to the JSON provider.
+    assert event["details"] == {"minimumSoc": Decimal("25")}
+
+
 def test_parse_event_status_rejects_unknown_status():
     with pytest.raises(ValueError) as error:
         parse_event_status("NOT_A_REAL_STATUS")
@@ -423,3 +459,85 @@ def test_analytics_snapshot_financials_zero_when_no_completed_contracts():
     assert financials["timeSeries"] == []
     assert financials["eventBreakdown"][0]["actualPayoutUsd"] == 0.0
     assert financials["eventBreakdown"][0]["deliveryRatePct"] == 0.0
+
+
+def _completed_event_measurements(now):
+    return [
+        {
+            "id": f"m{index}",
+            "drEventId": "event-1",
+            "contractId": "contract-1",
+            "vesselId": "vessel-1",
+            "timestamp": (now - timedelta(hours=hours_ago)).isoformat(),
+            "energyKwh": 10,
+            "powerKw": 5,
+            "currentSOC": 60,
+        }
+        for index, hours_ago in enumerate([30, 20, 3])
+    ]
+
+
+def test_analytics_rollup_is_materialized_for_closed_events_and_reused():
+    now = datetime.now(timezone.utc)
+    service = create_service(
+        events=[make_event(status="Completed")],
+        measurements=_completed_event_measurements(now),
+        contracts=[
+            {"id": "contract-1", "drEventId": "event-1", "status": "completed", "totalValue": 12.5}
+        ],
+    )
+
+    assert service.materialize_analytics() == 1
+    assert service.materialize_analytics() == 0
+    assert "analyticsRollup" in service.event_repository.events["event-1"]
+
+    service.measurement_repository.measurements = []
+    service.contract_repository.contracts = []
+    snapshot = service.get_analytics_snapshot(period_hours=48)
+
+    assert snapshot["summary"]["totalEnergyDischargedKwh"] == 30.0
+    assert snapshot["summary"]["contractsConsidered"] == 1
+    assert snapshot["financials"]["totalPayoutUsd"] == 12.5
+
+
+def test_analytics_period_starting_inside_a_rollup_only_counts_its_tail():
+    now = datetime.now(timezone.utc)
+    service = create_service(
+        events=[make_event(status="Completed")],
+        measurements=_completed_event_measurements(now),
+        contracts=[],
+    )
+    service.materialize_analytics()
+    service.measurement_repository.measurements = []
+
+    snapshot = service.get_analytics_snapshot(period_hours=24, grain="hour")
+
+    assert snapshot["summary"]["totalEnergyDischargedKwh"] == 20.0
+    assert len(snapshot["timeSeries"]) == 2
+    assert snapshot["vesselLeaderboard"][0]["totalEnergyDischargedKwh"] == 20.0
+
+
+def test_analytics_open_events_are_not_materialized():
+    service = create_service(events=[make_event(status="Active")])
+
+    assert service.materialize_analytics() == 0
+    service.get_analytics_snapshot(period_hours=24)
+
+    assert "analyticsRollup" not in service.event_repository.events["event-1"]
+
+
+def test_analytics_rollup_is_not_stored_right_after_an_invalidation():
+    now = datetime.now(timezone.utc)
+    event = {
+        **make_event(status="Completed"),
+        "analyticsGeneration": "generation-1",
+        "analyticsInvalidatedAt": now.isoformat(),
+    }
+    service = create_service(
+        events=[event], measurements=_completed_event_measurements(now)
+    )
+
+    snapshot = service.get_analytics_snapshot(period_hours=48)
+
+    assert snapshot["summary"]["totalEnergyDischargedKwh"] == 30.0
+    assert "analyticsRollup" not in service.event_repository.events["event-1"]
@@ -25,12 +25,27 @@ class InMemoryContractRepo:
     def list_contracts(self):
         return list(self._store.values())
 
+    def list_contracts_by_event(self, dr_event_id):
+        return [c for c in self._store.values() if c.get("drEventId") == dr_event_id]
+
+    def list_contracts_by_status(self, status):
+        return [c for c in self._store.values() if c.get("status") == status]
+
+    def list_contracts_by_vessel(self, vessel_id):
+        return [c for c in self._store.values() if c.get("vesselId") == vessel_id]
+
     def get_contract(self, contract_id):
         return self._store.get(contract_id)
 
     def create_contract(self, data):
         self._store[data["id"]] = dict(data)
 
+    def create_contracts(self, contracts_data):
+        written = [data for data in contracts_data if data["id"] not in self._store]
+        for data in written:
+            self.create_contract(data)
+        return [data["id"] for data in written]
+
     def update_contract(self, contract_id, update_data):
         self._store[contract_id].update(update_data)
         return self._store[contract_id]
@@ -256,6 +271,42 @@ class TestDispatchEvent:
         assert len(contracts) == 1
         assert contracts[0]["vesselId"] == "v1"
 
+    def test_dispatch_hands_every_offer_to_one_create_contracts_call(self):
+        repo = InMemoryContractRepo()
+        batches = []
+        repo.create_contract = lambda data: pytest.fail("expected create_contracts")
+        repo.create_contracts = lambda contracts_data: (
+            batches.append(contracts_data) or [data["id"] for data in contracts_data]
+        )
+        service = _make_service()
+        service.repository = repo
+        eligible = [{"vesselId": f"v{i}", "displayName": f"Ferry {i}"} for i in range(30)]
+
+        contracts = service.dispatch_event(DR_EVENT, eligible, caller_user_id="pso-001")
+
+        assert len(contracts) == 30
+        assert len(batches) == 1
+        assert len(batches[0]) == 30
+
+    def test_retried_dispatch_never_resets_existing_offers(self):
+        repo = InMemoryContractRepo()
+        service = _make_service()
+        service.repository = repo
+        eligible = [
+            {"vesselId": "v1", "displayName": "Ferry A"},
+            {"vesselId": "v2", "displayName": "Ferry B"},
+        ]
+
+        first = service.dispatch_event(DR_EVENT, eligible, caller_user_id="pso-001")
+        repo.update_contract(first[0]["id"], {"status": "active"})
+        # Simulate a retry whose duplicate check read a lagging index.
+        repo.list_contracts_by_event = lambda dr_event_id: []
+        second = service.dispatch_event(DR_EVENT, eligible, caller_user_id="pso-001")
+
+        assert second == []
+        assert len(repo.list_contracts()) == 2
+        assert repo.get_contract(first[0]["id"])["status"] == "active"
+
     def test_created_by_is_set_to_caller(self):
         service = _make_service()
         eligible = [{"vesselId": "v1", "displayName": "Ferry A"}]
@@ -32,3 +32,25 @@ def test_dispatch_loop_stops_without_writing_measurements_when_stop_requested(
         dynamo_client=None,
         stop_signal=stop_signal,
     )
+
+
+class _EventsClient:
+    def __init__(self, status):
+        self.status = status
+
+    def get_item(self, key):
+        return {"id": key["id"], "status": self.status}
+
+
+def test_event_still_active_follows_the_stored_status():
+    assert dispatcher._event_still_active(_EventsClient("Active"), "dr-001")
+    assert not dispatcher._event_still_active(_EventsClient("Completed"), "dr-001")
+
+
+def test_event_still_active_assumes_active_when_status_is_unreadable():
+    class _FailingClient:
+        def get_item(self, key):
+            raise RuntimeError("throttled")
+
+    assert dispatcher._event_still_active(None, "dr-001")
+    assert dispatcher._event_still_active(_FailingClient(), "dr-001")
@@ -249,6 +249,39 @@ def test_batch_write_large_batch(dynamo_client):
     )
 
 
+def test_put_items_if_absent_skips_taken_keys_across_transactions(dynamo_client):
+    """Conditional puts span several 100-item transactions and never overwrite"""
+    dynamo_client.put_item({"id": "absent-taken", "displayName": "Original"})
+    items = [{"id": "absent-taken", "displayName": "Overwrite"}] + [
+        {"id": f"absent-{i}", "displayName": f"New {i}"} for i in range(150)
+    ]
+
+    written = dynamo_client.put_items_if_absent(items)
+
+    assert written == [f"absent-{i}" for i in range(150)]
+    assert dynamo_client.get_item(key={"id": "absent-taken"})["displayName"] == "Original"
+    assert dynamo_client.get_item(key={"id": "absent-149"})["displayName"] == "New 149"
+
+
+def test_scan_items_reads_every_page(dynamo_client, monkeypatch):
+    """Scans follow LastEvaluatedKey instead of stopping at the first page"""
+    dynamo_client.batch_write_items(
+        [{"id": f"scan-page-{i}", "email": f"page{i}@example.com"} for i in range(5)]
+    )
+    scan = dynamo_client.table.scan
+    pages = []
+
+    def two_per_page(**kwargs):
+        pages.append(kwargs.get("ExclusiveStartKey"))
+        return scan(Limit=2, **kwargs)
+
+    monkeypatch.setattr(dynamo_client.table, "scan", two_per_page)
+    items = dynamo_client.scan_items(projection=["id"])
+
+    assert {f"scan-page-{i}" for i in range(5)} <= {item["id"] for item in items}
+    assert len(pages) >= 3
+
+
 # --- Error Handling Tests --- #
 def test_get_nonexistent_item(dynamo_client):
     """Test getting an item that doesn't exist"""
@@ -277,3 +310,26 @@ def test_batch_delete_empty_list(dynamo_client):
     result = dynamo_client.batch_delete_items([])
     assert result["success_count"] == 0
     assert result["unprocessed_keys"] == []
+
+
+def test_contract_repository_queries_event_and_booking_indexes():
+    """Contract lookups by drEventId and bookingId go through their GSIs"""
+    from services.bookings.service import DynamoContractRepository
+
+    contracts_client = DynamoClient(
+        table_name=config.CONTRACTS_TABLE, region_name=config.AWS_REGION
+    )
+    contracts_client.batch_write_items(
+        [
+            {"id": "c-1", "drEventId": "event-1", "bookingId": "booking-1"},
+            {"id": "c-2", "drEventId": "event-1", "vesselId": "vessel-2"},
+            {"id": "c-3", "drEventId": "event-2", "bookingId": "booking-3"},
+        ]
+    )
+    repository = DynamoContractRepository(client=contracts_client)
+
+    event_contracts = repository.list_contracts_by_event("event-1")
+
+    assert sorted(contract["id"] for contract in event_contracts) == ["c-1", "c-2"]
+    assert repository.get_contract_by_booking_id("booking-3")["id"] == "c-3"
+    assert repository.get_contract_by_booking_id("booking-missing") is None
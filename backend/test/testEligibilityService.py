@@ -1,13 +1,26 @@
+from decimal import Decimal
+
+import pytest
+
+from cache import MISSING, Cache, InMemoryBackend
+from services.eligibility import EligibilityResultCache, invalidate_eligibility_cache
 from services.eligibility.service import EligibilityService
 
 
 class InMemoryVesselRepository:
     def __init__(self, vessels):
         self._vessels = vessels
+        self.list_calls = 0
+        self.get_calls = 0
 
     def list_vessels(self):
+        self.list_calls += 1
         return self._vessels
 
+    def get_vessel(self, vessel_id):
+        self.get_calls += 1
+        return next((v for v in self._vessels if v["id"] == vessel_id), None)
+
 
 class InMemoryStationRepository:
     def __init__(self, stations):
@@ -30,6 +43,7 @@ def _build_service(vessels, stations, soc_by_vessel_id):
         vessel_repository=InMemoryVesselRepository(vessels),
         station_repository=InMemoryStationRepository(stations),
         measurement_repository=InMemoryMeasurementRepository(soc_by_vessel_id),
+        result_cache=EligibilityResultCache(ttl_seconds=60),
     )
 
 
@@ -290,3 +304,114 @@ def test_eligibility_derives_soc_from_capacity_when_telemetry_is_missing():
 
     assert vessel_result["eligible"] is True
     assert vessel_result["currentSoc"] == 97.0
+
+
+def _cacheable_fleet():
+    vessels = [
+        {
+            "id": "v-1",
+            "active": True,
+            "latitude": 44.65,
+            "longitude": -63.57,
+            "rangeMeters": 5000,
+        },
+        {
+            "id": "v-2",
+            "active": False,
+            "latitude": 44.65,
+            "longitude": -63.57,
+            "rangeMeters": 5000,
+        },
+    ]
+    stations = {
+        "station-1": {"id": "station-1", "latitude": 44.651, "longitude": -63.58}
+    }
+    return vessels, stations
+
+
+def test_get_vessel_eligibility_reuses_cached_results():
+    vessels, stations = _cacheable_fleet()
+    service = _build_service(vessels, stations, {"v-1": 80.0, "v-2": 80.0})
+    dr_event = {"id": "event-1", "stationId": "station-1"}
+
+    first = service.get_vessel_eligibility(dr_event, "v-1")
+    second = service.get_vessel_eligibility(dr_event, "v-2")
+    missing = service.get_vessel_eligibility(dr_event, "v-unknown")
+    service.get_vessel_eligibility(dr_event, "v-1")
+    service.get_vessel_eligibility(dr_event, "v-unknown")
+
+    assert first["eligible"] is True
+    assert second["eligible"] is False
+    assert missing is None
+    assert service.vessel_repository.get_calls == 3
+    assert service.vessel_repository.list_calls == 0
+
+
+def test_invalidate_eligibility_cache_forces_re_evaluation():
+    vessels, stations = _cacheable_fleet()
+    service = _build_service(vessels, stations, {"v-1": 80.0, "v-2": 80.0})
+    dr_event = {"id": "event-1", "stationId": "station-1"}
+
+    assert service.get_vessel_eligibility(dr_event, "v-2")["eligible"] is False
+
+    vessels[1]["active"] = True
+    invalidate_eligibility_cache()
+
+    assert service.get_vessel_eligibility(dr_event, "v-2")["eligible"] is True
+    assert service.vessel_repository.get_calls == 2
+
+
+def test_cached_results_are_shared_by_workers_using_one_backend():
+    backend = InMemoryBackend()
+    worker_a = EligibilityResultCache(ttl_seconds=60, cache=Cache(backend))
+    worker_b = EligibilityResultCache(ttl_seconds=60, cache=Cache(backend))
+
+    worker_a.set("event-1", "v-1", {"eligible": True})
+    worker_a.set("event-1", "v-unknown", None)
+
+    assert worker_b.get("event-1", "v-1") == {"eligible": True}
+    assert worker_b.get("event-1", "v-unknown") is None
+
+    worker_b.clear()
+
+    assert worker_a.get("event-1", "v-1") is MISSING
+
+
+def test_evaluate_vessel_for_event_matches_fleet_evaluation():
+    vessels, stations = _cacheable_fleet()
+    service = _build_service(vessels, stations, {"v-1": 80.0, "v-2": 80.0})
+    dr_event = {"id": "event-1", "stationId": "station-1"}
+
+    fleet_results = {
+        result["vesselId"]: result
+        for result in service.evaluate_vessels_for_event(
+            dr_event, include_ineligible=True
+        )["vessels"]
+    }
+
+    for vessel_id in ("v-1", "v-2"):
+        assert service.evaluate_vessel_for_event(vessel_id, dr_event) == (
+            fleet_results[vessel_id]
+        )
+
+
+def test_evaluate_vessel_for_event_raises_for_unknown_vessel():
+    vessels, stations = _cacheable_fleet()
+    service = _build_service(vessels, stations, {})
+
+    with pytest.raises(LookupError):
+        service.evaluate_vessel_for_event(
+            "v-missing", {"id": "event-1", "stationId": "station-1"}
+        )
+
+
+def test_latest_soc_projection_on_vessel_takes_precedence():
+    vessels, stations = _cacheable_fleet()
+    vessels[0]["latestSoc"] = Decimal("55.5")
+    service = _build_service(vessels, stations, {"v-1": 80.0})
+
+    result = service.evaluate_vessel_for_event(
+        "v-1", {"id": "event-1", "stationId": "station-1"}
+    )
+
+    assert result["currentSoc"] == 55.5
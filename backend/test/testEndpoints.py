@@ -359,23 +359,10 @@ def test_get_vessels_prefers_latest_measured_soc(client, monkeypatch):
         "chargerType": "CCS",
         "capacity": decimal.Decimal("96.0"),
         "maxCapacity": decimal.Decimal("120.0"),
+        "latestSoc": decimal.Decimal("44.0"),
+        "latestSocAt": "2026-03-28T12:00:00+00:00",
     }
 
-    measurements = [
-        {
-            "id": "measurement-old",
-            "vesselId": "vessel-telemetry-001",
-            "currentSOC": decimal.Decimal("80.0"),
-            "timestamp": "2026-03-27T12:00:00+00:00",
-        },
-        {
-            "id": "measurement-new",
-            "vesselId": "vessel-telemetry-001",
-            "currentSOC": decimal.Decimal("44.0"),
-            "timestamp": "2026-03-28T12:00:00+00:00",
-        },
-    ]
-
     class _FakeVesselsClient:
         def query_gsi(self, index_name, key_condition_expression):
             return [dict(vessel)]
@@ -388,12 +375,7 @@ def test_get_vessels_prefers_latest_measured_soc(client, monkeypatch):
                 return dict(vessel)
             return {}
 
-    class _FakeMeasurementsClient:
-        def scan_items(self):
-            return [dict(item) for item in measurements]
-
     monkeypatch.setattr(vessels_api, "dynamoDB_client", _FakeVesselsClient())
-    monkeypatch.setattr(vessels_api, "_measurements_client", _FakeMeasurementsClient())
 
     rv = client.get("/api/vessels?userId=user-telemetry-001")
 
@@ -0,0 +1,179 @@
+import gzip
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from flask import Blueprint, Flask, jsonify
+
+import config
+import http_cache
+from api.stations import stations_bp
+from cache import (
+    Cache,
+    InMemoryBackend,
+    bump_table_version,
+    reset_cache,
+    table_versions,
+)
+from db.dynamoClient import DynamoClient
+
+
+@pytest.fixture
+def probe():
+    calls = []
+    bp = Blueprint("etag_probe", __name__)
+
+    @bp.route("/probe")
+    @http_cache.conditional_get(config.CHARGERS_TABLE, time_bucket_seconds=60)
+    def probe_view():
+        calls.append(1)
+        return jsonify({"rows": ["x" * 40] * 50})
+
+    @bp.route("/missing")
+    @http_cache.conditional_get(config.CHARGERS_TABLE)
+    def missing_view():
+        return jsonify({"error": "not found"}), 404
+
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    http_cache.install_response_compression(app)
+    return app.test_client(), calls
+
+
+def test_matching_etag_skips_the_view(probe):
+    client, calls = probe
+
+    first = client.get("/probe")
+    etag = first.headers["ETag"]
+    second = client.get("/probe", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.data == b""
+    assert len(calls) == 1
+
+
+def test_table_write_changes_the_etag(probe):
+    client, calls = probe
+    etag = client.get("/probe").headers["ETag"]
+
+    bump_table_version(config.CHARGERS_TABLE)
+    response = client.get("/probe", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(calls) == 2
+
+
+def test_time_bucket_changes_the_etag(probe, monkeypatch):
+    client, _ = probe
+    monkeypatch.setattr(http_cache.time, "time", lambda: 600.0)
+    etag = client.get("/probe").headers["ETag"]
+
+    monkeypatch.setattr(http_cache.time, "time", lambda: 660.0)
+
+    assert client.get("/probe", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_error_responses_carry_no_etag(probe):
+    client, _ = probe
+
+    response = client.get("/missing")
+
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+def test_no_etag_while_workers_keep_separate_table_versions(probe, monkeypatch):
+    client, calls = probe
+    monkeypatch.setattr(config, "SERVER_PROCESSES", 3)
+
+    first = client.get("/probe")
+    second = client.get("/probe", headers={"If-None-Match": "*"})
+
+    assert "ETag" not in first.headers
+    assert second.status_code == 200
+    assert len(calls) == 2
+
+
+def test_shared_table_versions_keep_etags_across_workers(probe, monkeypatch):
+    client, calls = probe
+    monkeypatch.setattr(config, "SERVER_PROCESSES", 3)
+    backend = InMemoryBackend()
+    backend.shared = True  # stands in for the Redis backend
+    reset_cache(Cache(backend))
+
+    etag = client.get("/probe").headers["ETag"]
+
+    assert client.get("/probe", headers={"If-None-Match": etag}).status_code == 304
+    assert len(calls) == 1
+
+
+def test_large_json_is_gzipped_with_its_own_etag(probe):
+    client, calls = probe
+
+    response = client.get("/probe", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+    revalidated = client.get(
+        "/probe", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert etag.endswith(http_cache.GZIP_ETAG_SUFFIX + '"')
+    assert gzip.decompress(response.data).startswith(b'{"rows"')
+    assert revalidated.status_code == 304
+    assert len(calls) == 1
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(probe, monkeypatch):
+    client, _ = probe
+
+    plain = client.get("/probe")
+    monkeypatch.setattr(config, "COMPRESS_MIN_BYTES", 1 << 20)
+    small = client.get("/probe", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert "Content-Encoding" not in small.headers
+
+
+def test_dynamo_writes_bump_the_table_version():
+    client = DynamoClient(table_name=config.CHARGERS_TABLE, region_name=config.AWS_REGION)
+    before = table_versions([config.CHARGERS_TABLE])
+
+    client.put_item({"id": "charger-etag", "status": "active"})
+    after_put = table_versions([config.CHARGERS_TABLE])
+    client.update_item_conditional(
+        key={"id": "charger-etag"},
+        update_data={"status": "inactive"},
+        condition_expression=Attr("status").eq("retired"),
+    )
+
+    assert after_put[0] == before[0] + 1
+    assert table_versions([config.CHARGERS_TABLE]) == after_put
+
+
+def test_station_list_revalidates_until_a_station_is_created():
+    app = Flask(__name__)
+    app.register_blueprint(stations_bp, url_prefix="/api/stations")
+    client = app.test_client()
+
+    etag = client.get("/api/stations").headers["ETag"]
+    unchanged = client.get("/api/stations", headers={"If-None-Match": etag})
+    client.post(
+        "/api/stations",
+        json={
+            "displayName": "Harbour",
+            "longitude": -123.3,
+            "latitude": 48.4,
+            "city": "Victoria",
+            "provinceOrState": "BC",
+            "country": "Canada",
+        },
+    )
+    changed = client.get("/api/stations", headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert [station["displayName"] for station in changed.get_json()] == ["Harbour"]
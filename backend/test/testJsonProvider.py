@@ -0,0 +1,78 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Blueprint, Flask, jsonify
+
+import json_provider
+from json_provider import AppJSONProvider, install_json_provider, requires_json_provider
+from models.contract import ContractStatus
+
+
+PAYLOAD = {
+    "energyKwh": Decimal("12.5"),
+    "count": Decimal("3"),
+    "createdAt": datetime(2026, 3, 5, 10, 0, tzinfo=timezone.utc),
+    "day": date(2026, 3, 5),
+    "status": ContractStatus.ACTIVE,
+    "nested": [{"price": Decimal("0.15")}],
+}
+
+EXPECTED = {
+    "energyKwh": 12.5,
+    "count": 3.0,
+    "createdAt": "2026-03-05T10:00:00+00:00",
+    "day": "2026-03-05",
+    "status": ContractStatus.ACTIVE.value,
+    "nested": [{"price": 0.15}],
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_provider, "orjson", None)
+    return request.param
+
+
+def test_provider_encodes_model_types(encoder):
+    app = Flask(__name__)
+    install_json_provider(app)
+
+    assert json.loads(app.json.dumps(PAYLOAD)) == EXPECTED
+    assert app.json.loads(app.json.dumps({"a": 1})) == {"a": 1}
+
+
+def test_provider_rejects_unknown_types(encoder):
+    app = Flask(__name__)
+    install_json_provider(app)
+
+    with pytest.raises(TypeError):
+        app.json.dumps({"value": object()})
+
+
+def test_blueprint_installs_provider_on_registration():
+    bp = Blueprint("json_probe", __name__)
+    requires_json_provider(bp)
+
+    @bp.route("/probe")
+    def probe():
+        return jsonify(PAYLOAD)
+
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+
+    assert isinstance(app.json, AppJSONProvider)
+    assert app.test_client().get("/probe").get_json() == EXPECTED
+
+
+def test_install_is_idempotent():
+    app = Flask(__name__)
+    install_json_provider(app)
+    provider = app.json
+    install_json_provider(app)
+
+    assert app.json is provider
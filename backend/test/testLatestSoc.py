@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import config
+from db.dynamoClient import DynamoClient
+from services.telemetry import (
+    latest_soc_from_vessel,
+    latest_soc_projection,
+    record_latest_soc,
+)
+
+
+def _vessels_client():
+    client = DynamoClient(table_name=config.VESSELS_TABLE, region_name=config.AWS_REGION)
+    client.put_item(
+        {
+            "id": "vessel-latest-001",
+            "userId": "user-latest-001",
+            "capacity": Decimal("90"),
+            "maxCapacity": Decimal("100"),
+        }
+    )
+    return client
+
+
+def test_record_latest_soc_keeps_newest_reading():
+    client = _vessels_client()
+
+    assert record_latest_soc(
+        client,
+        "vessel-latest-001",
+        62.5,
+        "2026-03-01T10:05:00+00:00",
+        extra_fields={"capacity": Decimal("62.5")},
+    )
+    assert not record_latest_soc(
+        client,
+        "vessel-latest-001",
+        80.0,
+        "2026-03-01T10:00:00+00:00",
+        extra_fields={"capacity": Decimal("80")},
+    )
+
+    vessel = client.get_item({"id": "vessel-latest-001"})
+    assert latest_soc_from_vessel(vessel) == 62.5
+    assert vessel["latestSocAt"] == "2026-03-01T10:05:00+00:00"
+    assert vessel["capacity"] == Decimal("62.5")
+
+
+def test_record_latest_soc_does_not_create_missing_vessels():
+    client = _vessels_client()
+
+    assert not record_latest_soc(
+        client, "vessel-missing", 50.0, "2026-03-01T10:00:00+00:00"
+    )
+    assert client.get_item({"id": "vessel-missing"}) == {}
+
+
+def test_latest_soc_projection_picks_newest_measurement():
+    projection = latest_soc_projection(
+        [
+            {"currentSOC": 80, "timestamp": "2026-03-01T10:00:00+00:00"},
+            {"currentSOC": 44, "timestamp": "2026-03-01T11:00:00+00:00"},
+            {"currentSOC": None, "timestamp": "2026-03-01T12:00:00+00:00"},
+        ]
+    )
+
+    assert projection == {
+        "latestSoc": Decimal("44"),
+        "latestSocAt": "2026-03-01T11:00:00+00:00",
+    }
+    assert latest_soc_projection([]) == {}
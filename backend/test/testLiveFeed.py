@@ -0,0 +1,281 @@
+import fnmatch
+import json
+import threading
+from datetime import datetime, timedelta
+from queue import Queue
+
+import jwt
+import pytest
+from flask import Flask
+
+import api.drevents as drevents_api
+from api.drevents import drevents_bp
+from config import JWT_ALGORITHM, JWT_SECRET
+from services.dr.live import (
+    END_OF_STREAM,
+    DRLiveFeed,
+    LiveFeedFullError,
+    RedisLiveRelay,
+    dr_live_feed,
+)
+
+
+def _tick(vessel_id="vessel-1", energy=2.0, power=8.0, soc=75.0):
+    return {
+        "vesselId": vessel_id,
+        "contractId": f"contract-{vessel_id}",
+        "energyKwh": energy,
+        "powerKw": power,
+        "currentSOC": soc,
+    }
+
+
+def test_ticks_fan_out_to_every_subscriber():
+    feed = DRLiveFeed(queue_size=10)
+    first = feed.subscribe("dr-1")
+    second = feed.subscribe("dr-1")
+    other = feed.subscribe("dr-2")
+
+    feed.publish_tick("dr-1", "2026-03-05T10:00:00+00:00", [_tick(), _tick("vessel-2")])
+
+    for subscription in (first, second):
+        message = subscription.next_message(timeout=0)
+        assert message["type"] == "tick"
+        assert message["delta"] == {"energyKwh": 4.0, "powerKw": 16.0, "activeVessels": 2}
+        assert message["totals"] == {"energyKwh": 4.0}
+    assert other.next_message(timeout=0) is None
+
+
+def test_late_subscriber_starts_from_snapshot():
+    feed = DRLiveFeed(queue_size=10)
+    feed.publish_tick("dr-1", "2026-03-05T10:00:00+00:00", [_tick(energy=1.0)])
+    feed.publish_tick("dr-1", "2026-03-05T10:01:00+00:00", [_tick(energy=1.5, soc=70.0)])
+
+    snapshot = feed.subscribe("dr-1").next_message(timeout=0)
+
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["tick"] == 2
+    assert snapshot["totals"] == {"energyKwh": 2.5, "powerKw": 8.0}
+    assert snapshot["vessels"][0]["currentSOC"] == 70.0
+
+
+def test_slow_subscriber_drops_oldest_ticks():
+    feed = DRLiveFeed(queue_size=2)
+    subscription = feed.subscribe("dr-1")
+
+    for minute in range(4):
+        feed.publish_tick("dr-1", f"2026-03-05T10:0{minute}:00+00:00", [_tick()])
+
+    ticks = [subscription.next_message(timeout=0)["tick"] for _ in range(2)]
+    assert ticks == [3, 4]
+    assert subscription.dropped == 2
+
+
+def test_close_event_ends_streams_and_forgets_state():
+    feed = DRLiveFeed(queue_size=10)
+    feed.publish_tick("dr-1", "2026-03-05T10:00:00+00:00", [_tick()])
+    subscription = feed.subscribe("dr-1")
+    subscription.next_message(timeout=0)
+
+    feed.close_event("dr-1")
+    subscription.close()
+
+    assert subscription.next_message(timeout=0) is END_OF_STREAM
+    assert feed.subscriber_count("dr-1") == 0
+    assert feed.subscribe("dr-1").next_message(timeout=0) is None
+
+
+class _RedisStandIn:
+    """Just enough of redis-py for the relay: keys and pattern pub/sub."""
+
+    def __init__(self):
+        self.values = {}
+        self.listeners = []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def publish(self, channel, data):
+        for pattern, queue in self.listeners:
+            if fnmatch.fnmatchcase(channel, pattern):
+                queue.put({"type": "pmessage", "channel": channel, "data": data})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _PubSubStandIn(self)
+
+
+class _PubSubStandIn:
+    def __init__(self, server):
+        self.server = server
+        self.queue = Queue()
+
+    def psubscribe(self, pattern):
+        self.server.listeners.append((pattern, self.queue))
+
+    def listen(self):
+        while True:
+            yield self.queue.get()
+
+
+def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_relay_carries_ticks_and_snapshots_between_workers():
+    server = _RedisStandIn()
+    dispatching = DRLiveFeed(queue_size=10, relay=RedisLiveRelay(client=server))
+    other = DRLiveFeed(queue_size=10, relay=RedisLiveRelay(client=server))
+    dispatching.publish_tick("dr-1", "2026-03-05T10:00:00+00:00", [_tick(energy=1.0)])
+
+    subscription = other.subscribe("dr-1")
+    snapshot = subscription.next_message(timeout=1)
+    _wait_for(lambda: server.listeners)
+    dispatching.publish_tick("dr-1", "2026-03-05T10:01:00+00:00", [_tick(energy=1.5)])
+    tick = subscription.next_message(timeout=1)
+    dispatching.close_event("dr-1")
+
+    assert other.shared
+    assert snapshot["type"] == "snapshot" and snapshot["totals"]["energyKwh"] == 1.0
+    assert tick["tick"] == 2 and tick["totals"] == {"energyKwh": 2.5}
+    assert subscription.next_message(timeout=1) is END_OF_STREAM
+    assert other.subscribe("dr-1").next_message(timeout=0) is None
+
+
+def test_worker_refuses_streams_past_its_limit():
+    feed = DRLiveFeed(queue_size=10, max_subscribers=2)
+    feed.subscribe("dr-1")
+    closed = feed.subscribe("dr-2")
+
+    with pytest.raises(LiveFeedFullError):
+        feed.subscribe("dr-1")
+    closed.close()
+    feed.subscribe("dr-1")
+    assert feed.subscriber_count("dr-1") == 2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = Flask(__name__)
+    app.register_blueprint(drevents_bp, url_prefix="/api/drevents")
+    statuses = {"dr-live": "Active", "dr-done": "Completed", "dr-elsewhere": "Active"}
+    monkeypatch.setattr(
+        drevents_api.drevent_service,
+        "get_event",
+        lambda event_id: {"id": event_id, "status": statuses[event_id]},
+    )
+    monkeypatch.setattr(drevents_api, "_running_dispatch_event_ids", {"dr-live"})
+    with app.test_client() as test_client:
+        test_client.statuses = statuses
+        yield test_client
+
+
+def _headers():
+    token = jwt.encode(
+        {"id": "pso-1", "role": 2, "type": 2, "exp": datetime.utcnow() + timedelta(hours=1)},
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_relays_dispatch_ticks(client):
+    dr_live_feed.publish_tick("dr-live", "2026-03-05T10:00:00+00:00", [_tick()])
+
+    def dispatch_rest():
+        while not dr_live_feed.subscriber_count("dr-live"):
+            threading.Event().wait(0.01)
+        dr_live_feed.publish_tick("dr-live", "2026-03-05T10:01:00+00:00", [_tick()])
+        dr_live_feed.close_event("dr-live")
+
+    publisher = threading.Thread(target=dispatch_rest)
+    publisher.start()
+    response = client.get("/api/drevents/dr-live/stream", headers=_headers())
+    body = response.get_data(as_text=True)
+    publisher.join(timeout=5)
+
+    assert response.mimetype == "text/event-stream"
+    assert [name for name, _ in _parse_sse(body)] == ["snapshot", "tick", "end"]
+    assert _parse_sse(body)[1][1]["totals"] == {"energyKwh": 4.0}
+    assert dr_live_feed.subscriber_count("dr-live") == 0
+
+
+def test_stream_of_closed_event_ends_immediately(client):
+    response = client.get("/api/drevents/dr-done/stream", headers=_headers())
+
+    assert _parse_sse(response.get_data(as_text=True)) == [("end", {"type": "end"})]
+
+
+def test_stream_requires_auth(client):
+    assert client.get("/api/drevents/dr-live/stream").status_code == 401
+
+
+def test_stream_of_event_dispatched_by_another_process_is_refused(client):
+    response = client.get("/api/drevents/dr-elsewhere/stream", headers=_headers())
+
+    assert response.status_code == 409
+    assert response.get_json()["fallback"] == "/api/drevents/monitoring"
+    assert dr_live_feed.subscriber_count("dr-elsewhere") == 0
+
+
+def test_stream_of_event_dispatched_by_another_worker_is_relayed(client, monkeypatch):
+    server = _RedisStandIn()
+    feed = DRLiveFeed(queue_size=10, relay=RedisLiveRelay(client=server))
+    dispatcher = DRLiveFeed(queue_size=10, relay=RedisLiveRelay(client=server))
+    monkeypatch.setattr(drevents_api, "dr_live_feed", feed)
+
+    def dispatch_elsewhere():
+        _wait_for(lambda: server.listeners)
+        dispatcher.publish_tick("dr-elsewhere", "2026-03-05T10:01:00+00:00", [_tick()])
+        dispatcher.close_event("dr-elsewhere")
+
+    publisher = threading.Thread(target=dispatch_elsewhere)
+    publisher.start()
+    response = client.get("/api/drevents/dr-elsewhere/stream", headers=_headers())
+    body = response.get_data(as_text=True)
+    publisher.join(timeout=5)
+
+    assert response.status_code == 200
+    assert [name for name, _ in _parse_sse(body)] == ["tick", "end"]
+
+
+def test_stream_past_the_worker_limit_falls_back_to_polling(client, monkeypatch):
+    monkeypatch.setattr(
+        drevents_api, "dr_live_feed", DRLiveFeed(queue_size=10, max_subscribers=0)
+    )
+    response = client.get("/api/drevents/dr-live/stream", headers=_headers())
+
+    assert response.status_code == 503
+    assert response.get_json()["fallback"] == "/api/drevents/monitoring"
+    assert response.headers["Retry-After"]
+
+
+def test_quiet_stream_ends_once_the_event_is_no_longer_active(client, monkeypatch):
+    monkeypatch.setattr(drevents_api.config, "SSE_KEEPALIVE_SECONDS", 0.01)
+    response = client.get("/api/drevents/dr-live/stream", headers=_headers())
+    chunks = response.response
+    first = next(chunks)
+    client.statuses["dr-live"] = "Completed"
+    rest = b"".join(chunks).decode()
+
+    assert b"keepalive" in first
+    assert _parse_sse(rest) == [("end", {"type": "end"})]
+    assert dr_live_feed.subscriber_count("dr-live") == 0
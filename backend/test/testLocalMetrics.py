@@ -0,0 +1,252 @@
+import json
+import os
+import pickle
+import random
+import threading
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from flask import Flask, g, request
+
+import config
+from config import JWT_ALGORITHM, JWT_SECRET
+from api.metrics import metrics_bp
+from db.dynamoClient import DynamoClient
+from local_metrics import LatencyHistogram, MetricsRegistry, _snapshot_to_json, collect, registry
+from monitoring import record_request_end, record_request_start
+
+
+def _samples(body, name):
+    """Parse ``name{labels} value`` lines of a Prometheus text payload."""
+    samples = {}
+    for line in body.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+def test_histogram_quantiles_are_within_bucket_error():
+    histogram = LatencyHistogram()
+    rng = random.Random(7)
+    values = sorted(rng.uniform(0.001, 0.5) for _ in range(5000))
+    for value in values:
+        histogram.observe(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.05)
+    assert histogram.count == 5000
+    assert histogram.sum == pytest.approx(sum(values))
+
+
+def test_histogram_handles_extremes_and_empty():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.99) == 0.0
+
+    histogram.observe(0)
+    histogram.observe(10_000)
+
+    assert histogram.quantile(0.5) <= 1e-5
+    assert histogram.quantile(1.0) == pytest.approx(100, rel=0.1)
+
+
+def test_concurrent_observations_are_not_lost():
+    histogram = LatencyHistogram()
+
+    def worker():
+        for _ in range(2000):
+            histogram.observe(0.01)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert histogram.count == 16000
+
+
+def test_series_limit_drops_new_label_sets():
+    limited = MetricsRegistry(max_series=2)
+    for path in ("/a", "/b", "/c"):
+        limited.inc("requests_total", "Requests.", endpoint=path)
+    limited.inc("requests_total", "Requests.", endpoint="/a")
+
+    assert limited.get("requests_total", endpoint="/a").value == 2
+    assert limited.get("requests_total", endpoint="/c") is None
+    assert limited.dropped == 1
+
+
+def test_render_escapes_label_values():
+    local = MetricsRegistry()
+    local.inc("requests_total", "Requests.", endpoint='say "hi"\\')
+
+    assert 'requests_total{endpoint="say \\"hi\\"\\\\"} 1' in local.render()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(metrics_bp, url_prefix="/api/metrics")
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.before_request
+    def _before():
+        record_request_start(g)
+
+    @app.after_request
+    def _after(response):
+        record_request_end(g, response, request.endpoint, request.method)
+        return response
+
+    return app.test_client()
+
+
+def test_metrics_endpoint_reports_route_histograms(client):
+    for _ in range(3):
+        client.get("/api/ping")
+
+    response = client.get("/api/metrics")
+    body = response.get_data(as_text=True)
+    route = 'endpoint="ping",method="GET"'
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE aquacharge_http_request_duration_seconds histogram" in body
+    counts = _samples(body, "aquacharge_http_requests_total")
+    assert counts[f'aquacharge_http_requests_total{{{route},status="200"}}'] == 3
+    buckets = _samples(body, "aquacharge_http_request_duration_seconds_bucket")
+    assert buckets[f'aquacharge_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 3
+    assert buckets[f'aquacharge_http_request_duration_seconds_bucket{{{route},le="1e-05"}}'] <= 3
+    assert list(buckets.values()) == sorted(buckets.values())
+    assert _samples(body, "aquacharge_http_request_duration_seconds_count") == {
+        f"aquacharge_http_request_duration_seconds_count{{{route}}}": 3
+    }
+    quantiles = _samples(body, "aquacharge_http_request_duration_quantile_seconds")
+    assert set(quantiles) == {
+        f'aquacharge_http_request_duration_quantile_seconds{{{route},quantile="{q}"}}'
+        for q in ("0.5", "0.95", "0.99")
+    }
+    assert "aquacharge_metrics_dropped_total 0" in body
+
+
+def test_unmatched_paths_share_one_series(client):
+    for index in range(5):
+        client.get(f"/wp-admin/{index}.php")
+
+    body = client.get("/api/metrics").get_data(as_text=True)
+    counts = _samples(body, "aquacharge_http_requests_total")
+
+    assert counts['aquacharge_http_requests_total{endpoint="unmatched",method="GET",status="404"}'] == 5
+    assert "wp-admin" not in body
+
+
+def test_metrics_endpoint_merges_every_worker(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    other_worker = MetricsRegistry()
+    other_worker.inc("aquacharge_http_requests_total", "Requests.", endpoint="ping", method="GET", status="200")
+    for seconds in (0.001, 2.0):
+        other_worker.observe(
+            "aquacharge_http_request_duration_seconds", "Latency.", seconds, endpoint="ping", method="GET"
+        )
+    with open(tmp_path / "4242-0000.metrics", "w") as handle:
+        json.dump(_snapshot_to_json(other_worker.snapshot()), handle)
+    for _ in range(3):
+        client.get("/api/ping")
+
+    body = client.get("/api/metrics").get_data(as_text=True)
+    route = 'endpoint="ping",method="GET"'
+
+    assert _samples(body, "aquacharge_http_requests_total")[
+        f'aquacharge_http_requests_total{{{route},status="200"}}'
+    ] == 4
+    buckets = _samples(body, "aquacharge_http_request_duration_seconds_bucket")
+    assert buckets[f'aquacharge_http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 5
+    assert buckets[f'aquacharge_http_request_duration_seconds_bucket{{{route},le="1.31072"}}'] == 4
+    assert len(list(tmp_path.glob("*.metrics"))) == 2
+    assert "pid=" not in body
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (os.system, ("touch pwned",))
+
+
+def test_snapshots_are_json_and_planted_files_are_not_loaded(monkeypatch, tmp_path):
+    directory = tmp_path / "metrics"
+    monkeypatch.setattr(config, "METRICS_MULTIPROC_DIR", str(directory))
+    monkeypatch.chdir(tmp_path)
+    registry.inc("aquacharge_http_requests_total", "Requests.", endpoint="ping", method="GET", status="200")
+    registry.observe("aquacharge_http_request_duration_seconds", "Latency.", 0.25, endpoint="ping", method="GET")
+    collect()
+    (directory / "1-evil.metrics").write_bytes(pickle.dumps(_Exploit()))
+    (directory / "2-junk.metrics").write_text('{"families": {"x": {"kind": "gauge"}}}')
+
+    merged = collect()
+
+    assert not (tmp_path / "pwned").exists()
+    assert directory.stat().st_mode & 0o777 == 0o700
+    (own,) = [path for path in directory.glob("*.metrics") if path.name.startswith(f"{os.getpid()}-")]
+    assert json.loads(own.read_text())["dropped"] == 0
+    assert merged.get("aquacharge_http_requests_total", endpoint="ping", method="GET", status="200").value == 1
+    histogram = merged.get("aquacharge_http_request_duration_seconds", endpoint="ping", method="GET")
+    assert (histogram.count, histogram.sum) == (1, 0.25)
+
+
+def _token(role):
+    return jwt.encode(
+        {"id": "user-1", "role": role, "type": 1, "exp": datetime.utcnow() + timedelta(hours=1)},
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+
+def test_metrics_endpoint_requires_admin_or_scrape_token(client, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_REQUIRE_AUTH", True)
+    monkeypatch.setattr(config, "METRICS_TOKEN", "scrape-secret")
+
+    def status(token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return client.get("/api/metrics", headers=headers).status_code
+
+    assert status() == 401
+    assert status(_token(2)) == 401
+    assert status("wrong-secret") == 401
+    assert status(_token(1)) == 200
+    assert status("scrape-secret") == 200
+
+
+def test_dynamo_client_counts_calls_per_table_and_operation():
+    client = DynamoClient(table_name=config.CHARGERS_TABLE, region_name=config.AWS_REGION)
+
+    client.put_item({"id": "charger-metrics", "status": "active"})
+    client.get_item({"id": "charger-metrics"})
+    client.get_item({"id": "charger-metrics"})
+    client.batch_write_items([{"id": f"charger-batch-{i}"} for i in range(30)])
+
+    table = config.CHARGERS_TABLE
+    calls = "aquacharge_dynamodb_calls_total"
+    assert registry.get(calls, table=table, operation="PutItem").value == 1
+    assert registry.get(calls, table=table, operation="GetItem").value == 2
+    assert registry.get(calls, table=table, operation="BatchWriteItem").value == 2
+    latency = registry.get(
+        "aquacharge_dynamodb_call_duration_seconds", table=table, operation="GetItem"
+    )
+    assert latency.count == 2
+    assert registry.get("aquacharge_dynamodb_errors_total", table=table, operation="GetItem") is None
+
+
+def test_dynamo_client_counts_errors():
+    client = DynamoClient(table_name="missing-table", region_name=config.AWS_REGION)
+
+    with pytest.raises(Exception):
+        client.get_item({"id": "x"})
+
+    assert registry.get(
+        "aquacharge_dynamodb_errors_total", table="missing-table", operation="GetItem"
+    ).value == 1
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from services.analytics import MeasurementFrame
+from timeutil import US_PER_HOUR, US_PER_MINUTE, from_epoch_us
+
+
+def _row(vessel_id, timestamp, energy, power=1, contract_id=None):
+    return {
+        "vesselId": vessel_id,
+        "contractId": contract_id,
+        "drEventId": "event-1",
+        "timestamp": timestamp,
+        "energyKwh": Decimal(str(energy)),
+        "powerKw": Decimal(str(power)),
+        "currentSOC": Decimal("50"),
+    }
+
+
+def test_frame_skips_unparseable_and_early_rows():
+    frame = MeasurementFrame.from_records(
+        [
+            _row("v1", "2026-03-01T10:05:00Z", 1),
+            _row("v1", "not-a-timestamp", 2),
+            _row("v1", "2026-03-01T08:00:00+00:00", 4),
+        ],
+        since=datetime(2026, 3, 1, 9, tzinfo=timezone.utc),
+    )
+
+    assert len(frame) == 1
+    assert frame.energy_kwh.tolist() == [1.0]
+
+
+def test_bucket_sums_group_rows_by_hour():
+    frame = MeasurementFrame.from_records(
+        [
+            _row("v1", "2026-03-01T10:05:00+00:00", 1, power=2),
+            _row("v2", "2026-03-01T10:55:00+00:00", 3, power=4),
+            _row("v1", "2026-03-01T11:00:00+00:00", 5, power=6),
+        ]
+    )
+
+    starts, energy, power, samples = frame.bucket_sums(US_PER_HOUR)
+
+    assert [from_epoch_us(start).hour for start in starts] == [10, 11]
+    assert energy.tolist() == [4.0, 5.0]
+    assert power.tolist() == [6.0, 6.0]
+    assert samples.tolist() == [2, 1]
+
+
+def test_latest_rows_prefer_later_input_on_equal_timestamps():
+    frame = MeasurementFrame.from_records(
+        [
+            _row("v1", "2026-03-01T10:00:00+00:00", 1, contract_id="c-old"),
+            _row("v2", "2026-03-01T09:00:00+00:00", 1),
+            _row("v1", "2026-03-01T10:00:00+00:00", 1, contract_id="c-new"),
+        ]
+    )
+
+    codes, rows = frame.latest_rows_by_vessel()
+    latest = {frame.vessel_id(code): frame.contract_id(row) for code, row in zip(codes, rows)}
+
+    assert latest == {"v1": "c-new", "v2": None}
+
+
+def test_vessel_bucket_sums_ignore_rows_without_vessel():
+    frame = MeasurementFrame.from_records(
+        [
+            _row(None, "2026-03-01T10:00:00+00:00", 7),
+            _row("v1", "2026-03-01T10:00:30+00:00", 1),
+            _row("v1", "2026-03-01T10:00:45+00:00", 2),
+        ]
+    )
+
+    codes, starts, energy, _ = frame.vessel_bucket_sums(US_PER_MINUTE)
+
+    assert [frame.vessel_id(code) for code in codes] == ["v1"]
+    assert energy.tolist() == [3.0]
+    assert MeasurementFrame.from_records([]).vessel_bucket_sums(US_PER_MINUTE)[0].size == 0
@@ -0,0 +1,209 @@
+from decimal import Decimal
+
+import boto3
+import pytest
+from flask import Flask
+
+import config
+from api.chargers import chargers_bp
+from api.pagination import (
+    ListParamsError,
+    decode_cursor,
+    encode_cursor,
+    parse_list_params,
+)
+from api.stations import stations_bp
+from api.users import users_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(stations_bp, url_prefix="/api/stations")
+    app.register_blueprint(chargers_bp, url_prefix="/api/chargers")
+    app.register_blueprint(users_bp, url_prefix="/api/users")
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def stations():
+    table = boto3.resource("dynamodb", region_name=config.AWS_REGION).Table(
+        config.STATIONS_TABLE
+    )
+    names = ["Delta", "Alpha", "Echo", "Charlie", "Bravo"]
+    for index, name in enumerate(names):
+        table.put_item(
+            Item={
+                "id": f"station-{index}",
+                "displayName": name,
+                "city": "Victoria" if index % 2 else "Vancouver",
+                "status": 1,
+                "latitude": Decimal("48.4"),
+                "longitude": Decimal("-123.3"),
+            }
+        )
+    return names
+
+
+def test_cursor_round_trips_decimal_keys():
+    key = {"id": "station-1", "status": Decimal("2")}
+
+    assert decode_cursor(encode_cursor(key)) == key
+    assert encode_cursor(None) is None
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"limit": "abc"},
+        {"limit": "0"},
+        {"cursor": "not-a-cursor"},
+        {"fields": "name,bad-field"},
+        {"sort": "passwordHash"},
+        {"sort": "displayName", "order": "sideways"},
+    ],
+)
+def test_invalid_list_params_are_rejected(args):
+    with pytest.raises(ListParamsError):
+        parse_list_params(args, sort_fields=("displayName",))
+
+
+def test_limit_is_capped(monkeypatch):
+    monkeypatch.setattr(config, "LIST_PAGE_DEFAULT_LIMIT", 5)
+    monkeypatch.setattr(config, "LIST_PAGE_MAX_LIMIT", 10)
+
+    assert parse_list_params({"limit": "1000"}).limit == 10
+    assert parse_list_params({"cursor": encode_cursor({"id": "a"})}).limit == 5
+    assert parse_list_params({}).paginated is False
+
+
+def test_stations_walk_every_page_with_cursor(client, stations):
+    seen = []
+    cursor = None
+    for _ in range(10):
+        query = "limit=2" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(f"/api/stations?{query}").get_json()
+        assert len(body["items"]) <= 2
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == [f"station-{index}" for index in range(5)]
+
+
+def test_stations_without_limit_still_return_a_list(client, stations):
+    response = client.get("/api/stations?sort=displayName&order=desc")
+
+    assert response.status_code == 200
+    assert [item["displayName"] for item in response.get_json()] == sorted(
+        stations, reverse=True
+    )
+
+
+def test_stations_fields_projection_and_filter(client, stations):
+    response = client.get("/api/stations?fields=displayName&city=victoria")
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert {item["id"] for item in body} == {"station-1", "station-3"}
+    assert all(set(item) == {"id", "displayName"} for item in body)
+
+
+def test_filtered_station_pages_are_full_until_the_last(client, stations):
+    pages = []
+    cursor = None
+    for _ in range(10):
+        query = "limit=1&city=victoria" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(f"/api/stations?{query}").get_json()
+        pages.append([item["id"] for item in body["items"]])
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+
+    assert all(len(page) == 1 for page in pages[:-1])
+    assert sorted(sum(pages, [])) == ["station-1", "station-3"]
+
+
+def test_invalid_sort_returns_400(client, stations):
+    response = client.get("/api/stations?sort=latitude")
+
+    assert response.status_code == 400
+    assert "sort must be one of" in response.get_json()["error"]
+
+
+def test_chargers_filter_by_station_uses_index_page(client):
+    body = client.get("/api/chargers?stationId=station-001&limit=5").get_json()
+
+    assert [item["id"] for item in body["items"]] == ["charger-seed-001"]
+    assert body["nextCursor"] is None
+
+
+def test_chargers_sort_by_max_rate_with_mixed_types(client):
+    table = boto3.resource("dynamodb", region_name=config.AWS_REGION).Table(
+        config.CHARGERS_TABLE
+    )
+    table.put_item(Item={"id": "charger-fast", "maxRate": Decimal("150")})
+    table.put_item(Item={"id": "charger-slow", "maxRate": Decimal("7.4")})
+    table.put_item(Item={"id": "charger-odd", "maxRate": "unknown"})
+
+    response = client.get("/api/chargers?sort=maxRate&order=desc&fields=maxRate")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.get_json()] == [
+        "charger-odd",
+        "charger-fast",
+        "charger-seed-001",
+        "charger-slow",
+    ]
+
+
+def test_users_fields_leave_out_other_attributes(client):
+    body = client.get("/api/users?fields=displayName,email").get_json()
+
+    assert body == [
+        {
+            "id": "admin-seed-001",
+            "displayName": "Admin Jason",
+            "email": "admin.jason@boats.com",
+        }
+    ]
+
+
+def test_contract_pages_query_status_index():
+    from services.contracts import ContractService
+
+    table = boto3.resource("dynamodb", region_name=config.AWS_REGION).Table(
+        config.CONTRACTS_TABLE
+    )
+    for index in range(3):
+        table.put_item(
+            Item={
+                "id": f"contract-{index}",
+                "vesselId": "vessel-1",
+                "drEventId": "dr-1",
+                "vesselName": "Ferry",
+                "energyAmount": Decimal("10"),
+                "pricePerKwh": Decimal("0.2"),
+                "totalValue": Decimal("2"),
+                "startTime": f"2026-03-0{index + 1}T08:00:00",
+                "endTime": f"2026-03-0{index + 1}T12:00:00",
+                "status": "active" if index < 2 else "pending",
+                "terms": "",
+                "createdAt": f"2026-03-0{index + 1}T00:00:00",
+                "createdBy": "pso",
+            }
+        )
+    service = ContractService()
+
+    first, last_key = service.list_contracts_page(1, status_filter="active")
+    second, end_key = service.list_contracts_page(
+        1, last_key, status_filter="active"
+    )
+    if end_key:
+        tail, end_key = service.list_contracts_page(1, end_key, status_filter="active")
+        assert tail == []
+
+    assert end_key is None
+    assert {c["id"] for c in first + second} == {"contract-0", "contract-1"}
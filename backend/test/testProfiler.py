@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from flask import Flask
+
+import config
+from config import JWT_ALGORITHM, JWT_SECRET
+from profiler import finish_request_profile, start_request_profile
+
+
+def _slow_analytics_query():
+    deadline = time.perf_counter() + 0.08
+    while time.perf_counter() < deadline:
+        pass
+    return {"rows": 1}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_SAMPLE_INTERVAL_MS", 1)
+    monkeypatch.setattr(config, "REQUEST_PROFILING_ADMIN_ONLY", False)
+    app = Flask(__name__)
+
+    @app.get("/api/slow")
+    def slow():
+        return _slow_analytics_query()
+
+    @app.before_request
+    def _before():
+        start_request_profile()
+
+    @app.after_request
+    def _after(response):
+        return finish_request_profile(response)
+
+    return app.test_client()
+
+
+def _token(role):
+    return jwt.encode(
+        {"id": "user-1", "role": role, "type": 1, "exp": datetime.utcnow() + timedelta(hours=1)},
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+
+def test_requests_without_the_switch_are_untouched(client):
+    response = client.get("/api/slow")
+
+    assert response.get_json() == {"rows": 1}
+    assert "X-Profiled-Status" not in response.headers
+
+
+def test_collapsed_profile_shows_the_slow_frame(client):
+    response = client.get("/api/slow?__profile=collapsed")
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/plain"
+    assert response.headers["X-Profiled-Status"] == "200"
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    hot = [line for line in body.splitlines() if "_slow_analytics_query" in line]
+    assert hot
+    stack, count = hot[0].rsplit(" ", 1)
+    assert stack.split(";")[-1].startswith("_slow_analytics_query (testProfiler.py:")
+    assert int(count) > 0
+
+
+def test_speedscope_profile_is_well_formed(client):
+    response = client.get("/api/slow?__profile=1")
+    profile = response.get_json()
+
+    assert "profile.speedscope.json" in response.headers["Content-Disposition"]
+    (sampled,) = profile["profiles"]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    frames = profile["shared"]["frames"]
+    assert all(0 <= i < len(frames) for stack in sampled["samples"] for i in stack)
+    assert "_slow_analytics_query" in {frame["name"] for frame in frames}
+
+
+def test_production_profiles_only_admins(client, monkeypatch):
+    monkeypatch.setattr(config, "REQUEST_PROFILING_ADMIN_ONLY", True)
+
+    anonymous = client.get("/api/slow?__profile=1")
+    user = client.get("/api/slow?__profile=1", headers={"Authorization": f"Bearer {_token(2)}"})
+    admin = client.get("/api/slow?__profile=1", headers={"Authorization": f"Bearer {_token(1)}"})
+
+    assert anonymous.get_json() == {"rows": 1}
+    assert user.get_json() == {"rows": 1}
+    assert admin.headers["X-Profiled-Status"] == "200"
+
+
+def test_profiling_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(config, "REQUEST_PROFILING_ENABLED", False)
+
+    assert "X-Profiled-Status" not in client.get("/api/slow?__profile=1").headers
@@ -0,0 +1,161 @@
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+from flask_limiter import Limiter
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+import config
+import rate_limits
+from db.dynamoClient import DynamoClient
+from rate_limits import DynamoDBStorage
+
+_STORAGE_URI = f"dynamodb://{config.RATELIMITS_TABLE}"
+
+
+def _worker_app(storage_uri=_STORAGE_URI):
+    """A minimal app with its own limiter, standing in for one server process."""
+    app = Flask(__name__)
+    Limiter(
+        lambda: "203.0.113.7",
+        app=app,
+        default_limits=["3 per minute"],
+        storage_uri=storage_uri,
+        strategy="sliding-window-counter",
+        in_memory_fallback_enabled=True,
+    )
+
+    @app.route("/ping")
+    def ping():
+        return "pong"
+
+    return app.test_client()
+
+
+def test_fixed_window_counts_hits_until_the_limit():
+    limiter = FixedWindowRateLimiter(DynamoDBStorage(_STORAGE_URI))
+    limit = parse("2 per minute")
+
+    assert limiter.hit(limit, "client-a")
+    assert limiter.hit(limit, "client-a")
+    assert not limiter.hit(limit, "client-a")
+    assert limiter.hit(limit, "client-b")
+
+
+def test_sliding_window_limit_is_shared_across_storages():
+    limit = parse("3 per minute")
+    workers = [
+        SlidingWindowCounterRateLimiter(DynamoDBStorage(_STORAGE_URI)) for _ in range(2)
+    ]
+
+    allowed = [workers[index % 2].hit(limit, "client-a") for index in range(5)]
+
+    assert allowed == [True, True, True, False, False]
+    assert workers[1].get_window_stats(limit, "client-a").remaining == 0
+
+
+def test_previous_window_hits_count_towards_the_current_window(monkeypatch):
+    # One minute into the hour, 59/60 of the previous window still overlaps.
+    now = (int(time.time()) // 3600) * 3600 + 60
+    monkeypatch.setattr(rate_limits, "time", SimpleNamespace(time=lambda: now))
+    storage = DynamoDBStorage(_STORAGE_URI)
+    previous_key, _ = storage.sliding_window_keys("client-a", 3600, now)
+    DynamoClient(config.RATELIMITS_TABLE, config.AWS_REGION).put_item(
+        {"id": previous_key, "hits": 10, "expiresAt": now + 3600}
+    )
+
+    assert storage.acquire_sliding_window_entry("client-a", 10, 3600)
+    assert not storage.acquire_sliding_window_entry("client-a", 10, 3600)
+    previous_count, previous_ttl, current_count, _ = storage.get_sliding_window(
+        "client-a", 3600
+    )
+    assert (previous_count, current_count) == (10, 1)
+    assert previous_ttl == pytest.approx(3540)
+
+
+def test_expired_counter_starts_a_new_window():
+    DynamoClient(config.RATELIMITS_TABLE, config.AWS_REGION).put_item(
+        {"id": "client-a", "hits": 99, "expiresAt": int(time.time()) - 1}
+    )
+    storage = DynamoDBStorage(_STORAGE_URI)
+
+    assert storage.get("client-a") == 0
+    assert storage.incr("client-a", 60) == 1
+    assert storage.get_expiry("client-a") > time.time()
+
+
+def test_workers_enforce_one_combined_limit():
+    workers = [_worker_app(), _worker_app()]
+
+    statuses = [workers[index % 2].get("/ping").status_code for index in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_unreachable_storage_falls_back_to_process_memory():
+    client = _worker_app("dynamodb://aquacharge-ratelimits-missing")
+
+    statuses = [client.get("/ping").status_code for _ in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_limiter_settings_follow_config(monkeypatch):
+    monkeypatch.setattr(config, "RATELIMIT_STORAGE_URI", "memory://")
+    assert "in_memory_fallback_enabled" not in rate_limits.limiter_settings()
+
+    monkeypatch.setattr(config, "RATELIMIT_STORAGE_URI", _STORAGE_URI)
+    settings = rate_limits.limiter_settings()
+    assert settings["storage_uri"] == _STORAGE_URI
+    assert settings["strategy"] == "sliding-window-counter"
+    assert settings["in_memory_fallback_enabled"] is True
+
+
+@pytest.mark.parametrize("uri", ["dynamodb://", "dynamodb:///"])
+def test_table_defaults_to_configured_ratelimits_table(uri):
+    assert DynamoDBStorage(uri)._client.table_name == config.RATELIMITS_TABLE
+
+
+def test_reset_clears_counters_on_every_scan_page(monkeypatch):
+    storage = DynamoDBStorage(_STORAGE_URI)
+    for index in range(5):
+        storage.incr(f"client-{index}", 60)
+    scan = storage._table.scan
+    monkeypatch.setattr(
+        storage._table, "scan", lambda **kwargs: scan(**{**kwargs, "Limit": 2})
+    )
+
+    assert storage.reset() == 5
+    assert storage._client.scan_items(projection=["id"]) == []
+
+
+@pytest.mark.parametrize(
+    "cache_backend, expected",
+    [("redis", "redis://cache:6379/0"), ("memory", "memory://")],
+)
+def test_workers_share_counters_in_the_cache_redis(cache_backend, expected):
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in {"RATELIMIT_STORAGE_URI", "CACHE_BACKEND", "CACHE_REDIS_URL"}
+    }
+    env.update(
+        ENVIRONMENT="prod",
+        CACHE_BACKEND=cache_backend,
+        CACHE_REDIS_URL="redis://cache:6379/0",
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", "import config; print(config.RATELIMIT_STORAGE_URI)"],
+        cwd=os.path.dirname(os.path.abspath(config.__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == expected
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+from timeutil import from_epoch_us, parse_epoch_us, parse_iso, parse_utc, to_epoch_us
+
+
+def test_parse_iso_accepts_stored_formats():
+    expected = datetime(2026, 3, 5, 10, 0, tzinfo=timezone.utc)
+
+    assert parse_iso("2026-03-05T10:00:00Z") == expected
+    assert parse_iso("2026-03-05T10:00:00+00:00") == expected
+    assert parse_iso(" 2026-03-05T10:00:00 ") == expected
+    assert parse_iso("2026-03-05") == datetime(2026, 3, 5, tzinfo=timezone.utc)
+    assert parse_iso(datetime(2026, 3, 5, 10, 0)) == expected
+
+
+def test_parse_iso_keeps_offset_and_parse_utc_converts():
+    parsed = parse_iso("2026-03-05T12:00:00+02:00")
+
+    assert parsed.utcoffset() == timedelta(hours=2)
+    assert parse_utc("2026-03-05T12:00:00+02:00").isoformat() == "2026-03-05T10:00:00+00:00"
+
+
+def test_invalid_values_return_none():
+    assert parse_iso("not-a-date") is None
+    assert parse_iso(None) is None
+    assert parse_epoch_us("") is None
+    assert parse_epoch_us(12345) is None
+
+
+def test_epoch_round_trip_orders_like_datetimes():
+    earlier = parse_epoch_us("2026-03-05T10:00:00.000001Z")
+    later = parse_epoch_us("2026-03-05T12:00:00+02:00")
+
+    assert earlier > later
+    assert from_epoch_us(earlier) == datetime(2026, 3, 5, 10, 0, 0, 1, tzinfo=timezone.utc)
+    assert to_epoch_us(from_epoch_us(later)) == later
@@ -0,0 +1,107 @@
+from cache import Cache, InMemoryBackend
+from services.vo_dashboard import VODashboardCache
+
+
+def _cache(**kwargs):
+    return VODashboardCache(ttl_seconds=60, live_ttl_seconds=60, **kwargs)
+
+
+def _put(cache, user_id, snapshot, vessel_ids, generation=0):
+    versions = cache.vessel_versions(user_id, vessel_ids)
+    return cache.put_snapshot(user_id, snapshot, vessel_ids, generation, versions)
+
+
+def test_snapshot_is_invalidated_through_its_vessels():
+    cache = _cache()
+    generation = cache.generation("user-1")
+    assert _put(cache, "user-1", {"metrics": 1}, ["vessel-a"], generation)
+    assert _put(cache, "user-2", {"metrics": 2}, ["vessel-b"])
+
+    cache.invalidate_vessels(["vessel-a"])
+
+    assert cache.get_snapshot("user-1") is None
+    assert cache.get_snapshot("user-2") == {"metrics": 2}
+
+
+def test_snapshot_computed_during_invalidation_is_discarded():
+    cache = _cache()
+    generation = cache.generation("user-1")
+
+    cache.invalidate_users(["user-1"])
+
+    assert not _put(cache, "user-1", {"metrics": 1}, ["vessel-a"], generation)
+    assert cache.get_snapshot("user-1") is None
+
+
+def test_vessel_invalidated_during_the_load_is_not_stored_as_seen():
+    cache = _cache()
+    assert _put(cache, "user-1", {"metrics": "old"}, ["vessel-a"])
+    cache.invalidate_vessels(["vessel-a"])
+
+    # The next request reads its versions, then a write lands mid-load.
+    generation = cache.generation("user-1")
+    versions = cache.vessel_versions("user-1")
+    cache.invalidate_vessels(["vessel-a"])
+
+    assert not cache.put_snapshot(
+        "user-1", {"metrics": "stale"}, ["vessel-a"], generation, versions
+    )
+    assert cache.get_snapshot("user-1") is None
+
+
+def test_first_load_only_records_the_vessel_ids():
+    cache = _cache()
+    generation = cache.generation("user-1")
+    versions = cache.vessel_versions("user-1")
+
+    assert not cache.put_snapshot("user-1", {"n": 1}, ["vessel-a"], generation, versions)
+    assert cache.get_snapshot("user-1") is None
+
+    versions = cache.vessel_versions("user-1")
+    assert versions == {"vessel-a": 0}
+    assert cache.put_snapshot("user-1", {"n": 1}, ["vessel-a"], generation, versions)
+    assert cache.get_snapshot("user-1") == {"n": 1}
+
+
+def test_live_fields_expire_independently_and_track_the_contract():
+    cache = VODashboardCache(ttl_seconds=60, live_ttl_seconds=-1)
+    _put(cache, "user-1", {"metrics": 1}, ["vessel-a"])
+    cache.put_live("user-1", {"contractId": "c-1", "fields": {}}, 0)
+
+    assert cache.get_live("user-1", "c-1") is None
+    assert cache.get_snapshot("user-1") == {"metrics": 1}
+
+    cache = _cache()
+    cache.put_live("user-1", {"contractId": "c-1", "fields": {"x": 1}}, 0)
+    assert cache.get_live("user-1", "c-2") is None
+
+
+def test_least_recently_used_user_is_evicted():
+    cache = _cache(cache=Cache(InMemoryBackend(max_entries=2)))
+    _put(cache, "user-1", {"n": 1}, ["vessel-1"])
+    _put(cache, "user-2", {"n": 2}, ["vessel-2"])
+    cache.get_snapshot("user-1")
+    _put(cache, "user-3", {"n": 3}, ["vessel-3"])
+
+    assert cache.get_snapshot("user-2") is None
+    assert cache.get_snapshot("user-1") == {"n": 1}
+    assert cache.get_snapshot("user-3") == {"n": 3}
+
+
+def test_workers_sharing_a_backend_see_each_others_writes_and_invalidations():
+    backend = InMemoryBackend()
+    worker_a = _cache(cache=Cache(backend))
+    worker_b = _cache(cache=Cache(backend))
+    _put(worker_a, "user-1", {"metrics": 1}, ["vessel-a"])
+    worker_a.put_live("user-1", {"contractId": "c-1", "fields": {}}, 0)
+
+    assert worker_b.get_snapshot("user-1") == {"metrics": 1}
+    assert worker_b.get_live("user-1", "c-1") is not None
+
+    worker_b.invalidate_vessels(["vessel-a"])
+    assert worker_a.get_snapshot("user-1") is None
+
+    generation = worker_a.generation("user-1")
+    worker_b.invalidate_users(["user-1"])
+    assert worker_a.get_live("user-1", "c-1") is None
+    assert not _put(worker_a, "user-1", {"metrics": 2}, [], generation)
@@ -0,0 +1,67 @@
+from flask import Flask, g
+
+import config
+import warmup
+from db.callLedger import start_ledger
+from db.dynamoClient import DynamoClient
+from local_metrics import registry
+
+
+def _seed_stations(count):
+    client = DynamoClient(config.STATIONS_TABLE, config.AWS_REGION)
+    for index in range(count):
+        client.put_item({"id": f"station-warm-{index}", "displayName": f"Harbour {index}"})
+
+
+def test_warm_up_primes_clients_and_station_cache():
+    _seed_stations(3)
+
+    primed = warmup.warm_up()
+
+    assert primed["clients"] >= 1
+    assert primed["stations"] == 3
+    station = warmup.EventStationRepository().get_station("station-warm-1")
+    assert station["displayName"] == "Harbour 1"
+
+
+def test_warm_up_reads_only_the_stations_it_primes(monkeypatch):
+    _seed_stations(5)
+    monkeypatch.setattr(warmup, "_MAX_PRIMED_STATIONS", 2)
+
+    with Flask(__name__).test_request_context("/"):
+        ledger = start_ledger(g)
+        primed = warmup.warm_up()
+
+    (scan,) = [call for call in ledger.calls if call.operation == "Scan"]
+    assert primed["stations"] == 2
+    assert scan.item_count == 2
+
+
+def test_warm_up_reads_are_served_from_the_cache_afterwards():
+    _seed_stations(2)
+    warmup.warm_up()
+    registry.clear()
+
+    warmup.EventStationRepository().get_station("station-warm-0")
+    warmup.EligibilityStationRepository().get_station("station-warm-1")
+
+    assert "GetItem" not in registry.render()
+
+
+def test_warm_up_skips_account_level_calls_in_dynamodb_metrics():
+    warmup.warm_up_clients()
+
+    assert "DescribeEndpoints" not in registry.render()
+
+
+def test_warm_up_stops_at_first_failure(monkeypatch):
+    def unreachable():
+        raise RuntimeError("endpoint unreachable")
+
+    def unexpected():
+        raise AssertionError("station priming should be skipped")
+
+    monkeypatch.setattr(warmup, "warm_up_clients", unreachable)
+    monkeypatch.setattr(warmup, "_prime_station_cache", unexpected)
+
+    assert warmup.warm_up() == {}
@@ -69,6 +69,14 @@ class TestJsonFormatter:
 # emit_metric
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(autouse=True)
+def metrics_buffer():
+    import monitoring
+    buffer = monitoring.MetricsBuffer()
+    with patch.object(monitoring, "_metrics_buffer", buffer):
+        yield buffer
+
+
 class TestEmitMetric:
     def test_noop_when_disabled(self):
         """emit_metric must not call boto3 when CLOUDWATCH_ENABLED is false."""
@@ -76,31 +84,164 @@ class TestEmitMetric:
         with patch.object(monitoring, "CLOUDWATCH_ENABLED", False):
             with patch.object(monitoring, "_get_metrics_client") as mock_client:
                 monitoring.emit_metric("TestMetric", 1.0)
+                assert monitoring.flush_metrics() == 0
                 mock_client.assert_not_called()
 
-    def test_calls_put_metric_when_enabled(self):
+    def test_emit_is_buffered_until_flush(self):
         import monitoring
         mock_client = MagicMock()
         with patch.object(monitoring, "CLOUDWATCH_ENABLED", True):
             with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
                 monitoring.emit_metric("RequestCount", 1, "Count", [{"Name": "Env", "Value": "test"}])
+                mock_client.put_metric_data.assert_not_called()
+                assert monitoring.flush_metrics() == 1
         mock_client.put_metric_data.assert_called_once()
         call_kwargs = mock_client.put_metric_data.call_args[1]
         assert call_kwargs["Namespace"] == monitoring.METRICS_NAMESPACE
         assert call_kwargs["MetricData"][0]["MetricName"] == "RequestCount"
+        assert call_kwargs["MetricData"][0]["Dimensions"] == [{"Name": "Env", "Value": "test"}]
+
+    def test_samples_aggregate_into_statistic_sets(self):
+        import monitoring
+        mock_client = MagicMock()
+        dims = [{"Name": "Endpoint", "Value": "health"}, {"Name": "Method", "Value": "GET"}]
+        with patch.object(monitoring, "CLOUDWATCH_ENABLED", True):
+            with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
+                for latency in (12.0, 3.0, 30.0):
+                    monitoring.emit_metric("ResponseLatency", latency, "Milliseconds", dims)
+                # Same dimensions in a different order are the same series
+                monitoring.emit_metric("ResponseLatency", 5.0, "Milliseconds", dims[::-1])
+                monitoring.flush_metrics()
+
+        (datum,) = mock_client.put_metric_data.call_args[1]["MetricData"]
+        assert datum["StatisticValues"] == {
+            "SampleCount": 4.0, "Sum": 50.0, "Minimum": 3.0, "Maximum": 30.0,
+        }
+        assert datum["Unit"] == "Milliseconds"
+
+    def test_flush_splits_at_the_api_batch_limit(self):
+        import monitoring
+        buffer = monitoring.MetricsBuffer(batch_size=2)
+        mock_client = MagicMock()
+        for index in range(5):
+            buffer.add("RequestCount", 1, "Count", [{"Name": "Endpoint", "Value": str(index)}])
+        with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
+            assert buffer.flush() == 5
+        assert [len(c[1]["MetricData"]) for c in mock_client.put_metric_data.call_args_list] == [2, 2, 1]
+
+    def test_new_series_are_dropped_when_buffer_is_full(self):
+        import monitoring
+        buffer = monitoring.MetricsBuffer(max_series=2)
+        for endpoint in ("a", "b", "c"):
+            buffer.add("RequestCount", 1, "Count", [{"Name": "Endpoint", "Value": endpoint}])
+        buffer.add("RequestCount", 1, "Count", [{"Name": "Endpoint", "Value": "a"}])
+
+        mock_client = MagicMock()
+        with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
+            assert buffer.flush() == 2
+        assert buffer.dropped == 1
 
-    def test_swallows_botocore_errors(self):
-        """emit_metric should log a warning but not raise on AWS errors."""
+    def test_failed_flush_spills_to_next_flush(self):
+        """A CloudWatch error is logged, not raised, and the data is retried."""
         import monitoring
         from botocore.exceptions import ClientError
         mock_client = MagicMock()
-        mock_client.put_metric_data.side_effect = ClientError(
-            {"Error": {"Code": "ServiceUnavailable", "Message": "down"}}, "PutMetricData"
-        )
+        mock_client.put_metric_data.side_effect = [
+            ClientError({"Error": {"Code": "ServiceUnavailable", "Message": "down"}}, "PutMetricData"),
+            None,
+        ]
         with patch.object(monitoring, "CLOUDWATCH_ENABLED", True):
             with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
-                # Must not raise
                 monitoring.emit_metric("X", 1)
+                assert monitoring.flush_metrics() == 0
+                assert monitoring.flush_metrics() == 1
+        assert mock_client.put_metric_data.call_args[1]["MetricData"][0]["MetricName"] == "X"
+
+    def test_spill_is_bounded(self):
+        import monitoring
+        from botocore.exceptions import ClientError
+        buffer = monitoring.MetricsBuffer(max_pending=2)
+        for endpoint in ("a", "b", "c"):
+            buffer.add("RequestCount", 1, "Count", [{"Name": "Endpoint", "Value": endpoint}])
+        mock_client = MagicMock()
+        mock_client.put_metric_data.side_effect = ClientError(
+            {"Error": {"Code": "Throttling", "Message": "slow down"}}, "PutMetricData"
+        )
+        with patch.object(monitoring, "_get_metrics_client", return_value=mock_client):
+            buffer.flush()
+        assert buffer.dropped == 1
+
+
+class TestEmfTransport:
+    @pytest.fixture(autouse=True)
+    def emf_transport(self):
+        import monitoring
+        with patch.object(monitoring, "METRICS_TRANSPORT", "emf"), \
+                patch.object(monitoring, "CLOUDWATCH_ENABLED", False):
+            yield
+
+    @staticmethod
+    def _flush_to_stdout(capsys):
+        """Flush through a stdout JSON handler, as setup_logging attaches, and parse it."""
+        import sys
+        import monitoring
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(monitoring._JsonFormatter())
+        monitoring._emf_logger.addHandler(handler)
+        monitoring._emf_logger.setLevel(logging.INFO)
+        try:
+            written = monitoring.flush_metrics()
+        finally:
+            monitoring._emf_logger.removeHandler(handler)
+            monitoring._emf_logger.setLevel(logging.NOTSET)
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        return written, lines
+
+    def test_flush_writes_emf_lines_without_api_calls(self, capsys):
+        import monitoring
+        dims = [{"Name": "Endpoint", "Value": "health"}, {"Name": "Method", "Value": "GET"}]
+        with patch.object(monitoring, "_get_metrics_client") as mock_client:
+            for latency in (10.0, 10.2, 95.0):
+                monitoring.emit_metric("RequestCount", 1, "Count", dims)
+                monitoring.emit_metric("ResponseLatency", latency, "Milliseconds", dims)
+            written, (line,) = self._flush_to_stdout(capsys)
+            mock_client.assert_not_called()
+
+        assert written == 2
+        directive = line["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == monitoring.METRICS_NAMESPACE
+        assert directive["Dimensions"] == [["Endpoint", "Method"]]
+        assert {m["Name"]: m["Unit"] for m in directive["Metrics"]} == {
+            "RequestCount": "Count", "ResponseLatency": "Milliseconds",
+        }
+        assert isinstance(line["_aws"]["Timestamp"], int)
+        assert line["Endpoint"] == "health" and line["Method"] == "GET"
+        assert line["RequestCount"]["Values"] == [1.0]
+        assert line["RequestCount"]["Counts"] == [3]
+
+        latency = line["ResponseLatency"]
+        # 10.0 and 10.2 share a histogram bucket; the exact stats are kept
+        assert latency["Counts"] == [2, 1]
+        assert latency["Min"] == 10.0 and latency["Max"] == 95.0
+        assert latency["Sum"] == pytest.approx(115.2)
+        assert latency["Count"] == 3
+
+    def test_one_line_per_dimension_set(self, capsys):
+        import monitoring
+        monitoring.emit_metric("ErrorCount", 1, "Count", [{"Name": "StatusCode", "Value": "404"}])
+        monitoring.emit_metric("ErrorCount", 1, "Count", [{"Name": "StatusCode", "Value": "500"}])
+        _, lines = self._flush_to_stdout(capsys)
+
+        assert sorted(line["StatusCode"] for line in lines) == ["404", "500"]
+
+    def test_histogram_is_capped_at_emf_value_limit(self):
+        import monitoring
+        buffer = monitoring.MetricsBuffer()
+        for index in range(400):
+            buffer.add("ResponseLatency", 1.1 ** index, "Milliseconds")
+        (histogram,) = buffer._histograms.values()
+        assert len(histogram) == monitoring.EMF_MAX_VALUES
+        assert sum(histogram.values()) == 400
 
 
 # ---------------------------------------------------------------------------
@@ -137,9 +278,13 @@ class TestRequestLifecycle:
                     mock_client = MagicMock()
                     mock_cw.return_value = mock_client
                     monitoring.record_request_end(g, mock_response, "health", "GET")
+                    mock_client.put_metric_data.assert_not_called()
+                    monitoring.flush_metrics()
 
-            # Two metrics: RequestCount + ResponseLatency
-            assert mock_client.put_metric_data.call_count == 2
+            # One batched call with two metrics: RequestCount + ResponseLatency
+            assert mock_client.put_metric_data.call_count == 1
+            data = mock_client.put_metric_data.call_args[1]["MetricData"]
+            assert {d["MetricName"] for d in data} == {"RequestCount", "ResponseLatency"}
 
     def test_record_request_end_emits_error_metric_on_4xx(self, app):
         import monitoring
@@ -155,9 +300,28 @@ class TestRequestLifecycle:
                     mock_client = MagicMock()
                     mock_cw.return_value = mock_client
                     monitoring.record_request_end(g, mock_response, "not_found", "GET")
+                    monitoring.flush_metrics()
 
             # RequestCount + ResponseLatency + ErrorCount = 3
-            assert mock_client.put_metric_data.call_count == 3
+            assert len(mock_client.put_metric_data.call_args[1]["MetricData"]) == 3
+
+    def test_record_request_end_collapses_unmatched_routes(self, app):
+        import monitoring
+        mock_response = MagicMock()
+        mock_response.status_code = 404
+        buffer = monitoring.MetricsBuffer()
+
+        with app.test_request_context("/"):
+            from flask import g
+            with patch.object(monitoring, "CLOUDWATCH_ENABLED", True):
+                with patch.object(monitoring, "_metrics_buffer", buffer):
+                    for _ in range(3):
+                        monitoring.record_request_start(g)
+                        monitoring.record_request_end(g, mock_response, None, "GET")
+
+        endpoints = {dict(dims)["Endpoint"] for _, _, dims in buffer._series}
+        assert endpoints == {monitoring.UNMATCHED_ENDPOINT}
+        assert all(stats["SampleCount"] == 3 for stats in buffer._series.values())
 
     def test_record_request_end_no_op_when_start_missing(self, app):
         """Should return early without raising if request_start was never set."""
@@ -1,10 +1,14 @@
 """Tests for GET /api/vo/dashboard."""
 
 import time
+from datetime import datetime, timedelta
+
+import jwt
 import pytest
 from flask import Flask
 
 from api.auth import auth_bp
+from config import JWT_ALGORITHM, JWT_SECRET
 from api.vo_dashboard import vo_dashboard_bp
 
 created_test_emails = []
@@ -68,3 +72,245 @@ def test_vo_dashboard_returns_structure(client, vo_user_credentials):
     assert "todayIndex" in we
     assert len(we["dailyEarnings"]) == 7
     assert 0 <= we["todayIndex"] <= 6
+
+
+def test_vo_dashboard_aggregates_vessel_contracts_with_debug_timings(monkeypatch):
+    import api.vo_dashboard as vo_dashboard_api
+
+    user_id = "user-vo-fanout"
+    vessels = [
+        {"id": "vessel-a", "userId": user_id, "maxCapacity": 100, "latestSoc": 64},
+        {"id": "vessel-b", "userId": user_id, "maxCapacity": 80, "capacity": 40},
+    ]
+    contracts_by_vessel = {
+        "vessel-a": [
+            {"id": "c-1", "status": "completed", "energyAmount": 10, "totalValue": 5}
+        ],
+        "vessel-b": [
+            {"id": "c-2", "status": "completed", "energyAmount": 20, "totalValue": 7},
+            {"id": "c-3", "status": "pending", "energyAmount": 30, "totalValue": 9},
+        ],
+    }
+    updates = []
+
+    class _FakeUsersClient:
+        def get_item(self, key):
+            return {"id": user_id}
+
+        def update_item(self, key, update_data):
+            updates.append(update_data)
+            return {}
+
+    class _FakeVesselsClient:
+        def query_gsi(self, index_name, key_condition_expression):
+            assert index_name == "userId-index"
+            return [dict(vessel) for vessel in vessels]
+
+    monkeypatch.setattr(vo_dashboard_api, "_users_client", _FakeUsersClient())
+    monkeypatch.setattr(vo_dashboard_api, "_vessels_client", _FakeVesselsClient())
+    monkeypatch.setattr(
+        vo_dashboard_api.contract_service,
+        "list_contracts",
+        lambda status_filter=None, vessel_id=None: contracts_by_vessel[vessel_id],
+    )
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.debug = True
+    app.register_blueprint(vo_dashboard_bp, url_prefix="/api/vo")
+    token = jwt.encode(
+        {
+            "user_id": user_id,
+            "role": 2,
+            "type": 1,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        },
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+    rv = app.test_client().get(
+        "/api/vo/dashboard", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert rv.status_code == 200, rv.get_json()
+    data = rv.get_json()
+    assert data["metrics"]["contractsCompleted"] == 2
+    assert data["metrics"]["totalKwhDischarged"] == 30
+    assert data["currentVessel"]["id"] == "vessel-a"
+    assert data["currentVessel"]["socPercent"] == 64
+    assert updates[0]["currentVesselId"] == "vessel-a"
+    assert {"userAndVesselsMs", "contractsMs", "aggregateMs", "totalMs"} <= set(
+        data["debugTimings"]
+    )
+
+
+def test_vo_dashboard_serves_cached_snapshot_until_vessel_invalidated(monkeypatch):
+    import api.vo_dashboard as vo_dashboard_api
+    from services.vo_dashboard import invalidate_vo_dashboard_for_vessels
+
+    user_id = "user-vo-cached"
+    contract_reads = []
+
+    class _FakeUsersClient:
+        def get_item(self, key):
+            return {"id": user_id, "currentVesselId": "vessel-a"}
+
+    class _FakeVesselsClient:
+        def query_gsi(self, index_name, key_condition_expression):
+            return [{"id": "vessel-a", "userId": user_id, "maxCapacity": 100}]
+
+    def _list_contracts(status_filter=None, vessel_id=None):
+        contract_reads.append(vessel_id)
+        return [{"id": "c-1", "status": "completed", "totalValue": 4}]
+
+    monkeypatch.setattr(vo_dashboard_api, "_users_client", _FakeUsersClient())
+    monkeypatch.setattr(vo_dashboard_api, "_vessels_client", _FakeVesselsClient())
+    monkeypatch.setattr(
+        vo_dashboard_api.contract_service, "list_contracts", _list_contracts
+    )
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.register_blueprint(vo_dashboard_bp, url_prefix="/api/vo")
+    token = jwt.encode(
+        {
+            "user_id": user_id,
+            "role": 2,
+            "type": 1,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        },
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    test_client = app.test_client()
+
+    # A user's first load only learns its vessel ids: their versions were
+    # not read before it, so it cannot be stored.
+    cold = test_client.get("/api/vo/dashboard", headers=headers)
+    first = test_client.get("/api/vo/dashboard", headers=headers)
+    second = test_client.get("/api/vo/dashboard", headers=headers)
+    assert cold.status_code == first.status_code == second.status_code == 200
+    assert second.get_json()["metrics"] == first.get_json()["metrics"]
+    assert contract_reads == ["vessel-a", "vessel-a"]
+
+    invalidate_vo_dashboard_for_vessels(["vessel-a"])
+    third = test_client.get("/api/vo/dashboard", headers=headers)
+
+    assert third.status_code == 200
+    assert contract_reads == ["vessel-a", "vessel-a", "vessel-a"]
+
+
+def test_soc_history_queries_the_current_vessel_in_the_window(monkeypatch):
+    import boto3
+
+    import api.vo_dashboard as vo_dashboard_api
+    import config
+
+    user_id = "user-vo-history"
+    now = datetime.utcnow()
+    table = boto3.resource("dynamodb", region_name=config.AWS_REGION).Table(
+        config.MEASUREMENTS_TABLE
+    )
+    for measurement_id, vessel_id, age, soc in (
+        ("m-recent", "vessel-a", timedelta(hours=2), 55),
+        ("m-older", "vessel-a", timedelta(days=1), 70),
+        ("m-stale", "vessel-a", timedelta(days=9), 90),
+        ("m-other", "vessel-b", timedelta(hours=1), 10),
+    ):
+        table.put_item(
+            Item={
+                "id": measurement_id,
+                "vesselId": vessel_id,
+                "timestamp": (now - age).isoformat(),
+                "currentSOC": soc,
+            }
+        )
+
+    class _FakeUsersClient:
+        def get_item(self, key):
+            return {"id": user_id, "currentVesselId": "vessel-a"}
+
+    def _no_scan(*args, **kwargs):
+        raise AssertionError("soc-history must not scan the measurements table")
+
+    monkeypatch.setattr(vo_dashboard_api, "_users_client", _FakeUsersClient())
+    monkeypatch.setattr(vo_dashboard_api._measurements_client, "scan_items", _no_scan)
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.register_blueprint(vo_dashboard_bp, url_prefix="/api/vo")
+    token = jwt.encode(
+        {
+            "user_id": user_id,
+            "role": 2,
+            "type": 1,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        },
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+    rv = app.test_client().get(
+        "/api/vo/soc-history", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert rv.status_code == 200, rv.get_json()
+    assert [point["socPercent"] for point in rv.get_json()["points"]] == [70, 55]
+
+
+def test_vo_dashboard_reads_on_the_pool_are_in_the_request_ledger():
+    import boto3
+    from flask import g
+
+    import config
+    from monitoring import record_request_start
+
+    user_id = "user-vo-ledger"
+    dynamodb = boto3.resource("dynamodb", region_name=config.AWS_REGION)
+    dynamodb.Table(config.USERS_TABLE).put_item(
+        Item={"id": user_id, "currentVesselId": "vessel-a"}
+    )
+    for vessel_id in ("vessel-a", "vessel-b"):
+        dynamodb.Table(config.VESSELS_TABLE).put_item(
+            Item={"id": vessel_id, "userId": user_id, "maxCapacity": 100}
+        )
+
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.register_blueprint(vo_dashboard_bp, url_prefix="/api/vo")
+    summaries = []
+
+    @app.before_request
+    def _before():
+        record_request_start(g)
+
+    @app.after_request
+    def _after(response):
+        summaries.append(g.dynamo_ledger.summary())
+        return response
+
+    token = jwt.encode(
+        {
+            "user_id": user_id,
+            "role": 2,
+            "type": 1,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        },
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+
+    rv = app.test_client().get(
+        "/api/vo/dashboard", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert rv.status_code == 200, rv.get_json()
+    (summary,) = summaries
+    assert summary["dynamo_calls"] == 4
+    assert summary["dynamo_operations"] == {
+        f"{config.USERS_TABLE}.GetItem": 1,
+        f"{config.VESSELS_TABLE}/userId-index.Query": 1,
+        f"{config.CONTRACTS_TABLE}/vesselId-index.Query": 2,
+    }
@@ -0,0 +1,77 @@
+"""ISO-8601 timestamp helpers shared by the services.
+
+Timestamps are stored as ISO strings and the same values (event start times,
+contract windows) are parsed over and over in sort keys and service loops.
+Parsing goes through an LRU cache keyed by the raw string, and callers that
+only compare or bucket timestamps use ``parse_epoch_us`` to get plain integer
+microseconds since the Unix epoch.
+
+Accepted input: ``datetime`` objects and ISO strings with or without an
+offset, with a ``Z`` suffix, or date-only.  Naive values are taken as UTC.
+Unparseable values return ``None``.
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
+US_PER_SECOND = 1_000_000
+US_PER_MINUTE = 60 * US_PER_SECOND
+US_PER_HOUR = 60 * US_PER_MINUTE
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _ONE_US
+
+
+def from_epoch_us(epoch_us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(epoch_us))
+
+
+@lru_cache(maxsize=65536)
+def _parse_string(value: str) -> Optional[datetime]:
+    text = value.strip()
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        # Interpreters before 3.11 reject the "Z" suffix.
+        if not text.endswith(("Z", "z")):
+            return None
+        try:
+            parsed = datetime.fromisoformat(text[:-1] + "+00:00")
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=65536)
+def _parse_string_epoch_us(value: str) -> Optional[int]:
+    parsed = _parse_string.__wrapped__(value)
+    return to_epoch_us(parsed) if parsed is not None else None
+
+
+def parse_iso(value: Any) -> Optional[datetime]:
+    """Return an aware datetime, keeping the stored offset."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str):
+        return _parse_string(value)
+    return None
+
+
+def parse_utc(value: Any) -> Optional[datetime]:
+    parsed = parse_iso(value)
+    return parsed.astimezone(timezone.utc) if parsed is not None else None
+
+
+def parse_epoch_us(value: Any) -> Optional[int]:
+    if isinstance(value, str):
+        return _parse_string_epoch_us(value)
+    if isinstance(value, datetime):
+        return to_epoch_us(value)
+    return None
@@ -0,0 +1,59 @@
+"""Warm-up for freshly started server processes.
+
+Gunicorn preloads the app in its master and forks the workers from it.
+Sockets must not be shared across a fork, and the in-process cache belongs to
+each worker, so ``warm_up`` runs in every worker after the fork
+(``post_worker_init`` in ``gunicorn.conf.py``), before the worker accepts requests:
+
+* every ``DynamoClient`` resolves its credentials and opens its connection,
+  so the first requests don't pay for the credential lookup and TLS handshake;
+* station lookups, read by event creation, eligibility and monitoring, are
+  loaded into the cache.
+
+Warm-up is best effort: the first failure (no credentials, DynamoDB
+unreachable) is logged and the remaining steps are skipped, so a worker never
+spends longer than one failed call starting up.
+"""
+
+import time
+from typing import Dict
+
+import config
+from db.dynamoClient import DynamoClient, warm_up_clients
+from monitoring import logger
+from services.drevents.service import DynamoStationRepository as EventStationRepository
+from services.eligibility.service import (
+    DynamoStationRepository as EligibilityStationRepository,
+)
+
+_MAX_PRIMED_STATIONS = 200
+
+
+def _prime_station_cache() -> int:
+    client = DynamoClient(config.STATIONS_TABLE, config.AWS_REGION)
+    repositories = [EventStationRepository(client), EligibilityStationRepository(client)]
+    stations, _ = client.scan_page(limit=_MAX_PRIMED_STATIONS, projection=["id"])
+    station_ids = [station["id"] for station in stations]
+    for station_id in station_ids:
+        for repository in repositories:
+            repository.get_station(station_id)
+    return len(station_ids)
+
+
+def warm_up() -> Dict[str, int]:
+    """Prime this process's DynamoDB clients and station cache."""
+    started = time.perf_counter()
+    primed: Dict[str, int] = {}
+    try:
+        primed["clients"] = warm_up_clients()
+        primed["stations"] = _prime_station_cache()
+    except Exception as error:
+        logger.warning("Warm-up stopped early: %s", error, extra={"primed": primed})
+        return primed
+    logger.info(
+        "Warm-up primed %d DynamoDB clients and %d stations in %.0f ms",
+        primed["clients"],
+        primed["stations"],
+        (time.perf_counter() - started) * 1000,
+    )
+    return primed
@@ -24,6 +24,8 @@ export class DynamoDbTables {
   public readonly drEventsTable: dynamodb.ITable;
   public readonly orgsTable: dynamodb.ITable;
   public readonly measurementsTable: dynamodb.ITable;
+  public readonly rateLimitsTable: dynamodb.ITable;
+  public readonly analyticsRollupsTable: dynamodb.ITable;
 
   constructor(tableScope: Construct, props: DynamoDbTablesProps) {
     const { environmentName, useExistingTables } = props;
@@ -59,6 +61,16 @@ export class DynamoDbTables {
       this.measurementsTable = dynamodb.Table.fromTableName(
         tableScope, 'MeasurementsTable', `aquacharge-measurements-${environmentName}`
       );
+      // Imported only: create this table (partition key id, TTL on expiresAt)
+      // before pointing RATELIMIT_STORAGE_URI at it.
+      this.rateLimitsTable = dynamodb.Table.fromTableName(
+        tableScope, 'RateLimitsTable', `aquacharge-ratelimits-${environmentName}`
+      );
+      // Imported only: create this table (partition key id) before the
+      // analytics materializer stores rollups.
+      this.analyticsRollupsTable = dynamodb.Table.fromTableName(
+        tableScope, 'AnalyticsRollupsTable', `aquacharge-analyticsrollups-${environmentName}`
+      );
     } else {
       // Users Table
       const usersTable = new dynamodb.Table(tableScope, 'UsersTable', {
@@ -301,6 +313,35 @@ export class DynamoDbTables {
         partitionKey: { name: 'vesselId', type: dynamodb.AttributeType.STRING},
         projectionType: dynamodb.ProjectionType.ALL
       })
+
+      // SoC history: one vessel's measurements in a time range
+      measurementsTable.addGlobalSecondaryIndex({
+        indexName: 'vesselId-timestamp-index',
+        partitionKey: { name: 'vesselId', type: dynamodb.AttributeType.STRING },
+        sortKey: { name: 'timestamp', type: dynamodb.AttributeType.STRING },
+        projectionType: dynamodb.ProjectionType.ALL
+      })
+
+      // Rate Limits Table (shared API rate-limit counters; expired windows removed by TTL)
+      const rateLimitsTable = new dynamodb.Table(tableScope, 'RateLimitsTable', {
+        tableName: `aquacharge-ratelimits-${environmentName}`,
+        partitionKey: { name: 'id', type: dynamodb.AttributeType.STRING },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        removalPolicy: cdk.RemovalPolicy.RETAIN,
+        encryption: dynamodb.TableEncryption.AWS_MANAGED,
+        timeToLiveAttribute: 'expiresAt',
+      });
+      this.rateLimitsTable = rateLimitsTable;
+
+      // Analytics Rollups Table (per-vessel parts of stored DR event rollups)
+      const analyticsRollupsTable = new dynamodb.Table(tableScope, 'AnalyticsRollupsTable', {
+        tableName: `aquacharge-analyticsrollups-${environmentName}`,
+        partitionKey: { name: 'id', type: dynamodb.AttributeType.STRING },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        removalPolicy: cdk.RemovalPolicy.RETAIN,
+        encryption: dynamodb.TableEncryption.AWS_MANAGED,
+      });
+      this.analyticsRollupsTable = analyticsRollupsTable;
     }
   }
 }
\ No newline at end of file
@@ -26,6 +26,8 @@ export class InfraStack extends cdk.Stack {
   public readonly portsTable: dynamodb.ITable;
   public readonly drEventsTable: dynamodb.ITable;
   public readonly orgsTable: dynamodb.ITable;
+  public readonly rateLimitsTable: dynamodb.ITable;
+  public readonly analyticsRollupsTable: dynamodb.ITable;
 
   constructor(scope: Construct, id: string, props?: InfraStackProps) {
     super(scope, id, props);
@@ -53,6 +55,8 @@ export class InfraStack extends cdk.Stack {
     this.portsTable = tables.portsTable;
     this.drEventsTable = tables.drEventsTable;
     this.orgsTable = tables.orgsTable;
+    this.rateLimitsTable = tables.rateLimitsTable;
+    this.analyticsRollupsTable = tables.analyticsRollupsTable;
 
     // ===== VPC (Simplified - only public subnets, no NAT Gateway) =====
     const vpc = new ec2.Vpc(this, 'AquaChargeVpc', {
@@ -139,6 +143,8 @@ export class InfraStack extends cdk.Stack {
     this.portsTable.grantReadWriteData(ec2Role);
     this.drEventsTable.grantReadWriteData(ec2Role);
     this.orgsTable.grantReadWriteData(ec2Role);
+    this.rateLimitsTable.grantReadWriteData(ec2Role);
+    this.analyticsRollupsTable.grantReadWriteData(ec2Role);
 
     // Grant additional permissions for GSI queries (indexes)
     // grantReadWriteData only covers the table, not the indexes